@@ -0,0 +1,97 @@
+"""Import-time benchmark of elaws_api_python.
+
+Each module is imported in a fresh interpreter with `-X importtime`, and
+the best cumulative time over several runs is compared with a budget. It
+also checks that importing a module does not load heavy dependencies that
+are only needed on first use (the HTTP stack, xmlschema, numpy, pyarrow).
+
+Run it from the repository root:
+
+    python benchmarks/import_time.py [--repeat 5] [--budget-ms 50]
+
+The exit status is 1 if a module exceeds the budget or loads a deferred
+dependency, so it can guard CI against regressions.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+MODULES = (
+    "elaws_api_python",
+    "elaws_api_python.base",
+    "elaws_api_python.cache_backends",
+    "elaws_api_python.classes",
+    "elaws_api_python.classes.laws_and_ordinances_response",
+    "elaws_api_python.classes.law_text_response",
+    "elaws_api_python.classes.law_content_response",
+    "elaws_api_python.main",
+    "elaws_api_python.records",
+    "elaws_api_python.search",
+    "elaws_api_python.near_duplicates",
+)
+DEFERRED = ("requests", "urllib3", "xmlschema", "numpy", "pyarrow")
+REPEAT = 5
+BUDGET_MS = 50.0
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(module: str) -> Tuple[float, List[str]]:
+    """
+    Import `module` in a fresh interpreter.
+
+    Returns
+    -------
+    Tuple[float, List[str]]
+        Cumulative import time of `module` in milliseconds, and the
+        deferred dependencies that were loaded by the import.
+    """
+    code = (
+        f"import {module}, sys; "
+        f"print(','.join(name for name in {DEFERRED!r} if name in sys.modules))"
+    )
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env, check=True
+    )
+    cumulative_us = 0
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            cumulative_us = int(fields[1])
+    loaded = [name for name in process.stdout.strip().split(",") if name]
+    return cumulative_us / 1000.0, loaded
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    failed = False
+    results: Dict[str, Tuple[float, List[str]]] = {}
+    for module in MODULES:
+        runs = [measure(module) for _ in range(args.repeat)]
+        results[module] = (min(run[0] for run in runs), runs[0][1])
+
+    width = max(len(module) for module in MODULES)
+    for module, (elapsed, loaded) in results.items():
+        status = "ok"
+        if elapsed > args.budget_ms:
+            status = "OVER BUDGET"
+            failed = True
+        if loaded:
+            status = "LOADS " + ", ".join(loaded)
+            failed = True
+        print(f"{module:<{width}}  {elapsed:8.2f} ms  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,482 @@
+"""elaws_api_python.appendix
+
+Extraction of the appended tables (別表) of laws and ordinances into rows
+and columns, and an index of them by law ID and table number.
+
+Examples
+--------
+>>> from elaws_api_python.bulk import acquire_law_texts
+>>> index = AppendixIndex()
+>>> for result in acquire_law_texts(1, law_ids, extract=extract_appendix_tables):
+...     index.add(result.value)
+>>> index.get("129AC0000000089", "別表第一").tables[0].rows
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from xml.etree import ElementTree as ET
+
+from .batch import appdx_table_num
+from .classes.law_model import AMEND_PROVISION_TAG
+from .records import element_text, sentence_text
+
+Row = Tuple[str, ...]
+
+
+class Table(NamedTuple):
+    """
+    A table of an appended table, with the cells spanning several rows or
+    columns repeated at each position they cover, so that all the rows have
+    the same number of columns.
+
+    Attributes
+    ----------
+    title : str
+        Title of the table (`TableStructTitle`), if any.
+    header : Tuple[Tuple[str, ...], ...]
+        Header rows (`TableHeaderRow`).
+    rows : Tuple[Tuple[str, ...], ...]
+        Body rows (`TableRow`).
+    remarks : str
+        Remarks under the table.
+    """
+    title: str
+    header: Tuple[Row, ...]
+    rows: Tuple[Row, ...]
+    remarks: str
+
+    @property
+    def width(self) -> int:
+        """
+        Number of columns.
+        """
+        return max((len(row) for row in self.header + self.rows), default=0)
+
+    def records(self, header_row: bool = False) -> List[Dict[str, str]]:
+        """
+        Convert the rows into records keyed by column name.
+
+        Parameters
+        ----------
+        header_row : bool, optional
+            If True, the first body row gives the column names, for tables
+            without `TableHeaderRow`. Default is False.
+
+        Returns
+        -------
+        List[Dict[str, str]]
+            A record per row. Columns are named by the last header row, or
+            numbered from "1" if the table has none.
+        """
+        rows = self.rows
+        if header_row and rows:
+            names, rows = rows[0], rows[1:]
+        elif self.header:
+            names = self.header[-1]
+        else:
+            names = tuple(str(column) for column in range(1, self.width + 1))
+        # make repeated names (from spanning header cells) unique
+        keys: List[str] = []
+        for name in names:
+            key, suffix = name, 2
+            while key in keys:
+                key, suffix = f"{name}_{suffix}", suffix + 1
+            keys.append(key)
+        return [dict(zip(keys, row)) for row in rows]
+
+
+class AppendixTable(NamedTuple):
+    """
+    An appended table (`AppdxTable`) of a law/ordinance.
+
+    Attributes
+    ----------
+    law_id : str, optional
+        Law ID.
+    num : str
+        Num of the table, e.g. "1" for "別表第一".
+    title : str
+        Title, e.g. "別表第一".
+    related_article_num : str
+        Related articles, e.g. "（第二条関係）".
+    tables : Tuple[Table, ...]
+        The tables (`TableStruct`) in order.
+    text : str
+        Text outside the tables, e.g. of items listed instead of a table.
+    """
+    law_id: Optional[str]
+    num: str
+    title: str
+    related_article_num: str
+    tables: Tuple[Table, ...]
+    text: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the appended table into a JSON-serializable dict.
+        """
+        data = self._asdict()
+        data["tables"] = [table._asdict() for table in self.tables]
+        return data
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]):
+        """
+        Static method to create an AppendixTable object from `to_dict` output.
+        """
+        tables = tuple(
+            Table(
+                table["title"],
+                tuple(tuple(row) for row in table["header"]),
+                tuple(tuple(row) for row in table["rows"]),
+                table["remarks"],
+            )
+            for table in data["tables"]
+        )
+        return AppendixTable(
+            data["law_id"], data["num"], data["title"],
+            data["related_article_num"], tables, data["text"]
+        )
+
+
+def _blocks_text(text: Optional[str], children: Iterable[ET.Element]) -> str:
+    # Sentences run on; items, columns and remarks start new lines.
+    lines: List[str] = []
+    inline: List[str] = [text.strip()] if text and text.strip() else []
+    for child in children:
+        if child.tag in ("Sentence", "Ruby", "Line", "Sup", "Sub"):
+            inline.append(element_text(child))
+            continue
+        if inline:
+            lines.append("".join(inline))
+            inline = []
+        if child.tag.startswith(("Item", "Subitem")):
+            title = element_text(child.find(child.tag + "Title"))
+            texts = [
+                sentence_text(grandchild) for grandchild in child
+                if grandchild.tag.endswith("Sentence")
+            ]
+            lines.append("　".join(text for text in [title] + texts if text))
+        else:
+            lines.append(element_text(child))
+    if inline:
+        lines.append("".join(inline))
+    return "\n".join(line for line in lines if line)
+
+
+def _cell_text(elem: ET.Element) -> str:
+    return _blocks_text(elem.text, elem)
+
+
+def _span(elem: ET.Element, name: str) -> int:
+    try:
+        return max(1, int(elem.get(name, "1")))
+    except ValueError:
+        return 1
+
+
+def _grid(rows: List[ET.Element], cell_tag: str) -> Tuple[Row, ...]:
+    # Place the cells in a grid, skipping positions covered by cells of
+    # earlier rows that span downwards.
+    grid: Dict[Tuple[int, int], str] = {}
+    width = 0
+    for row_index, row in enumerate(rows):
+        column = 0
+        for cell in row.findall(cell_tag):
+            while (row_index, column) in grid:
+                column += 1
+            text = _cell_text(cell)
+            rowspan, colspan = _span(cell, "rowspan"), _span(cell, "colspan")
+            for row_offset in range(rowspan):
+                for column_offset in range(colspan):
+                    grid[(row_index + row_offset, column + column_offset)] = text
+            column += colspan
+            width = max(width, column)
+    return tuple(
+        tuple(grid.get((row_index, column), "") for column in range(width))
+        for row_index in range(len(rows))
+    )
+
+
+def parse_table(table_struct: ET.Element) -> Table:
+    """
+    Convert a `TableStruct` element into a Table.
+
+    Parameters
+    ----------
+    table_struct : xml.etree.ElementTree.Element
+        The element.
+
+    Returns
+    -------
+    Table
+        The table.
+    """
+    table = table_struct.find("Table")
+    header_rows = table.findall("TableHeaderRow") if table is not None else []
+    body_rows = table.findall("TableRow") if table is not None else []
+    header = _grid(header_rows, "TableHeaderColumn")
+    rows = _grid(body_rows, "TableColumn")
+    # align the header and the body to the same width
+    width = max((len(row) for row in header + rows), default=0)
+    return Table(
+        element_text(table_struct.find("TableStructTitle")),
+        tuple(row + ("",) * (width - len(row)) for row in header),
+        tuple(row + ("",) * (width - len(row)) for row in rows),
+        "\n".join(_cell_text(remarks) for remarks in table_struct.findall("Remarks")),
+    )
+
+
+def parse_appendix_table(elem: ET.Element, law_id: Optional[str] = None) -> AppendixTable:
+    """
+    Convert an `AppdxTable` element into an AppendixTable.
+
+    Parameters
+    ----------
+    elem : xml.etree.ElementTree.Element
+        The element.
+    law_id : str, optional
+        Law ID.
+
+    Returns
+    -------
+    AppendixTable
+        The appended table.
+    """
+    tables = [parse_table(child) for child in elem.findall("TableStruct")]
+    others = [
+        child for child in elem
+        if child.tag not in ("TableStruct", "AppdxTableTitle", "RelatedArticleNum")
+    ]
+    return AppendixTable(
+        law_id, elem.get("Num", ""),
+        element_text(elem.find("AppdxTableTitle")),
+        element_text(elem.find("RelatedArticleNum")),
+        tuple(tables),
+        _blocks_text(None, others),
+    )
+
+
+def find_appendix_tables(elem: ET.Element, law_id: Optional[str] = None) -> List[AppendixTable]:
+    """
+    Extract the appended tables under an element.
+
+    Parameters
+    ----------
+    elem : xml.etree.ElementTree.Element
+        The element, e.g. `LawTextResponse.law_full_text` or
+        `LawContentResponse.appl_data.law_contents`.
+    law_id : str, optional
+        Law ID.
+
+    Returns
+    -------
+    List[AppendixTable]
+        The appended tables in document order. Tables in `AmendProvision`,
+        which belong to the law being amended, are not included.
+    """
+    tables = []
+    stack = [elem]
+    while stack:
+        current = stack.pop()
+        if current.tag == "AppdxTable":
+            tables.append(parse_appendix_table(current, law_id))
+        elif current.tag != AMEND_PROVISION_TAG:
+            stack.extend(reversed(current))
+    return tables
+
+
+def iter_appendix_tables_from_chunks(
+    chunks: Iterable[bytes], law_id: Optional[str] = None
+) -> Iterator[AppendixTable]:
+    """
+    Extract the appended tables of a full text while it is being parsed.
+
+    Elements outside the appended tables are released as soon as they end,
+    and each appended table once it is converted, so the memory held is
+    bounded by the largest appended table rather than the whole document.
+
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        Chunks of the raw response of `base.request_law_text`,
+        e.g. from `base.stream_law_text`.
+    law_id : str, optional
+        Law ID. Taken from the response if not given.
+
+    Yields
+    ------
+    AppendixTable
+        The appended tables in document order, except those in
+        `AmendProvision`.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    parents: List[ET.Element] = []
+    depth = 0  # number of open AppdxTable elements
+    amend_depth = 0  # number of open AmendProvision elements
+
+    def read_events() -> Iterator[AppendixTable]:
+        nonlocal law_id, depth, amend_depth
+        for event, elem in parser.read_events():
+            if event == "start":
+                parents.append(elem)
+                if elem.tag == AMEND_PROVISION_TAG:
+                    amend_depth += 1
+                elif elem.tag == "AppdxTable" and not amend_depth:
+                    depth += 1
+                continue
+            parents.pop()
+            if elem.tag == AMEND_PROVISION_TAG:
+                amend_depth -= 1
+            elif elem.tag == "AppdxTable" and not amend_depth:
+                depth -= 1
+                if depth == 0:
+                    yield parse_appendix_table(elem, law_id)
+            elif depth > 0:
+                continue
+            elif elem.tag == "LawId" and law_id is None:
+                law_id = elem.text
+            if parents:
+                parents[-1].remove(elem)
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from read_events()
+    parser.close()
+    yield from read_events()
+
+
+def extract_appendix_tables(content: bytes) -> List[AppendixTable]:
+    """
+    Extract the appended tables of a raw response of `base.request_law_text`.
+
+    This is an extractor for `bulk.acquire_law_texts` whose values are
+    passed to `AppendixIndex.add`.
+    """
+    return list(iter_appendix_tables_from_chunks((content,)))
+
+
+class AppendixIndex:
+    """
+    Index of appended tables by law ID and table number.
+
+    Tables are looked up by their Num or by any notation normalized by
+    `batch.appdx_table_num`, e.g. "1", "第一", "別表第一" or "別表第一の二",
+    so tables extracted from full texts can be served instead of requesting
+    each one with `base.request_law_content(appdx_table=...)`.
+    """
+
+    def __init__(self, tables: Iterable[AppendixTable] = ()) -> None:
+        """
+        Initialize the AppendixIndex object.
+
+        Parameters
+        ----------
+        tables : Iterable[AppendixTable], optional
+            Initial tables.
+        """
+        self._tables: Dict[Tuple[str, str], AppendixTable] = {}
+        self._by_law: Dict[str, List[str]] = {}
+        self.add(tables)
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def __iter__(self) -> Iterator[AppendixTable]:
+        return iter(self._tables.values())
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return self.get(*key) is not None
+
+    @property
+    def law_ids(self) -> List[str]:
+        """
+        IDs of the laws with appended tables.
+        """
+        return list(self._by_law)
+
+    def add(self, tables: Iterable[AppendixTable]) -> int:
+        """
+        Add appended tables, replacing those with the same law ID and Num.
+
+        Returns
+        -------
+        int
+            Number of added tables.
+        """
+        count = 0
+        for table in tables:
+            key = (table.law_id or "", table.num)
+            if key not in self._tables:
+                self._by_law.setdefault(key[0], []).append(table.num)
+            self._tables[key] = table
+            count += 1
+        return count
+
+    def add_law_text(self, law_text) -> int:
+        """
+        Add the appended tables of a full text.
+
+        Parameters
+        ----------
+        law_text : LawTextResponse
+            The full text.
+
+        Returns
+        -------
+        int
+            Number of added tables.
+        """
+        if law_text.law_full_text is None:
+            return 0
+        return self.add(find_appendix_tables(law_text.law_full_text, law_text.appl_data.law_id))
+
+    def get(self, law_id: str, table: str) -> Optional[AppendixTable]:
+        """
+        Get an appended table.
+
+        Parameters
+        ----------
+        law_id : str
+            Law ID.
+        table : str
+            Num or notation of the table, e.g. "1" or "別表第一".
+
+        Returns
+        -------
+        AppendixTable, optional
+            The table, or None if it is not indexed.
+        """
+        found = self._tables.get((law_id, table))
+        if found is None:
+            found = self._tables.get((law_id, appdx_table_num(table)))
+        if found is None and table in ("", "別表"):
+            # a law with a single appended table may leave its Num empty
+            nums = self._by_law.get(law_id, [])
+            if len(nums) == 1:
+                found = self._tables[(law_id, nums[0])]
+        return found
+
+    def tables_of(self, law_id: str) -> List[AppendixTable]:
+        """
+        Get the appended tables of a law in document order.
+        """
+        return [self._tables[(law_id, num)] for num in self._by_law.get(law_id, [])]
+
+    def save(self, path: str) -> None:
+        """
+        Save the index as JSON lines, one table per line.
+        """
+        with open(path, "w", encoding="utf-8") as file_:
+            for table in self:
+                file_.write(json.dumps(table.to_dict(), ensure_ascii=False) + "\n")
+
+    @staticmethod
+    def load(path: str):
+        """
+        Static method to load an index saved by `save`.
+        """
+        with open(path, "r", encoding="utf-8") as file_:
+            return AppendixIndex(
+                AppendixTable.from_dict(json.loads(line)) for line in file_ if line.strip()
+            )
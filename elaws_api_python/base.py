@@ -1,15 +1,193 @@
 """elaws_api_python.base
 """
 
-from typing import Optional
-import requests
+import os
+from typing import Iterator, Optional
+
+from .cache import ResponseCache
 
 TIMEOUT_SEC = 30.0
+CHUNK_SIZE = 64 * 1024
+DEFAULT_BASE_URL = "https://elaws.e-gov.go.jp/api"
+# Base URL of the requests, e.g. that of a `proxy.CachingProxy` shared by
+# several clients. It can be set with the environment variable
+# ELAWS_API_BASE_URL, or by assigning to it at run time.
+BASE_URL = os.environ.get("ELAWS_API_BASE_URL", DEFAULT_BASE_URL).rstrip("/")
+
+# Law types of `request_laws_and_ordinances`.
+LAWTYPE_ALL = 1
+LAWTYPE_CONSTITUTION_AND_ACTS = 2
+LAWTYPE_CABINET_ORDERS = 3
+LAWTYPE_MINISTERIAL_ORDINANCES = 4
+LAWTYPES = (
+    LAWTYPE_ALL,
+    LAWTYPE_CONSTITUTION_AND_ACTS,
+    LAWTYPE_CABINET_ORDERS,
+    LAWTYPE_MINISTERIAL_ORDINANCES,
+)
+
+
+def build_laws_and_ordinances_url(version: int, lawtype: int) -> str:
+    """
+    Build the URL to acquire a list of laws and ordinances.
+    """
+    return f"{BASE_URL}/{version}/lawlists/{lawtype}"
+
+
+def build_law_text_url(version: int, law_id_or_law_number: str) -> str:
+    """
+    Build the URL to acquire the full text of a law/ordinance.
+    """
+    return f"{BASE_URL}/{version}/lawdata/{law_id_or_law_number}"
+
+
+def build_law_content_url(
+    version: int, law_number: Optional[str] = None,
+    law_id: Optional[str] = None, article: Optional[str] = None,
+    paragraph: Optional[str] = None, appdx_table: Optional[str] = None
+) -> str:
+    """
+    Build the URL to acquire the content of the current law/ordinance.
+    """
+    url = f"{BASE_URL}/{version}/articles;"
+    if law_number is not None:
+        url += f"lawNum={law_number};"
+    if law_id is not None:
+        url += f"lawId={law_id};"
+    if article is not None:
+        url += f"article={article};"
+    if paragraph is not None:
+        url += f"paragraph={paragraph};"
+    if appdx_table is not None:
+        url += f"appdxTable={appdx_table}"
+    return url
+
+
+def build_updated_laws_url(version: int, date: int) -> str:
+    """
+    Build the URL to acquire the list of updated laws and ordinances.
+    """
+    return f"{BASE_URL}/{version}/updatelawlists/{date}"
+
+
+def _response_encoding(response, body: bytes) -> str:
+    """
+    Character encoding of a response body to cache: that of the headers,
+    else the one detected from `body` like `Response.apparent_encoding`,
+    else UTF-8. `body` is passed since a streamed response has no content.
+    """
+    if response.encoding:
+        return response.encoding
+    from requests.compat import chardet
+
+    detected = chardet.detect(body)["encoding"] if chardet is not None else None
+    return detected or "utf-8"
+
+
+def _get(url: str, timeout: float, cache: Optional[ResponseCache] = None) -> str:
+    """
+    Send a GET request and return the decoded body.
+
+    If `cache` is given, the cached entry for `url` is revalidated with
+    `If-None-Match`/`If-Modified-Since`, and its body is reused on 304.
+    An entry still fresh for the cache, e.g. one just downloaded by another
+    process sharing its backend, is used without a request.
+    """
+    # imported on first use, since importing requests dominates the startup
+    import requests
+
+    if cache is None:
+        response = requests.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.text
+
+    entry = cache.get(url)
+    if entry is not None and cache.is_fresh(entry):
+        return entry.text
+    headers = entry.conditional_headers() if entry is not None else {}
+    response = requests.get(url, headers=headers, timeout=timeout)
+    if entry is not None and response.status_code == 304:
+        cache.revalidated(url)
+        return entry.text
+    response.raise_for_status()
+    entry = cache.update(
+        url, response.content, _response_encoding(response, response.content),
+        response.headers.get("ETag"), response.headers.get("Last-Modified")
+    )
+    return entry.text
+
+
+def _split(body: bytes, chunk_size: int) -> Iterator[bytes]:
+    for start in range(0, len(body), chunk_size):
+        yield body[start:start + chunk_size]
+
+
+def _iter_chunks(
+    url: str, timeout: float, chunk_size: int, cache: Optional[ResponseCache]
+) -> Iterator[bytes]:
+    import requests
+
+    entry = cache.get(url) if cache is not None else None
+    if entry is not None and cache.is_fresh(entry):
+        yield from _split(entry.body, chunk_size)
+        return
+    headers = entry.conditional_headers() if entry is not None else {}
+    with requests.get(url, headers=headers, timeout=timeout, stream=True) as response:
+        if entry is not None and response.status_code == 304:
+            cache.revalidated(url)
+            yield from _split(entry.body, chunk_size)
+            return
+        response.raise_for_status()
+        if cache is None:
+            yield from response.iter_content(chunk_size)
+            return
+        chunks = []
+        for chunk in response.iter_content(chunk_size):
+            chunks.append(chunk)
+            yield chunk
+        body = b"".join(chunks)
+        cache.update(
+            url, body, _response_encoding(response, body),
+            response.headers.get("ETag"), response.headers.get("Last-Modified")
+        )
+
+
+def _stream(
+    url: str, timeout: float, chunk_size: int = CHUNK_SIZE,
+    save_path: Optional[str] = None, cache: Optional[ResponseCache] = None
+) -> Iterator[bytes]:
+    """
+    Send a GET request and yield the raw body in chunks as it arrives.
+
+    If `save_path` is given, the chunks are also written to that file.
+    The file is written to `<save_path>.part` and renamed once the whole
+    body has been received, so a partial download never replaces it; the
+    `.part` file is removed if the request fails or the consumer stops
+    early.
+
+    If `cache` is given, the request is revalidated against it like in
+    `_get`, and the body is stored in it once it has been received as a
+    whole.
+    """
+    if save_path is None:
+        yield from _iter_chunks(url, timeout, chunk_size, cache)
+        return
+    part_path = save_path + ".part"
+    try:
+        with open(part_path, "wb") as file_:
+            for chunk in _iter_chunks(url, timeout, chunk_size, cache):
+                file_.write(chunk)
+                yield chunk
+        os.replace(part_path, save_path)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
 
 
 def request_laws_and_ordinances(
     version: int, lawtype: int,
-    timeout: float = TIMEOUT_SEC
+    timeout: float = TIMEOUT_SEC,
+    cache: Optional[ResponseCache] = None
 ) -> str:
     """
     Acquire a list of laws and ordinances.
@@ -22,6 +200,8 @@ def request_laws_and_ordinances(
         Law type.
     timeout : float, optional
         Timeout duration in seconds. Default is TIMEOUT_SEC.
+    cache : ResponseCache, optional
+        Cache to revalidate the response against. Default is None.
 
     Returns
     -------
@@ -33,16 +213,14 @@ def request_laws_and_ordinances(
     requests.exceptions.RequestException
         If an error occurs during the API request.
     """
-    url = f"https://elaws.e-gov.go.jp/api/{version}/lawlists/{lawtype}"
-
-    response = requests.get(url, timeout=timeout)
-    response.raise_for_status()
-    return response.text
+    url = build_laws_and_ordinances_url(version, lawtype)
+    return _get(url, timeout, cache)
 
 
 def request_law_text(
     version: int, law_id_or_law_number: str,
-    timeout: float = TIMEOUT_SEC
+    timeout: float = TIMEOUT_SEC,
+    cache: Optional[ResponseCache] = None
 ) -> str:
     """
     Acquire the full text of a law/ordinance.
@@ -53,6 +231,10 @@ def request_law_text(
         Version number of the e-Gov eLaw API.
     law_id_or_law_number : str
         Law ID or law number.
+    timeout : float, optional
+        Timeout duration in seconds. Default is TIMEOUT_SEC.
+    cache : ResponseCache, optional
+        Cache to revalidate the response against. Default is None.
 
     Returns
     -------
@@ -64,17 +246,16 @@ def request_law_text(
     requests.exceptions.RequestException
         If an error occurs during the API request.
     """
-    url = f"https://elaws.e-gov.go.jp/api/{version}/lawdata/{law_id_or_law_number}"
-    response = requests.get(url, timeout=timeout)
-    response.raise_for_status()
-    return response.text
+    url = build_law_text_url(version, law_id_or_law_number)
+    return _get(url, timeout, cache)
 
 
 def request_law_content(
     version: int, law_number: Optional[str] = None,
     law_id: Optional[str] = None, article: Optional[str] = None,
     paragraph: Optional[str] = None, appdx_table: Optional[str] = None,
-    timeout: float = TIMEOUT_SEC
+    timeout: float = TIMEOUT_SEC,
+    cache: Optional[ResponseCache] = None
 ) -> str:
     """
     Acquire the content of the current law/ordinance.
@@ -95,6 +276,8 @@ def request_law_content(
         Appendix table number. Defaults to None.
     timeout : float, optional
         Timeout duration in seconds. Default is TIMEOUT_SEC.
+    cache : ResponseCache, optional
+        Cache to revalidate the response against. Default is None.
 
     Returns
     -------
@@ -117,26 +300,16 @@ def request_law_content(
         raise ValueError(
             "Invalid combination of article, paragraph, and appdx_table.")
 
-    url = f"https://elaws.e-gov.go.jp/api/{version}/articles;"
-    if law_number is not None:
-        url += f"lawNum={law_number};"
-    if law_id is not None:
-        url += f"lawId={law_id};"
-    if article is not None:
-        url += f"article={article};"
-    if paragraph is not None:
-        url += f"paragraph={paragraph};"
-    if appdx_table is not None:
-        url += f"appdxTable={appdx_table}"
-
-    response = requests.get(url, timeout=timeout)
-    response.raise_for_status()
-    return response.text
+    url = build_law_content_url(
+        version, law_number, law_id, article, paragraph, appdx_table
+    )
+    return _get(url, timeout, cache)
 
 
 def request_list_of_updated_laws_and_ordinance(
     version: int, date: int,
-    timeout: float = TIMEOUT_SEC
+    timeout: float = TIMEOUT_SEC,
+    cache: Optional[ResponseCache] = None
 ) -> str:
     """
     Acquire the full text of a law/ordinance.
@@ -147,6 +320,10 @@ def request_list_of_updated_laws_and_ordinance(
         Version number of the e-Gov eLaw API.
     date : int
         date.
+    timeout : float, optional
+        Timeout duration in seconds. Default is TIMEOUT_SEC.
+    cache : ResponseCache, optional
+        Cache to revalidate the response against. Default is None.
 
     Returns
     -------
@@ -158,7 +335,180 @@ def request_list_of_updated_laws_and_ordinance(
     requests.exceptions.RequestException
         If an error occurs during the API request.
     """
-    url = f"https://elaws.e-gov.go.jp/api/{version}/updatelawlists/{date}"
-    response = requests.get(url, timeout=timeout)
-    response.raise_for_status()
-    return response.text
+    url = build_updated_laws_url(version, date)
+    return _get(url, timeout, cache)
+
+
+def stream_laws_and_ordinances(
+    version: int, lawtype: int,
+    timeout: float = TIMEOUT_SEC, chunk_size: int = CHUNK_SIZE,
+    save_path: Optional[str] = None, cache: Optional[ResponseCache] = None
+) -> Iterator[bytes]:
+    """
+    Acquire a list of laws and ordinances as a stream of raw chunks.
+
+    Parameters
+    ----------
+    version : int
+        Version number of the e-Gov eLaw API.
+    lawtype : int
+        Law type.
+    timeout : float, optional
+        Timeout duration in seconds. Default is TIMEOUT_SEC.
+    chunk_size : int, optional
+        Size of each chunk in bytes. Default is CHUNK_SIZE.
+    save_path : str, optional
+        Path to write the raw body to while streaming. Default is None.
+    cache : ResponseCache, optional
+        Cache to revalidate the response against, and to store the body in
+        once it is complete. Default is None.
+
+    Yields
+    ------
+    bytes
+        Chunks of the list of laws and ordinances in the XML format.
+
+    Raises
+    ------
+    requests.exceptions.RequestException
+        If an error occurs during the API request.
+    """
+    url = build_laws_and_ordinances_url(version, lawtype)
+    return _stream(url, timeout, chunk_size, save_path, cache)
+
+
+def stream_law_text(
+    version: int, law_id_or_law_number: str,
+    timeout: float = TIMEOUT_SEC, chunk_size: int = CHUNK_SIZE,
+    save_path: Optional[str] = None, cache: Optional[ResponseCache] = None
+) -> Iterator[bytes]:
+    """
+    Acquire the full text of a law/ordinance as a stream of raw chunks.
+
+    Parameters
+    ----------
+    version : int
+        Version number of the e-Gov eLaw API.
+    law_id_or_law_number : str
+        Law ID or law number.
+    timeout : float, optional
+        Timeout duration in seconds. Default is TIMEOUT_SEC.
+    chunk_size : int, optional
+        Size of each chunk in bytes. Default is CHUNK_SIZE.
+    save_path : str, optional
+        Path to write the raw body to while streaming. Default is None.
+    cache : ResponseCache, optional
+        Cache to revalidate the response against, and to store the body in
+        once it is complete. Default is None.
+
+    Yields
+    ------
+    bytes
+        Chunks of the full text of the law/ordinance in the XML format.
+
+    Raises
+    ------
+    requests.exceptions.RequestException
+        If an error occurs during the API request.
+    """
+    url = build_law_text_url(version, law_id_or_law_number)
+    return _stream(url, timeout, chunk_size, save_path, cache)
+
+
+def stream_law_content(
+    version: int, law_number: Optional[str] = None,
+    law_id: Optional[str] = None, article: Optional[str] = None,
+    paragraph: Optional[str] = None, appdx_table: Optional[str] = None,
+    timeout: float = TIMEOUT_SEC, chunk_size: int = CHUNK_SIZE,
+    save_path: Optional[str] = None, cache: Optional[ResponseCache] = None
+) -> Iterator[bytes]:
+    """
+    Acquire the content of the current law/ordinance as a stream of raw chunks.
+
+    Parameters
+    ----------
+    version : int
+        Version number of the e-Gov eLaw API.
+    law_number : str
+        Law number.
+    law_id : str
+        Law ID.
+    article : str, optional
+        Article number. Defaults to None.
+    paragraph : str, optional
+        Paragraph number. Defaults to None.
+    appdx_table : str, optional
+        Appendix table number. Defaults to None.
+    timeout : float, optional
+        Timeout duration in seconds. Default is TIMEOUT_SEC.
+    chunk_size : int, optional
+        Size of each chunk in bytes. Default is CHUNK_SIZE.
+    save_path : str, optional
+        Path to write the raw body to while streaming. Default is None.
+    cache : ResponseCache, optional
+        Cache to revalidate the response against, and to store the body in
+        once it is complete. Default is None.
+
+    Yields
+    ------
+    bytes
+        Chunks of the content of the current law/ordinance in the XML format.
+
+    Raises
+    ------
+    requests.exceptions.RequestException
+        If an error occurs during the API request.
+    ValueError
+        If both law_number and law_id are given.
+        Elst if the given combination of article, paragraph, and appdx_table
+        is invalid.
+    """
+    if law_number and law_id:
+        raise ValueError(
+            "Only one of (law_number, law_id) is acceptable.")
+    if (article and appdx_table) or (paragraph and appdx_table):
+        raise ValueError(
+            "Invalid combination of article, paragraph, and appdx_table.")
+
+    url = build_law_content_url(
+        version, law_number, law_id, article, paragraph, appdx_table
+    )
+    return _stream(url, timeout, chunk_size, save_path, cache)
+
+
+def stream_list_of_updated_laws_and_ordinance(
+    version: int, date: int,
+    timeout: float = TIMEOUT_SEC, chunk_size: int = CHUNK_SIZE,
+    save_path: Optional[str] = None, cache: Optional[ResponseCache] = None
+) -> Iterator[bytes]:
+    """
+    Acquire the list of updated laws and ordinances as a stream of raw chunks.
+
+    Parameters
+    ----------
+    version : int
+        Version number of the e-Gov eLaw API.
+    date : int
+        date.
+    timeout : float, optional
+        Timeout duration in seconds. Default is TIMEOUT_SEC.
+    chunk_size : int, optional
+        Size of each chunk in bytes. Default is CHUNK_SIZE.
+    save_path : str, optional
+        Path to write the raw body to while streaming. Default is None.
+    cache : ResponseCache, optional
+        Cache to revalidate the response against, and to store the body in
+        once it is complete. Default is None.
+
+    Yields
+    ------
+    bytes
+        Chunks of the list of udpated laws and ordinances in the XML format.
+
+    Raises
+    ------
+    requests.exceptions.RequestException
+        If an error occurs during the API request.
+    """
+    url = build_updated_laws_url(version, date)
+    return _stream(url, timeout, chunk_size, save_path, cache)
@@ -0,0 +1,319 @@
+"""elaws_api_python.batch
+
+Batched acquisition of the contents of many articles, paragraphs and
+appended tables.
+"""
+
+import asyncio
+import copy
+import re
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+from xml.etree import ElementTree as ET
+
+from .base import TIMEOUT_SEC, request_law_content, request_law_text
+from .cache import ResponseCache
+from .classes.common import Result
+from .classes.law_content_response import ApplData, LawContentResponse
+from .classes.law_model import AMEND_PROVISION_TAG
+from .classes.law_text_response import LawTextResponse
+from .law_number import parse_law_number
+from .numerals import replace_kanji_numerals
+
+MAX_WORKERS = 8
+# Cost of acquiring a full text, in units of the cost of one content request.
+FULL_TEXT_COST = 5.0
+
+RESULT_NOT_FOUND = 1
+_ARTICLE_PATTERN = re.compile(r"^第?(\d+)条?((?:の\d+)*)$")
+_NUMBER_PATTERN = re.compile(r"^(?:別表)?第?(\d+)(?:項|号)?$")
+_APPDX_TABLE_PATTERN = re.compile(r"^(?:別表)?第?(\d+)((?:の\d+)*)$")
+
+
+class ContentSpec(NamedTuple):
+    """
+    Specification of a content to acquire.
+
+    Attributes
+    ----------
+    law : str
+        Law ID or law number.
+    article : str, optional
+        Article, e.g. "3_2", "3の2" or "第三条の二".
+    paragraph : str, optional
+        Paragraph, e.g. "2" or "第二項".
+    appdx_table : str, optional
+        Appended table, e.g. "1" or "別表第一".
+    """
+    law: str
+    article: Optional[str] = None
+    paragraph: Optional[str] = None
+    appdx_table: Optional[str] = None
+
+
+SpecLike = Union[ContentSpec, Tuple]
+
+
+def _normalize(value: str) -> str:
+    # NFKC turns full-width digits into the ASCII ones of the Num attributes
+    return replace_kanji_numerals(re.sub(r"\s+", "", unicodedata.normalize("NFKC", value)))
+
+
+def article_num(article: Optional[str]) -> Optional[str]:
+    """
+    Normalize an article into the value of its `Num` attribute, e.g. "第三条の二" -> "3_2".
+
+    Values that cannot be normalized are returned as they are.
+    """
+    if article is None:
+        return None
+    match = _ARTICLE_PATTERN.match(_normalize(article).replace("_", "の"))
+    if match is None:
+        return article
+    return "_".join([match.group(1)] + match.group(2).split("の")[1:])
+
+
+def number_num(number: Optional[str]) -> Optional[str]:
+    """
+    Normalize a paragraph or appended table number, e.g. "第二項" -> "2".
+
+    Values that cannot be normalized are returned as they are.
+    """
+    if number is None:
+        return None
+    match = _NUMBER_PATTERN.match(_normalize(number))
+    return match.group(1) if match is not None else number
+
+
+def appdx_table_num(appdx_table: Optional[str]) -> Optional[str]:
+    """
+    Normalize an appended table into the value of its `Num` attribute,
+    e.g. "別表第一の二" -> "1_2".
+
+    Values that cannot be normalized are returned as they are.
+    """
+    if appdx_table is None:
+        return None
+    match = _APPDX_TABLE_PATTERN.match(_normalize(appdx_table).replace("_", "の"))
+    if match is None:
+        return appdx_table
+    return "_".join([match.group(1)] + match.group(2).split("の")[1:])
+
+
+def plan_batch(
+    specs: Sequence[ContentSpec], full_text_cost: float = FULL_TEXT_COST
+) -> Dict[str, bool]:
+    """
+    Decide per law whether to acquire the full text once.
+
+    Acquiring the full text costs `full_text_cost` content requests, while
+    each distinct spec costs one, so the full text is chosen when a law has
+    more distinct specs than that.
+
+    Parameters
+    ----------
+    specs : Sequence[ContentSpec]
+        The specs.
+    full_text_cost : float, optional
+        Cost of a full text in units of a content request. Default is FULL_TEXT_COST.
+
+    Returns
+    -------
+    Dict[str, bool]
+        Whether to acquire the full text, keyed by law.
+    """
+    counts: Dict[str, int] = {}
+    for spec in set(specs):
+        counts[spec.law] = counts.get(spec.law, 0) + 1
+    return {law: count > full_text_cost for law, count in counts.items()}
+
+
+def _find(parent: Optional[ET.Element], tag: str, num: Optional[str]) -> Optional[ET.Element]:
+    # walk in document order like `appendix.find_appendix_tables`, skipping
+    # `AmendProvision`, whose elements belong to the law being amended
+    if parent is None:
+        return None
+    stack = list(reversed(parent))
+    while stack:
+        elem = stack.pop()
+        if elem.tag == tag:
+            if elem.get("Num") == num:
+                return elem
+        elif elem.tag != AMEND_PROVISION_TAG:
+            stack.extend(reversed(elem))
+    return None
+
+
+def extract_content(law_text: LawTextResponse, spec: ContentSpec) -> LawContentResponse:
+    """
+    Extract the content of a spec from a full text.
+
+    The result has the same structure as the response of
+    `base.request_law_content` for the spec.
+
+    Parameters
+    ----------
+    law_text : LawTextResponse
+        The full text of the law of `spec`.
+    spec : ContentSpec
+        The spec.
+
+    Returns
+    -------
+    LawContentResponse
+        The content. Its result code is RESULT_NOT_FOUND if the full text
+        has no such content.
+    """
+    appl_data = law_text.appl_data
+    law_body = None
+    if law_text.law_full_text is not None:
+        law_body = law_text.law_full_text.find("Law/LawBody")
+
+    target = None
+    if law_body is not None:
+        if spec.appdx_table is not None:
+            target = _find(law_body, "AppdxTable", appdx_table_num(spec.appdx_table))
+        else:
+            main_provision = law_body.find("MainProvision")
+            target = main_provision
+            if spec.article is not None:
+                target = _find(main_provision, "Article", article_num(spec.article))
+            if spec.paragraph is not None:
+                target = _find(target, "Paragraph", number_num(spec.paragraph))
+
+    if target is None:
+        result = Result(RESULT_NOT_FOUND, "The content is not found in the full text.")
+        law_contents = None
+    else:
+        result = Result(law_text.result.code, law_text.result.message)
+        law_contents = ET.Element("LawContents")
+        # the full text may be shared by other specs, so it is left intact
+        law_contents.append(copy.deepcopy(target))
+    return LawContentResponse.from_data(result, ApplData(
+        appl_data.law_id, appl_data.law_number,
+        spec.article, spec.paragraph, spec.appdx_table,
+        law_contents, None, appl_data.image_data,
+    ))
+
+
+def _is_law_number(law: str) -> bool:
+    return parse_law_number(law) is not None
+
+
+def _acquire_law_content(
+    version: int, spec: ContentSpec, timeout: float, cache: Optional[ResponseCache]
+) -> LawContentResponse:
+    law_number, law_id = (spec.law, None) if _is_law_number(spec.law) else (None, spec.law)
+    return LawContentResponse(request_law_content(
+        version, law_number, law_id, spec.article, spec.paragraph, spec.appdx_table,
+        timeout, cache
+    ))
+
+
+def _acquire_group(
+    version: int, law: str, specs: List[ContentSpec], full_text: bool,
+    timeout: float, cache: Optional[ResponseCache]
+) -> List[LawContentResponse]:
+    if full_text:
+        law_text = LawTextResponse(request_law_text(version, law, timeout, cache))
+        return [extract_content(law_text, spec) for spec in specs]
+    return [_acquire_law_content(version, spec, timeout, cache) for spec in specs]
+
+
+def _prepare(specs: Iterable[SpecLike]) -> Tuple[List[ContentSpec], Dict[str, List[ContentSpec]]]:
+    specs = [ContentSpec(*spec) for spec in specs]
+    groups: Dict[str, List[ContentSpec]] = {}
+    for spec in dict.fromkeys(specs):
+        groups.setdefault(spec.law, []).append(spec)
+    return specs, groups
+
+
+def acquire_law_contents(
+    version: int, specs: Iterable[SpecLike],
+    timeout: float = TIMEOUT_SEC,
+    cache: Optional[ResponseCache] = None,
+    max_workers: int = MAX_WORKERS,
+    full_text_cost: float = FULL_TEXT_COST,
+    return_exceptions: bool = False
+) -> List[Union[LawContentResponse, BaseException]]:
+    """
+    Acquire the contents of many specs concurrently.
+
+    The specs are deduplicated and grouped by law. For each law, either its
+    full text is acquired once and the contents are extracted from it, or
+    one content request is made per spec, whichever `plan_batch` estimates
+    to be cheaper. Content requests are fanned out individually, so a
+    large group does not serialize the batch.
+
+    Parameters
+    ----------
+    version : int
+        Version number of the e-Gov eLaw API.
+    specs : Iterable[ContentSpec or tuple]
+        Specs, or tuples of (law, article, paragraph, appdx_table).
+    timeout : float, optional
+        Timeout duration in seconds. Default is TIMEOUT_SEC.
+    cache : ResponseCache, optional
+        Cache to revalidate the responses against. Default is None.
+    max_workers : int, optional
+        Maximum number of concurrent requests. Default is MAX_WORKERS.
+    full_text_cost : float, optional
+        Cost of a full text in units of a content request. Default is FULL_TEXT_COST.
+    return_exceptions : bool, optional
+        If True, errors are returned in place of the results instead of
+        being raised. Default is False.
+
+    Returns
+    -------
+    List[LawContentResponse or BaseException]
+        Results in the order of `specs`.
+
+    Raises
+    ------
+    requests.exceptions.RequestException
+        If an error occurs during an API request and `return_exceptions` is False.
+    """
+    specs, groups = _prepare(specs)
+    plan = plan_batch(specs, full_text_cost)
+
+    results: Dict[ContentSpec, Union[LawContentResponse, BaseException]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for law, group in groups.items():
+            if plan[law]:
+                futures.append((group, executor.submit(
+                    _acquire_group, version, law, group, True, timeout, cache)))
+            else:
+                futures.extend(([spec], executor.submit(
+                    _acquire_group, version, law, [spec], False, timeout, cache))
+                    for spec in group)
+        for group, future in futures:
+            error = future.exception()
+            if error is not None and not return_exceptions:
+                raise error
+            for index, spec in enumerate(group):
+                results[spec] = error if error is not None else future.result()[index]
+    return [results[spec] for spec in specs]
+
+
+async def acquire_law_contents_async(
+    version: int, specs: Iterable[SpecLike],
+    timeout: float = TIMEOUT_SEC,
+    cache: Optional[ResponseCache] = None,
+    max_workers: int = MAX_WORKERS,
+    full_text_cost: float = FULL_TEXT_COST,
+    return_exceptions: bool = False
+) -> List[Union[LawContentResponse, BaseException]]:
+    """
+    Awaitable version of `acquire_law_contents`.
+
+    The requests run on a thread pool, so the event loop is not blocked.
+    See `acquire_law_contents` for the parameters.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, lambda: acquire_law_contents(
+            version, specs, timeout, cache, max_workers, full_text_cost, return_exceptions
+        )
+    )
@@ -0,0 +1,476 @@
+"""elaws_api_python.blob_store
+
+Content-addressed, deduplicated storage of raw full-text responses.
+
+zstd compression requires the optional dependency `zstandard`
+(`pip install elaws-api-python[zstd]`); gzip needs nothing extra.
+"""
+
+import bisect
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+COMPRESSIONS = ("gzip", "zstd", None)
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst", None: ""}
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+
+IMAGE_DATA_PATTERN = re.compile(rb"(<ImageData>)(.*?)(</ImageData>)", re.DOTALL)
+
+DateLike = Union[str, datetime.date]
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise ImportError(
+            "zstandard is required for zstd compression. "
+            "Install it with `pip install elaws-api-python[zstd]`."
+        ) from exc
+    return zstandard
+
+
+def _isoformat(date: DateLike) -> str:
+    if isinstance(date, datetime.date):
+        return date.isoformat()
+    return datetime.date.fromisoformat(date).isoformat()
+
+
+class BlobStore:
+    """
+    Store of immutable blobs addressed by the SHA-256 digest of their contents.
+
+    Blobs are written compressed to `objects/<first 2 hex>/<rest><suffix>`
+    through a temporary file, so a blob is either complete or absent.
+    Storing contents that are already present is a no-op.
+
+    Attributes
+    ----------
+    directory : str
+        Root directory of the store.
+    compression : str, optional
+        Compression of new blobs: "gzip", "zstd" or None.
+        Blobs stored with another compression can still be read.
+    """
+
+    def __init__(self, directory: str, compression: Optional[str] = "gzip") -> None:
+        """
+        Initialize the BlobStore object.
+
+        Parameters
+        ----------
+        directory : str
+            Root directory of the store. Created if it does not exist.
+        compression : str, optional
+            Compression of new blobs: "gzip" (default), "zstd" or None.
+        """
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd":
+            _import_zstandard()
+        self.directory: str = directory
+        self.compression: Optional[str] = compression
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+
+    def _base_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "objects", digest[:2], digest[2:])
+
+    def _find(self, digest: str) -> Optional[Tuple[str, Optional[str]]]:
+        base_path = self._base_path(digest)
+        for compression in COMPRESSIONS:
+            path = base_path + SUFFIXES[compression]
+            if os.path.exists(path):
+                return path, compression
+        return None
+
+    def __contains__(self, digest: str) -> bool:
+        return self._find(digest) is not None
+
+    def put(self, data: bytes) -> str:
+        """
+        Store a blob.
+
+        Parameters
+        ----------
+        data : bytes
+            Contents of the blob.
+
+        Returns
+        -------
+        str
+            Hexadecimal SHA-256 digest of `data`, which addresses the blob.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        if self._find(digest) is not None:
+            return digest
+        path = self._base_path(digest) + SUFFIXES[self.compression]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file_:
+                file_.write(self._compress(data))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """
+        Read a blob.
+
+        Parameters
+        ----------
+        digest : str
+            Digest returned by `put`.
+
+        Returns
+        -------
+        bytes
+            Contents of the blob.
+
+        Raises
+        ------
+        KeyError
+            If no blob is stored for `digest`.
+        """
+        found = self._find(digest)
+        if found is None:
+            raise KeyError(digest)
+        path, compression = found
+        with open(path, "rb") as file_:
+            return self._decompress(file_.read(), compression)
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == "gzip":
+            return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+        if self.compression == "zstd":
+            return _import_zstandard().ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        return data
+
+    @staticmethod
+    def _decompress(data: bytes, compression: Optional[str]) -> bytes:
+        if compression == "gzip":
+            return gzip.decompress(data)
+        if compression == "zstd":
+            return _import_zstandard().ZstdDecompressor().decompress(data)
+        return data
+
+
+class ManifestEntry(NamedTuple):
+    """
+    Blobs of a law/ordinance fetched on a date.
+
+    Attributes
+    ----------
+    law_id : str
+        Law ID.
+    fetch_date : str
+        Fetch date in ISO format (YYYY-MM-DD).
+    text : str
+        Digest of the response with the contents of `ImageData` removed.
+    image : str, optional
+        Digest of the contents of `ImageData` (Base64 text), if any.
+    """
+    law_id: str
+    fetch_date: str
+    text: str
+    image: Optional[str] = None
+
+
+def _lock_file(file_) -> None:
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+
+        file_.seek(0)
+        msvcrt.locking(file_.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        fcntl.flock(file_.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(file_) -> None:
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+
+        file_.seek(0)
+        msvcrt.locking(file_.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(file_.fileno(), fcntl.LOCK_UN)
+
+
+class Manifest:
+    """
+    Append-only log mapping (law ID, fetch date) to blob digests.
+
+    An entry is appended only when the digests differ from those of the
+    latest earlier fetch, and a lookup by date returns the latest entry at
+    or before that date, so unchanged fetches cost no writes.
+
+    The file may be shared by several processes: `record` appends under an
+    exclusive lock of the file after reading the entries other processes
+    appended, and lookups read those entries first.
+
+    Attributes
+    ----------
+    path : str
+        Path to the manifest file (JSON Lines).
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the Manifest object by loading `path` if it exists.
+
+        Parameters
+        ----------
+        path : str
+            Path to the manifest file.
+        """
+        self.path: str = path
+        self._entries: Dict[str, List[ManifestEntry]] = {}
+        self._offset: int = 0
+        self._lock = threading.Lock()
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self, file_=None) -> None:
+        # read the complete lines appended since the last read; a line being
+        # written by another process is read once its newline is there
+        try:
+            if file_ is None:
+                if os.path.getsize(self.path) <= self._offset:
+                    return
+                with open(self.path, "rb") as file_:
+                    file_.seek(self._offset)
+                    data = file_.read()
+            else:
+                file_.seek(self._offset)
+                data = file_.read()
+        except FileNotFoundError:
+            return
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._insert(ManifestEntry(**json.loads(line)))
+        self._offset += end
+
+    def _insert(self, entry: ManifestEntry) -> None:
+        entries = self._entries.setdefault(entry.law_id, [])
+        dates = [elem.fetch_date for elem in entries]
+        index = bisect.bisect_right(dates, entry.fetch_date)
+        if index > 0 and entries[index - 1].fetch_date == entry.fetch_date:
+            entries[index - 1] = entry
+        else:
+            entries.insert(index, entry)
+
+    def _find(self, law_id: str, fetch_date: Optional[str]) -> Optional[ManifestEntry]:
+        entries = self._entries.get(law_id)
+        if not entries:
+            return None
+        if fetch_date is None:
+            return entries[-1]
+        dates = [entry.fetch_date for entry in entries]
+        index = bisect.bisect_right(dates, fetch_date)
+        return entries[index - 1] if index > 0 else None
+
+    @property
+    def law_ids(self) -> List[str]:
+        """
+        The law IDs recorded in the manifest.
+        """
+        with self._lock:
+            self._refresh()
+            return list(self._entries)
+
+    def entries(self, law_id: str) -> List[ManifestEntry]:
+        """
+        Get the recorded entries of a law/ordinance, oldest first.
+        """
+        with self._lock:
+            self._refresh()
+            return list(self._entries.get(law_id, []))
+
+    def find(self, law_id: str, date: Optional[DateLike] = None) -> Optional[ManifestEntry]:
+        """
+        Find the entry in effect for a law/ordinance on a date.
+
+        Parameters
+        ----------
+        law_id : str
+            Law ID.
+        date : str or datetime.date, optional
+            Date. Default is None, which returns the latest entry.
+
+        Returns
+        -------
+        ManifestEntry, optional
+            The latest entry fetched at or before `date`, or None.
+        """
+        with self._lock:
+            self._refresh()
+            return self._find(law_id, _isoformat(date) if date is not None else None)
+
+    def record(
+        self, law_id: str, fetch_date: DateLike, text: str, image: Optional[str] = None
+    ) -> bool:
+        """
+        Record the blobs of a fetch.
+
+        Parameters
+        ----------
+        law_id : str
+            Law ID.
+        fetch_date : str or datetime.date
+            Fetch date.
+        text : str
+            Digest of the text blob.
+        image : str, optional
+            Digest of the image blob.
+
+        Returns
+        -------
+        bool
+            True if an entry was appended, False if the blobs are unchanged,
+            also when another process recorded them first.
+        """
+        entry = ManifestEntry(law_id, _isoformat(fetch_date), text, image)
+        line = (json.dumps(entry._asdict(), ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock, open(self.path, "a+b") as file_:
+            _lock_file(file_)
+            try:
+                self._refresh(file_)
+                previous = self._find(law_id, entry.fetch_date)
+                if previous is not None and (previous.text, previous.image) == (text, image):
+                    return False
+                # no process holds the lock, so an incomplete last line is
+                # left by a process that crashed while appending it
+                file_.truncate(self._offset)
+                file_.write(line)
+                file_.flush()
+                self._insert(entry)
+                self._offset += len(line)
+                return True
+            finally:
+                _unlock_file(file_)
+
+
+def split_image_data(body: bytes) -> Tuple[bytes, Optional[bytes]]:
+    """
+    Split the contents of `ImageData` from a raw full-text response.
+
+    Parameters
+    ----------
+    body : bytes
+        Raw response of `base.request_law_text`.
+
+    Returns
+    -------
+    Tuple[bytes, bytes or None]
+        The response with an empty `ImageData` element, and the original
+        contents of the element (None if the response has no image data).
+    """
+    match = IMAGE_DATA_PATTERN.search(body)
+    if match is None or not match.group(2):
+        return body, None
+    return body[:match.start(2)] + body[match.end(2):], match.group(2)
+
+
+def join_image_data(text: bytes, image: Optional[bytes]) -> bytes:
+    """
+    Restore the contents of `ImageData` split by `split_image_data`.
+    """
+    if image is None:
+        return text
+    match = IMAGE_DATA_PATTERN.search(text)
+    if match is None:
+        raise ValueError("The response has no ImageData element.")
+    return text[:match.start(2)] + image + text[match.end(2):]
+
+
+class LawTextStore:
+    """
+    Deduplicated archive of full-text responses per law ID and fetch date.
+
+    Each response is split into the text and the (usually much larger and
+    rarely changing) contents of `ImageData`, which are stored as separate
+    blobs, so a new version of a law does not store its images again and
+    a byte-identical fetch writes nothing.
+
+    Attributes
+    ----------
+    blobs : BlobStore
+        Store of the blobs.
+    manifest : Manifest
+        Manifest of the fetches.
+    """
+
+    def __init__(self, directory: str, compression: Optional[str] = "gzip") -> None:
+        """
+        Initialize the LawTextStore object.
+
+        Parameters
+        ----------
+        directory : str
+            Root directory of the archive. Created if it does not exist.
+        compression : str, optional
+            Compression of new blobs: "gzip" (default), "zstd" or None.
+        """
+        self.blobs: BlobStore = BlobStore(directory, compression)
+        self.manifest: Manifest = Manifest(os.path.join(directory, "manifest.jsonl"))
+
+    def put(self, law_id: str, fetch_date: DateLike, body: bytes) -> bool:
+        """
+        Store a fetched response.
+
+        Parameters
+        ----------
+        law_id : str
+            Law ID.
+        fetch_date : str or datetime.date
+            Fetch date.
+        body : bytes
+            Raw response of `base.request_law_text`.
+
+        Returns
+        -------
+        bool
+            True if the response differs from the previous fetch.
+        """
+        text, image = split_image_data(body)
+        text_digest = self.blobs.put(text)
+        image_digest = self.blobs.put(image) if image is not None else None
+        return self.manifest.record(law_id, fetch_date, text_digest, image_digest)
+
+    def get(self, law_id: str, date: Optional[DateLike] = None) -> Optional[bytes]:
+        """
+        Get the response of a law/ordinance in effect on a date.
+
+        Parameters
+        ----------
+        law_id : str
+            Law ID.
+        date : str or datetime.date, optional
+            Date. Default is None, which returns the latest response.
+
+        Returns
+        -------
+        bytes, optional
+            The raw response fetched latest at or before `date`, or None.
+        """
+        entry = self.manifest.find(law_id, date)
+        if entry is None:
+            return None
+        image = self.blobs.get(entry.image) if entry.image is not None else None
+        return join_image_data(self.blobs.get(entry.text), image)
@@ -0,0 +1,228 @@
+"""elaws_api_python.bulk
+
+Bulk acquisition of full texts, with downloads on threads and parsing in
+worker processes.
+"""
+
+import os
+import queue
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from .base import TIMEOUT_SEC, stream_law_text
+from .concurrency import AdaptiveLimiter
+from .records import ProvisionRecord, iter_records_from_chunks
+
+FETCH_WORKERS = 8
+
+
+class BulkResult(NamedTuple):
+    """
+    Result of acquiring one law/ordinance in bulk.
+
+    Attributes
+    ----------
+    law_id : str
+        Law ID or law number that was requested.
+    value : Any
+        Value returned by the extractor. None if an error occurred.
+    error : BaseException, optional
+        Error raised while downloading or extracting, if any.
+    """
+    law_id: str
+    value: Any
+    error: Optional[BaseException] = None
+
+
+def extract_records(content: bytes) -> List[ProvisionRecord]:
+    """
+    Flatten a raw response of `base.request_law_text` into records.
+
+    The elements are released as the records are produced, so the tree is
+    never held as a whole. This is the default extractor of
+    `acquire_law_texts` and runs in the worker processes.
+
+    Parameters
+    ----------
+    content : bytes
+        Raw response.
+
+    Returns
+    -------
+    List[ProvisionRecord]
+        Records in document order.
+    """
+    return list(iter_records_from_chunks((content,)))
+
+
+def fetch_law_text_bytes(
+    version: int, law_id_or_law_number: str, timeout: float = TIMEOUT_SEC
+) -> bytes:
+    """
+    Download the raw full text of a law/ordinance.
+
+    Parameters
+    ----------
+    version : int
+        Version number of the e-Gov eLaw API.
+    law_id_or_law_number : str
+        Law ID or law number.
+    timeout : float, optional
+        Timeout duration in seconds. Default is TIMEOUT_SEC.
+
+    Returns
+    -------
+    bytes
+        The raw response.
+    """
+    return b"".join(stream_law_text(version, law_id_or_law_number, timeout))
+
+
+def acquire_law_texts(
+    version: int, law_ids: Iterable[str],
+    extract: Callable[[bytes], Any] = extract_records,
+    timeout: float = TIMEOUT_SEC,
+    fetch_workers: int = FETCH_WORKERS,
+    parse_workers: Optional[int] = None,
+    fetch: Callable[[int, str, float], bytes] = fetch_law_text_bytes,
+    limiter: Optional[AdaptiveLimiter] = None
+) -> Iterator[BulkResult]:
+    """
+    Acquire and extract the full texts of many laws/ordinances.
+
+    Downloads run on a thread pool and each downloaded body is handed to a
+    process pool that runs `extract` on it, so parsing is not serialized
+    by the GIL and throughput scales with cores. Only the compact value
+    returned by `extract` comes back from the worker processes. At most
+    twice as many bodies as parse workers are held at once, so downloads
+    wait while the parsers are behind, and `law_ids` is consumed only as
+    downloads can start, so it may be a lazy iterator of any length.
+
+    Parameters
+    ----------
+    version : int
+        Version number of the e-Gov eLaw API.
+    law_ids : Iterable[str]
+        Law IDs or law numbers.
+    extract : Callable[[bytes], Any], optional
+        Picklable function that turns a raw response into the value to
+        return, e.g. `extract_records` (default).
+    timeout : float, optional
+        Timeout duration in seconds. Default is TIMEOUT_SEC.
+    fetch_workers : int, optional
+        Number of download threads. Default is FETCH_WORKERS.
+    parse_workers : int, optional
+        Number of worker processes. Default is the number of CPUs.
+        If 0, `extract` runs on the download threads instead.
+    fetch : Callable[[int, str, float], bytes], optional
+        Function downloading a raw response. Default is `fetch_law_text_bytes`.
+    limiter : AdaptiveLimiter, optional
+        Limiter adapting the number of downloads in flight to the latency
+        and the overload responses of the server. If given, up to
+        `limiter.max_limit` download threads are used and `fetch_workers`
+        is ignored. Default is None (a fixed number of downloads).
+
+    Yields
+    ------
+    BulkResult
+        Results in completion order. Errors are reported per law instead
+        of being raised.
+    """
+    if limiter is not None:
+        fetch = _limited(fetch, limiter)
+        fetch_workers = limiter.max_limit
+    law_ids = iter(law_ids)
+    if parse_workers == 0:
+        yield from _acquire_on_threads(version, law_ids, extract, timeout, fetch_workers, fetch)
+        return
+
+    max_pending = 2 * (parse_workers or os.cpu_count() or 1)
+    fetchers = ThreadPoolExecutor(max_workers=fetch_workers)
+    parsers = ProcessPoolExecutor(max_workers=parse_workers)
+    # completed futures are queued by their callbacks, so each completion
+    # costs O(1) however many laws are outstanding
+    completed: "queue.SimpleQueue[Tuple[bool, str, Future]]" = queue.SimpleQueue()
+    outstanding: Set[Future] = set()
+    downloading = 0
+    parsing = 0
+
+    def submit(executor, is_download: bool, law_id: str, func, *args) -> None:
+        future = executor.submit(func, *args)
+        outstanding.add(future)
+        future.add_done_callback(lambda done: completed.put((is_download, law_id, done)))
+
+    try:
+        while True:
+            # downloads are only started while fewer than `max_pending`
+            # bodies are being downloaded or parsed
+            while downloading < fetch_workers and downloading + parsing < max_pending:
+                law_id = next(law_ids, None)
+                if law_id is None:
+                    break
+                submit(fetchers, True, law_id, fetch, version, law_id, timeout)
+                downloading += 1
+            if not downloading and not parsing:
+                return
+            is_download, law_id, future = completed.get()
+            outstanding.discard(future)
+            error = future.exception()
+            if is_download:
+                downloading -= 1
+                if error is None:
+                    submit(parsers, False, law_id, extract, future.result())
+                    parsing += 1
+                    continue
+            else:
+                parsing -= 1
+            if error is not None:
+                yield BulkResult(law_id, None, error)
+            else:
+                yield BulkResult(law_id, future.result())
+    finally:
+        for future in outstanding:
+            future.cancel()
+        fetchers.shutdown(wait=True)
+        parsers.shutdown(wait=True)
+
+
+def _limited(
+    fetch: Callable[[int, str, float], bytes], limiter: AdaptiveLimiter
+) -> Callable[[int, str, float], bytes]:
+    def limited_fetch(version: int, law_id: str, timeout: float) -> bytes:
+        return limiter.call(fetch, version, law_id, timeout)
+    return limited_fetch
+
+
+def _acquire_on_threads(
+    version: int, law_ids: Iterator[str], extract: Callable[[bytes], Any],
+    timeout: float, fetch_workers: int,
+    fetch: Callable[[int, str, float], bytes]
+) -> Iterator[BulkResult]:
+    def run(law_id: str) -> Any:
+        return extract(fetch(version, law_id, timeout))
+
+    completed: "queue.SimpleQueue[Tuple[str, Future]]" = queue.SimpleQueue()
+    outstanding: Set[Future] = set()
+    with ThreadPoolExecutor(max_workers=fetch_workers) as fetchers:
+        try:
+            while True:
+                while len(outstanding) < fetch_workers:
+                    law_id = next(law_ids, None)
+                    if law_id is None:
+                        break
+                    future = fetchers.submit(run, law_id)
+                    outstanding.add(future)
+                    future.add_done_callback(
+                        lambda done, law_id=law_id: completed.put((law_id, done)))
+                if not outstanding:
+                    return
+                law_id, future = completed.get()
+                outstanding.discard(future)
+                error = future.exception()
+                if error is not None:
+                    yield BulkResult(law_id, None, error)
+                else:
+                    yield BulkResult(law_id, future.result())
+        finally:
+            for future in outstanding:
+                future.cancel()
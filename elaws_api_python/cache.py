@@ -0,0 +1,418 @@
+"""elaws_api_python.cache
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .cache_backends import CacheBackend, backend_errors
+
+_META_LENGTH = struct.Struct("<I")
+
+logger = logging.getLogger(__name__)
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """
+    Write a file through a `.part` file unique to the process and thread,
+    so readers and concurrent writers never see a partially written file.
+    """
+    part_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    try:
+        with open(part_path, "wb") as file_:
+            file_.write(data)
+        os.replace(part_path, path)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+def compute_digest(body: bytes) -> str:
+    """
+    Compute the content digest of a response body.
+
+    Parameters
+    ----------
+    body : bytes
+        Raw response body.
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 digest of `body`.
+    """
+    return hashlib.sha256(body).hexdigest()
+
+
+class CacheEntry:
+    """
+    A cached response body together with its HTTP validators.
+
+    Attributes
+    ----------
+    body : bytes
+        Raw response body.
+    encoding : str
+        Character encoding of `body`.
+    etag : str, optional
+        Value of the `ETag` response header.
+    last_modified : str, optional
+        Value of the `Last-Modified` response header.
+    digest : str
+        SHA-256 digest of `body`.
+    parsed : Any, optional
+        Parsed object built from `body`, if one is held.
+    fetched_at : float
+        Time (seconds since the epoch) when `body` was last downloaded or
+        revalidated.
+    """
+
+    def __init__(
+        self, body: bytes, encoding: str = "utf-8",
+        etag: Optional[str] = None, last_modified: Optional[str] = None,
+        digest: Optional[str] = None, parsed: Any = None,
+        fetched_at: Optional[float] = None
+    ) -> None:
+        """
+        Initialize the CacheEntry object.
+
+        Parameters
+        ----------
+        body : bytes
+            Raw response body.
+        encoding : str, optional
+            Character encoding of `body`. Default is "utf-8".
+        etag : str, optional
+            Value of the `ETag` response header.
+        last_modified : str, optional
+            Value of the `Last-Modified` response header.
+        digest : str, optional
+            SHA-256 digest of `body`. Computed from `body` if not given.
+        parsed : Any, optional
+            Parsed object built from `body`.
+        fetched_at : float, optional
+            Time when `body` was last downloaded or revalidated. Default is now.
+        """
+        self.body: bytes = body
+        self.encoding: str = encoding
+        self.etag: Optional[str] = etag
+        self.last_modified: Optional[str] = last_modified
+        self.digest: str = digest or compute_digest(body)
+        self.parsed: Any = parsed
+        self.fetched_at: float = time.time() if fetched_at is None else fetched_at
+
+    @property
+    def text(self) -> str:
+        """
+        The body decoded with its encoding.
+        """
+        return self.body.decode(self.encoding)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """
+        Build the request headers for revalidating this entry.
+
+        Returns
+        -------
+        Dict[str, str]
+            `If-None-Match` and/or `If-Modified-Since` headers.
+            Empty if the server sent no validators.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize the entry, without its parsed object, for a cache backend.
+        """
+        meta = json.dumps({
+            "encoding": self.encoding,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "digest": self.digest,
+            "fetched_at": self.fetched_at,
+        }).encode("utf-8")
+        return _META_LENGTH.pack(len(meta)) + meta + self.body
+
+    @staticmethod
+    def from_bytes(data: bytes):
+        """
+        Static method to create a CacheEntry object from `to_bytes` output.
+
+        Returns
+        -------
+        CacheEntry, optional
+            The entry, or None if the body does not match its digest.
+        """
+        (length,) = _META_LENGTH.unpack_from(data)
+        start = _META_LENGTH.size
+        meta = json.loads(data[start:start + length].decode("utf-8"))
+        body = data[start + length:]
+        if compute_digest(body) != meta["digest"]:
+            return None
+        return CacheEntry(
+            body, meta["encoding"], meta["etag"], meta["last_modified"],
+            meta["digest"], fetched_at=meta["fetched_at"]
+        )
+
+
+class ResponseCache:
+    """
+    Cache of API responses keyed by request URL.
+
+    Entries are held in memory. If `directory` is given, each body is also
+    written to `<key>.xml` with its validators in `<key>.json`, so that
+    revalidation survives a process restart. Parsed objects are held in
+    memory only.
+
+    If `backend` is given, entries are also stored in it for `ttl` seconds,
+    so that processes and hosts sharing the backend share the downloads: an
+    entry missing here, or older here than in the backend, is taken from it.
+    With `max_age`, an entry downloaded or revalidated less than `max_age`
+    seconds ago, by any of them, is used without a request to e-Gov. Errors
+    of the backend are logged and treated as misses, so an unavailable
+    backend degrades to a per-process cache.
+
+    Attributes
+    ----------
+    directory : str, optional
+        Directory to persist the cached bodies.
+    backend : CacheBackend, optional
+        Backend shared with other processes.
+    ttl : float, optional
+        Seconds for which an entry is kept in the backend.
+    max_age : float, optional
+        Seconds for which an entry is used without revalidation.
+    """
+
+    def __init__(
+        self, directory: Optional[str] = None,
+        backend: Optional[CacheBackend] = None,
+        ttl: Optional[float] = None, max_age: Optional[float] = None
+    ) -> None:
+        """
+        Initialize the ResponseCache object.
+
+        Parameters
+        ----------
+        directory : str, optional
+            Directory to persist the cached bodies. Default is None.
+        backend : CacheBackend, optional
+            Backend shared with other processes. Default is None.
+        ttl : float, optional
+            Seconds for which an entry is kept in the backend.
+            Default is None (until evicted by the backend).
+        max_age : float, optional
+            Seconds for which an entry is used without revalidation.
+            Default is None (always revalidated).
+        """
+        self.directory: Optional[str] = directory
+        self.backend: Optional[CacheBackend] = backend
+        self.ttl: Optional[float] = ttl
+        self.max_age: Optional[float] = max_age
+        self._entries: Dict[str, CacheEntry] = {}
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """
+        Get the entry cached for `url`.
+
+        Parameters
+        ----------
+        url : str
+            Request URL.
+
+        Returns
+        -------
+        CacheEntry, optional
+            The cached entry, or None if `url` is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None and self.directory is not None:
+                entry = self._load(url)
+                if entry is not None:
+                    self._entries[url] = entry
+        if self.backend is None or (entry is not None and self.is_fresh(entry)):
+            return entry
+        data = self.get_shared(self._key(url))
+        try:
+            shared = CacheEntry.from_bytes(data) if data is not None else None
+        except backend_errors() as error:
+            logger.warning("Ignoring a corrupt cache entry of %s: %r", url, error)
+            shared = None
+        with self._lock:
+            entry = self._entries.get(url)
+            if shared is None or (entry is not None and entry.fetched_at >= shared.fetched_at):
+                return entry
+            if entry is not None and entry.digest == shared.digest:
+                # keep the parsed object of an unchanged body
+                shared.parsed = entry.parsed
+            self._entries[url] = shared
+            return shared
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """
+        Whether `entry` can be used without revalidation.
+        """
+        return self.max_age is not None and time.time() - entry.fetched_at < self.max_age
+
+    def get_shared(self, key: str) -> Optional[bytes]:
+        """
+        Get a value from the backend.
+
+        Returns
+        -------
+        bytes, optional
+            The value, or None if there is no backend, the key is missing,
+            or the backend fails.
+        """
+        if self.backend is None:
+            return None
+        try:
+            return self.backend.get(key)
+        except backend_errors() as error:
+            logger.warning("Cache backend failed to get %s: %r", key, error)
+            return None
+
+    def set_shared(self, key: str, value: bytes) -> bool:
+        """
+        Set a value in the backend for `ttl` seconds.
+
+        Returns
+        -------
+        bool
+            Whether the value was stored; False if there is no backend or
+            the backend fails.
+        """
+        if self.backend is None:
+            return False
+        try:
+            self.backend.set(key, value, self.ttl)
+        except backend_errors() as error:
+            logger.warning("Cache backend failed to set %s: %r", key, error)
+            return False
+        return True
+
+    def update(
+        self, url: str, body: bytes, encoding: str = "utf-8",
+        etag: Optional[str] = None, last_modified: Optional[str] = None
+    ) -> CacheEntry:
+        """
+        Store a freshly downloaded body for `url`.
+
+        If the body is byte-identical to the cached one, the cached entry
+        (and its parsed object) is kept and only the validators are updated.
+
+        Parameters
+        ----------
+        url : str
+            Request URL.
+        body : bytes
+            Raw response body.
+        encoding : str, optional
+            Character encoding of `body`. Default is "utf-8".
+        etag : str, optional
+            Value of the `ETag` response header.
+        last_modified : str, optional
+            Value of the `Last-Modified` response header.
+
+        Returns
+        -------
+        CacheEntry
+            The entry now cached for `url`.
+        """
+        digest = compute_digest(body)
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None and entry.digest == digest:
+                entry.etag = etag
+                entry.last_modified = last_modified
+                entry.fetched_at = time.time()
+            else:
+                entry = CacheEntry(body, encoding, etag, last_modified, digest)
+                self._entries[url] = entry
+            if self.directory is not None:
+                self._store(url, entry)
+        self.set_shared(self._key(url), entry.to_bytes())
+        return entry
+
+    def revalidated(self, url: str) -> Optional[CacheEntry]:
+        """
+        Mark the entry cached for `url` as revalidated (e.g. on 304), which
+        makes it fresh again here, in the directory and in the backend.
+
+        Returns
+        -------
+        CacheEntry, optional
+            The entry, or None if `url` is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            entry.fetched_at = time.time()
+            if self.directory is not None:
+                self._store(url, entry)
+        self.set_shared(self._key(url), entry.to_bytes())
+        return entry
+
+    def clear(self) -> None:
+        """
+        Drop all the entries held in memory.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def _paths(self, url: str):
+        key = self._key(url)
+        return (
+            os.path.join(self.directory, key + ".xml"),
+            os.path.join(self.directory, key + ".json"),
+        )
+
+    def _load(self, url: str) -> Optional[CacheEntry]:
+        body_path, meta_path = self._paths(url)
+        if not (os.path.exists(body_path) and os.path.exists(meta_path)):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as file_:
+            meta = json.load(file_)
+        with open(body_path, "rb") as file_:
+            body = file_.read()
+        if compute_digest(body) != meta.get("digest"):
+            return None
+        return CacheEntry(
+            body, meta.get("encoding", "utf-8"),
+            meta.get("etag"), meta.get("last_modified"), meta["digest"],
+            fetched_at=meta.get("fetched_at", 0.0)
+        )
+
+    def _store(self, url: str, entry: CacheEntry) -> None:
+        body_path, meta_path = self._paths(url)
+        meta = {
+            "url": url,
+            "encoding": entry.encoding,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "digest": entry.digest,
+            "fetched_at": entry.fetched_at,
+        }
+        # the body is replaced before the meta, and `_load` checks the digest,
+        # so a reader never takes a partially written or mismatched pair
+        write_atomic(body_path, entry.body)
+        write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
@@ -0,0 +1,484 @@
+"""elaws_api_python.cache_backends
+
+Backends storing cached values outside the process, so that the worker
+processes of a host, or several hosts, share one cache.
+
+A backend maps string keys to byte values with an optional per-entry TTL.
+Values are compressed with zlib when it makes them smaller. Backends are
+used by `cache.ResponseCache` for raw response bodies and by
+`main.load_or_acquire_laws_and_ordinances` for list snapshots.
+
+Examples
+--------
+>>> backend = open_backend("sqlite:///var/cache/elaws.db")
+>>> cache = ResponseCache(backend=backend, ttl=86400, max_age=3600)
+>>> list_of_laws = acquire_laws_and_ordinances(1, LAWTYPE_ALL, cache=cache)
+"""
+
+import hashlib
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import List, Optional, Tuple, Union
+
+COMPRESS_LEVEL = 6
+TIMEOUT_SEC = 5.0
+REDIS_PORT = 6379
+REDIS_PREFIX = "elaws:"
+
+_RAW = b"\x00"
+_ZLIB = b"\x01"
+_EXPIRES = struct.Struct("<d")
+
+
+def _pack(value: bytes, level: int) -> bytes:
+    if level > 0:
+        compressed = zlib.compress(value, level)
+        if len(compressed) < len(value):
+            return _ZLIB + compressed
+    return _RAW + value
+
+
+def _unpack(data: bytes) -> bytes:
+    if data[:1] == _ZLIB:
+        return zlib.decompress(data[1:])
+    if data[:1] == _RAW:
+        return data[1:]
+    raise ValueError("Unknown encoding of a cached value.")
+
+
+def _expires_at(ttl: Optional[float]) -> float:
+    return 0.0 if ttl is None else time.time() + ttl
+
+
+class CacheBackend:
+    """
+    Interface of the cache backends.
+
+    Subclasses store the encoded values with `_get_raw`, `_set_raw` and
+    `_delete_raw`; `get` and `set` handle the compression.
+
+    Attributes
+    ----------
+    compress_level : int
+        zlib compression level of the stored values; 0 stores them as is.
+    """
+
+    def __init__(self, compress_level: int = COMPRESS_LEVEL) -> None:
+        self.compress_level: int = compress_level
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get the value of `key`, or None if it is missing or expired.
+        """
+        data = self._get_raw(key)
+        return None if data is None else _unpack(data)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        """
+        Set the value of `key`, expiring after `ttl` seconds if given.
+        """
+        self._set_raw(key, _pack(value, self.compress_level), ttl)
+
+    def delete(self, key: str) -> None:
+        """
+        Delete `key` if it exists.
+        """
+        self._delete_raw(key)
+
+    def close(self) -> None:
+        """
+        Release the resources of the backend.
+        """
+
+    def __enter__(self) -> "CacheBackend":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _get_raw(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def _set_raw(self, key: str, data: bytes, ttl: Optional[float]) -> None:
+        raise NotImplementedError
+
+    def _delete_raw(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class RedisError(Exception):
+    """
+    Error replied by a Redis server.
+    """
+
+
+def backend_errors() -> Tuple[type, ...]:
+    """
+    Exception types raised by the backends when their store is unavailable
+    or holds a corrupt value, which callers treat as cache misses.
+    """
+    import sqlite3
+
+    return (OSError, RedisError, sqlite3.Error, ValueError, KeyError, zlib.error, struct.error)
+
+
+class FileSystemBackend(CacheBackend):
+    """
+    Backend storing each value in a file of a directory, shared by the
+    processes of a host or by hosts mounting the same file system.
+
+    Files are written next to their final path and renamed into place, so
+    a reader never sees a partially written value. The expiry time is kept
+    in the first 8 bytes of each file.
+
+    Attributes
+    ----------
+    directory : str
+        The directory.
+    """
+
+    def __init__(self, directory: str, compress_level: int = COMPRESS_LEVEL) -> None:
+        """
+        Initialize the FileSystemBackend object, creating the directory if needed.
+
+        Parameters
+        ----------
+        directory : str
+            The directory.
+        compress_level : int, optional
+            zlib compression level. Default is COMPRESS_LEVEL.
+        """
+        super().__init__(compress_level)
+        self.directory: str = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name[:2], name[2:] + ".bin")
+
+    def _get_raw(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file_:
+                data = file_.read()
+        except FileNotFoundError:
+            return None
+        (expires_at,) = _EXPIRES.unpack_from(data)
+        if expires_at and expires_at <= time.time():
+            self._delete_raw(key)
+            return None
+        return data[_EXPIRES.size:]
+
+    def _set_raw(self, key: str, data: bytes, ttl: Optional[float]) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        part_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        with open(part_path, "wb") as file_:
+            file_.write(_EXPIRES.pack(_expires_at(ttl)))
+            file_.write(data)
+        os.replace(part_path, path)
+
+    def _delete_raw(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Backend storing the values in an SQLite file shared by the processes
+    of a host.
+
+    Attributes
+    ----------
+    path : str
+        Path to the database file.
+    """
+
+    def __init__(
+        self, path: str, compress_level: int = COMPRESS_LEVEL, timeout: float = 30.0
+    ) -> None:
+        """
+        Initialize the SQLiteBackend object, creating the database if needed.
+
+        Parameters
+        ----------
+        path : str
+            Path to the database file.
+        compress_level : int, optional
+            zlib compression level. Default is COMPRESS_LEVEL.
+        timeout : float, optional
+            Seconds to wait for a lock held by another process. Default is 30.0.
+        """
+        # imported on first use, like the HTTP stack in `base`
+        import sqlite3
+
+        super().__init__(compress_level)
+        self.path: str = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, timeout=timeout, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _get_raw(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM entries WHERE key = ? AND (expires_at = 0 OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def _set_raw(self, key: str, data: bytes, ttl: Optional[float]) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, data, _expires_at(ttl))
+            )
+
+    def _delete_raw(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def purge(self) -> int:
+        """
+        Delete the expired entries.
+
+        Returns
+        -------
+        int
+            Number of deleted entries.
+        """
+        with self._lock:
+            cursor = self._connection.execute(
+                "DELETE FROM entries WHERE expires_at != 0 AND expires_at <= ?", (time.time(),)
+            )
+            return cursor.rowcount
+
+
+def encode_command(*args: Union[str, bytes, int]) -> bytes:
+    """
+    Encode a command in the Redis serialization protocol (RESP).
+    """
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode("utf-8")
+        elif isinstance(arg, int):
+            arg = str(arg).encode("ascii")
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+def read_reply(file_) -> Union[None, int, bytes, List]:
+    """
+    Read a RESP reply from a binary file object.
+
+    Raises
+    ------
+    RedisError
+        If the reply is an error.
+    ConnectionError
+        If the connection is closed.
+    """
+    line = file_.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by the Redis server.")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest
+    if kind == b"-":
+        raise RedisError(rest.decode("utf-8", "replace"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        data = file_.read(length + 2)
+        if len(data) != length + 2:
+            raise ConnectionError("Connection closed by the Redis server.")
+        return data[:-2]
+    if kind == b"*":
+        length = int(rest)
+        if length < 0:
+            return None
+        return [read_reply(file_) for _ in range(length)]
+    raise ConnectionError(f"Invalid reply from the Redis server: {line!r}")
+
+
+class RedisBackend(CacheBackend):
+    """
+    Backend storing the values in a Redis server, or any server speaking
+    its protocol, shared by the hosts of a deployment.
+
+    It speaks the protocol over a plain socket and needs no Redis client
+    library. Expiry is left to the server (`SET ... PX`). The connection is
+    opened on first use and opened again once if it is broken.
+
+    Attributes
+    ----------
+    host : str
+        Host of the server.
+    port : int
+        Port of the server.
+    db : int
+        Database number.
+    prefix : str
+        Prefix of the keys.
+    """
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = REDIS_PORT, db: int = 0,
+        password: Optional[str] = None, prefix: str = REDIS_PREFIX,
+        compress_level: int = COMPRESS_LEVEL, timeout: float = TIMEOUT_SEC
+    ) -> None:
+        """
+        Initialize the RedisBackend object. The server is not connected yet.
+
+        Parameters
+        ----------
+        host : str, optional
+            Host of the server. Default is "127.0.0.1".
+        port : int, optional
+            Port of the server. Default is REDIS_PORT.
+        db : int, optional
+            Database number. Default is 0.
+        password : str, optional
+            Password sent with AUTH. Default is None.
+        prefix : str, optional
+            Prefix of the keys. Default is REDIS_PREFIX.
+        compress_level : int, optional
+            zlib compression level. Default is COMPRESS_LEVEL.
+        timeout : float, optional
+            Socket timeout in seconds. Default is TIMEOUT_SEC.
+        """
+        super().__init__(compress_level)
+        self.host: str = host
+        self.port: int = port
+        self.db: int = db
+        self.prefix: str = prefix
+        self._password: Optional[str] = password
+        self._timeout: float = timeout
+        self._lock = threading.Lock()
+        self._socket = None
+        self._file = None
+
+    def _connect(self) -> None:
+        import socket
+
+        self._socket = socket.create_connection((self.host, self.port), self._timeout)
+        try:
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._file = self._socket.makefile("rb")
+            if self._password is not None:
+                self._send("AUTH", self._password)
+            if self.db:
+                self._send("SELECT", self.db)
+        except BaseException:
+            # never keep a connection that is not authenticated
+            self._disconnect()
+            raise
+
+    def _send(self, *args):
+        self._socket.sendall(encode_command(*args))
+        return read_reply(self._file)
+
+    def execute(self, *args: Union[str, bytes, int]):
+        """
+        Send a command and return its reply.
+
+        Raises
+        ------
+        RedisError
+            If the server replies with an error.
+        OSError
+            If the server cannot be reached.
+        """
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._socket is None:
+                        self._connect()
+                    return self._send(*args)
+                except (ConnectionError, TimeoutError):
+                    self._disconnect()
+                    if attempt:
+                        raise
+        return None
+
+    def _disconnect(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        if self._socket is not None:
+            self._socket.close()
+        self._socket = None
+        self._file = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+    def _get_raw(self, key: str) -> Optional[bytes]:
+        return self.execute("GET", self.prefix + key)
+
+    def _set_raw(self, key: str, data: bytes, ttl: Optional[float]) -> None:
+        if ttl is None:
+            self.execute("SET", self.prefix + key, data)
+        else:
+            self.execute("SET", self.prefix + key, data, "PX", max(1, int(ttl * 1000)))
+
+    def _delete_raw(self, key: str) -> None:
+        self.execute("DEL", self.prefix + key)
+
+
+def open_backend(url: str, compress_level: int = COMPRESS_LEVEL) -> CacheBackend:
+    """
+    Open a backend from a URL.
+
+    Parameters
+    ----------
+    url : str
+        "file:///path/to/directory", "sqlite:///path/to/file.db" or
+        "redis://[:password@]host[:port][/db]".
+    compress_level : int, optional
+        zlib compression level. Default is COMPRESS_LEVEL.
+
+    Returns
+    -------
+    CacheBackend
+        The backend.
+
+    Raises
+    ------
+    ValueError
+        If the scheme of `url` is not supported.
+    """
+    from urllib.parse import unquote, urlparse
+
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return FileSystemBackend(unquote(parsed.path), compress_level)
+    if parsed.scheme == "sqlite":
+        return SQLiteBackend(unquote(parsed.path), compress_level)
+    if parsed.scheme == "redis":
+        db = parsed.path.strip("/")
+        return RedisBackend(
+            parsed.hostname or "127.0.0.1", parsed.port or REDIS_PORT,
+            int(db) if db else 0,
+            unquote(parsed.password) if parsed.password else None,
+            compress_level=compress_level
+        )
+    raise ValueError(f"Unsupported cache backend URL: {url}")
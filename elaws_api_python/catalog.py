@@ -0,0 +1,333 @@
+"""elaws_api_python.catalog
+
+Catalog of laws and ordinances merged across law types.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+from .base import LAWTYPES, TIMEOUT_SEC
+from .cache import ResponseCache
+from .classes.laws_and_ordinances_response import (
+    LawNameInfoElement, LawNameListInfo, ListOfLaws
+)
+from .main import acquire_laws_and_ordinances
+
+
+class LawCatalog:
+    """
+    Deduplicated store of laws and ordinances of several law types.
+
+    Each law/ordinance is held once, keyed by its law id, together with the
+    set of categories (law types) whose lists include it. All the lookups
+    run on a single LawNameListInfo whose indexes are built once.
+
+    Attributes
+    ----------
+    law_name_list_info : LawNameListInfo
+        The merged list of law/ordinance information.
+    """
+
+    def __init__(self, lists_of_laws: Dict[int, ListOfLaws]) -> None:
+        """
+        Initialize the LawCatalog object by merging lists of laws and ordinances.
+
+        Parameters
+        ----------
+        lists_of_laws : Dict[int, ListOfLaws]
+            Lists of laws and ordinances keyed by law type. The category in
+            each list is used instead of the key if it is given.
+        """
+        elements: List[LawNameInfoElement] = []
+        row_by_law_id: Dict[str, int] = {}
+        # Rows share one frozenset per distinct combination of categories.
+        interned: Dict[FrozenSet[int], FrozenSet[int]] = {}
+        self._categories: List[FrozenSet[int]] = []
+        for lawtype, list_of_laws in lists_of_laws.items():
+            category = list_of_laws.appl_data.category
+            if category is None:
+                category = lawtype
+            for elem in list_of_laws.list_name_list_info:
+                row = row_by_law_id.get(elem.law_id)
+                if row is None:
+                    row = len(elements)
+                    row_by_law_id[elem.law_id] = row
+                    elements.append(elem)
+                    self._categories.append(frozenset())
+                categories = self._categories[row] | {category}
+                self._categories[row] = interned.setdefault(categories, categories)
+
+        self.law_name_list_info: LawNameListInfo = LawNameListInfo(elements)
+        self.law_name_list_info.build_indexes()
+        # build the name index up front so that the first query does not pay for it
+        self.law_name_list_info.name_matcher  # pylint: disable=pointless-statement
+        self._row_by_law_id: Dict[str, int] = row_by_law_id
+
+    @staticmethod
+    def fetch(
+        version: int, lawtypes: Iterable[int] = LAWTYPES,
+        timeout: float = TIMEOUT_SEC,
+        cache: Optional[ResponseCache] = None,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Static method to acquire the lists of several law types in parallel
+        and merge them into a LawCatalog.
+
+        Parameters
+        ----------
+        version : int
+            Version number of the e-Gov eLaw API.
+        lawtypes : Iterable[int], optional
+            Law types to acquire. Default is all of LAWTYPES.
+        timeout : float, optional
+            Timeout duration in seconds. Default is TIMEOUT_SEC.
+        cache : ResponseCache, optional
+            Cache to revalidate the responses against. Default is None.
+        max_workers : int, optional
+            Maximum number of concurrent requests.
+            Default is the number of law types.
+
+        Returns
+        -------
+        LawCatalog
+            The merged catalog.
+
+        Raises
+        ------
+        requests.exceptions.RequestException
+            If an error occurs during the API requests.
+        """
+        lawtypes = list(lawtypes)
+        with ThreadPoolExecutor(max_workers=max_workers or len(lawtypes)) as executor:
+            lists = executor.map(
+                lambda lawtype: acquire_laws_and_ordinances(
+                    version, lawtype, timeout, cache),
+                lawtypes
+            )
+            return LawCatalog(dict(zip(lawtypes, lists)))
+
+    def __len__(self) -> int:
+        return len(self.law_name_list_info)
+
+    def __iter__(self):
+        return iter(self.law_name_list_info)
+
+    def __contains__(self, law_id: str) -> bool:
+        return law_id in self._row_by_law_id
+
+    def categories_of(self, law_id: str) -> Set[int]:
+        """
+        Get the categories whose lists include a law/ordinance.
+
+        Parameters
+        ----------
+        law_id : str
+            The id of the law/ordinance.
+
+        Returns
+        -------
+        Set[int]
+            The categories. Empty if the law/ordinance is not in the catalog.
+        """
+        row = self._row_by_law_id.get(law_id)
+        if row is None:
+            return set()
+        return set(self._categories[row])
+
+    def findall_elements_by_category(self, category: int) -> List[LawNameInfoElement]:
+        """
+        Find all the law information elements included in a category.
+
+        Parameters
+        ----------
+        category : int
+            Law type category.
+
+        Returns
+        -------
+        List[LawNameInfoElement]
+            List of the law information elements in the category.
+        """
+        list_of_info = self.law_name_list_info.list_of_info
+        return [
+            list_of_info[row]
+            for row, categories in enumerate(self._categories)
+            if category in categories
+        ]
+
+    def find_element_by_law_id(self, law_id: str) -> Optional[LawNameInfoElement]:
+        """
+        Find the law information element by law id.
+
+        Parameters
+        ----------
+        law_id : str
+            The id of the law/ordinance.
+
+        Returns
+        -------
+        LawNameInfoElement, optional
+            If the law/ordinance with the specified id exists, its information is returned.
+            If no such law/ordinance exists, None is returned.
+        """
+        return self.law_name_list_info.find_element_by_law_id(law_id)
+
+    def find_law_name_by_law_id(self, law_id: str) -> Optional[str]:
+        """
+        Find the law name by law id.
+
+        Parameters
+        ----------
+        law_id : str
+            The id of the law/ordinance.
+
+        Returns
+        -------
+        str, optional
+            If the law/ordinance with the specified id exists, its naem is returned.
+            If no such law/ordinance exists, None is returned.
+        """
+        return self.law_name_list_info.find_law_name_by_law_id(law_id)
+
+    def find_element_by_law_name(self, law_name: str) -> Optional[LawNameInfoElement]:
+        """
+        Find the law information element by law name.
+
+        Parameters
+        ----------
+        law_name : str
+            The name of the law/ordinance.
+
+        Returns
+        -------
+        LawNameInfoElement, optional
+            If the law/ordinance with the specified law name exists, its information is returned.
+            If no such law/ordinance exists, None is returned.
+        """
+        return self.law_name_list_info.find_element_by_law_name(law_name)
+
+    def find_law_id_by_law_name(self, law_name: str) -> Optional[str]:
+        """
+        Find the law id by law name.
+
+        Parameters
+        ----------
+        law_name : str
+            The name of the law/ordinance.
+
+        Returns
+        -------
+        str, optional
+            If the law/ordinance with the specified id exists, its id is returned.
+            If no such law/ordinance exists, None is returned.
+        """
+        return self.law_name_list_info.find_law_id_by_law_name(law_name)
+
+    def findall_elements_by_keyword_in_law_name(self, key: str) -> List[LawNameInfoElement]:
+        """
+        Find all the law information elements whose names include `key.`
+
+        Parameters
+        ----------
+        key : str
+            The keyword of the law/ordinance.
+
+        Returns
+        -------
+        List[LawNameInfoElement]
+            List of the law information elements whose names include 'key.'
+        """
+        return self.law_name_list_info.findall_elements_by_keyword_in_law_name(key)
+
+    def findall_law_ids_by_keyword_in_law_name(self, key: str) -> List[str]:
+        """
+        Find all the law ids of the law information elements whose names include 'key.'
+
+        Parameters
+        ----------
+        key : str
+            The keyword of the law/ordinance.
+
+        Returns
+        -------
+        List[str]
+            List of law ids of the law information elements whose names include 'key.'
+        """
+        return self.law_name_list_info.findall_law_ids_by_keyword_in_law_name(key)
+
+    def findall_law_names_by_keyword_in_law_name(self, key: str) -> List[str]:
+        """
+        Find all the law names of the law information elements including 'key.'
+
+        Parameters
+        ----------
+        key : str
+            The keyword of the law/ordinance.
+
+        Returns
+        -------
+        List[str]
+            List of law names of the law information elements including 'key.'
+        """
+        return self.law_name_list_info.findall_law_names_by_keyword_in_law_name(key)
+
+    def findall_elements_by_fuzzy_law_name(
+        self, law_name: str, limit: int = 10, max_distance: Optional[int] = None
+    ) -> List[LawNameInfoElement]:
+        """
+        Find the law information elements whose names are similar to `law_name`.
+
+        Parameters
+        ----------
+        law_name : str
+            The name of the law/ordinance, possibly inexact.
+        limit : int, optional
+            Maximum number of results. Default is 10.
+        max_distance : int, optional
+            Maximum edit distance between the normalized names.
+            Default is a quarter of the length of the normalized name.
+
+        Returns
+        -------
+        List[LawNameInfoElement]
+            List of the law information elements, best match first.
+        """
+        return self.law_name_list_info.findall_elements_by_fuzzy_law_name(
+            law_name, limit, max_distance
+        )
+
+    def find_element_by_law_number(self, law_number: str) -> Optional[LawNameInfoElement]:
+        """
+        Find the law information element by law number.
+
+        Parameters
+        ----------
+        law_number : str
+            The law number of the law/ordinance, with kanji or Arabic numerals
+            and an era or a western year.
+
+        Returns
+        -------
+        LawNameInfoElement, optional
+            If the law/ordinance with the specified law number exists, its information is returned.
+            If no such law/ordinance exists, None is returned.
+        """
+        return self.law_name_list_info.find_element_by_law_number(law_number)
+
+    def find_law_id_by_law_number(self, law_number: str) -> Optional[str]:
+        """
+        Find the law id by law number.
+
+        Parameters
+        ----------
+        law_number : str
+            The law number of the law/ordinance.
+
+        Returns
+        -------
+        str, optional
+            If the law/ordinance with the specified law number exists, its id is returned.
+            If no such law/ordinance exists, None is returned.
+        """
+        return self.law_name_list_info.find_law_id_by_law_number(law_number)
@@ -1,6 +1,29 @@
 """elaws_api_python.main.classes
+
+The response classes are imported on first access, so that importing one
+of them does not load the modules (and dependencies) of the others.
 """
 
-from .law_content_response import LawContentResponse
-from .law_text_response import LawTextResponse
-from .laws_and_ordinances_response import ListOfLaws
+import importlib
+
+_CLASSES = {
+    "LawContentResponse": ".law_content_response",
+    "LawTextResponse": ".law_text_response",
+    "ListOfLaws": ".laws_and_ordinances_response",
+    "ListOfUpdatedLaws": ".updated_laws_response",
+}
+
+__all__ = list(_CLASSES)
+
+
+def __getattr__(name: str):
+    module = _CLASSES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
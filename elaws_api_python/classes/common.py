@@ -1,9 +1,310 @@
 """common
 """
 
-from typing import Optional
+import os
+import re
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
 from xml.etree import ElementTree as ET
 
+XMLSource = Union[str, bytes, Iterable[bytes]]
+
+READ_SIZE = 64 * 1024
+# Elements relative to which selectors are matched.
+ANCHOR_TAGS = ("LawBody", "LawContents")
+# Children kept in the ancestors of the selected subtrees.
+HEADING_SUFFIXES = ("Title", "Caption", "Label")
+STEP_PATTERN = re.compile(r"^(?P<tag>[\w*]+)(?P<predicates>(?:\[[^\]]*\])*)$")
+PREDICATE_PATTERN = re.compile(
+    r"\[@(?P<name>\w+)\s*=\s*(?P<value>\"[^\"]*\"|'[^']*'|[^\]]*)\]"
+)
+
+
+def parse_chunks(chunks: Iterable[bytes]) -> ET.Element:
+    """
+    Parse XML data fed in chunks with an incremental parser.
+
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        Chunks of the raw XML data, e.g. from `base.stream_law_text`.
+
+    Returns
+    -------
+    xml.etree.ElementTree.Element
+        The root element of the XML data.
+    """
+    parser = ET.XMLPullParser(events=("start",))
+    root = None
+    for chunk in chunks:
+        parser.feed(chunk)
+        if root is None:
+            for _, elem in parser.read_events():
+                root = elem
+                break
+        # drop the remaining start events so that they do not pile up
+        for _ in parser.read_events():
+            pass
+    parser.close()
+    if root is None:
+        raise ValueError("XML data is empty.")
+    return root
+
+
+def load_root(xml_content: XMLSource, select: Optional[Sequence[str]] = None) -> ET.Element:
+    """
+    Load the root element of XML data.
+
+    Parameters
+    ----------
+    xml_content : str, bytes or Iterable[bytes]
+        Content or path to the XML data file as str, raw content as bytes,
+        or an iterable of raw chunks to be parsed incrementally.
+    select : Sequence[str], optional
+        Selectors of the subtrees to keep; see `parse_selected`.
+        Default is None, which keeps the whole tree.
+
+    Returns
+    -------
+    xml.etree.ElementTree.Element
+        The root element of the XML data.
+    """
+    if select is not None:
+        return parse_selected(_iter_chunks(xml_content), select)
+    if isinstance(xml_content, bytes):
+        return ET.fromstring(xml_content)
+    if isinstance(xml_content, str):
+        if os.path.exists(xml_content):
+            return ET.parse(xml_content).getroot()
+        return ET.fromstring(xml_content)
+    return parse_chunks(xml_content)
+
+
+def _iter_chunks(xml_content: XMLSource) -> Iterable[Union[str, bytes]]:
+    if isinstance(xml_content, bytes):
+        return (xml_content,)
+    if isinstance(xml_content, str):
+        if os.path.exists(xml_content):
+            return _read_file(xml_content)
+        return (xml_content,)
+    return xml_content
+
+
+def _read_file(path: str) -> Iterable[bytes]:
+    with open(path, "rb") as file_:
+        while True:
+            chunk = file_.read(READ_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+class Step(NamedTuple):
+    """
+    A step of a selector.
+
+    Attributes
+    ----------
+    tag : str
+        Tag name, or "*" for any tag.
+    attributes : Tuple[Tuple[str, str], ...]
+        Attribute values the element must have.
+    descendant : bool
+        Whether the step may match at any depth below the previous one.
+    """
+    tag: str
+    attributes: Tuple[Tuple[str, str], ...]
+    descendant: bool
+
+    def matches(self, elem: ET.Element) -> bool:
+        """
+        Whether `elem` matches the step.
+        """
+        if self.tag != "*" and self.tag != elem.tag:
+            return False
+        return all(elem.get(name) == value for name, value in self.attributes)
+
+
+def parse_selector(selector: str) -> Tuple[Step, ...]:
+    """
+    Parse a structural selector.
+
+    Steps are separated by "/", and "//" lets the next step match at any
+    depth. A step is a tag name or "*" followed by optional attribute
+    predicates, e.g. "MainProvision/Chapter[@Num=3]",
+    "SupplProvision[@AmendLawNum='平成二九年六月二日法律第四四号']" or
+    "MainProvision//Article[@Num=709]".
+
+    Parameters
+    ----------
+    selector : str
+        The selector.
+
+    Returns
+    -------
+    Tuple[Step, ...]
+        The steps.
+
+    Raises
+    ------
+    ValueError
+        If `selector` is malformed.
+    """
+    steps: List[Step] = []
+    descendant = False
+    for index, token in enumerate(selector.strip().split("/")):
+        if not token:
+            if index > 0 or selector.startswith("//"):
+                descendant = True
+            continue
+        match = STEP_PATTERN.match(token.strip())
+        if match is None:
+            raise ValueError(f"Invalid selector: {selector}")
+        predicates = match.group("predicates")
+        attributes = tuple(
+            (predicate.group("name"), predicate.group("value").strip().strip("\"'"))
+            for predicate in PREDICATE_PATTERN.finditer(predicates)
+        )
+        if len(attributes) != predicates.count("["):
+            raise ValueError(f"Invalid selector: {selector}")
+        steps.append(Step(match.group("tag"), attributes, descendant))
+        descendant = False
+    if not steps:
+        raise ValueError(f"Invalid selector: {selector}")
+    return tuple(steps)
+
+
+# States of the elements while selecting.
+_OUTSIDE = 0  # above the anchor: kept
+_PARTIAL = 1  # on the way to a selected subtree: kept if it leads to one
+_KEEP = 2     # in a selected subtree: kept as a whole
+_HEADING = 3  # heading of a partial element: kept as a whole
+_DROP = 4     # elsewhere: discarded as soon as it ends
+
+States = FrozenSet[Tuple[int, int]]
+
+
+class _Selection:
+    """
+    Transitions of the selector states from an element to its children.
+
+    Transitions are memoized by the parent states, the tag and the values of
+    the attributes that predicates test, so each distinct case is computed
+    once per document.
+    """
+
+    def __init__(self, select: Sequence[str]) -> None:
+        self.selectors: List[Tuple[Step, ...]] = [parse_selector(selector) for selector in select]
+        self.initial: States = frozenset((index, 0) for index in range(len(self.selectors)))
+        self._names: Dict[str, Tuple[str, ...]] = {}
+        any_names = set()
+        for steps in self.selectors:
+            for step in steps:
+                names = {name for name, _ in step.attributes}
+                if step.tag == "*":
+                    any_names |= names
+                else:
+                    self._names[step.tag] = tuple(set(self._names.get(step.tag, ())) | names)
+        self._any_names: Tuple[str, ...] = tuple(any_names)
+        self._memo: Dict[tuple, Tuple[int, States]] = {}
+
+    def child(self, states: States, elem: ET.Element) -> Tuple[int, States]:
+        tag = elem.tag
+        names = self._names.get(tag, ()) + self._any_names
+        key = (states, tag, tuple(elem.get(name) for name in names))
+        result = self._memo.get(key)
+        if result is None:
+            result = self._compute(states, elem)
+            self._memo[key] = result
+        return result
+
+    def _compute(self, states: States, elem: ET.Element) -> Tuple[int, States]:
+        next_states = set()
+        matched = False
+        for selector_index, step_index in states:
+            steps = self.selectors[selector_index]
+            step = steps[step_index]
+            if step.descendant:
+                next_states.add((selector_index, step_index))
+            if step.matches(elem):
+                if step_index + 1 == len(steps):
+                    return _KEEP, frozenset()
+                next_states.add((selector_index, step_index + 1))
+                matched = True
+        if not matched and elem.tag.endswith(HEADING_SUFFIXES):
+            return _HEADING, frozenset()
+        if next_states:
+            return _PARTIAL, frozenset(next_states)
+        return _DROP, frozenset()
+
+
+def parse_selected(chunks: Iterable[Union[str, bytes]], select: Sequence[str]) -> ET.Element:
+    """
+    Parse XML data keeping only the subtrees matched by selectors.
+
+    Selectors are matched relative to `LawBody` (full texts) or
+    `LawContents` (contents). Everything outside them is kept; inside, an
+    element is kept if a selector matches it or one of its ancestors, and
+    the ancestors of kept elements are kept with their headings (titles,
+    captions and labels) only. Any other element is removed from the tree
+    as soon as it ends, so memory stays proportional to the selected part.
+
+    Parameters
+    ----------
+    chunks : Iterable[str or bytes]
+        Chunks of the XML data.
+    select : Sequence[str]
+        Selectors; see `parse_selector`.
+
+    Returns
+    -------
+    xml.etree.ElementTree.Element
+        The root element of the pruned tree.
+    """
+    selection = _Selection(select)
+    parser = ET.XMLPullParser(events=("start", "end"))
+    elems: List[ET.Element] = []
+    # [status, states, whether a selected subtree was kept below]
+    stack: List[list] = []
+    root: Optional[ET.Element] = None
+
+    def drain() -> None:
+        nonlocal root
+        for event, elem in parser.read_events():
+            if event == "start":
+                if not stack:
+                    root = elem
+                    stack.append([_OUTSIDE, frozenset(), False])
+                else:
+                    status, states, _ = stack[-1]
+                    if status == _PARTIAL:
+                        status, states = selection.child(states, elem)
+                    elif status == _OUTSIDE:
+                        if elem.tag in ANCHOR_TAGS:
+                            status, states = _PARTIAL, selection.initial
+                    elif status == _HEADING:
+                        status = _KEEP
+                    stack.append([status, states, False])
+                elems.append(elem)
+                continue
+            status, _, leads = stack.pop()
+            elems.pop()
+            if not elems or status == _OUTSIDE or status == _HEADING:
+                continue
+            if status == _DROP or (
+                    status == _PARTIAL and not leads and elem.tag not in ANCHOR_TAGS):
+                elems[-1].remove(elem)
+            else:
+                stack[-1][2] = True
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        drain()
+    parser.close()
+    drain()
+    if root is None:
+        raise ValueError("XML data is empty.")
+    return root
+
 
 class Result:
     """
@@ -2,10 +2,11 @@
 """
 
 import os
-from typing import Optional, List
+from typing import Optional, List, Sequence, Tuple
 from xml.etree import ElementTree as ET
 
-from .common import Result
+from .common import Result, XMLSource, load_root
+from .law_model import build_models
 
 SCHEMA_PATH: str = os.path.join(
     os.path.dirname(__file__),
@@ -112,7 +113,7 @@ class ApplData:
             )
 
         image_data = elem.find("ImageData")
-        if image_data:
+        if image_data is not None:
             image_data = image_data.text
         return ApplData(
             law_id, law_number, article, paragraph,
@@ -138,20 +139,22 @@ class LawContentResponse:
         Path to the XML data file.
     """
 
-    def __init__(self, xml_content: str) -> None:
+    def __init__(self, xml_content: XMLSource, select: Optional[Sequence[str]] = None) -> None:
         """
         Initialize the DataRoot object by loading XML data from the specified path.
 
         Parameters
         ----------
-        xml_content : str
-            Content or path to the XML data file.
+        xml_content : str, bytes or Iterable[bytes]
+            Content or path to the XML data file. Raw bytes and an iterable
+            of raw chunks (e.g. from `base.stream_law_text`) are also
+            accepted; chunks are parsed incrementally as they arrive.
+        select : Sequence[str], optional
+            Selectors of the subtrees to keep, e.g. ["MainProvision/Chapter[@Num=3]"]
+            or ["SupplProvision"]; see `common.parse_selector`. The other
+            subtrees are discarded while parsing. Default is None (keep all).
         """
-        content = xml_content
-        if os.path.exists(xml_content):
-            with open(xml_content, "r", encoding="utf-8") as file_:
-                content = file_.read()
-        root = ET.fromstring(content)
+        root = load_root(xml_content, select)
 
         # XML data validation
         # schema = XMLSchema(SCHEMA_PATH)
@@ -163,6 +166,28 @@ class LawContentResponse:
         self._appl_data: Optional[ApplData] = None
         self.parse_data(root)
 
+    @staticmethod
+    def from_data(result: Result, appl_data: ApplData):
+        """
+        Static method to create a LawContentResponse object from already parsed data.
+
+        Parameters
+        ----------
+        result : Result
+            Processing result.
+        appl_data : ApplData
+            Main data.
+
+        Returns
+        -------
+        LawContentResponse
+            LawContentResponse object holding `result` and `appl_data`.
+        """
+        obj = LawContentResponse.__new__(LawContentResponse)
+        obj._result = result
+        obj._appl_data = appl_data
+        return obj
+
     def parse_data(self, root: ET.Element) -> None:
         """
         Parse and extract data from the XML root element.
@@ -207,3 +232,25 @@ class LawContentResponse:
             The main data information.
         """
         return self._appl_data
+
+    def to_models(self, release: bool = False) -> Tuple:
+        """
+        Build the typed models of the contents, e.g. (Article,) for an article.
+
+        Parameters
+        ----------
+        release : bool, optional
+            If True, the elements are released as the models are built and
+            `law_contents` is dropped afterwards. Default is False.
+
+        Returns
+        -------
+        Tuple
+            The models of the top-most elements of the contents.
+        """
+        if self._appl_data.law_contents is None:
+            return ()
+        models = build_models(self._appl_data.law_contents, release)
+        if release:
+            self._appl_data.law_contents = None
+        return models
@@ -0,0 +1,596 @@
+"""law_model
+
+Typed object model of the full-text XML hierarchy.
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from xml.etree import ElementTree as ET
+
+from ..records import element_text, sentence_text
+
+SUBITEM_TAGS = tuple(f"Subitem{level}" for level in range(1, 11))
+
+
+class Item:
+    """
+    An item (号) or a subitem (イ, (1), ...).
+
+    Attributes
+    ----------
+    tag : str
+        "Item" or "Subitem1" to "Subitem10".
+    num : str, optional
+        Value of the `Num` attribute.
+    title : str
+        Title, e.g. "一" or "イ".
+    text : str
+        Sentence of the item itself.
+    subitems : Tuple[Item, ...]
+        Subitems.
+    """
+    __slots__ = ("tag", "num", "title", "text", "subitems")
+
+    def __init__(
+        self, tag: str, num: Optional[str], title: str, text: str,
+        subitems: Tuple["Item", ...] = ()
+    ) -> None:
+        self.tag: str = tag
+        self.num: Optional[str] = num
+        self.title: str = title
+        self.text: str = text
+        self.subitems: Tuple[Item, ...] = subitems
+
+    def __repr__(self) -> str:
+        return f"{self.tag}(num={self.num!r}, title={self.title!r})"
+
+
+class Paragraph:
+    """
+    A paragraph (項).
+
+    Attributes
+    ----------
+    num : str, optional
+        Value of the `Num` attribute.
+    paragraph_num : str
+        Displayed paragraph number, e.g. "２" ("" for the first paragraph).
+    caption : str
+        Caption, if any.
+    text : str
+        Sentence of the paragraph.
+    items : Tuple[Item, ...]
+        Items.
+    """
+    __slots__ = ("num", "paragraph_num", "caption", "text", "items")
+
+    def __init__(
+        self, num: Optional[str], paragraph_num: str, caption: str, text: str,
+        items: Tuple[Item, ...] = ()
+    ) -> None:
+        self.num: Optional[str] = num
+        self.paragraph_num: str = paragraph_num
+        self.caption: str = caption
+        self.text: str = text
+        self.items: Tuple[Item, ...] = items
+
+    def __repr__(self) -> str:
+        return f"Paragraph(num={self.num!r})"
+
+
+class Article:
+    """
+    An article (条).
+
+    Attributes
+    ----------
+    num : str, optional
+        Value of the `Num` attribute, e.g. "3_2".
+    title : str
+        Title, e.g. "第三条の二".
+    caption : str
+        Caption, e.g. "（意思能力）".
+    paragraphs : Tuple[Paragraph, ...]
+        Paragraphs.
+    """
+    __slots__ = ("num", "title", "caption", "paragraphs")
+
+    def __init__(
+        self, num: Optional[str], title: str, caption: str,
+        paragraphs: Tuple[Paragraph, ...] = ()
+    ) -> None:
+        self.num: Optional[str] = num
+        self.title: str = title
+        self.caption: str = caption
+        self.paragraphs: Tuple[Paragraph, ...] = paragraphs
+
+    def __repr__(self) -> str:
+        return f"Article(num={self.num!r}, title={self.title!r})"
+
+
+Node = Union["Part", "Chapter", "Section", "Subsection", "Division", Article, Paragraph]
+
+
+class _Container:
+    """
+    Mixin of the nodes holding articles, paragraphs or lower divisions.
+    """
+    __slots__ = ()
+
+    def iter_articles(self) -> Iterator[Article]:
+        """
+        Iterate over the articles in document order.
+        """
+        for child in self.children:
+            if isinstance(child, Article):
+                yield child
+            elif isinstance(child, _Container):
+                yield from child.iter_articles()
+
+
+class _Division(_Container):
+    """
+    Base class of the divisions (Part, Chapter, Section, Subsection, Division).
+
+    Attributes
+    ----------
+    num : str, optional
+        Value of the `Num` attribute.
+    title : str
+        Title, e.g. "第一章　通則".
+    children : Tuple[Node, ...]
+        Lower divisions or articles.
+    """
+    __slots__ = ("num", "title", "children")
+
+    def __init__(self, num: Optional[str], title: str, children: Tuple[Node, ...] = ()) -> None:
+        self.num: Optional[str] = num
+        self.title: str = title
+        self.children: Tuple[Node, ...] = children
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(num={self.num!r}, title={self.title!r})"
+
+
+class Part(_Division):
+    """
+    A part (編).
+    """
+    __slots__ = ()
+
+
+class Chapter(_Division):
+    """
+    A chapter (章).
+    """
+    __slots__ = ()
+
+
+class Section(_Division):
+    """
+    A section (節).
+    """
+    __slots__ = ()
+
+
+class Subsection(_Division):
+    """
+    A subsection (款).
+    """
+    __slots__ = ()
+
+
+class Division(_Division):
+    """
+    A division (目).
+    """
+    __slots__ = ()
+
+
+class MainProvision(_Container):
+    """
+    The main provision (本則).
+
+    Attributes
+    ----------
+    children : Tuple[Node, ...]
+        Divisions, articles, or paragraphs of a law without articles.
+    """
+    __slots__ = ("children",)
+
+    def __init__(self, children: Tuple[Node, ...] = ()) -> None:
+        self.children: Tuple[Node, ...] = children
+
+    def __repr__(self) -> str:
+        return f"MainProvision({len(self.children)} children)"
+
+
+class SupplProvision(_Container):
+    """
+    A supplementary provision (附則).
+
+    Attributes
+    ----------
+    amend_law_num : str, optional
+        Law number of the amending law, None for the original supplementary provision.
+    extract : bool
+        Whether the provision is an extract.
+    label : str
+        Label, e.g. "附　則".
+    children : Tuple[Node, ...]
+        Divisions, articles or paragraphs.
+    """
+    __slots__ = ("amend_law_num", "extract", "label", "children")
+
+    def __init__(
+        self, amend_law_num: Optional[str], extract: bool, label: str,
+        children: Tuple[Node, ...] = ()
+    ) -> None:
+        self.amend_law_num: Optional[str] = amend_law_num
+        self.extract: bool = extract
+        self.label: str = label
+        self.children: Tuple[Node, ...] = children
+
+    def __repr__(self) -> str:
+        return f"SupplProvision(amend_law_num={self.amend_law_num!r})"
+
+
+class AppdxTable:
+    """
+    An appended table (別表).
+
+    Attributes
+    ----------
+    num : str, optional
+        Value of the `Num` attribute.
+    title : str
+        Title, e.g. "別表第一".
+    related_article_num : str
+        Related articles, e.g. "（第二条関係）".
+    rows : Tuple[Tuple[str, ...], ...]
+        Texts of the cells of the table, row by row.
+    """
+    __slots__ = ("num", "title", "related_article_num", "rows")
+
+    def __init__(
+        self, num: Optional[str], title: str, related_article_num: str,
+        rows: Tuple[Tuple[str, ...], ...] = ()
+    ) -> None:
+        self.num: Optional[str] = num
+        self.title: str = title
+        self.related_article_num: str = related_article_num
+        self.rows: Tuple[Tuple[str, ...], ...] = rows
+
+    def __repr__(self) -> str:
+        return f"AppdxTable(num={self.num!r}, title={self.title!r})"
+
+
+class LawBody:
+    """
+    The body of a law.
+
+    Attributes
+    ----------
+    law_title : str
+        Law title.
+    law_title_kana : str, optional
+        Reading of the law title.
+    enact_statement : str
+        Enact statement (制定文), if any.
+    main_provision : MainProvision, optional
+        The main provision.
+    suppl_provisions : Tuple[SupplProvision, ...]
+        Supplementary provisions.
+    appdx_tables : Tuple[AppdxTable, ...]
+        Appended tables.
+    """
+    __slots__ = (
+        "law_title", "law_title_kana", "enact_statement",
+        "main_provision", "suppl_provisions", "appdx_tables",
+    )
+
+    def __init__(
+        self, law_title: str, law_title_kana: Optional[str], enact_statement: str,
+        main_provision: Optional[MainProvision],
+        suppl_provisions: Tuple[SupplProvision, ...] = (),
+        appdx_tables: Tuple[AppdxTable, ...] = ()
+    ) -> None:
+        self.law_title: str = law_title
+        self.law_title_kana: Optional[str] = law_title_kana
+        self.enact_statement: str = enact_statement
+        self.main_provision: Optional[MainProvision] = main_provision
+        self.suppl_provisions: Tuple[SupplProvision, ...] = suppl_provisions
+        self.appdx_tables: Tuple[AppdxTable, ...] = appdx_tables
+
+    def __repr__(self) -> str:
+        return f"LawBody(law_title={self.law_title!r})"
+
+
+class Law:
+    """
+    A law/ordinance.
+
+    Attributes
+    ----------
+    era : str, optional
+        Era of the law number, e.g. "Meiji".
+    year : str, optional
+        Year of the law number.
+    num : str, optional
+        Serial number of the law number.
+    law_type : str, optional
+        Law type, e.g. "Act".
+    lang : str, optional
+        Language, e.g. "ja".
+    law_num : str
+        Law number, e.g. "明治二十九年法律第八十九号".
+    body : LawBody, optional
+        The body.
+    """
+    __slots__ = ("era", "year", "num", "law_type", "lang", "law_num", "body")
+
+    def __init__(
+        self, era: Optional[str], year: Optional[str], num: Optional[str],
+        law_type: Optional[str], lang: Optional[str], law_num: str,
+        body: Optional[LawBody]
+    ) -> None:
+        self.era: Optional[str] = era
+        self.year: Optional[str] = year
+        self.num: Optional[str] = num
+        self.law_type: Optional[str] = law_type
+        self.lang: Optional[str] = lang
+        self.law_num: str = law_num
+        self.body: Optional[LawBody] = body
+
+    def __repr__(self) -> str:
+        return f"Law(law_num={self.law_num!r})"
+
+    def iter_articles(self) -> Iterator[Article]:
+        """
+        Iterate over the articles of the main provision in document order.
+        """
+        if self.body is not None and self.body.main_provision is not None:
+            yield from self.body.main_provision.iter_articles()
+
+
+def _build_item(elem: ET.Element, children: List) -> Item:
+    tag = elem.tag
+    texts = [sentence_text(child) for child in elem if child.tag == tag + "Sentence"]
+    return Item(
+        tag, elem.get("Num"), element_text(elem.find(tag + "Title")),
+        "\n".join(text for text in texts if text), tuple(children)
+    )
+
+
+def _build_paragraph(elem: ET.Element, children: List) -> Paragraph:
+    return Paragraph(
+        elem.get("Num"),
+        element_text(elem.find("ParagraphNum")),
+        element_text(elem.find("ParagraphCaption")),
+        sentence_text(elem.find("ParagraphSentence"))
+        if elem.find("ParagraphSentence") is not None else "",
+        tuple(children),
+    )
+
+
+def _build_article(elem: ET.Element, children: List) -> Article:
+    return Article(
+        elem.get("Num"),
+        element_text(elem.find("ArticleTitle")),
+        element_text(elem.find("ArticleCaption")),
+        tuple(children),
+    )
+
+
+def _division_builder(cls) -> Callable[[ET.Element, List], _Division]:
+    title_tag = cls.__name__ + "Title"
+
+    def build(elem: ET.Element, children: List) -> _Division:
+        return cls(elem.get("Num"), element_text(elem.find(title_tag)), tuple(children))
+    return build
+
+
+def _build_appdx_table(elem: ET.Element, children: List) -> AppdxTable:
+    rows = tuple(
+        tuple(element_text(column) for column in row.iter("TableColumn"))
+        for row in elem.iter("TableRow")
+    )
+    return AppdxTable(
+        elem.get("Num"),
+        element_text(elem.find("AppdxTableTitle")),
+        element_text(elem.find("RelatedArticleNum")),
+        rows,
+    )
+
+
+def _build_suppl_provision(elem: ET.Element, children: List) -> SupplProvision:
+    return SupplProvision(
+        elem.get("AmendLawNum"),
+        elem.get("Extract") == "true",
+        element_text(elem.find("SupplProvisionLabel")),
+        tuple(children),
+    )
+
+
+def _build_law_body(elem: ET.Element, children: List) -> LawBody:
+    title = elem.find("LawTitle")
+    enact_statements = [element_text(child) for child in elem.findall("EnactStatement")]
+    main_provisions = [child for child in children if isinstance(child, MainProvision)]
+    return LawBody(
+        element_text(title),
+        title.get("Kana") if title is not None else None,
+        "\n".join(enact_statements),
+        main_provisions[0] if main_provisions else None,
+        tuple(child for child in children if isinstance(child, SupplProvision)),
+        tuple(child for child in children if isinstance(child, AppdxTable)),
+    )
+
+
+def _build_law(elem: ET.Element, children: List) -> Law:
+    bodies = [child for child in children if isinstance(child, LawBody)]
+    return Law(
+        elem.get("Era"), elem.get("Year"), elem.get("Num"),
+        elem.get("LawType"), elem.get("Lang"),
+        element_text(elem.find("LawNum")),
+        bodies[0] if bodies else None,
+    )
+
+
+BUILDERS: Dict[str, Callable[[ET.Element, List], object]] = {
+    "Law": _build_law,
+    "LawBody": _build_law_body,
+    "MainProvision": lambda elem, children: MainProvision(tuple(children)),
+    "SupplProvision": _build_suppl_provision,
+    "Part": _division_builder(Part),
+    "Chapter": _division_builder(Chapter),
+    "Section": _division_builder(Section),
+    "Subsection": _division_builder(Subsection),
+    "Division": _division_builder(Division),
+    "Article": _build_article,
+    "Paragraph": _build_paragraph,
+    "Item": _build_item,
+    "AppdxTable": _build_appdx_table,
+}
+BUILDERS.update({tag: _build_item for tag in SUBITEM_TAGS})
+# Element holding the provisions an amending law adds or replaces. They are
+# content of another law, so its subtree is not modelled.
+AMEND_PROVISION_TAG = "AmendProvision"
+
+
+class _ModelBuilder:
+    """
+    Builder of the model from start/end events, bottom-up.
+
+    Each modelled element is built when it ends, from its own title and
+    sentence children and from the already built models of its modelled
+    descendants. With `release`, each built element is removed from its
+    parent, so the tree never holds more than the open ancestors. The
+    subtrees of `AmendProvision` are skipped, so the articles they add are
+    not taken as items of the amending paragraph.
+    """
+
+    def __init__(self, release: bool) -> None:
+        self.release: bool = release
+        self.elems: List[ET.Element] = []
+        self.children: List[List] = [[]]
+        self.amend_depth: int = 0
+
+    def start(self, elem: ET.Element) -> None:
+        self.elems.append(elem)
+        if elem.tag == AMEND_PROVISION_TAG:
+            self.amend_depth += 1
+        elif elem.tag in BUILDERS and not self.amend_depth:
+            self.children.append([])
+
+    def end(self, elem: ET.Element) -> None:
+        self.elems.pop()
+        if elem.tag == AMEND_PROVISION_TAG:
+            self.amend_depth -= 1
+            if not self.amend_depth:
+                self._release(elem)
+            return
+        builder = BUILDERS.get(elem.tag)
+        if builder is None or self.amend_depth:
+            return
+        model = builder(elem, self.children.pop())
+        self.children[-1].append(model)
+        self._release(elem)
+
+    def _release(self, elem: ET.Element) -> None:
+        if self.release:
+            elem.clear()
+            if self.elems:
+                self.elems[-1].remove(elem)
+
+    def walk(self, elem: ET.Element) -> None:
+        self.start(elem)
+        for child in list(elem):
+            self.walk(child)
+        self.end(elem)
+
+    @property
+    def models(self) -> Tuple:
+        return tuple(self.children[0])
+
+
+def build_models(elem: ET.Element, release: bool = False) -> Tuple:
+    """
+    Build the models of the top-most modelled elements in a tree, in one pass.
+
+    Parameters
+    ----------
+    elem : xml.etree.ElementTree.Element
+        The element, e.g. `LawFullText` or `LawContents`.
+    release : bool, optional
+        If True, the modelled elements are removed from the tree as they
+        are built, so the tree can be garbage-collected. Default is False.
+
+    Returns
+    -------
+    Tuple
+        The models, e.g. (Law,) for `LawFullText` or (Article,) for the
+        `LawContents` of an article.
+    """
+    builder = _ModelBuilder(release)
+    builder.walk(elem)
+    return builder.models
+
+
+def build_law(elem: ET.Element, release: bool = False) -> Optional[Law]:
+    """
+    Build the model of a law from its tree, in one pass.
+
+    Parameters
+    ----------
+    elem : xml.etree.ElementTree.Element
+        `LawFullText` or `Law` element.
+    release : bool, optional
+        If True, the modelled elements are removed from the tree as they
+        are built. Default is False.
+
+    Returns
+    -------
+    Law, optional
+        The model, or None if `elem` contains no law.
+    """
+    for model in build_models(elem, release):
+        if isinstance(model, Law):
+            return model
+    return None
+
+
+def build_law_from_chunks(chunks: Iterable[bytes]) -> Optional[Law]:
+    """
+    Build the model of a law from a raw response fed in chunks.
+
+    The elements are released as they are built, so the whole tree is
+    never held in memory.
+
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        Chunks of the raw response, e.g. from `base.stream_law_text`.
+
+    Returns
+    -------
+    Law, optional
+        The model, or None if the response contains no law.
+    """
+    builder = _ModelBuilder(release=True)
+    parser = ET.XMLPullParser(events=("start", "end"))
+
+    def drain() -> None:
+        for event, elem in parser.read_events():
+            if event == "start":
+                builder.start(elem)
+            else:
+                builder.end(elem)
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        drain()
+    parser.close()
+    drain()
+    for model in builder.models:
+        if isinstance(model, Law):
+            return model
+    return None
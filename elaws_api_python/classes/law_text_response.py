@@ -2,10 +2,12 @@
 """
 
 import os
-from typing import Optional
+from typing import Iterator, List, Optional, Sequence
 from xml.etree import ElementTree as ET
 
-from .common import Result
+from ..records import ProvisionRecord, iter_records, to_plain_text
+from .common import Result, XMLSource, load_root
+from .law_model import Law, build_law
 
 SCHEMA_PATH: str = os.path.join(
     os.path.dirname(__file__),
@@ -73,7 +75,7 @@ class ApplData:
         law_number = elem.find("LawNum").text
         law_full_text = elem.find("LawFullText")
         image_data = elem.find("ImageData")
-        if image_data:
+        if image_data is not None:
             image_data = image_data.text
         return ApplData(law_id, law_number, law_full_text, image_data)
 
@@ -95,20 +97,22 @@ class LawTextResponse:
         Path to the XML data file.
     """
 
-    def __init__(self, xml_content: str) -> None:
+    def __init__(self, xml_content: XMLSource, select: Optional[Sequence[str]] = None) -> None:
         """
         Initialize the DataRoot object by loading XML data from the specified path.
 
         Parameters
         ----------
-        xml_content : str
-            Content or path to the XML data file.
+        xml_content : str, bytes or Iterable[bytes]
+            Content or path to the XML data file. Raw bytes and an iterable
+            of raw chunks (e.g. from `base.stream_law_text`) are also
+            accepted; chunks are parsed incrementally as they arrive.
+        select : Sequence[str], optional
+            Selectors of the subtrees to keep, e.g. ["MainProvision/Chapter[@Num=3]"]
+            or ["SupplProvision"]; see `common.parse_selector`. The other
+            subtrees are discarded while parsing. Default is None (keep all).
         """
-        content = xml_content
-        if os.path.exists(xml_content):
-            with open(xml_content, "r", encoding="utf-8") as file_:
-                content = file_.read()
-        root = ET.fromstring(content)
+        root = load_root(xml_content, select)
 
         # XML data validation
         # schema = XMLSchema(SCHEMA_PATH)
@@ -176,3 +180,60 @@ class LawTextResponse:
             The full text.
         """
         return self._appl_data.law_full_text
+
+    def iter_records(self) -> Iterator[ProvisionRecord]:
+        """
+        Iterate over the paragraphs and items of the full text as flat records.
+
+        Yields
+        ------
+        ProvisionRecord
+            Records in document order.
+        """
+        if self.law_full_text is None:
+            return iter(())
+        return iter_records(self.law_full_text, self._appl_data.law_id)
+
+    def records(self) -> List[ProvisionRecord]:
+        """
+        Get the paragraphs and items of the full text as flat records.
+
+        Returns
+        -------
+        List[ProvisionRecord]
+            Records in document order.
+        """
+        return list(self.iter_records())
+
+    def to_plain_text(self) -> str:
+        """
+        Render the full text as plain text.
+
+        Returns
+        -------
+        str
+            The text.
+        """
+        return to_plain_text(self.iter_records())
+
+    def to_model(self, release: bool = False) -> Optional[Law]:
+        """
+        Build the typed model of the full text.
+
+        Parameters
+        ----------
+        release : bool, optional
+            If True, the elements are released as the model is built and
+            `law_full_text` is dropped afterwards. Default is False.
+
+        Returns
+        -------
+        Law, optional
+            The model, or None if there is no full text.
+        """
+        if self.law_full_text is None:
+            return None
+        law = build_law(self.law_full_text, release)
+        if release:
+            self._appl_data.law_full_text = None
+        return law
@@ -1,12 +1,14 @@
 """laws_and_ordinances
 """
 
+import functools
 import os
 from typing import List, Optional, Dict
 from xml.etree import ElementTree as ET
-from xmlschema import XMLSchema
 
-from .common import Result
+from ..law_number import LawNumberKey, WesternLawNumberKey, parse_law_number
+from ..name_matching import LawNameMatcher
+from .common import Result, XMLSource, load_root
 
 SCHEMA_PATH: str = os.path.join(
     os.path.dirname(__file__),
@@ -14,6 +16,24 @@ SCHEMA_PATH: str = os.path.join(
 )
 
 
+@functools.lru_cache(maxsize=None)
+def load_schema():
+    """
+    Load the schema of the list of laws and ordinances.
+
+    xmlschema is imported and the schema is compiled on the first call
+    only, so neither is paid at import time nor per response.
+
+    Returns
+    -------
+    xmlschema.XMLSchema
+        The compiled schema.
+    """
+    from xmlschema import XMLSchema
+
+    return XMLSchema(SCHEMA_PATH)
+
+
 class LawNameInfoElement:
     """
     Information about a law/ordinance.
@@ -98,9 +118,15 @@ class LawNameListInfo:
         self._index_cache_by_law_name: Dict[str, int] = {}
         self._index_cache_by_keyword: Dict[str, List[int]] = {}
         self._index_cache_by_law_id: Dict[str, int] = {}
+        self._name_matcher: Optional[LawNameMatcher] = None
+        self._index_by_law_number: Optional[Dict[LawNumberKey, int]] = None
+        self._index_by_western_law_number: Dict[WesternLawNumberKey, List[int]] = {}
 
     def __iter__(self):
-        return self._list_of_info.__iter__
+        return iter(self._list_of_info)
+
+    def __len__(self) -> int:
+        return len(self._list_of_info)
 
     @staticmethod
     def from_elem(elem: ET.Element):
@@ -123,6 +149,16 @@ class LawNameListInfo:
         ]
         return LawNameListInfo(list_)
 
+    def build_indexes(self) -> None:
+        """
+        Build the indexes by law id and by law name in a single pass.
+
+        Without this, the indexes are filled lazily by the lookups.
+        """
+        for index, elem in enumerate(self._list_of_info):
+            self._index_cache_by_law_id.setdefault(elem.law_id, index)
+            self._index_cache_by_law_name.setdefault(elem.law_name, index)
+
     def find_element_by_law_id(self, law_id: str) -> Optional[LawNameInfoElement]:
         """
         Find the law information element by law id.
@@ -138,13 +174,13 @@ class LawNameListInfo:
             If the law/ordinance with the specified id exists, its information is returned.
             If no such law/ordinance exists, None is returned.
         """
-        index = self._index_cache_by_law_id.get(law_id, "")
-        if index:
+        index = self._index_cache_by_law_id.get(law_id, None)
+        if index is not None:
             return self._list_of_info[index]
 
         for index, elem in enumerate(self._list_of_info):
             if law_id == elem.law_id:
-                self._index_cache_by_keyword[law_id] = index
+                self._index_cache_by_law_id[law_id] = index
                 return elem
         return None
 
@@ -184,7 +220,7 @@ class LawNameListInfo:
             If no such law/ordinance exists, None is returned.
         """
         index = self._index_cache_by_law_name.get(law_name, None)
-        if index:
+        if index is not None:
             return self._list_of_info[index]
 
         for index, elem in enumerate(self._list_of_info):
@@ -228,11 +264,11 @@ class LawNameListInfo:
             List of the law information elements whose names include 'key.'
         """
         index = self._index_cache_by_keyword.get(key, None)
-        if index:
+        if index is not None:
             return [self._list_of_info[ii] for ii in index]
 
         index_list: List[int] = []
-        dst: List[str] = []
+        dst: List[LawNameInfoElement] = []
         for index, elem in enumerate(self._list_of_info):
             if key in elem.law_name:
                 index_list.append(index)
@@ -272,6 +308,109 @@ class LawNameListInfo:
         """
         return [elem.law_name for elem in self.findall_elements_by_keyword_in_law_name(key)]
 
+    def _build_law_number_indexes(self) -> None:
+        self._index_by_law_number = {}
+        self._index_by_western_law_number = {}
+        for index, elem in enumerate(self._list_of_info):
+            if not elem.law_number:
+                continue
+            law_number = parse_law_number(elem.law_number)
+            if law_number is None or law_number.key is None:
+                continue
+            self._index_by_law_number.setdefault(law_number.key, index)
+            self._index_by_western_law_number.setdefault(
+                law_number.western_key, []).append(index)
+
+    def find_element_by_law_number(self, law_number: str) -> Optional[LawNameInfoElement]:
+        """
+        Find the law information element by law number.
+
+        The law number is parsed, so kanji or Arabic numerals and a western
+        year are all accepted. The index is built on first use.
+
+        Parameters
+        ----------
+        law_number : str
+            The law number of the law/ordinance, e.g. 昭和二十九年法律第百六十二号,
+            昭和29年法律第162号 or 1954年法律第162号.
+
+        Returns
+        -------
+        LawNameInfoElement, optional
+            If the law/ordinance with the specified law number exists, its information is returned.
+            If no such law/ordinance exists, None is returned.
+            For a western year at the boundary of two eras, the first match is returned.
+        """
+        parsed = parse_law_number(law_number)
+        if parsed is None:
+            return None
+        if self._index_by_law_number is None:
+            self._build_law_number_indexes()
+        if parsed.key is not None:
+            index = self._index_by_law_number.get(parsed.key)
+        else:
+            indexes = self._index_by_western_law_number.get(parsed.western_key)
+            index = indexes[0] if indexes else None
+        if index is None:
+            return None
+        return self._list_of_info[index]
+
+    def find_law_id_by_law_number(self, law_number: str) -> Optional[str]:
+        """
+        Find the law id by law number.
+
+        Parameters
+        ----------
+        law_number : str
+            The law number of the law/ordinance.
+
+        Returns
+        -------
+        str, optional
+            If the law/ordinance with the specified law number exists, its id is returned.
+            If no such law/ordinance exists, None is returned.
+        """
+        elem = self.find_element_by_law_number(law_number)
+        if elem is not None:
+            return elem.law_id
+        return None
+
+    @property
+    def name_matcher(self) -> LawNameMatcher:
+        """
+        The index of normalized law names, built on first use.
+        """
+        if self._name_matcher is None:
+            self._name_matcher = LawNameMatcher(self._list_of_info)
+        return self._name_matcher
+
+    def findall_elements_by_fuzzy_law_name(
+        self, law_name: str, limit: int = 10, max_distance: Optional[int] = None
+    ) -> List[LawNameInfoElement]:
+        """
+        Find the law information elements whose names are similar to `law_name`.
+
+        Names are compared after normalization (full-width/half-width,
+        kanji numerals, parenthesized abbreviations and spaces), and ranked
+        by edit distance.
+
+        Parameters
+        ----------
+        law_name : str
+            The name of the law/ordinance, possibly inexact.
+        limit : int, optional
+            Maximum number of results. Default is 10.
+        max_distance : int, optional
+            Maximum edit distance between the normalized names.
+            Default is a quarter of the length of the normalized name.
+
+        Returns
+        -------
+        List[LawNameInfoElement]
+            List of the law information elements, best match first.
+        """
+        return self.name_matcher.match(law_name, limit, max_distance)
+
     @property
     def list_of_info(self):
         """
@@ -360,25 +499,22 @@ class ListOfLaws:
         Path to the XML data file.
     """
 
-    def __init__(self, xml_content: str) -> None:
+    def __init__(self, xml_content: XMLSource) -> None:
         """
         Initialize the DataRoot object by loading XML data from the specified path.
 
         Parameters
         ----------
-        xml_content : str
-            Content or path to the XML data file.
+        xml_content : str, bytes or Iterable[bytes]
+            Content or path to the XML data file. Raw bytes and an iterable
+            of raw chunks (e.g. from `base.stream_laws_and_ordinances`) are
+            also accepted; chunks are parsed incrementally as they arrive.
         """
 
         # XML data validation
-        schema = XMLSchema(SCHEMA_PATH)
-        content = xml_content
-        if os.path.exists(xml_content):
-            with open(xml_content, "r", encoding="utf-8") as file_:
-                content = file_.read()
-        root = ET.fromstring(content)
-
-        if not schema.is_valid(root):
+        root = load_root(xml_content)
+
+        if not load_schema().is_valid(root):
             raise ValueError("XML data does not conform to the schema.")
 
         # parse_data
@@ -386,6 +522,28 @@ class ListOfLaws:
         self._appl_data: Optional[ApplData] = None
         self.parse_data(root)
 
+    @staticmethod
+    def from_data(result: Result, appl_data: ApplData):
+        """
+        Static method to create a ListOfLaws object from already parsed data.
+
+        Parameters
+        ----------
+        result : Result
+            Processing result.
+        appl_data : ApplData
+            Main data.
+
+        Returns
+        -------
+        ListOfLaws
+            ListOfLaws object holding `result` and `appl_data`.
+        """
+        obj = ListOfLaws.__new__(ListOfLaws)
+        obj._result = result
+        obj._appl_data = appl_data
+        return obj
+
     def parse_data(self, root: ET.Element) -> None:
         """
         Parse and extract data from the XML root element.
@@ -523,6 +681,66 @@ class ListOfLaws:
         """
         return self.appl_data.law_name_list_info.findall_law_names_by_keyword_in_law_name(key)
 
+    def find_element_by_law_number(self, law_number: str) -> Optional[LawNameInfoElement]:
+        """
+        Find the law information element by law number.
+
+        Parameters
+        ----------
+        law_number : str
+            The law number of the law/ordinance, with kanji or Arabic numerals
+            and an era or a western year.
+
+        Returns
+        -------
+        LawNameInfoElement, optional
+            If the law/ordinance with the specified law number exists, its information is returned.
+            If no such law/ordinance exists, None is returned.
+        """
+        return self.appl_data.law_name_list_info.find_element_by_law_number(law_number)
+
+    def find_law_id_by_law_number(self, law_number: str) -> Optional[str]:
+        """
+        Find the law id by law number.
+
+        Parameters
+        ----------
+        law_number : str
+            The law number of the law/ordinance.
+
+        Returns
+        -------
+        str, optional
+            If the law/ordinance with the specified law number exists, its id is returned.
+            If no such law/ordinance exists, None is returned.
+        """
+        return self.appl_data.law_name_list_info.find_law_id_by_law_number(law_number)
+
+    def findall_elements_by_fuzzy_law_name(
+        self, law_name: str, limit: int = 10, max_distance: Optional[int] = None
+    ) -> List[LawNameInfoElement]:
+        """
+        Find the law information elements whose names are similar to `law_name`.
+
+        Parameters
+        ----------
+        law_name : str
+            The name of the law/ordinance, possibly inexact.
+        limit : int, optional
+            Maximum number of results. Default is 10.
+        max_distance : int, optional
+            Maximum edit distance between the normalized names.
+            Default is a quarter of the length of the normalized name.
+
+        Returns
+        -------
+        List[LawNameInfoElement]
+            List of the law information elements, best match first.
+        """
+        return self.appl_data.law_name_list_info.findall_elements_by_fuzzy_law_name(
+            law_name, limit, max_distance
+        )
+
     @property
     def result(self) -> Result:
         """
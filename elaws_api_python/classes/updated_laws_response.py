@@ -0,0 +1,229 @@
+"""updated_laws_response
+"""
+
+from typing import List, Optional
+from xml.etree import ElementTree as ET
+
+from .common import Result, XMLSource, load_root
+
+
+class UpdatedLawInfoElement:
+    """
+    Information about an updated law/ordinance.
+
+    Attributes
+    ----------
+    law_type_name : str, optional
+        Law type name, e.g. "法律".
+    law_number : str, optional
+        Law number.
+    law_name : str, optional
+        Law name.
+    promulgation_date : str, optional
+        Promulgation date (YYYYMMDD).
+    amend_name : str, optional
+        Name of the amending law/ordinance.
+    amend_number : str, optional
+        Law number of the amending law/ordinance.
+    enforcement_date : str, optional
+        Enforcement date of the amendment (YYYYMMDD).
+    law_id : str, optional
+        Law ID.
+    """
+
+    def __init__(
+        self, law_type_name: Optional[str] = None, law_number: Optional[str] = None,
+        law_name: Optional[str] = None, promulgation_date: Optional[str] = None,
+        amend_name: Optional[str] = None, amend_number: Optional[str] = None,
+        enforcement_date: Optional[str] = None, law_id: Optional[str] = None
+    ) -> None:
+        """
+        Initialize the UpdatedLawInfoElement object.
+
+        Parameters
+        ----------
+        law_type_name : str, optional
+            Law type name, e.g. "法律".
+        law_number : str, optional
+            Law number.
+        law_name : str, optional
+            Law name.
+        promulgation_date : str, optional
+            Promulgation date (YYYYMMDD).
+        amend_name : str, optional
+            Name of the amending law/ordinance.
+        amend_number : str, optional
+            Law number of the amending law/ordinance.
+        enforcement_date : str, optional
+            Enforcement date of the amendment (YYYYMMDD).
+        law_id : str, optional
+            Law ID.
+        """
+        self.law_type_name: Optional[str] = law_type_name
+        self.law_number: Optional[str] = law_number
+        self.law_name: Optional[str] = law_name
+        self.promulgation_date: Optional[str] = promulgation_date
+        self.amend_name: Optional[str] = amend_name
+        self.amend_number: Optional[str] = amend_number
+        self.enforcement_date: Optional[str] = enforcement_date
+        self.law_id: Optional[str] = law_id
+
+    @staticmethod
+    def from_elem(elem: ET.Element):
+        """
+        Static method to create an UpdatedLawInfoElement object from an XML element.
+
+        Parameters
+        ----------
+        elem : xml.etree.ElementTree.Element
+            XML element that contains the information about an updated law.
+
+        Returns
+        -------
+        UpdatedLawInfoElement
+            UpdatedLawInfoElement object with the information from the XML element.
+        """
+        return UpdatedLawInfoElement(
+            elem.findtext("LawTypeName"),
+            elem.findtext("LawNo"),
+            elem.findtext("LawName"),
+            elem.findtext("PromulgationDate"),
+            elem.findtext("AmendName"),
+            elem.findtext("AmendNo"),
+            elem.findtext("EnforcementDate"),
+            elem.findtext("LawId"),
+        )
+
+
+class ApplData:
+    """
+    Main data information.
+
+    Attributes
+    ----------
+    date : str, optional
+        Date of the update (YYYYMMDD).
+    list_of_info : List[UpdatedLawInfoElement]
+        List of information about the updated laws and ordinances.
+    """
+
+    def __init__(
+        self, date: Optional[str] = None,
+        list_of_info: Optional[List[UpdatedLawInfoElement]] = None
+    ) -> None:
+        """
+        Initialize the ApplData object.
+
+        Parameters
+        ----------
+        date : str, optional
+            Date of the update (YYYYMMDD).
+        list_of_info : List[UpdatedLawInfoElement], optional
+            List of information about the updated laws and ordinances.
+        """
+        self.date: Optional[str] = date
+        self.list_of_info: List[UpdatedLawInfoElement] = list_of_info or []
+
+    @staticmethod
+    def from_elem(elem: ET.Element):
+        """
+        Static method to create an ApplData object from an XML element.
+
+        Parameters
+        ----------
+        elem : ET.Element
+            XML element that contains the application data information.
+
+        Returns
+        -------
+        ApplData
+            ApplData object with the information from the XML element.
+        """
+        list_of_info = [
+            UpdatedLawInfoElement.from_elem(info_elem)
+            for info_elem in elem.findall("LawNameListInfo")
+        ]
+        return ApplData(elem.findtext("Date"), list_of_info)
+
+
+class ListOfUpdatedLaws:
+    """
+    Root structure of the data obtained by `base.request_list_of_updated_laws_and_ordinance`.
+
+    Attributes
+    ----------
+    result : Result
+        Processing result.
+    appl_data : ApplData
+        Main data.
+    """
+
+    def __init__(self, xml_content: XMLSource) -> None:
+        """
+        Initialize the ListOfUpdatedLaws object by loading XML data.
+
+        Parameters
+        ----------
+        xml_content : str, bytes or Iterable[bytes]
+            Content or path to the XML data file. Raw bytes and an iterable
+            of raw chunks are also accepted.
+        """
+        self._result: Optional[Result] = None
+        self._appl_data: Optional[ApplData] = None
+        self.parse_data(load_root(xml_content))
+
+    def __iter__(self):
+        return iter(self._appl_data.list_of_info)
+
+    def __len__(self) -> int:
+        return len(self._appl_data.list_of_info)
+
+    def parse_data(self, root: ET.Element) -> None:
+        """
+        Parse and extract data from the XML root element.
+
+        Parameters
+        ----------
+        root : xml.etree.ElementTree.Element
+            The root element of the XML data.
+        """
+        result_element = root.find("Result")
+        if result_element is None:
+            raise ValueError("Result is not found.")
+        self._result = Result.from_elem(result_element)
+
+        appl_data_element = root.find("ApplData")
+        if appl_data_element is None:
+            raise ValueError("ApplData is not found.")
+        self._appl_data = ApplData.from_elem(appl_data_element)
+
+    @property
+    def result(self) -> Result:
+        """
+        Get the processing result.
+
+        Returns
+        -------
+        Result
+            Processing result.
+        """
+        return self._result
+
+    @property
+    def appl_data(self) -> ApplData:
+        """
+        Get the main data.
+
+        Returns
+        -------
+        ApplData
+            Main data.
+        """
+        return self._appl_data
+
+    @property
+    def law_ids(self) -> List[str]:
+        """
+        The law IDs of the updated laws and ordinances.
+        """
+        return [elem.law_id for elem in self._appl_data.list_of_info]
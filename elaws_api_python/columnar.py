@@ -0,0 +1,215 @@
+"""elaws_api_python.columnar
+
+Columnar (Arrow/Parquet) export of the law list and provision records.
+
+Requires the optional dependency `pyarrow`
+(`pip install elaws-api-python[arrow]`).
+"""
+
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from .classes.laws_and_ordinances_response import (
+    LawNameInfoElement, LawNameListInfo, ListOfLaws
+)
+from .records import COLUMNS as RECORD_COLUMNS, ProvisionRecord
+
+BATCH_SIZE = 10000
+LAW_LIST_COLUMNS = ("law_id", "law_name", "law_number", "promulgation_date")
+PARQUET_SUFFIXES = (".parquet", ".pq")
+IPC_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+LawList = Union[ListOfLaws, LawNameListInfo, Iterable[LawNameInfoElement]]
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ImportError(
+            "pyarrow is required for the columnar export. "
+            "Install it with `pip install elaws-api-python[arrow]`."
+        ) from exc
+    return pyarrow
+
+
+def _file_format(path: str, file_format: Optional[str]) -> str:
+    if file_format is not None:
+        if file_format not in ("parquet", "ipc"):
+            raise ValueError(f"Unknown file format: {file_format}")
+        return file_format
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in PARQUET_SUFFIXES:
+        return "parquet"
+    if suffix in IPC_SUFFIXES:
+        return "ipc"
+    raise ValueError(
+        f"Cannot infer the file format from '{path}'. "
+        "Specify file_format='parquet' or 'ipc'."
+    )
+
+
+def _iter_batches(
+    rows: Iterable[Sequence[Any]], columns: Sequence[str], batch_size: int
+) -> Iterator[Dict[str, List[Any]]]:
+    batch: Dict[str, List[Any]] = {name: [] for name in columns}
+    size = 0
+    for row in rows:
+        for name, value in zip(columns, row):
+            batch[name].append(value)
+        size += 1
+        if size == batch_size:
+            yield batch
+            batch = {name: [] for name in columns}
+            size = 0
+    if size:
+        yield batch
+
+
+def _write_batches(
+    rows: Iterable[Sequence[Any]], columns: Sequence[str], path: str,
+    batch_size: int, file_format: Optional[str]
+) -> int:
+    pa = _import_pyarrow()
+    file_format = _file_format(path, file_format)
+    schema = pa.schema([(name, pa.string()) for name in columns])
+    count = 0
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(path, schema)
+    else:
+        import pyarrow.ipc as ipc
+        writer = ipc.new_file(path, schema)
+    try:
+        for batch in _iter_batches(rows, columns, batch_size):
+            record_batch = pa.RecordBatch.from_pydict(batch, schema=schema)
+            writer.write_batch(record_batch)
+            count += record_batch.num_rows
+    finally:
+        writer.close()
+    return count
+
+
+def _law_list_elements(law_list: LawList) -> Iterable[LawNameInfoElement]:
+    if isinstance(law_list, ListOfLaws):
+        return law_list.list_name_list_info
+    if isinstance(law_list, LawNameListInfo):
+        return law_list.list_of_info
+    return law_list
+
+
+def write_law_list(
+    law_list: LawList, path: str,
+    batch_size: int = BATCH_SIZE, file_format: Optional[str] = None
+) -> int:
+    """
+    Write a list of laws and ordinances to a columnar file.
+
+    Parameters
+    ----------
+    law_list : ListOfLaws, LawNameListInfo or Iterable[LawNameInfoElement]
+        The list of laws and ordinances.
+    path : str
+        Path to the output file.
+    batch_size : int, optional
+        Number of rows per record batch. Default is BATCH_SIZE.
+    file_format : str, optional
+        "parquet" or "ipc" (Arrow IPC file). Inferred from the suffix of
+        `path` if not given.
+
+    Returns
+    -------
+    int
+        The number of rows written.
+    """
+    rows = (
+        (elem.law_id, elem.law_name, elem.law_number, elem.promulgation_date)
+        for elem in _law_list_elements(law_list)
+    )
+    return _write_batches(rows, LAW_LIST_COLUMNS, path, batch_size, file_format)
+
+
+def write_records(
+    records: Iterable[ProvisionRecord], path: str,
+    batch_size: int = BATCH_SIZE, file_format: Optional[str] = None
+) -> int:
+    """
+    Write provision records to a columnar file.
+
+    The records are consumed in batches, so a generator over the whole
+    corpus (e.g. chained `LawTextResponse.iter_records`) can be written
+    without holding every record in memory.
+
+    Parameters
+    ----------
+    records : Iterable[ProvisionRecord]
+        Records to write.
+    path : str
+        Path to the output file.
+    batch_size : int, optional
+        Number of rows per record batch. Default is BATCH_SIZE.
+    file_format : str, optional
+        "parquet" or "ipc" (Arrow IPC file). Inferred from the suffix of
+        `path` if not given.
+
+    Returns
+    -------
+    int
+        The number of rows written.
+    """
+    rows = (
+        tuple(record.to_dict().values())
+        for record in records
+    )
+    return _write_batches(rows, RECORD_COLUMNS, path, batch_size, file_format)
+
+
+def read_table(path: str, file_format: Optional[str] = None):
+    """
+    Read a columnar file as a `pyarrow.Table`.
+
+    Arrow IPC files are memory-mapped, so the columns are not copied.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    file_format : str, optional
+        "parquet" or "ipc". Inferred from the suffix of `path` if not given.
+
+    Returns
+    -------
+    pyarrow.Table
+        The table.
+    """
+    pa = _import_pyarrow()
+    file_format = _file_format(path, file_format)
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=True)
+    import pyarrow.ipc as ipc
+    with pa.memory_map(path, "r") as source:
+        return ipc.open_file(source).read_all()
+
+
+def read_law_list(path: str, file_format: Optional[str] = None) -> LawNameListInfo:
+    """
+    Load a list of laws and ordinances written by `write_law_list`.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    file_format : str, optional
+        "parquet" or "ipc". Inferred from the suffix of `path` if not given.
+
+    Returns
+    -------
+    LawNameListInfo
+        The list of law/ordinance information.
+    """
+    table = read_table(path, file_format)
+    columns = [table.column(name).to_pylist() for name in LAW_LIST_COLUMNS]
+    return LawNameListInfo([
+        LawNameInfoElement(*row) for row in zip(*columns)
+    ])
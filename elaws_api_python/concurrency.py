@@ -0,0 +1,230 @@
+"""elaws_api_python.concurrency
+
+Adaptive limit of the number of in-flight requests.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, NamedTuple, Optional
+
+INITIAL_LIMIT = 4
+MIN_LIMIT = 1
+MAX_LIMIT = 32
+BACKOFF = 0.5
+LATENCY_TOLERANCE = 2.0
+LATENCY_WINDOW = 100
+LATENCY_SMOOTHING = 0.2
+MIN_SAMPLES = 10
+THROUGHPUT_WINDOW_SEC = 10.0
+OVERLOAD_STATUS_CODES = frozenset((429, 500, 502, 503, 504))
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """
+    Whether an error signals that the server is overloaded.
+
+    HTTP 429, the 5xx server errors and timeouts count as overload, so the
+    limit backs off with the rate of server errors; 500 is included since an
+    overloaded server often answers with it rather than with 503.
+    """
+    from requests.exceptions import Timeout
+
+    if isinstance(error, Timeout):
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) in OVERLOAD_STATUS_CODES
+
+
+class LimiterMetrics(NamedTuple):
+    """
+    Snapshot of the state of an AdaptiveLimiter.
+
+    Attributes
+    ----------
+    limit : int
+        Current limit of in-flight requests.
+    in_flight : int
+        Number of requests in flight.
+    completed : int
+        Number of completed requests, including failed ones.
+    overloaded : int
+        Number of requests that signalled overload.
+    throughput : float
+        Completed requests per second over the last THROUGHPUT_WINDOW_SEC seconds.
+    latency : float, optional
+        Smoothed latency in seconds.
+    baseline_latency : float, optional
+        Lowest latency in the recent window, in seconds.
+    """
+    limit: int
+    in_flight: int
+    completed: int
+    overloaded: int
+    throughput: float
+    latency: Optional[float]
+    baseline_latency: Optional[float]
+
+
+class AdaptiveLimiter:
+    """
+    Limit of in-flight requests adapted by AIMD (additive increase,
+    multiplicative decrease).
+
+    Each successful request raises the limit by 1 / limit, i.e. by about one
+    per round of requests. The limit is multiplied by `backoff` when a
+    request signals overload (429, 5xx or a timeout) or when the smoothed
+    latency exceeds `latency_tolerance` times the lowest recent latency,
+    which means requests are queueing at the server. Decreases are applied
+    at most once per smoothed latency, so that the requests of one round
+    do not cut the limit several times. It is thread-safe.
+
+    Attributes
+    ----------
+    min_limit : int
+        Lower bound of the limit.
+    max_limit : int
+        Upper bound of the limit.
+    """
+
+    def __init__(
+        self, initial_limit: int = INITIAL_LIMIT,
+        min_limit: int = MIN_LIMIT, max_limit: int = MAX_LIMIT,
+        backoff: float = BACKOFF, latency_tolerance: float = LATENCY_TOLERANCE
+    ) -> None:
+        """
+        Initialize the AdaptiveLimiter object.
+
+        Parameters
+        ----------
+        initial_limit : int, optional
+            Initial limit. Default is INITIAL_LIMIT.
+        min_limit : int, optional
+            Lower bound of the limit. Default is MIN_LIMIT.
+        max_limit : int, optional
+            Upper bound of the limit. Default is MAX_LIMIT.
+        backoff : float, optional
+            Factor applied to the limit on overload. Default is BACKOFF.
+        latency_tolerance : float, optional
+            Ratio of the smoothed latency to the lowest recent latency
+            above which the limit is decreased. Default is LATENCY_TOLERANCE.
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit.")
+        self.min_limit: int = min_limit
+        self.max_limit: int = max_limit
+        self._backoff: float = backoff
+        self._latency_tolerance: float = latency_tolerance
+        self._limit: float = float(initial_limit)
+        self._in_flight: int = 0
+        self._completed: int = 0
+        self._overloaded: int = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._latency: Optional[float] = None
+        self._last_decrease: float = 0.0
+        self._cooldown: float = 0.0
+        self._completions: Deque[float] = deque()
+        self._created: float = time.monotonic()
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """
+        Current limit of in-flight requests.
+        """
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """
+        Number of requests in flight.
+        """
+        return self._in_flight
+
+    def acquire(self) -> float:
+        """
+        Wait until a request may be sent.
+
+        Returns
+        -------
+        float
+            Start time to pass to `release`.
+        """
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+        return time.monotonic()
+
+    def release(self, start: float, overloaded: bool = False) -> None:
+        """
+        Record the completion of a request and adapt the limit.
+
+        Parameters
+        ----------
+        start : float
+            Value returned by `acquire`.
+        overloaded : bool, optional
+            Whether the request signalled overload. Default is False.
+        """
+        now = time.monotonic()
+        latency = now - start
+        with self._condition:
+            self._in_flight -= 1
+            self._completed += 1
+            self._completions.append(now)
+            if overloaded:
+                self._overloaded += 1
+                self._decrease(now)
+            else:
+                self._latencies.append(latency)
+                self._latency = latency if self._latency is None else \
+                    self._latency + LATENCY_SMOOTHING * (latency - self._latency)
+                if len(self._latencies) >= MIN_SAMPLES and \
+                        self._latency > self._latency_tolerance * min(self._latencies):
+                    self._decrease(now)
+                else:
+                    self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+            self._condition.notify_all()
+
+    def _decrease(self, now: float) -> None:
+        if self._latency is not None:
+            self._cooldown = self._latency
+        if now - self._last_decrease < self._cooldown:
+            return
+        self._limit = max(self.min_limit, self._limit * self._backoff)
+        self._last_decrease = now
+        # the queue drains after a decrease, so the smoothed latency is stale
+        self._latency = None
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call `func` within the limit, recording its latency and outcome.
+
+        Errors for which `is_overload_error` holds decrease the limit;
+        every error is re-raised.
+        """
+        start = self.acquire()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as error:
+            self.release(start, is_overload_error(error))
+            raise
+        self.release(start)
+        return result
+
+    def metrics(self) -> LimiterMetrics:
+        """
+        Get a snapshot of the limit, the throughput and the latencies.
+        """
+        now = time.monotonic()
+        with self._condition:
+            while self._completions and now - self._completions[0] > THROUGHPUT_WINDOW_SEC:
+                self._completions.popleft()
+            return LimiterMetrics(
+                int(self._limit), self._in_flight, self._completed, self._overloaded,
+                len(self._completions) / max(
+                    min(THROUGHPUT_WINDOW_SEC, now - self._created), 1e-9),
+                self._latency,
+                min(self._latencies) if self._latencies else None,
+            )
@@ -0,0 +1,347 @@
+"""elaws_api_python.diff
+
+Structural diff between two versions of the full text of a law/ordinance.
+"""
+
+import difflib
+import hashlib
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from .classes.law_text_response import LawTextResponse
+from .records import ProvisionRecord, path_key
+
+ADDED = "added"
+REMOVED = "removed"
+MODIFIED = "modified"
+
+LawText = Union[LawTextResponse, Iterable[ProvisionRecord]]
+
+
+class UnitChange(NamedTuple):
+    """
+    A change of an article, a paragraph or an item.
+
+    Attributes
+    ----------
+    change : str
+        ADDED, REMOVED or MODIFIED.
+    kind : str
+        "Article", "Paragraph" or "Item".
+    key : str
+        Structural key of the unit, e.g. "MainProvision/Article[5]/Paragraph[2]".
+    old_text : str, optional
+        Text before the change. None if the unit was added.
+    new_text : str, optional
+        Text after the change. None if the unit was removed.
+    text_diff : str, optional
+        Inline diff of the text for a modified unit, in which deleted and
+        inserted parts are marked as [-...-] and {+...+}. If the text is
+        unchanged, that of the caption of the unit, or None if the unit was
+        only retitled or moved.
+    """
+    change: str
+    kind: str
+    key: str
+    old_text: Optional[str]
+    new_text: Optional[str]
+    text_diff: Optional[str] = None
+
+    @property
+    def article_key(self) -> str:
+        """
+        Structural key of the article the unit belongs to.
+        """
+        return self.key.split("/Paragraph[", 1)[0]
+
+
+class LawTextDiff:
+    """
+    Result of comparing two versions of the full text of a law/ordinance.
+
+    Attributes
+    ----------
+    law_id : str, optional
+        Law ID.
+    changes : List[UnitChange]
+        Changes in the document order of the new version, followed by the
+        removed articles.
+    """
+
+    def __init__(self, law_id: Optional[str], changes: List[UnitChange]) -> None:
+        """
+        Initialize the LawTextDiff object.
+
+        Parameters
+        ----------
+        law_id : str, optional
+            Law ID.
+        changes : List[UnitChange]
+            Changes between the two versions.
+        """
+        self.law_id: Optional[str] = law_id
+        self.changes: List[UnitChange] = changes
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    def __iter__(self):
+        return iter(self.changes)
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def _filter(self, change: str) -> List[UnitChange]:
+        return [unit for unit in self.changes if unit.change == change]
+
+    @property
+    def added(self) -> List[UnitChange]:
+        """
+        Units added in the new version.
+        """
+        return self._filter(ADDED)
+
+    @property
+    def removed(self) -> List[UnitChange]:
+        """
+        Units removed in the new version.
+        """
+        return self._filter(REMOVED)
+
+    @property
+    def modified(self) -> List[UnitChange]:
+        """
+        Units whose text was modified.
+        """
+        return self._filter(MODIFIED)
+
+    @property
+    def changed_article_keys(self) -> Set[str]:
+        """
+        Keys of the articles touched by any change, i.e. the units to re-index.
+        """
+        return {unit.article_key for unit in self.changes}
+
+
+def inline_diff(old: str, new: str) -> str:
+    """
+    Build a character-level inline diff of two texts.
+
+    Parameters
+    ----------
+    old : str
+        Text before the change.
+    new : str
+        Text after the change.
+
+    Returns
+    -------
+    str
+        `new` with the deleted parts of `old` marked as [-...-] and the
+        inserted parts marked as {+...+}.
+    """
+    matcher = difflib.SequenceMatcher(None, old, new, autojunk=False)
+    parts: List[str] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            parts.append(new[j1:j2])
+            continue
+        if tag in ("delete", "replace"):
+            parts.append(f"[-{old[i1:i2]}-]")
+        if tag in ("insert", "replace"):
+            parts.append(f"{{+{new[j1:j2]}+}}")
+    return "".join(parts)
+
+
+def _digest(*values: str) -> bytes:
+    hash_ = hashlib.blake2b(digest_size=16)
+    for value in values:
+        hash_.update(value.encode("utf-8"))
+        hash_.update(b"\0")
+    return hash_.digest()
+
+
+class _Article:
+    """
+    Records of an article (or of a provision without articles) with its hash.
+    """
+
+    def __init__(self, header: str, caption: str = "") -> None:
+        self.header: str = header
+        self.caption: str = caption
+        self.units: Dict[str, ProvisionRecord] = {}
+        self.hashes: Dict[str, bytes] = {}
+        self._hash = hashlib.blake2b(digest_size=16)
+        self._hash.update(header.encode("utf-8"))
+
+    def add(self, unit_key: str, record: ProvisionRecord) -> None:
+        digest = _digest(record.title, self.unit_caption(record), record.text)
+        self.units[unit_key] = record
+        self.hashes[unit_key] = digest
+        self._hash.update(unit_key.encode("utf-8"))
+        self._hash.update(digest)
+
+    def unit_caption(self, record: ProvisionRecord) -> str:
+        # the caption of the article is compared as part of the header
+        return record.caption if record.caption != self.caption else ""
+
+    @property
+    def text(self) -> str:
+        return "\n".join(record.text for record in self.units.values())
+
+    def digest(self) -> bytes:
+        return self._hash.digest()
+
+
+def _split_key(record: ProvisionRecord) -> Tuple[str, str, str, str]:
+    # Articles are matched by their provision and number only, so that
+    # renumbered chapters or sections do not turn them into new units.
+    provision = record.path[0]
+    for index, (tag, num) in enumerate(record.path):
+        if tag == "Article":
+            return (
+                path_key((provision, (tag, num))),
+                path_key(record.path[index + 1:]),
+                record.titles[index] + record.caption,
+                record.caption,
+            )
+    index = len(record.path) - (2 if record.kind == "Item" else 1)
+    return (
+        path_key(record.path[:index]),
+        path_key(record.path[index:]),
+        "",
+        "",
+    )
+
+
+def _moved_units(old_article: _Article, new_article: _Article) -> Set[str]:
+    # units kept by both versions but out of their previous order
+    old_keys = [key for key in old_article.units if key in new_article.units]
+    new_keys = [key for key in new_article.units if key in old_article.units]
+    if old_keys == new_keys:
+        return set()
+    matcher = difflib.SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+    kept = {key for block in matcher.get_matching_blocks()
+            for key in new_keys[block.b:block.b + block.size]}
+    return set(new_keys) - kept
+
+
+def _group(law_text: LawText) -> Tuple[Optional[str], Dict[str, _Article]]:
+    records = law_text.iter_records() if isinstance(law_text, LawTextResponse) \
+        else law_text
+    law_id = None
+    articles: Dict[str, _Article] = {}
+    for record in records:
+        law_id = law_id or record.law_id
+        article_key, unit_key, header, caption = _split_key(record)
+        article = articles.get(article_key)
+        if article is None:
+            article = _Article(header, caption)
+            articles[article_key] = article
+        article.add(unit_key, record)
+    return law_id, articles
+
+
+def article_texts(law_text: LawText) -> Dict[str, Tuple[str, str]]:
+    """
+    Group the full text of a law/ordinance into articles.
+
+    Parameters
+    ----------
+    law_text : LawTextResponse or Iterable[ProvisionRecord]
+        The full text.
+
+    Returns
+    -------
+    Dict[str, Tuple[str, str]]
+        Pairs of the header (title and caption) and the text of each article,
+        keyed by the article keys used in `UnitChange.article_key`.
+    """
+    _, articles = _group(law_text)
+    return {key: (article.header, article.text) for key, article in articles.items()}
+
+
+def diff_law_texts(old: LawText, new: LawText) -> LawTextDiff:
+    """
+    Compare two versions of the full text of a law/ordinance.
+
+    Articles are matched by their provision and article number, and
+    paragraphs and items by their numbering inside the article. A unit
+    whose caption changed, or which moved out of its previous order, is
+    reported as modified even if its text is unchanged. Each
+    article is hashed over its units, so unchanged articles are skipped
+    without comparing their text and the comparison runs in time linear
+    in the size of the two versions.
+
+    Parameters
+    ----------
+    old : LawTextResponse or Iterable[ProvisionRecord]
+        The older version.
+    new : LawTextResponse or Iterable[ProvisionRecord]
+        The newer version.
+
+    Returns
+    -------
+    LawTextDiff
+        The changes from `old` to `new`.
+
+    Raises
+    ------
+    ValueError
+        If the two versions belong to different laws.
+    """
+    old_law_id, old_articles = _group(old)
+    new_law_id, new_articles = _group(new)
+    if old_law_id and new_law_id and old_law_id != new_law_id:
+        raise ValueError(
+            f"Cannot compare different laws: {old_law_id} and {new_law_id}.")
+
+    changes: List[UnitChange] = []
+    for article_key, new_article in new_articles.items():
+        old_article = old_articles.get(article_key)
+        if old_article is None:
+            changes.append(UnitChange(
+                ADDED, "Article", article_key, None, new_article.text))
+            continue
+        if old_article.digest() == new_article.digest():
+            continue
+
+        if old_article.header != new_article.header:
+            changes.append(UnitChange(
+                MODIFIED, "Article", article_key,
+                old_article.header, new_article.header,
+                inline_diff(old_article.header, new_article.header)
+            ))
+        moved = _moved_units(old_article, new_article)
+        for unit_key, record in new_article.units.items():
+            key = f"{article_key}/{unit_key}"
+            old_record = old_article.units.get(unit_key)
+            if old_record is None:
+                changes.append(UnitChange(ADDED, record.kind, key, None, record.text))
+            elif old_record.text != record.text:
+                changes.append(UnitChange(
+                    MODIFIED, record.kind, key, old_record.text, record.text,
+                    inline_diff(old_record.text, record.text)
+                ))
+            elif old_article.hashes[unit_key] != new_article.hashes[unit_key] \
+                    or unit_key in moved:
+                # the title or the caption was modified, or the unit was moved
+                old_caption = old_article.unit_caption(old_record)
+                new_caption = new_article.unit_caption(record)
+                changes.append(UnitChange(
+                    MODIFIED, record.kind, key, old_record.text, record.text,
+                    inline_diff(old_caption, new_caption) if old_caption != new_caption
+                    else None
+                ))
+        for unit_key, old_record in old_article.units.items():
+            if unit_key not in new_article.units:
+                changes.append(UnitChange(
+                    REMOVED, old_record.kind, f"{article_key}/{unit_key}",
+                    old_record.text, None
+                ))
+
+    for article_key, old_article in old_articles.items():
+        if article_key not in new_articles:
+            changes.append(UnitChange(
+                REMOVED, "Article", article_key, old_article.text, None))
+
+    return LawTextDiff(new_law_id or old_law_id, changes)
@@ -0,0 +1,464 @@
+"""elaws_api_python.history
+
+Versioned store of laws/ordinances answering point-in-time queries per article.
+"""
+
+import bisect
+import datetime
+import json
+import os
+from typing import Dict, List, NamedTuple, Optional, Set, Union
+
+from .base import TIMEOUT_SEC
+from .bulk import acquire_law_texts
+from .cache import write_atomic
+from .classes.law_text_response import LawTextResponse
+from .diff import LawText, LawTextDiff, article_texts, diff_law_texts
+from .records import ProvisionRecord, path_key
+from .updates import fetch_updated_laws
+
+DateLike = Union[str, datetime.date]
+
+
+def _isoformat(date: DateLike) -> str:
+    if isinstance(date, datetime.date):
+        return date.isoformat()
+    if len(date) == 8 and date.isdigit():
+        return f"{date[:4]}-{date[4:6]}-{date[6:]}"
+    return datetime.date.fromisoformat(date).isoformat()
+
+
+def _article_key(article: str) -> str:
+    # "709" or "3_2" means an article of the main provision
+    if "[" in article or "/" in article:
+        return article
+    return path_key((("MainProvision", ""), ("Article", article)))
+
+
+class ArticleVersion(NamedTuple):
+    """
+    A version of an article and the interval in which it was in effect.
+
+    Attributes
+    ----------
+    key : str
+        Article key, e.g. "MainProvision/Article[709]".
+    start : str
+        First date of the interval (ISO format, inclusive).
+    end : str, optional
+        Date the next version took effect (exclusive).
+        None if the version is still in effect.
+    header : str
+        Title and caption of the article.
+    text : str, optional
+        Text of the article. None if the article was removed.
+    """
+    key: str
+    start: str
+    end: Optional[str]
+    header: str
+    text: Optional[str]
+
+
+class SyncResult(NamedTuple):
+    """
+    Result of `HistoryStore.sync`.
+
+    Attributes
+    ----------
+    diffs : Dict[str, LawTextDiff]
+        The changes of the applied laws keyed by law ID.
+    errors : Dict[str, BaseException]
+        Errors of the laws that could not be acquired or applied, keyed by
+        law ID. Syncing the date again retries them.
+    """
+    diffs: Dict[str, LawTextDiff]
+    errors: Dict[str, BaseException]
+
+
+class _Timeline:
+    """
+    Versions of an article, sorted by their start dates.
+    """
+
+    def __init__(self) -> None:
+        self.starts: List[str] = []
+        self.headers: List[str] = []
+        self.texts: List[Optional[str]] = []
+
+    def append(self, start: str, header: str, text: Optional[str]) -> None:
+        if self.starts and self.starts[-1] == start:
+            self.headers[-1] = header
+            self.texts[-1] = text
+        else:
+            self.starts.append(start)
+            self.headers.append(header)
+            self.texts.append(text)
+
+    def version(self, key: str, index: int) -> ArticleVersion:
+        end = self.starts[index + 1] if index + 1 < len(self.starts) else None
+        return ArticleVersion(
+            key, self.starts[index], end, self.headers[index], self.texts[index])
+
+    def find(self, date: str) -> int:
+        return bisect.bisect_right(self.starts, date) - 1
+
+
+class LawHistory:
+    """
+    History of a law/ordinance as per-article version intervals.
+
+    Each applied version is compared with the previous one by
+    `diff.diff_law_texts`, and only the changed articles get a new
+    interval, so a query touches one article's intervals only.
+
+    Attributes
+    ----------
+    law_id : str
+        Law ID.
+    latest_date : str, optional
+        Date of the latest applied version.
+    """
+
+    def __init__(self, law_id: str) -> None:
+        """
+        Initialize the LawHistory object.
+
+        Parameters
+        ----------
+        law_id : str
+            Law ID.
+        """
+        self.law_id: str = law_id
+        self.latest_date: Optional[str] = None
+        self._latest: List[ProvisionRecord] = []
+        self._timelines: Dict[str, _Timeline] = {}
+
+    @property
+    def article_keys(self) -> List[str]:
+        """
+        Keys of all the articles that have ever existed.
+        """
+        return list(self._timelines)
+
+    def apply(self, law_text: LawText, date: DateLike) -> LawTextDiff:
+        """
+        Apply a version of the full text that took effect on a date.
+
+        Parameters
+        ----------
+        law_text : LawTextResponse or Iterable[ProvisionRecord]
+            The full text.
+        date : str or datetime.date
+            Date the version took effect.
+
+        Returns
+        -------
+        LawTextDiff
+            The changes from the previous version.
+
+        Raises
+        ------
+        ValueError
+            If `date` is earlier than the latest applied version.
+        """
+        date = _isoformat(date)
+        if self.latest_date is not None and date < self.latest_date:
+            raise ValueError(
+                f"Cannot apply a version of {date} before that of {self.latest_date}.")
+        records = list(law_text.iter_records()) \
+            if isinstance(law_text, LawTextResponse) else list(law_text)
+
+        diff = diff_law_texts(self._latest, records)
+        articles = article_texts(records)
+        for key in diff.changed_article_keys:
+            timeline = self._timelines.setdefault(key, _Timeline())
+            if key in articles:
+                timeline.append(date, *articles[key])
+            else:
+                timeline.append(date, timeline.headers[-1], None)
+        self._latest = records
+        self.latest_date = date
+        return diff
+
+    def versions(self, article: str) -> List[ArticleVersion]:
+        """
+        Get all the versions of an article, oldest first.
+
+        Parameters
+        ----------
+        article : str
+            Article number of the main provision, e.g. "709" or "3_2",
+            or an article key, e.g. "SupplProvision/Article[1]".
+
+        Returns
+        -------
+        List[ArticleVersion]
+            The versions.
+        """
+        key = _article_key(article)
+        timeline = self._timelines.get(key)
+        if timeline is None:
+            return []
+        return [timeline.version(key, index) for index in range(len(timeline.starts))]
+
+    def article_at(self, article: str, date: DateLike) -> Optional[ArticleVersion]:
+        """
+        Get the version of an article in effect on a date.
+
+        Parameters
+        ----------
+        article : str
+            Article number of the main provision, e.g. "709" or "3_2",
+            or an article key, e.g. "SupplProvision/Article[1]".
+        date : str or datetime.date
+            Date.
+
+        Returns
+        -------
+        ArticleVersion, optional
+            The version, or None if the article did not exist on `date`.
+        """
+        key = _article_key(article)
+        timeline = self._timelines.get(key)
+        if timeline is None:
+            return None
+        index = timeline.find(_isoformat(date))
+        if index < 0 or timeline.texts[index] is None:
+            return None
+        return timeline.version(key, index)
+
+    def articles_at(self, date: DateLike) -> List[ArticleVersion]:
+        """
+        Get the versions of all the articles in effect on a date.
+        """
+        date = _isoformat(date)
+        dst = []
+        for key, timeline in self._timelines.items():
+            index = timeline.find(date)
+            if index >= 0 and timeline.texts[index] is not None:
+                dst.append(timeline.version(key, index))
+        return dst
+
+    def to_dict(self) -> dict:
+        """
+        Convert the history into a JSON-serializable dictionary.
+        """
+        return {
+            "latest_date": self.latest_date,
+            "latest": [
+                [record.path, record.titles, record.caption, record.text]
+                for record in self._latest
+            ],
+            "articles": {
+                key: [timeline.starts, timeline.headers, timeline.texts]
+                for key, timeline in self._timelines.items()
+            },
+        }
+
+    @staticmethod
+    def from_dict(law_id: str, src: dict):
+        """
+        Static method to create a LawHistory object from `to_dict` output.
+        """
+        history = LawHistory(law_id)
+        history.latest_date = src["latest_date"]
+        history._latest = [
+            ProvisionRecord(
+                law_id, tuple(tuple(pair) for pair in path), tuple(titles), caption, text)
+            for path, titles, caption, text in src["latest"]
+        ]
+        for key, (starts, headers, texts) in src["articles"].items():
+            timeline = _Timeline()
+            timeline.starts, timeline.headers, timeline.texts = starts, headers, texts
+            history._timelines[key] = timeline
+        return history
+
+
+class HistoryStore:
+    """
+    Versioned store of many laws/ordinances.
+
+    Each law is saved to its own JSON file in a directory and loaded on
+    first use, so saving after an update writes only the laws it changed,
+    and processes updating different laws do not overwrite each other.
+
+    Attributes
+    ----------
+    directory : str, optional
+        Directory the histories are loaded from and saved to.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        """
+        Initialize the HistoryStore object.
+
+        Parameters
+        ----------
+        directory : str, optional
+            Directory of the JSON files, created if it does not exist.
+            Default is None (in-memory only).
+        """
+        self.directory: Optional[str] = directory
+        self._histories: Dict[str, LawHistory] = {}
+        self._modified: Set[str] = set()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, law_id: str) -> str:
+        return os.path.join(self.directory, law_id + ".json")
+
+    def _load(self, law_id: str) -> Optional[LawHistory]:
+        history = self._histories.get(law_id)
+        if history is not None or self.directory is None:
+            return history
+        try:
+            with open(self._path(law_id), "r", encoding="utf-8") as file_:
+                history = LawHistory.from_dict(law_id, json.load(file_))
+        except FileNotFoundError:
+            return None
+        self._histories[law_id] = history
+        return history
+
+    def __contains__(self, law_id: str) -> bool:
+        return self._load(law_id) is not None
+
+    @property
+    def law_ids(self) -> List[str]:
+        """
+        The law IDs stored in memory or in the directory.
+        """
+        law_ids = dict.fromkeys(self._histories)
+        if self.directory is not None:
+            for name in sorted(os.listdir(self.directory)):
+                if name.endswith(".json"):
+                    law_ids.setdefault(name[:-len(".json")])
+        return list(law_ids)
+
+    def history(self, law_id: str) -> Optional[LawHistory]:
+        """
+        Get the history of a law/ordinance, or None if it is not stored.
+        """
+        return self._load(law_id)
+
+    def apply(self, law_id: str, law_text: LawText, date: DateLike) -> LawTextDiff:
+        """
+        Apply a version of a law/ordinance that took effect on a date.
+
+        See `LawHistory.apply`.
+        """
+        history = self._load(law_id)
+        if history is None:
+            history = LawHistory(law_id)
+            self._histories[law_id] = history
+        diff = history.apply(law_text, date)
+        self._modified.add(law_id)
+        return diff
+
+    def article_text(self, law_id: str, article: str, date: DateLike) -> Optional[str]:
+        """
+        Get the text of an article of a law/ordinance as of a date.
+
+        Parameters
+        ----------
+        law_id : str
+            Law ID.
+        article : str
+            Article number of the main provision, e.g. "709" or "3_2",
+            or an article key, e.g. "SupplProvision/Article[1]".
+        date : str or datetime.date
+            Date.
+
+        Returns
+        -------
+        str, optional
+            The text, or None if the article did not exist on `date`.
+        """
+        history = self._load(law_id)
+        if history is None:
+            return None
+        version = history.article_at(article, date)
+        return version.text if version is not None else None
+
+    def sync(
+        self, version: int, date: int,
+        timeout: float = TIMEOUT_SEC, parse_workers: Optional[int] = None
+    ) -> SyncResult:
+        """
+        Apply the laws/ordinances updated on a date.
+
+        The list of updated laws of `date` is acquired, and the full text of
+        each law is acquired in bulk and applied as of `date`. The API serves
+        the text in effect when it is requested, not as of the enforcement
+        date of an amendment, which may be in the future, so the text is
+        dated by the list that announced it. Sync the dates in order: a law
+        whose history already has a version later than `date` is not applied
+        and is reported as an error.
+
+        A law that fails does not stop the others, and the applied laws are
+        saved to `self.directory`, if any.
+
+        Parameters
+        ----------
+        version : int
+            Version number of the e-Gov eLaw API.
+        date : int
+            Date of the list of updated laws (YYYYMMDD).
+        timeout : float, optional
+            Timeout duration in seconds. Default is TIMEOUT_SEC.
+        parse_workers : int, optional
+            Number of worker processes; see `bulk.acquire_law_texts`.
+
+        Returns
+        -------
+        SyncResult
+            The changes and the errors, keyed by law ID.
+
+        Raises
+        ------
+        requests.exceptions.RequestException
+            If an error occurs while acquiring the list of updated laws.
+        ValueError
+            If the API reports an error for the list of `date`.
+        """
+        effective = _isoformat(str(date))
+        law_ids = list(dict.fromkeys(
+            elem.law_id for elem in fetch_updated_laws(version, date, timeout) if elem.law_id))
+
+        diffs: Dict[str, LawTextDiff] = {}
+        errors: Dict[str, BaseException] = {}
+        for result in acquire_law_texts(
+                version, law_ids, timeout=timeout, parse_workers=parse_workers):
+            if result.error is not None:
+                errors[result.law_id] = result.error
+                continue
+            try:
+                diffs[result.law_id] = self.apply(result.law_id, result.value, effective)
+            except ValueError as error:
+                errors[result.law_id] = error
+        if self.directory is not None:
+            self.save()
+        return SyncResult(diffs, errors)
+
+    def save(self) -> int:
+        """
+        Save the laws applied since the last save, replacing each file atomically.
+
+        Returns
+        -------
+        int
+            Number of saved laws.
+
+        Raises
+        ------
+        ValueError
+            If the store has no directory.
+        """
+        if self.directory is None:
+            raise ValueError("The store has no directory.")
+        for law_id in sorted(self._modified):
+            data = json.dumps(self._histories[law_id].to_dict(), ensure_ascii=False)
+            write_atomic(self._path(law_id), data.encode("utf-8"))
+        saved = len(self._modified)
+        self._modified.clear()
+        return saved
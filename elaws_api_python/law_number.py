@@ -0,0 +1,159 @@
+"""elaws_api_python.law_number
+
+Parser of law numbers such as 昭和二十九年法律第百六十二号.
+"""
+
+import re
+import unicodedata
+from typing import NamedTuple, Optional, Tuple
+
+from .numerals import replace_kanji_numerals
+
+# Era name -> (code used in law IDs, first western year)
+ERAS = {
+    "明治": (1, 1868),
+    "大正": (2, 1912),
+    "昭和": (3, 1926),
+    "平成": (4, 1989),
+    "令和": (5, 2019),
+}
+ERA_NAMES = {code: name for name, (code, _) in ERAS.items()}
+
+_ERA_PATTERN = re.compile(
+    r"^(?P<era>明治|大正|昭和|平成|令和)(?P<year>元|\d+)年"
+    r"(?:\d+月\d+日)?(?P<type>.+?)(?:第(?P<serial>\d+)号(?:の(?P<branch>\d+))?)?$"
+)
+_WESTERN_PATTERN = re.compile(
+    r"^(?P<year>\d{4})年"
+    r"(?:\d+月\d+日)?(?P<type>.+?)(?:第(?P<serial>\d+)号(?:の(?P<branch>\d+))?)?$"
+)
+
+LawNumberKey = Tuple[int, int, str, Optional[int], Optional[int]]
+WesternLawNumberKey = Tuple[int, str, Optional[int], Optional[int]]
+
+
+class LawNumber(NamedTuple):
+    """
+    Parsed law number.
+
+    Attributes
+    ----------
+    era : int, optional
+        Era code as used in law IDs (1: 明治, 2: 大正, 3: 昭和, 4: 平成, 5: 令和).
+        None if the law number was given with a western year.
+    year : int
+        Year in the era, or the western year if `era` is None.
+    law_type : str
+        Law type, e.g. "法律", "政令" or "厚生省令".
+    serial : int, optional
+        Serial number. None for law numbers without one, e.g. 昭和二十一年憲法.
+    branch : int, optional
+        Branch number of a serial number, e.g. 2 for 第百六十号の二.
+        None if the serial number has none.
+    """
+    era: Optional[int]
+    year: int
+    law_type: str
+    serial: Optional[int]
+    branch: Optional[int] = None
+
+    @property
+    def western_year(self) -> int:
+        """
+        The western year of the law number.
+        """
+        if self.era is None:
+            return self.year
+        return ERAS[ERA_NAMES[self.era]][1] + self.year - 1
+
+    @property
+    def key(self) -> Optional[LawNumberKey]:
+        """
+        Compact key (era, year, law type, serial, branch), or None for a western year.
+        """
+        if self.era is None:
+            return None
+        return (self.era, self.year, self.law_type, self.serial, self.branch)
+
+    @property
+    def western_key(self) -> WesternLawNumberKey:
+        """
+        Compact key (western year, law type, serial, branch).
+
+        A western year at the boundary of two eras can match two law numbers.
+        """
+        return (self.western_year, self.law_type, self.serial, self.branch)
+
+    def __str__(self) -> str:
+        serial = f"第{self.serial}号" if self.serial is not None else ""
+        if self.branch is not None:
+            serial += f"の{self.branch}"
+        if self.era is None:
+            return f"{self.year}年{self.law_type}{serial}"
+        return f"{ERA_NAMES[self.era]}{self.year}年{self.law_type}{serial}"
+
+
+def parse_law_number(law_number: str) -> Optional[LawNumber]:
+    """
+    Parse a law number.
+
+    Kanji and Arabic (full-width or half-width) numerals, 元年, an
+    optional promulgation date and western years are accepted, e.g.
+    "昭和二十九年法律第百六十二号", "昭和29年法律第162号" or
+    "1954年法律第162号", and branch numbers such as "第百六十号の二".
+
+    Parameters
+    ----------
+    law_number : str
+        The law number.
+
+    Returns
+    -------
+    LawNumber, optional
+        The parsed law number, or None if `law_number` cannot be parsed.
+    """
+    text = unicodedata.normalize("NFKC", law_number)
+    text = replace_kanji_numerals(re.sub(r"\s+", "", text))
+
+    match = _ERA_PATTERN.match(text)
+    if match is not None:
+        year = match.group("year")
+        era = ERAS[match.group("era")][0]
+        year = 1 if year == "元" else int(year)
+    else:
+        match = _WESTERN_PATTERN.match(text)
+        if match is None:
+            return None
+        era = None
+        year = int(match.group("year"))
+    serial = match.group("serial")
+    branch = match.group("branch")
+    return LawNumber(
+        era, year, match.group("type"),
+        int(serial) if serial is not None else None,
+        int(branch) if branch is not None else None
+    )
+
+
+def resolve_law_id(law_id_or_law_number: str, law_list) -> str:
+    """
+    Resolve a law number to a law ID with a local list of laws.
+
+    Requests by law ID share cached responses regardless of how the law
+    number was written.
+
+    Parameters
+    ----------
+    law_id_or_law_number : str
+        Law ID or law number.
+    law_list : ListOfLaws, LawNameListInfo or LawCatalog
+        Object providing `find_law_id_by_law_number`.
+
+    Returns
+    -------
+    str
+        The law ID if `law_id_or_law_number` is a known law number,
+        otherwise `law_id_or_law_number` itself.
+    """
+    law_id = law_list.find_law_id_by_law_number(law_id_or_law_number)
+    return law_id if law_id is not None else law_id_or_law_number
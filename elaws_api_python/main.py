@@ -1,17 +1,51 @@
 """elaws_api_python.main
 """
 
+import os
+import time
+from typing import Callable, Optional, TypeVar
+
 from .base import (
+    build_laws_and_ordinances_url,
+    build_law_text_url,
     request_laws_and_ordinances,
     request_law_text,
+    stream_law_text,
+    CHUNK_SIZE,
     TIMEOUT_SEC
 )
+from .cache import ResponseCache
 from .classes import ListOfLaws, LawTextResponse
+from .law_number import resolve_law_id
+from .snapshot import load_snapshot, save_snapshot
+
+T = TypeVar("T")
+
+
+def _parse_cached(
+    content: str, parser: Callable[[str], T],
+    cache: Optional[ResponseCache], url: str
+) -> T:
+    """
+    Parse `content`, reusing the parsed object held in `cache` for `url`.
+
+    The cache keeps the parsed object only while the body is unchanged,
+    so a held object is always consistent with `content`.
+    """
+    if cache is None:
+        return parser(content)
+    entry = cache.get(url)
+    if entry is None:
+        return parser(content)
+    if entry.parsed is None:
+        entry.parsed = parser(content)
+    return entry.parsed
 
 
 def acquire_laws_and_ordinances(
     version: int, lawtype: int,
-    timeout: float = TIMEOUT_SEC
+    timeout: float = TIMEOUT_SEC,
+    cache: Optional[ResponseCache] = None
 ) -> ListOfLaws:
     """
     Acquire a list of laws and ordinances.
@@ -24,20 +58,97 @@ def acquire_laws_and_ordinances(
         Law type.
     timeout : float, optional
         Timeout duration in seconds. Default is TIMEOUT_SEC.
+    cache : ResponseCache, optional
+        Cache to revalidate the response against. If the list is unchanged,
+        the ListOfLaws held in the cache is returned. Default is None.
 
     Returns
     -------
     ListOfLaws
         The list of laws and ordinances.
     """
-    content = request_laws_and_ordinances(version, lawtype, timeout)
-    return ListOfLaws(content)
+    content = request_laws_and_ordinances(version, lawtype, timeout, cache)
+    url = build_laws_and_ordinances_url(version, lawtype)
+    return _parse_cached(content, ListOfLaws, cache, url)
+
+
+def load_or_acquire_laws_and_ordinances(
+    version: int, lawtype: int, snapshot_path: str,
+    timeout: float = TIMEOUT_SEC,
+    cache: Optional[ResponseCache] = None,
+    max_age: Optional[float] = None
+) -> ListOfLaws:
+    """
+    Load a list of laws and ordinances from a snapshot, acquiring it if missing.
+
+    The snapshot is memory-mapped, so worker processes on the same host
+    share its pages. If the snapshot does not exist, it is taken from the
+    backend of `cache` if one holds it; otherwise the list is acquired and
+    saved as a snapshot for the next process, and published to the backend
+    for the other hosts.
+
+    A snapshot older than `max_age` is refreshed: the list is acquired
+    again, revalidated against `cache` if given, and the snapshot is
+    rewritten only if the list changed. Otherwise its modification time is
+    updated, so it is used for another `max_age` seconds.
+
+    Parameters
+    ----------
+    version : int
+        Version number of the e-Gov eLaw API.
+    lawtype : int
+        Law type.
+    snapshot_path : str
+        Path to the snapshot file.
+    timeout : float, optional
+        Timeout duration in seconds. Default is TIMEOUT_SEC.
+    cache : ResponseCache, optional
+        Cache to revalidate the response against, and whose backend shares
+        the snapshot. Default is None.
+    max_age : float, optional
+        Seconds for which a snapshot is used without refreshing it.
+        Default is None (never refreshed).
+
+    Returns
+    -------
+    ListOfLaws
+        The list of laws and ordinances.
+    """
+    url = build_laws_and_ordinances_url(version, lawtype)
+    key = "snapshot:" + url
+    if os.path.exists(snapshot_path):
+        if max_age is None or time.time() - os.path.getmtime(snapshot_path) < max_age:
+            return load_snapshot(snapshot_path)
+        entry = cache.get(url) if cache is not None else None
+        digest = entry.digest if entry is not None else None
+        content = request_laws_and_ordinances(version, lawtype, timeout, cache)
+        entry = cache.get(url) if cache is not None else None
+        if digest is not None and entry is not None and entry.digest == digest:
+            os.utime(snapshot_path)
+            return load_snapshot(snapshot_path)
+        list_of_laws = _parse_cached(content, ListOfLaws, cache, url)
+    else:
+        data = cache.get_shared(key) if cache is not None else None
+        if data is not None:
+            part_path = f"{snapshot_path}.{os.getpid()}.part"
+            with open(part_path, "wb") as file_:
+                file_.write(data)
+            os.replace(part_path, snapshot_path)
+            return load_snapshot(snapshot_path)
+        list_of_laws = acquire_laws_and_ordinances(version, lawtype, timeout, cache)
+    save_snapshot(list_of_laws, snapshot_path)
+    if cache is not None and cache.backend is not None:
+        with open(snapshot_path, "rb") as file_:
+            cache.set_shared(key, file_.read())
+    return list_of_laws
 
 
 def aquire_law_text(
     version: int, law_id_or_law_number: str,
-    timeout: float = TIMEOUT_SEC
-) -> str:
+    timeout: float = TIMEOUT_SEC,
+    cache: Optional[ResponseCache] = None,
+    law_list: Optional[ListOfLaws] = None
+) -> LawTextResponse:
     """
     Acquire the full text of a law/ordinance.
 
@@ -47,16 +158,67 @@ def aquire_law_text(
         Version number of the e-Gov eLaw API.
     law_id_or_law_number : str
         Law ID or law number.
+    timeout : float, optional
+        Timeout duration in seconds. Default is TIMEOUT_SEC.
+    cache : ResponseCache, optional
+        Cache to revalidate the response against. If the text is unchanged,
+        the LawTextResponse held in the cache is returned. Default is None.
+    law_list : ListOfLaws, optional
+        List of laws used to resolve a law number to its law ID locally,
+        so that the response is cached under the law ID. Default is None.
+
+    Returns
+    -------
+    LawTextResponse
+        The full text of the law/ordinance.
+
+    Raises
+    ------
+    requests.exceptions.RequestException
+        If an error occurs during the API request.
+    """
+    if law_list is not None:
+        law_id_or_law_number = resolve_law_id(law_id_or_law_number, law_list)
+    content = request_law_text(version, law_id_or_law_number, timeout, cache)
+    url = build_law_text_url(version, law_id_or_law_number)
+    return _parse_cached(content, LawTextResponse, cache, url)
+
+
+def acquire_law_text_stream(
+    version: int, law_id_or_law_number: str,
+    timeout: float = TIMEOUT_SEC, chunk_size: int = CHUNK_SIZE,
+    save_path: Optional[str] = None
+) -> LawTextResponse:
+    """
+    Acquire the full text of a law/ordinance, parsing it while downloading.
+
+    The body is fed to the parser chunk by chunk instead of being buffered
+    and decoded as a whole, which keeps the peak memory of large full texts low.
+
+    Parameters
+    ----------
+    version : int
+        Version number of the e-Gov eLaw API.
+    law_id_or_law_number : str
+        Law ID or law number.
+    timeout : float, optional
+        Timeout duration in seconds. Default is TIMEOUT_SEC.
+    chunk_size : int, optional
+        Size of each chunk in bytes. Default is CHUNK_SIZE.
+    save_path : str, optional
+        Path to write the raw body to while streaming. Default is None.
 
     Returns
     -------
-    str
-        The full text of the law/ordinance in the XML format.
+    LawTextResponse
+        The full text of the law/ordinance.
 
     Raises
     ------
     requests.exceptions.RequestException
         If an error occurs during the API request.
     """
-    content = request_law_text(version, law_id_or_law_number, timeout)
-    return LawTextResponse(content)
+    chunks = stream_law_text(
+        version, law_id_or_law_number, timeout, chunk_size, save_path
+    )
+    return LawTextResponse(chunks)
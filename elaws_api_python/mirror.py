@@ -0,0 +1,613 @@
+"""elaws_api_python.mirror
+
+Sharded, resumable mirror of the full texts into a `blob_store.LawTextStore`,
+run by any number of worker processes sharing a work queue.
+
+Examples
+--------
+Plan a refresh of all the laws, then start workers on one or more hosts
+sharing the queue file and the store directory:
+
+    python -m elaws_api_python.mirror plan --queue mirror.sqlite --refresh
+    python -m elaws_api_python.mirror work --queue mirror.sqlite --store archive \\
+        --worker-id w1 --workers w1,w2,w3
+    python -m elaws_api_python.mirror status --queue mirror.sqlite
+"""
+
+import argparse
+import bisect
+import datetime
+import hashlib
+import os
+import socket
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .base import LAWTYPE_ALL, TIMEOUT_SEC
+from .blob_store import DateLike, LawTextStore
+from .bulk import FETCH_WORKERS, acquire_law_texts
+from .cache import compute_digest
+from .classes.laws_and_ordinances_response import ListOfLaws
+from .concurrency import AdaptiveLimiter
+
+SHARDS = 16
+REPLICAS = 64
+BATCH_SIZE = 32
+LEASE_SEC = 300.0
+MAX_ATTEMPTS = 3
+POLL_SEC = 1.0
+
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys to nodes.
+
+    Each node is placed on the ring at `replicas` points, and a key belongs
+    to the first node at or after its hash. Adding or removing a node only
+    moves the keys of that node, i.e. about 1 / n of them.
+    """
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = REPLICAS) -> None:
+        """
+        Initialize the HashRing object.
+
+        Parameters
+        ----------
+        nodes : Iterable[str], optional
+            Initial nodes.
+        replicas : int, optional
+            Number of points per node. Default is REPLICAS.
+        """
+        self._replicas: int = replicas
+        self._points: List[int] = []
+        self._nodes: List[str] = []
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self) -> int:
+        return len(set(self._nodes))
+
+    def add(self, node: str) -> None:
+        """
+        Add a node.
+        """
+        for replica in range(self._replicas):
+            point = _hash(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._nodes.insert(index, node)
+
+    def remove(self, node: str) -> None:
+        """
+        Remove a node.
+        """
+        kept = [(point, node_) for point, node_ in zip(self._points, self._nodes) if node_ != node]
+        self._points = [point for point, _ in kept]
+        self._nodes = [node_ for _, node_ in kept]
+
+    def node_for(self, key: str) -> str:
+        """
+        Get the node of a key.
+
+        Raises
+        ------
+        ValueError
+            If the ring has no node.
+        """
+        if not self._points:
+            raise ValueError("The hash ring has no node.")
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._nodes[index]
+
+
+class Task(NamedTuple):
+    """
+    A law/ordinance leased from a work queue.
+
+    Attributes
+    ----------
+    law_id : str
+        Law ID.
+    shard : int
+        Shard of the law.
+    attempts : int
+        Number of leases of the law so far, including this one.
+    """
+    law_id: str
+    shard: int
+    attempts: int
+
+
+class WorkQueue(ABC):
+    """
+    Interface of the work queues of a mirror.
+
+    A law is leased by one worker at a time. A lease that is neither
+    completed nor failed before it expires, e.g. because its worker crashed,
+    makes the law available again, unless the law has been leased
+    `max_attempts` times, and only the worker holding the current lease of
+    a law can complete it.
+    """
+
+    @abstractmethod
+    def enqueue(self, tasks: Iterable[Tuple[str, int]], reset: bool = False) -> int:
+        """
+        Add (law ID, shard) pairs. If `reset`, laws already added are made
+        pending again, e.g. to start a new refresh round. Returns the
+        number of pending laws added or reset.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def lease(
+        self, owner: str, limit: int, lease_sec: float,
+        shards: Optional[Sequence[int]] = None, max_attempts: int = MAX_ATTEMPTS
+    ) -> List[Task]:
+        """
+        Lease up to `limit` available laws, preferring those of `shards`.
+        An expired lease of a law already leased `max_attempts` times marks
+        the law as failed instead, so a law that crashes every worker
+        taking it is not leased forever.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, owner: str, results: Iterable[Tuple[str, str]]) -> int:
+        """
+        Mark (law ID, digest) pairs leased by `owner` as done. Returns the
+        number of laws whose lease was still held.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def fail(self, owner: str, law_id: str, error: str, max_attempts: int = MAX_ATTEMPTS) -> None:
+        """
+        Release a law leased by `owner` after an error. It is retried until
+        it has been leased `max_attempts` times.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """
+        Number of laws per status.
+        """
+        raise NotImplementedError
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Work queue in an SQLite file, shared by the processes of one host or
+    by hosts mounting the same file system.
+
+    Leases are taken in `BEGIN IMMEDIATE` transactions, so two processes
+    never lease the same law.
+
+    Attributes
+    ----------
+    path : str
+        Path to the database file.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0) -> None:
+        """
+        Initialize the SQLiteWorkQueue object, creating the database if needed.
+
+        Parameters
+        ----------
+        path : str
+            Path to the database file.
+        timeout : float, optional
+            Seconds to wait for a lock held by another process. Default is 30.0.
+        """
+        self.path: str = path
+        self._connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "law_id TEXT PRIMARY KEY, shard INTEGER NOT NULL, status TEXT NOT NULL, "
+            "owner TEXT, lease_until REAL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "digest TEXT, error TEXT)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, shard)"
+        )
+
+    def close(self) -> None:
+        """
+        Close the database.
+        """
+        self._connection.close()
+
+    def _transaction(self):
+        connection = self._connection
+
+        class Transaction:
+            def __enter__(self):
+                connection.execute("BEGIN IMMEDIATE")
+                return connection
+
+            def __exit__(self, exc_type, *args):
+                connection.execute("ROLLBACK" if exc_type is not None else "COMMIT")
+
+        return Transaction()
+
+    def enqueue(self, tasks: Iterable[Tuple[str, int]], reset: bool = False) -> int:
+        tasks = list(tasks)
+        with self._transaction() as connection:
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO tasks (law_id, shard, status) VALUES (?, ?, ?)",
+                [(law_id, shard, STATUS_PENDING) for law_id, shard in tasks]
+            )
+            if reset:
+                connection.executemany(
+                    "UPDATE tasks SET shard = ?, status = ?, owner = NULL, lease_until = NULL, "
+                    "attempts = 0, error = NULL WHERE law_id = ? AND status != ?",
+                    [(shard, STATUS_PENDING, law_id, STATUS_PENDING) for law_id, shard in tasks]
+                )
+            return connection.total_changes - before
+
+    def lease(
+        self, owner: str, limit: int, lease_sec: float,
+        shards: Optional[Sequence[int]] = None, max_attempts: int = MAX_ATTEMPTS
+    ) -> List[Task]:
+        now = time.time()
+        preferred = ",".join(str(int(shard)) for shard in shards or ())
+        order = f"CASE WHEN shard IN ({preferred}) THEN 0 ELSE 1 END, " if preferred else ""
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE tasks SET status = ?, owner = NULL, lease_until = NULL, error = ? "
+                "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                (STATUS_FAILED, "The lease expired on every attempt.",
+                 STATUS_LEASED, now, max_attempts)
+            )
+            rows = connection.execute(
+                "SELECT law_id, shard, attempts FROM tasks "
+                "WHERE status = ? OR (status = ? AND lease_until < ?) "
+                f"ORDER BY {order}shard, law_id LIMIT ?",
+                (STATUS_PENDING, STATUS_LEASED, now, limit)
+            ).fetchall()
+            connection.executemany(
+                "UPDATE tasks SET status = ?, owner = ?, lease_until = ?, "
+                "attempts = attempts + 1 WHERE law_id = ?",
+                [(STATUS_LEASED, owner, now + lease_sec, law_id) for law_id, _, _ in rows]
+            )
+        return [Task(law_id, shard, attempts + 1) for law_id, shard, attempts in rows]
+
+    def complete(self, owner: str, results: Iterable[Tuple[str, str]]) -> int:
+        with self._transaction() as connection:
+            before = connection.total_changes
+            connection.executemany(
+                "UPDATE tasks SET status = ?, owner = NULL, lease_until = NULL, "
+                "digest = ?, error = NULL WHERE law_id = ? AND owner = ? AND status = ?",
+                [(STATUS_DONE, digest, law_id, owner, STATUS_LEASED) for law_id, digest in results]
+            )
+            return connection.total_changes - before
+
+    def fail(self, owner: str, law_id: str, error: str, max_attempts: int = MAX_ATTEMPTS) -> None:
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "owner = NULL, lease_until = NULL, error = ? "
+                "WHERE law_id = ? AND owner = ? AND status = ?",
+                (max_attempts, STATUS_FAILED, STATUS_PENDING, error, law_id, owner, STATUS_LEASED)
+            )
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._connection.execute(
+            "SELECT status, COUNT(*) FROM tasks GROUP BY status"
+        ).fetchall()
+        counts = {status: 0 for status in (STATUS_PENDING, STATUS_LEASED, STATUS_DONE, STATUS_FAILED)}
+        counts.update(rows)
+        return counts
+
+    def failures(self) -> Dict[str, str]:
+        """
+        Errors of the laws that failed, keyed by law ID.
+        """
+        return dict(self._connection.execute(
+            "SELECT law_id, error FROM tasks WHERE status = ?", (STATUS_FAILED,)
+        ).fetchall())
+
+
+class MirrorCoordinator:
+    """
+    Planner of a mirror: partitions the law IDs into shards and the shards
+    among the workers.
+
+    Laws are mapped to shards and shards to workers with consistent hash
+    rings, so that the assignment is stable as laws are added to the
+    corpus and as workers join or leave. The assignment only sets which
+    laws each worker takes first; a worker that runs out of its own shards
+    takes over the others', so a slow or dead worker does not hold up the
+    mirror.
+
+    Attributes
+    ----------
+    queue : WorkQueue
+        The work queue.
+    shards : int
+        Number of shards.
+    """
+
+    def __init__(self, queue: WorkQueue, shards: int = SHARDS) -> None:
+        """
+        Initialize the MirrorCoordinator object.
+
+        Parameters
+        ----------
+        queue : WorkQueue
+            The work queue.
+        shards : int, optional
+            Number of shards. Default is SHARDS.
+        """
+        self.queue: WorkQueue = queue
+        self.shards: int = shards
+        self._ring = HashRing(str(shard) for shard in range(shards))
+
+    def shard_of(self, law_id: str) -> int:
+        """
+        Get the shard of a law ID.
+        """
+        return int(self._ring.node_for(law_id))
+
+    def plan(self, law_ids: Union[ListOfLaws, Iterable[str]], refresh: bool = False) -> Dict[int, int]:
+        """
+        Add laws to the queue.
+
+        Parameters
+        ----------
+        law_ids : ListOfLaws or Iterable[str]
+            The laws, e.g. a list acquired by `main.acquire_laws_and_ordinances`.
+        refresh : bool, optional
+            If True, laws already mirrored are fetched again. Default is False.
+
+        Returns
+        -------
+        Dict[int, int]
+            Number of laws per shard.
+        """
+        if isinstance(law_ids, ListOfLaws):
+            law_ids = [elem.law_id for elem in law_ids.list_name_list_info]
+        tasks = [(law_id, self.shard_of(law_id)) for law_id in dict.fromkeys(law_ids)]
+        self.queue.enqueue(tasks, reset=refresh)
+        sizes: Dict[int, int] = {}
+        for _, shard in tasks:
+            sizes[shard] = sizes.get(shard, 0) + 1
+        return sizes
+
+    def assign(self, worker_ids: Iterable[str]) -> Dict[str, List[int]]:
+        """
+        Assign the shards to workers.
+
+        Parameters
+        ----------
+        worker_ids : Iterable[str]
+            IDs of the workers.
+
+        Returns
+        -------
+        Dict[str, List[int]]
+            Shards keyed by worker ID.
+        """
+        worker_ids = list(worker_ids)
+        ring = HashRing(worker_ids)
+        assignment: Dict[str, List[int]] = {worker_id: [] for worker_id in worker_ids}
+        for shard in range(self.shards):
+            assignment[ring.node_for(str(shard))].append(shard)
+        return assignment
+
+    def progress(self) -> Dict[str, int]:
+        """
+        Number of laws per status.
+        """
+        return self.queue.counts()
+
+
+def _raw(content: bytes) -> bytes:
+    return content
+
+
+class MirrorWorker:
+    """
+    Worker fetching leased laws into a LawTextStore.
+
+    Laws are leased in batches and fetched concurrently. Each fetched
+    response is stored before its law is marked done, so a worker that
+    crashes loses nothing: its leases expire and the laws are leased again.
+    The store is content-addressed, so storing a response twice writes
+    nothing new.
+
+    Attributes
+    ----------
+    worker_id : str
+        ID of the worker, used as the owner of its leases.
+    fetched : int
+        Number of laws fetched and stored.
+    changed : int
+        Number of stored laws that differed from their previous fetch.
+    failed : int
+        Number of fetches that failed.
+    """
+
+    def __init__(
+        self, queue: WorkQueue, store: LawTextStore, version: int = 1,
+        worker_id: Optional[str] = None,
+        shards: Optional[Sequence[int]] = None,
+        fetch_date: Optional[DateLike] = None,
+        batch_size: int = BATCH_SIZE,
+        lease_sec: float = LEASE_SEC,
+        max_attempts: int = MAX_ATTEMPTS,
+        timeout: float = TIMEOUT_SEC,
+        fetch_workers: int = FETCH_WORKERS,
+        limiter: Optional[AdaptiveLimiter] = None
+    ) -> None:
+        """
+        Initialize the MirrorWorker object.
+
+        Parameters
+        ----------
+        queue : WorkQueue
+            The work queue.
+        store : LawTextStore
+            Store of the full texts.
+        version : int, optional
+            Version number of the e-Gov eLaw API. Default is 1.
+        worker_id : str, optional
+            ID of the worker. Default is "<host>-<pid>".
+        shards : Sequence[int], optional
+            Shards to take first, e.g. from `MirrorCoordinator.assign`.
+        fetch_date : str or datetime.date, optional
+            Fetch date recorded in the store. Default is today.
+        batch_size : int, optional
+            Number of laws per lease. Default is BATCH_SIZE.
+        lease_sec : float, optional
+            Duration of a lease, which must cover fetching a batch.
+            Default is LEASE_SEC.
+        max_attempts : int, optional
+            Number of attempts before a law is marked failed. Default is MAX_ATTEMPTS.
+        timeout : float, optional
+            Timeout duration in seconds. Default is TIMEOUT_SEC.
+        fetch_workers : int, optional
+            Number of concurrent downloads. Default is FETCH_WORKERS.
+        limiter : AdaptiveLimiter, optional
+            Limiter of the downloads in flight. Default is None.
+        """
+        self.queue: WorkQueue = queue
+        self.store: LawTextStore = store
+        self.version: int = version
+        self.worker_id: str = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.shards: Optional[Sequence[int]] = shards
+        self.fetch_date: DateLike = fetch_date or datetime.date.today()
+        self.batch_size: int = batch_size
+        self.lease_sec: float = lease_sec
+        self.max_attempts: int = max_attempts
+        self.timeout: float = timeout
+        self.fetch_workers: int = fetch_workers
+        self.limiter: Optional[AdaptiveLimiter] = limiter
+        self.fetched: int = 0
+        self.changed: int = 0
+        self.failed: int = 0
+
+    def run_batch(self) -> int:
+        """
+        Lease, fetch and store one batch.
+
+        Returns
+        -------
+        int
+            Number of leased laws; 0 if none was available.
+        """
+        tasks = self.queue.lease(
+            self.worker_id, self.batch_size, self.lease_sec, self.shards, self.max_attempts)
+        if not tasks:
+            return 0
+        done = []
+        for result in acquire_law_texts(
+            self.version, [task.law_id for task in tasks], extract=_raw,
+            timeout=self.timeout, fetch_workers=self.fetch_workers,
+            parse_workers=0, limiter=self.limiter
+        ):
+            if result.error is not None:
+                self.failed += 1
+                self.queue.fail(self.worker_id, result.law_id, repr(result.error), self.max_attempts)
+                continue
+            if self.store.put(result.law_id, self.fetch_date, result.value):
+                self.changed += 1
+            self.fetched += 1
+            done.append((result.law_id, compute_digest(result.value)))
+        self.queue.complete(self.worker_id, done)
+        return len(tasks)
+
+    def run(self, poll_sec: float = POLL_SEC) -> int:
+        """
+        Process batches until no law is pending or leased.
+
+        When the remaining laws are all leased by other workers, the worker
+        waits in case their leases expire.
+
+        Parameters
+        ----------
+        poll_sec : float, optional
+            Seconds to wait between checks. Default is POLL_SEC.
+
+        Returns
+        -------
+        int
+            Number of laws fetched and stored by this worker.
+        """
+        while True:
+            if self.run_batch():
+                continue
+            counts = self.queue.counts()
+            if counts[STATUS_PENDING] == 0 and counts[STATUS_LEASED] == 0:
+                return self.fetched
+            time.sleep(poll_sec)
+
+
+def main(argv=None) -> None:
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Sharded mirror of the e-Gov eLaw API.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    plan = commands.add_parser("plan", help="add the laws of a list to the queue")
+    plan.add_argument("--queue", required=True)
+    plan.add_argument("--version", type=int, default=1)
+    plan.add_argument("--lawtype", type=int, default=LAWTYPE_ALL)
+    plan.add_argument("--shards", type=int, default=SHARDS)
+    plan.add_argument("--refresh", action="store_true")
+    work = commands.add_parser("work", help="fetch leased laws into a store")
+    work.add_argument("--queue", required=True)
+    work.add_argument("--store", required=True)
+    work.add_argument("--version", type=int, default=1)
+    work.add_argument("--worker-id", default=None)
+    work.add_argument("--workers", default=None,
+                      help="comma-separated IDs of all the workers, to take own shards first")
+    work.add_argument("--shards", type=int, default=SHARDS)
+    work.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    work.add_argument("--lease-sec", type=float, default=LEASE_SEC)
+    work.add_argument("--fetch-workers", type=int, default=FETCH_WORKERS)
+    status = commands.add_parser("status", help="show the progress")
+    status.add_argument("--queue", required=True)
+    args = parser.parse_args(argv)
+
+    queue = SQLiteWorkQueue(args.queue)
+    if args.command == "plan":
+        from .main import acquire_laws_and_ordinances
+
+        list_of_laws = acquire_laws_and_ordinances(args.version, args.lawtype)
+        sizes = MirrorCoordinator(queue, args.shards).plan(list_of_laws, args.refresh)
+        print(f"planned {sum(sizes.values())} laws in {len(sizes)} shards")
+    elif args.command == "work":
+        shards = None
+        if args.workers and args.worker_id:
+            assignment = MirrorCoordinator(queue, args.shards).assign(args.workers.split(","))
+            shards = assignment.get(args.worker_id)
+        worker = MirrorWorker(
+            queue, LawTextStore(args.store), args.version, args.worker_id, shards,
+            batch_size=args.batch_size, lease_sec=args.lease_sec,
+            fetch_workers=args.fetch_workers
+        )
+        worker.run()
+        print(f"{worker.worker_id}: fetched {worker.fetched}, "
+              f"changed {worker.changed}, failed {worker.failed}")
+    for status_, count in queue.counts().items():
+        print(f"{status_}: {count}")
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""elaws_api_python.name_matching
+
+Normalized and fuzzy matching of law names.
+"""
+
+import re
+import unicodedata
+from array import array
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .numerals import replace_kanji_numerals
+
+NGRAM = 2
+PARENTHESES_PATTERN = re.compile(r"\(([^()]*)\)")
+SPACES_PATTERN = re.compile(r"\s+")
+
+
+def _normalize_base(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text)
+    text = replace_kanji_numerals(text)
+    return SPACES_PATTERN.sub("", text)
+
+
+def normalize_law_name(law_name: str) -> str:
+    """
+    Normalize a law name for matching.
+
+    The name is NFKC-normalized (which unifies full-width and half-width
+    characters), kanji numerals are replaced with Arabic numerals, and
+    parenthesized parts such as abbreviations and whitespace are removed.
+
+    Parameters
+    ----------
+    law_name : str
+        The law name.
+
+    Returns
+    -------
+    str
+        The normalized name.
+    """
+    text = _normalize_base(law_name)
+    while True:
+        stripped = PARENTHESES_PATTERN.sub("", text)
+        if stripped == text:
+            return stripped
+        text = stripped
+
+
+def law_name_aliases(law_name: str) -> List[str]:
+    """
+    Get the normalized parenthesized parts of a law name, e.g. abbreviations.
+
+    Parameters
+    ----------
+    law_name : str
+        The law name.
+
+    Returns
+    -------
+    List[str]
+        The normalized contents of the innermost parentheses.
+    """
+    text = _normalize_base(law_name)
+    return [alias for alias in PARENTHESES_PATTERN.findall(text) if alias]
+
+
+def ngrams(text: str, n: int = NGRAM) -> Set[str]:
+    """
+    Get the set of character n-grams of a text.
+
+    Texts shorter than `n` yield the text itself.
+    """
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[index:index + n] for index in range(len(text) - n + 1)}
+
+
+def bounded_edit_distance(source: str, target: str, bound: int) -> Optional[int]:
+    """
+    Compute the Levenshtein distance of two texts if it is at most `bound`.
+
+    Only the diagonal band of width `2 * bound + 1` is computed, and the
+    computation stops as soon as the distance is known to exceed `bound`.
+
+    Parameters
+    ----------
+    source : str
+        A text.
+    target : str
+        Another text.
+    bound : int
+        Upper bound of the distance.
+
+    Returns
+    -------
+    int, optional
+        The distance, or None if it exceeds `bound`.
+    """
+    if abs(len(source) - len(target)) > bound:
+        return None
+    if len(source) > len(target):
+        source, target = target, source
+    inf = bound + 1
+    previous = [col if col <= bound else inf for col in range(len(target) + 1)]
+    for row in range(1, len(source) + 1):
+        char = source[row - 1]
+        low = max(1, row - bound)
+        high = min(len(target), row + bound)
+        current = [inf] * (len(target) + 1)
+        current[0] = row if row <= bound else inf
+        best = current[0]
+        for col in range(low, high + 1):
+            cost = previous[col - 1] + (char != target[col - 1])
+            if previous[col] + 1 < cost:
+                cost = previous[col] + 1
+            if current[col - 1] + 1 < cost:
+                cost = current[col - 1] + 1
+            current[col] = cost
+            if cost < best:
+                best = cost
+        if best > bound:
+            return None
+        previous = current
+    distance = previous[len(target)]
+    return distance if distance <= bound else None
+
+
+class LawNameMatcher:
+    """
+    Index of normalized law names for exact and fuzzy lookups.
+
+    Normalized names (and the abbreviations in their parentheses) are built
+    once. Candidates for a fuzzy query are taken from an inverted index of
+    character bigrams, using only the rarest bigrams of the query that any
+    name within the distance bound must share, and are then filtered by
+    length and bigram overlap before the edit distance is computed.
+
+    Attributes
+    ----------
+    elements : Sequence
+        The indexed elements, typically LawNameInfoElement objects.
+    """
+
+    def __init__(self, elements: Sequence, n: int = NGRAM) -> None:
+        """
+        Initialize the LawNameMatcher object by indexing the law names.
+
+        Parameters
+        ----------
+        elements : Sequence
+            Elements with a `law_name` attribute, e.g. LawNameInfoElement.
+        n : int, optional
+            Length of the character n-grams. Default is NGRAM.
+        """
+        self.elements: Sequence = elements
+        self._n: int = n
+        self._keys: List[str] = []
+        self._rows = array("I")
+        self._exact: Dict[str, List[int]] = {}
+        postings: Dict[str, List[int]] = {}
+        by_length: Dict[int, List[int]] = {}
+        for row, elem in enumerate(elements):
+            if not elem.law_name:
+                continue
+            keys = [normalize_law_name(elem.law_name)]
+            keys.extend(
+                alias for alias in law_name_aliases(elem.law_name) if alias != keys[0]
+            )
+            for key in keys:
+                key_id = len(self._keys)
+                self._keys.append(key)
+                self._rows.append(row)
+                self._exact.setdefault(key, []).append(row)
+                by_length.setdefault(len(key), []).append(key_id)
+                for gram in ngrams(key, n):
+                    postings.setdefault(gram, []).append(key_id)
+        self._postings: Dict[str, array] = {
+            gram: array("I", key_ids) for gram, key_ids in postings.items()
+        }
+        self._by_length: Dict[int, array] = {
+            length: array("I", key_ids) for length, key_ids in by_length.items()
+        }
+
+    def find_exact(self, query: str) -> List:
+        """
+        Find the elements whose normalized name (or abbreviation) equals that of `query`.
+
+        Parameters
+        ----------
+        query : str
+            The law name.
+
+        Returns
+        -------
+        List
+            The matching elements in list order.
+        """
+        rows = self._exact.get(normalize_law_name(query), [])
+        return [self.elements[row] for row in rows]
+
+    def match_with_scores(
+        self, query: str, limit: int = 10, max_distance: Optional[int] = None
+    ) -> List[Tuple[object, float]]:
+        """
+        Find the elements whose names are similar to `query` with their scores.
+
+        Parameters
+        ----------
+        query : str
+            The law name, possibly with typos or notation differences.
+        limit : int, optional
+            Maximum number of results. Default is 10.
+        max_distance : int, optional
+            Maximum edit distance between the normalized names.
+            Default is a quarter of the length of the normalized query (at least 1).
+
+        Returns
+        -------
+        List[Tuple[object, float]]
+            Pairs of an element and its score in (0, 1], best first.
+            The score is 1 - distance / (length of the longer name).
+        """
+        key = normalize_law_name(query)
+        if not key:
+            return []
+        if max_distance is None:
+            max_distance = max(1, len(key) // 4)
+
+        query_grams = ngrams(key, self._n)
+        candidates: Set[int] = set()
+        if len(query_grams) <= max_distance * self._n:
+            # the edits can remove every gram of a short query, so a match
+            # may share none: scan the names in the length window instead
+            for length in range(len(key) - max_distance, len(key) + max_distance + 1):
+                candidates.update(self._by_length.get(length, ()))
+        else:
+            # A name within `max_distance` edits shares all but at most
+            # `max_distance * n` of the query's grams, so it must contain one
+            # of the `max_distance * n + 1` rarest ones.
+            ranked_grams = sorted(
+                query_grams, key=lambda gram: len(self._postings.get(gram, ()))
+            )
+            for gram in ranked_grams[:max_distance * self._n + 1]:
+                candidates.update(self._postings.get(gram, ()))
+
+        best: Dict[int, Tuple[int, int]] = {}
+        for key_id in candidates:
+            candidate = self._keys[key_id]
+            if abs(len(candidate) - len(key)) > max_distance:
+                continue
+            # each edit removes at most n distinct grams from either set
+            candidate_grams = ngrams(candidate, self._n)
+            required = max(len(query_grams), len(candidate_grams)) \
+                - max_distance * self._n
+            if required > 0 and len(query_grams & candidate_grams) < required:
+                continue
+            distance = bounded_edit_distance(key, candidate, max_distance)
+            if distance is None:
+                continue
+            row = self._rows[key_id]
+            length = max(len(key), len(candidate))
+            if row not in best or distance * best[row][1] < best[row][0] * length:
+                best[row] = (distance, length)
+
+        ranked = sorted(
+            best.items(), key=lambda item: (item[1][0] / item[1][1], item[0])
+        )[:limit]
+        return [
+            (self.elements[row], 1.0 - distance / length)
+            for row, (distance, length) in ranked
+        ]
+
+    def match(
+        self, query: str, limit: int = 10, max_distance: Optional[int] = None
+    ) -> List:
+        """
+        Find the elements whose names are similar to `query`, best first.
+
+        Parameters
+        ----------
+        query : str
+            The law name, possibly with typos or notation differences.
+        limit : int, optional
+            Maximum number of results. Default is 10.
+        max_distance : int, optional
+            Maximum edit distance between the normalized names.
+            Default is a quarter of the length of the normalized query (at least 1).
+
+        Returns
+        -------
+        List
+            The matching elements, best first.
+        """
+        return [elem for elem, _ in self.match_with_scores(query, limit, max_distance)]
+
@@ -0,0 +1,610 @@
+"""elaws_api_python.near_duplicates
+
+Detection of near-duplicate articles across laws and ordinances with
+MinHash signatures and locality-sensitive hashing (LSH).
+
+Examples
+--------
+>>> from elaws_api_python.bulk import acquire_law_texts
+>>> from elaws_api_python.search import extract_articles
+>>> index = NearDuplicateIndex()
+>>> for result in acquire_law_texts(1, law_ids, extract=extract_articles):
+...     index.add_articles(result.law_id, result.value)
+>>> index.groups(threshold=0.8)
+"""
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+import uuid
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+NUM_PERM = 128
+BANDS = 16
+SHINGLE = 5
+SEED = 1
+THRESHOLD = 0.8
+# Number of shingles hashed at once, bounding the temporary memory to
+# NUM_PERM * BLOCK_SHINGLES * 8 bytes.
+BLOCK_SHINGLES = 1 << 13
+# Number of texts per task of the worker processes.
+CHUNK_TEXTS = 2000
+INDEX_FORMAT = 1
+
+_SPACE_PATTERN = re.compile(r"\s+")
+_ROLLING_BASE = 0x100000001B3
+_MIX = 0xBF58476D1CE4E5B9
+
+Articles = Dict[str, Tuple[str, str]]
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError as exc:
+        raise ImportError(
+            "numpy is required for the near-duplicate detection. "
+            "Install it with `pip install elaws-api-python[minhash]`."
+        ) from exc
+    return numpy
+
+
+def _permutations(num_perm: int, seed: int):
+    np = _import_numpy()
+    rng = np.random.default_rng(seed)
+    # multiply-shift hashing: h(x) = ((a * x + b) mod 2^64) >> 32 with odd a
+    a = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    return a[:, None], b[:, None]
+
+
+def shingle_hashes(text: str, shingle: int = SHINGLE):
+    """
+    Hash the distinct character shingles of a text.
+
+    The text is NFKC-normalized with the whitespace removed, and its
+    overlapping substrings of `shingle` characters are hashed with a
+    vectorized rolling hash. A text shorter than `shingle` is a single
+    shingle.
+
+    Parameters
+    ----------
+    text : str
+        The text.
+    shingle : int, optional
+        Length of the shingles. Default is SHINGLE.
+
+    Returns
+    -------
+    numpy.ndarray
+        Sorted distinct 32-bit hashes (uint64 dtype); empty for an empty text.
+    """
+    np = _import_numpy()
+    text = _SPACE_PATTERN.sub("", unicodedata.normalize("NFKC", text))
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(codes) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    width = min(shingle, len(codes))
+    count = len(codes) - width + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(width):
+        hashes = hashes * np.uint64(_ROLLING_BASE) + codes[offset:offset + count]
+    hashes ^= hashes >> np.uint64(31)
+    hashes *= np.uint64(_MIX)
+    hashes ^= hashes >> np.uint64(29)
+    return np.unique(hashes >> np.uint64(32))
+
+
+def minhash_signatures(
+    texts: Sequence[str], num_perm: int = NUM_PERM,
+    shingle: int = SHINGLE, seed: int = SEED
+):
+    """
+    Compute the MinHash signatures of texts.
+
+    The shingles of many texts are hashed by all the permutations at once
+    in blocks, and the minimum per text is taken with `minimum.reduceat`.
+
+    Parameters
+    ----------
+    texts : Sequence[str]
+        The texts.
+    num_perm : int, optional
+        Number of hash functions. Default is NUM_PERM.
+    shingle : int, optional
+        Length of the shingles. Default is SHINGLE.
+    seed : int, optional
+        Seed of the hash functions; signatures compare only under the same seed.
+
+    Returns
+    -------
+    numpy.ndarray
+        Signatures of shape (len(texts), num_perm) and dtype uint32. The
+        signature of an empty text is all 0xFFFFFFFF.
+    """
+    np = _import_numpy()
+    a, b = _permutations(num_perm, seed)
+    signatures = np.full((len(texts), num_perm), 0xFFFFFFFF, dtype=np.uint32)
+    shift = np.uint64(32)
+
+    start = 0
+    while start < len(texts):
+        # gather texts until the block is full
+        hashes, rows, size = [], [], 0
+        while start < len(texts) and (size < BLOCK_SHINGLES or not hashes):
+            values = shingle_hashes(texts[start], shingle)
+            if len(values):
+                hashes.append(values)
+                rows.append(start)
+                size += len(values)
+            start += 1
+        if not hashes:
+            continue
+        offsets = np.cumsum([0] + [len(values) for values in hashes[:-1]])
+        permuted = a * np.concatenate(hashes)[None, :]
+        permuted += b
+        permuted >>= shift
+        signatures[rows] = np.minimum.reduceat(permuted, offsets, axis=1).T.astype(np.uint32)
+    return signatures
+
+
+def _signatures_task(args) -> bytes:
+    texts, num_perm, shingle, seed = args
+    return minhash_signatures(texts, num_perm, shingle, seed).tobytes()
+
+
+def compute_signatures(
+    texts: Sequence[str], num_perm: int = NUM_PERM,
+    shingle: int = SHINGLE, seed: int = SEED,
+    workers: Optional[int] = None
+):
+    """
+    Compute the MinHash signatures of many texts in worker processes.
+
+    Parameters
+    ----------
+    texts : Sequence[str]
+        The texts.
+    num_perm : int, optional
+        Number of hash functions. Default is NUM_PERM.
+    shingle : int, optional
+        Length of the shingles. Default is SHINGLE.
+    seed : int, optional
+        Seed of the hash functions. Default is SEED.
+    workers : int, optional
+        Number of worker processes. Default is the number of CPUs.
+        If 0, or if there are few texts, they are computed in this process.
+
+    Returns
+    -------
+    numpy.ndarray
+        Signatures of shape (len(texts), num_perm) and dtype uint32.
+    """
+    if workers == 0 or len(texts) <= CHUNK_TEXTS:
+        return minhash_signatures(texts, num_perm, shingle, seed)
+    from concurrent.futures import ProcessPoolExecutor
+
+    np = _import_numpy()
+    chunks = [
+        (list(texts[start:start + CHUNK_TEXTS]), num_perm, shingle, seed)
+        for start in range(0, len(texts), CHUNK_TEXTS)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parts = [
+            np.frombuffer(part, dtype=np.uint32).reshape(-1, num_perm)
+            for part in executor.map(_signatures_task, chunks)
+        ]
+    return np.concatenate(parts)
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class ArticleRef(NamedTuple):
+    """
+    Reference to an article.
+
+    Attributes
+    ----------
+    law_id : str
+        Law ID.
+    key : str
+        Article key, e.g. "MainProvision/Article[1]".
+    """
+    law_id: str
+    key: str
+
+
+class Match(NamedTuple):
+    """
+    A near duplicate of an article.
+
+    Attributes
+    ----------
+    article : ArticleRef
+        The near-duplicate article.
+    similarity : float
+        Jaccard similarity of the shingles, estimated from the signatures.
+    """
+    article: ArticleRef
+    similarity: float
+
+
+class NearDuplicateIndex:
+    """
+    LSH index of the MinHash signatures of articles.
+
+    Each signature is cut into `bands` bands, and articles sharing a band
+    fall into the same bucket, so the candidates of an article are found
+    without comparing it with the whole corpus. With the defaults (16 bands
+    of 8 rows) pairs with a Jaccard similarity of 0.8 are candidates with a
+    probability above 0.99, and pairs of 0.5 with about 0.06. Candidates
+    are then checked against the estimated similarity.
+
+    Laws are added and replaced one by one. The signatures of articles
+    whose text has not changed are reused, and `save` keeps them with the
+    digests of the texts, so an index is updated incrementally as laws
+    are amended.
+
+    Attributes
+    ----------
+    num_perm : int
+        Number of hash functions.
+    bands : int
+        Number of LSH bands.
+    shingle : int
+        Length of the shingles.
+    seed : int
+        Seed of the hash functions.
+    """
+
+    def __init__(
+        self, num_perm: int = NUM_PERM, bands: int = BANDS,
+        shingle: int = SHINGLE, seed: int = SEED, workers: Optional[int] = None
+    ) -> None:
+        """
+        Initialize an empty NearDuplicateIndex object.
+
+        Parameters
+        ----------
+        num_perm : int, optional
+            Number of hash functions. Default is NUM_PERM.
+        bands : int, optional
+            Number of LSH bands; must divide `num_perm`. Default is BANDS.
+        shingle : int, optional
+            Length of the shingles. Default is SHINGLE.
+        seed : int, optional
+            Seed of the hash functions. Default is SEED.
+        workers : int, optional
+            Number of worker processes computing the signatures; see
+            `compute_signatures`. Default is the number of CPUs.
+        """
+        if num_perm % bands != 0:
+            raise ValueError("bands must divide num_perm.")
+        np = _import_numpy()
+        self.num_perm: int = num_perm
+        self.bands: int = bands
+        self.shingle: int = shingle
+        self.seed: int = seed
+        self.workers: Optional[int] = workers
+        self._rows: int = num_perm // bands
+        self._signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self._size: int = 0
+        self._refs: List[Optional[ArticleRef]] = []
+        self._digests: List[str] = []
+        self._docs: Dict[ArticleRef, int] = {}
+        self._by_law: Dict[str, List[int]] = {}
+        self._buckets: List[Dict[bytes, Set[int]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, article: Tuple[str, str]) -> bool:
+        return ArticleRef(*article) in self._docs
+
+    @property
+    def law_ids(self) -> List[str]:
+        """
+        IDs of the indexed laws.
+        """
+        return list(self._by_law)
+
+    def _band_keys(self, signature) -> List[bytes]:
+        return [
+            signature[band * self._rows:(band + 1) * self._rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def _insert(self, ref: ArticleRef, digest: str, signature) -> None:
+        np = _import_numpy()
+        if self._size == len(self._signatures):
+            grown = np.zeros((max(1024, 2 * self._size), self.num_perm), dtype=np.uint32)
+            grown[:self._size] = self._signatures[:self._size]
+            self._signatures = grown
+        doc = self._size
+        self._signatures[doc] = signature
+        self._size += 1
+        self._refs.append(ref)
+        self._digests.append(digest)
+        self._docs[ref] = doc
+        self._by_law.setdefault(ref.law_id, []).append(doc)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, set()).add(doc)
+
+    def remove_law(self, law_id: str) -> int:
+        """
+        Remove the articles of a law.
+
+        Returns
+        -------
+        int
+            Number of removed articles.
+        """
+        docs = self._by_law.pop(law_id, [])
+        for doc in docs:
+            for band, key in enumerate(self._band_keys(self._signatures[doc])):
+                bucket = self._buckets[band][key]
+                bucket.discard(doc)
+                if not bucket:
+                    del self._buckets[band][key]
+            del self._docs[self._refs[doc]]
+            self._refs[doc] = None
+        return len(docs)
+
+    def add_articles(self, law_id: str, articles: Articles) -> int:
+        """
+        Add the articles of a law, replacing those added before.
+
+        Signatures of the articles whose text is unchanged are reused.
+
+        Parameters
+        ----------
+        law_id : str
+            Law ID.
+        articles : Dict[str, Tuple[str, str]]
+            Pairs of the header and the text of each article keyed by
+            article key, as returned by `diff.article_texts`.
+
+        Returns
+        -------
+        int
+            Number of articles whose signature was computed.
+        """
+        np = _import_numpy()
+        previous = {
+            self._digests[doc]: self._signatures[doc].copy()
+            for doc in self._by_law.get(law_id, [])
+        }
+        self.remove_law(law_id)
+
+        texts = {key: text for key, (_, text) in articles.items() if text.strip()}
+        digests = {key: _digest(text) for key, text in texts.items()}
+        missing = [key for key in texts if digests[key] not in previous]
+        computed = compute_signatures(
+            [texts[key] for key in missing], self.num_perm, self.shingle, self.seed,
+            self.workers
+        ) if missing else np.zeros((0, self.num_perm), dtype=np.uint32)
+        signatures = dict(zip(missing, computed))
+        for key in texts:
+            signature = signatures.get(key)
+            if signature is None:
+                signature = previous[digests[key]]
+            self._insert(ArticleRef(law_id, key), digests[key], signature)
+        return len(missing)
+
+    def add_corpus(self, laws: Dict[str, Articles]) -> int:
+        """
+        Add the articles of many laws, computing all their signatures at
+        once in the worker processes.
+
+        Parameters
+        ----------
+        laws : Dict[str, Dict[str, Tuple[str, str]]]
+            Articles keyed by law ID.
+
+        Returns
+        -------
+        int
+            Number of added articles.
+        """
+        refs, texts = [], []
+        for law_id, articles in laws.items():
+            self.remove_law(law_id)
+            for key, (_, text) in articles.items():
+                if text.strip():
+                    refs.append(ArticleRef(law_id, key))
+                    texts.append(text)
+        signatures = compute_signatures(
+            texts, self.num_perm, self.shingle, self.seed, self.workers
+        )
+        for ref, text, signature in zip(refs, texts, signatures):
+            self._insert(ref, _digest(text), signature)
+        return len(refs)
+
+    def _similarities(self, signature, docs: Iterable[int]) -> List[Tuple[int, float]]:
+        docs = list(docs)
+        if not docs:
+            return []
+        equal = (self._signatures[docs] == signature[None, :]).mean(axis=1)
+        return list(zip(docs, equal.tolist()))
+
+    def _candidates(self, signature) -> Set[int]:
+        candidates: Set[int] = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates |= self._buckets[band].get(key, set())
+        return candidates
+
+    def query(self, law_id: str, key: str, threshold: float = THRESHOLD) -> List[Match]:
+        """
+        Find the near duplicates of an indexed article.
+
+        Parameters
+        ----------
+        law_id : str
+            Law ID.
+        key : str
+            Article key.
+        threshold : float, optional
+            Minimum estimated similarity. Default is THRESHOLD.
+
+        Returns
+        -------
+        List[Match]
+            The other articles in descending order of similarity.
+        """
+        doc = self._docs.get(ArticleRef(law_id, key))
+        if doc is None:
+            return []
+        signature = self._signatures[doc]
+        return self._matches(signature, self._candidates(signature) - {doc}, threshold)
+
+    def query_text(self, text: str, threshold: float = THRESHOLD) -> List[Match]:
+        """
+        Find the indexed articles that are near duplicates of a text.
+        """
+        signature = minhash_signatures([text], self.num_perm, self.shingle, self.seed)[0]
+        return self._matches(signature, self._candidates(signature), threshold)
+
+    def _matches(self, signature, docs: Set[int], threshold: float) -> List[Match]:
+        matches = [
+            Match(self._refs[doc], similarity)
+            for doc, similarity in self._similarities(signature, docs)
+            if similarity >= threshold
+        ]
+        matches.sort(key=lambda match: (-match.similarity, match.article))
+        return matches
+
+    def groups(self, threshold: float = THRESHOLD, min_size: int = 2) -> List[List[ArticleRef]]:
+        """
+        Group the articles into clusters of near duplicates.
+
+        Within each bucket, the members are compared with one member, and
+        those at or above `threshold` are joined with union-find, so the
+        work is linear in the total size of the buckets.
+
+        Parameters
+        ----------
+        threshold : float, optional
+            Minimum estimated similarity. Default is THRESHOLD.
+        min_size : int, optional
+            Minimum size of the returned groups. Default is 2.
+
+        Returns
+        -------
+        List[List[ArticleRef]]
+            The groups, largest first.
+        """
+        parent: Dict[int, int] = {}
+
+        def find(doc: int) -> int:
+            root = doc
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while parent.get(doc, doc) != root:
+                parent[doc], doc = root, parent[doc]
+            return root
+
+        for buckets in self._buckets:
+            for bucket in buckets.values():
+                if len(bucket) < 2:
+                    continue
+                members = sorted(bucket)
+                first = members[0]
+                for doc, similarity in self._similarities(self._signatures[first], members[1:]):
+                    if similarity >= threshold:
+                        parent[find(doc)] = find(first)
+
+        clusters: Dict[int, List[ArticleRef]] = {}
+        for doc in parent:
+            clusters.setdefault(find(doc), []).append(self._refs[doc])
+        for root in list(clusters):
+            if root not in parent:
+                clusters[root].append(self._refs[root])
+        groups = [sorted(set(group)) for group in clusters.values() if len(set(group)) >= min_size]
+        groups.sort(key=lambda group: (-len(group), group[0]))
+        return groups
+
+    def save(self, directory: str) -> None:
+        """
+        Save the signatures to a directory.
+
+        Parameters
+        ----------
+        directory : str
+            The directory. An index saved there before is replaced.
+        """
+        np = _import_numpy()
+        os.makedirs(directory, exist_ok=True)
+        alive = [doc for doc in range(self._size) if self._refs[doc] is not None]
+        # a new file per save, named by meta.json: replacing meta.json
+        # switches the signatures and the articles together
+        signatures_name = f"signatures.{uuid.uuid4().hex[:16]}.npy"
+        path = os.path.join(directory, signatures_name)
+        with open(path + ".part", "wb") as file_:
+            np.save(file_, self._signatures[alive])
+        os.replace(path + ".part", path)
+        meta = {
+            "format": INDEX_FORMAT,
+            "signatures": signatures_name,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "shingle": self.shingle,
+            "seed": self.seed,
+            "articles": [
+                [self._refs[doc].law_id, self._refs[doc].key, self._digests[doc]]
+                for doc in alive
+            ],
+        }
+        path = os.path.join(directory, "meta.json")
+        with open(path + ".part", "w", encoding="utf-8") as file_:
+            json.dump(meta, file_, ensure_ascii=False)
+        os.replace(path + ".part", path)
+        for file_name in os.listdir(directory):
+            if file_name.startswith("signatures.") and file_name.endswith(".npy") \
+                    and file_name != signatures_name:
+                try:
+                    os.remove(os.path.join(directory, file_name))
+                except OSError:
+                    pass
+
+    @staticmethod
+    def load(directory: str, workers: Optional[int] = None):
+        """
+        Static method to load an index saved by `save`.
+
+        Parameters
+        ----------
+        directory : str
+            The directory.
+        workers : int, optional
+            Number of worker processes of the loaded index. Default is the
+            number of CPUs.
+
+        Returns
+        -------
+        NearDuplicateIndex
+            The index, with its buckets rebuilt from the signatures.
+
+        Raises
+        ------
+        ValueError
+            If the directory holds an index of an unknown format, or its
+            signatures do not match its articles.
+        """
+        np = _import_numpy()
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as file_:
+            meta = json.load(file_)
+        if meta.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unknown near-duplicate index format: {meta.get('format')}")
+        index = NearDuplicateIndex(
+            meta["num_perm"], meta["bands"], meta["shingle"], meta["seed"], workers
+        )
+        signatures = np.load(os.path.join(directory, meta.get("signatures", "signatures.npy")))
+        if signatures.shape != (len(meta["articles"]), meta["num_perm"]):
+            raise ValueError("The signatures do not match the articles of the index.")
+        for (law_id, key, digest), signature in zip(meta["articles"], signatures):
+            index._insert(ArticleRef(law_id, key), digest, signature)
+        return index
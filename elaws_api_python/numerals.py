@@ -0,0 +1,78 @@
+"""elaws_api_python.numerals
+
+Conversion of kanji numerals used in law names and law numbers.
+"""
+
+import re
+
+DIGITS = {
+    "〇": 0, "零": 0, "一": 1, "二": 2, "三": 3, "四": 4,
+    "五": 5, "六": 6, "七": 7, "八": 8, "九": 9,
+}
+UNITS = {"十": 10, "百": 100, "千": 1000}
+LARGE_UNITS = {"万": 10000, "億": 100000000}
+
+KANJI_NUMERAL_PATTERN = re.compile(r"[〇零一二三四五六七八九十百千万億]+")
+
+
+def kanji_to_int(text: str) -> int:
+    """
+    Convert a kanji numeral into an integer.
+
+    Both positional ("二〇一九") and multiplicative ("二千十九") notations
+    are accepted.
+
+    Parameters
+    ----------
+    text : str
+        The kanji numeral, e.g. "百六十二".
+
+    Returns
+    -------
+    int
+        The value of the numeral.
+
+    Raises
+    ------
+    ValueError
+        If `text` includes a character that is not a kanji numeral.
+    """
+    if not text:
+        raise ValueError("Empty numeral.")
+    if all(char in DIGITS for char in text):
+        return int("".join(str(DIGITS[char]) for char in text))
+
+    total = 0
+    section = 0
+    digit = None
+    for char in text:
+        if char in DIGITS:
+            digit = DIGITS[char] if digit is None else digit * 10 + DIGITS[char]
+        elif char in UNITS:
+            section += (1 if digit is None else digit) * UNITS[char]
+            digit = None
+        elif char in LARGE_UNITS:
+            section += digit or 0
+            total += (section or 1) * LARGE_UNITS[char]
+            section = 0
+            digit = None
+        else:
+            raise ValueError(f"Invalid kanji numeral: {text}")
+    return total + section + (digit or 0)
+
+
+def replace_kanji_numerals(text: str) -> str:
+    """
+    Replace every run of kanji numerals in a text with Arabic numerals.
+
+    Parameters
+    ----------
+    text : str
+        The text, e.g. "第三種郵便物".
+
+    Returns
+    -------
+    str
+        The text with Arabic numerals, e.g. "第3種郵便物".
+    """
+    return KANJI_NUMERAL_PATTERN.sub(lambda match: str(kanji_to_int(match.group())), text)
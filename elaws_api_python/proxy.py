@@ -0,0 +1,413 @@
+"""elaws_api_python.proxy
+
+Caching proxy of the e-Gov eLaw API, so that many clients share one cache.
+
+The proxy serves the same paths as the API (lawlists, lawdata, articles and
+updatelawlists), so a client is pointed at it by its base URL:
+
+>>> from elaws_api_python import base
+>>> base.BASE_URL = "http://localhost:8080"
+
+or by setting the environment variable ELAWS_API_BASE_URL before the import.
+Run it with `python -m elaws_api_python.proxy --port 8080 --cache-dir cache`.
+"""
+
+import argparse
+import asyncio
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import requests
+
+from .base import DEFAULT_BASE_URL, TIMEOUT_SEC
+from .cache import CacheEntry, ResponseCache
+from .cache_backends import open_backend
+from .concurrency import AdaptiveLimiter
+
+# Seconds for which a cached response is served without revalidation.
+TTL_SEC = 3600.0
+# Seconds after the TTL during which a stale response is served while it is
+# revalidated in the background.
+STALE_WHILE_REVALIDATE_SEC = 86400.0
+MAX_WORKERS = 8
+IDLE_TIMEOUT_SEC = 60.0
+# Statuses of the upstream for which a stale response is served instead.
+STALE_IF_ERROR_STATUS_CODES = frozenset((429, 500, 502, 503, 504))
+
+_PATH_PATTERN = re.compile(r"^/\d+/(?:lawlists|lawdata|articles|updatelawlists)(?:[/;]|$)")
+_REASONS = {
+    200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 502: "Bad Gateway",
+}
+
+
+class _Upstream(NamedTuple):
+    status: int
+    entry: Optional[CacheEntry] = None
+    body: bytes = b""
+
+
+class CachingProxy:
+    """
+    Read-through caching HTTP proxy of the e-Gov eLaw API on asyncio.
+
+    Responses are cached in a ResponseCache keyed by the upstream URL and
+    served for `ttl` seconds. After that, for `stale_while_revalidate`
+    seconds more, the stale response is served at once while it is
+    revalidated in the background with the upstream validators, so clients
+    never wait on a known path. Concurrent misses and revalidations of the
+    same path are coalesced into one upstream request. If the upstream
+    fails, a cached response is served however old it is. Error responses
+    of the upstream are passed through without being cached.
+
+    Each response carries the digest of its body as `ETag`, so clients
+    holding their own ResponseCache revalidate against the proxy.
+
+    Attributes
+    ----------
+    upstream : str
+        Base URL of the upstream API.
+    cache : ResponseCache
+        Shared cache of the responses.
+    ttl : float
+        Seconds for which a response is fresh.
+    stale_while_revalidate : float
+        Seconds after `ttl` during which a stale response is served.
+    hits : int
+        Number of requests served fresh from the cache.
+    stale_hits : int
+        Number of requests served stale from the cache.
+    misses : int
+        Number of requests that waited on the upstream.
+    coalesced : int
+        Number of misses and revalidations joined to one in flight.
+    upstream_requests : int
+        Number of requests sent to the upstream.
+    errors : int
+        Number of upstream requests that failed.
+    """
+
+    def __init__(
+        self, upstream: str = DEFAULT_BASE_URL,
+        cache: Optional[ResponseCache] = None,
+        ttl: float = TTL_SEC,
+        stale_while_revalidate: float = STALE_WHILE_REVALIDATE_SEC,
+        timeout: float = TIMEOUT_SEC,
+        max_workers: int = MAX_WORKERS,
+        limiter: Optional[AdaptiveLimiter] = None
+    ) -> None:
+        """
+        Initialize the CachingProxy object. The proxy is not started yet.
+
+        Parameters
+        ----------
+        upstream : str, optional
+            Base URL of the upstream API. Default is DEFAULT_BASE_URL.
+        cache : ResponseCache, optional
+            Shared cache. Default is a new in-memory ResponseCache.
+        ttl : float, optional
+            Seconds for which a response is fresh. Default is TTL_SEC.
+        stale_while_revalidate : float, optional
+            Seconds after `ttl` during which a stale response is served
+            while it is revalidated. Default is STALE_WHILE_REVALIDATE_SEC.
+        timeout : float, optional
+            Timeout of the upstream requests in seconds. Default is TIMEOUT_SEC.
+        max_workers : int, optional
+            Maximum number of upstream requests in flight. Default is MAX_WORKERS.
+        limiter : AdaptiveLimiter, optional
+            Limiter adapting the upstream requests in flight to the load of
+            the upstream. Default is None.
+        """
+        self.upstream: str = upstream.rstrip("/")
+        self.cache: ResponseCache = cache if cache is not None else ResponseCache()
+        self.ttl: float = ttl
+        self.stale_while_revalidate: float = stale_while_revalidate
+        self.hits: int = 0
+        self.stale_hits: int = 0
+        self.misses: int = 0
+        self.coalesced: int = 0
+        self.upstream_requests: int = 0
+        self.errors: int = 0
+        self._timeout: float = timeout
+        self._limiter: Optional[AdaptiveLimiter] = limiter
+        self._executor = ThreadPoolExecutor(
+            max_workers=limiter.max_limit if limiter is not None else max_workers
+        )
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def url(self) -> str:
+        """
+        Base URL to set to `base.BASE_URL` of the clients.
+        """
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> "CachingProxy":
+        """
+        Start serving.
+
+        Parameters
+        ----------
+        host : str, optional
+            Host to bind. Default is "127.0.0.1".
+        port : int, optional
+            Port to bind. Default is 0 (any free port).
+        """
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self
+
+    async def serve_forever(self) -> None:
+        """
+        Serve until cancelled.
+        """
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """
+        Stop serving and wait for the upstream requests in flight.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._executor.shutdown(wait=True)
+
+    async def get(self, path: str) -> Tuple[int, Optional[CacheEntry], str, bytes]:
+        """
+        Get the response of a path of the API.
+
+        Parameters
+        ----------
+        path : str
+            Path without the base URL, e.g. "/1/lawdata/129AC0000000089".
+
+        Returns
+        -------
+        Tuple[int, CacheEntry or None, str, bytes]
+            Status, cached entry (None unless the status is 200), cache
+            status ("HIT", "STALE" or "MISS") and the body of an error.
+        """
+        url = self.upstream + path
+        loop = asyncio.get_running_loop()
+        try:
+            # a shared backend is a socket or file round-trip, kept off the loop
+            entry = await loop.run_in_executor(self._executor, self.cache.get, url)
+        except Exception:  # pylint: disable=broad-except
+            self.errors += 1
+            return 502, None, "MISS", b""
+        if entry is not None:
+            age = time.time() - entry.fetched_at
+            if age < self.ttl:
+                self.hits += 1
+                return 200, entry, "HIT", b""
+            if age < self.ttl + self.stale_while_revalidate:
+                self.stale_hits += 1
+                self._revalidate(url)
+                return 200, entry, "STALE", b""
+
+        self.misses += 1
+        try:
+            result = await asyncio.shield(self._revalidate(url))
+        except Exception:  # pylint: disable=broad-except
+            result = _Upstream(502)
+        if result.entry is not None:
+            return 200, result.entry, "MISS", b""
+        if entry is not None and (result.status in STALE_IF_ERROR_STATUS_CODES):
+            self.stale_hits += 1
+            return 200, entry, "STALE", b""
+        return result.status, None, "MISS", result.body
+
+    def _revalidate(self, url: str) -> asyncio.Future:
+        future = self._in_flight.get(url)
+        if future is not None:
+            self.coalesced += 1
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, self._fetch, url)
+        self._in_flight[url] = future
+        future.add_done_callback(lambda _: self._in_flight.pop(url, None))
+        future.add_done_callback(self._count_error)
+        self.upstream_requests += 1
+        return future
+
+    def _count_error(self, future: asyncio.Future) -> None:
+        # retrieving the error also silences it for background revalidations
+        if future.cancelled() or future.exception() is not None:
+            self.errors += 1
+        elif future.result().entry is None:
+            self.errors += 1
+
+    def _fetch(self, url: str) -> _Upstream:
+        if self._limiter is None:
+            return self._fetch_upstream(url)
+        try:
+            return self._limiter.call(self._fetch_upstream, url)
+        except requests.HTTPError as error:
+            return _Upstream(error.response.status_code, None, error.response.content)
+
+    def _fetch_upstream(self, url: str) -> _Upstream:
+        entry = self.cache.get(url)
+        headers = entry.conditional_headers() if entry is not None else {}
+        response = requests.get(url, headers=headers, timeout=self._timeout)
+        if entry is not None and response.status_code == 304:
+            return _Upstream(200, self.cache.revalidated(url) or entry)
+        if response.status_code != 200:
+            if self._limiter is not None:
+                # let the limiter see overload statuses
+                response.raise_for_status()
+            return _Upstream(response.status_code, None, response.content)
+        entry = self.cache.update(
+            url, response.content,
+            response.encoding or response.apparent_encoding or "utf-8",
+            response.headers.get("ETag"), response.headers.get("Last-Modified")
+        )
+        return _Upstream(200, entry)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT_SEC)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                headers = await _read_headers(reader)
+                keep_alive = await self._respond(request_line, headers, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(
+        self, request_line: bytes, headers: Dict[str, str], writer: asyncio.StreamWriter
+    ) -> bool:
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:
+            _write(writer, 400, b"", {}, False)
+            return False
+        method, path, http_version = parts
+        keep_alive = headers.get("connection", "").lower() != "close" \
+            if http_version == "HTTP/1.1" else \
+            headers.get("connection", "").lower() == "keep-alive"
+        if method not in ("GET", "HEAD"):
+            _write(writer, 405, b"", {"Allow": "GET, HEAD"}, keep_alive)
+            return keep_alive
+        if _PATH_PATTERN.match(path) is None:
+            _write(writer, 404, b"", {}, keep_alive)
+            return keep_alive
+
+        status, entry, cache_status, body = await self.get(path)
+        if entry is None:
+            _write(writer, status, b"" if method == "HEAD" else body,
+                   {"X-Cache": cache_status}, keep_alive)
+            return keep_alive
+        response_headers = {
+            "Content-Type": f"application/xml; charset={entry.encoding}",
+            "ETag": f'"{entry.digest}"',
+            "X-Cache": cache_status,
+        }
+        if headers.get("if-none-match") == response_headers["ETag"]:
+            _write(writer, 304, b"", response_headers, keep_alive)
+        elif method == "HEAD":
+            response_headers["Content-Length"] = str(len(entry.body))
+            _write(writer, 200, b"", response_headers, keep_alive, False)
+        else:
+            _write(writer, 200, entry.body, response_headers, keep_alive)
+        return keep_alive
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+def _write(
+    writer: asyncio.StreamWriter, status: int, body: bytes,
+    headers: Dict[str, str], keep_alive: bool, content_length: bool = True
+) -> None:
+    lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    if content_length:
+        lines.append(f"Content-Length: {len(body)}")
+    lines.append("Connection: " + ("keep-alive" if keep_alive else "close"))
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+
+async def serve(
+    host: str = "127.0.0.1", port: int = 8080, cache_dir: Optional[str] = None,
+    upstream: str = DEFAULT_BASE_URL, ttl: float = TTL_SEC,
+    stale_while_revalidate: float = STALE_WHILE_REVALIDATE_SEC,
+    cache_url: Optional[str] = None
+) -> None:
+    """
+    Run a CachingProxy until cancelled.
+
+    Parameters
+    ----------
+    host : str, optional
+        Host to bind. Default is "127.0.0.1".
+    port : int, optional
+        Port to bind. Default is 8080.
+    cache_dir : str, optional
+        Directory to persist the cache. Default is None (in memory).
+    upstream : str, optional
+        Base URL of the upstream API. Default is DEFAULT_BASE_URL.
+    ttl : float, optional
+        Seconds for which a response is fresh. Default is TTL_SEC.
+    stale_while_revalidate : float, optional
+        Seconds after `ttl` during which a stale response is served.
+        Default is STALE_WHILE_REVALIDATE_SEC.
+    cache_url : str, optional
+        URL of a cache backend shared with other proxies, as taken by
+        `cache_backends.open_backend`. Default is None.
+    """
+    backend = open_backend(cache_url) if cache_url is not None else None
+    cache = ResponseCache(cache_dir, backend, ttl + stale_while_revalidate, ttl)
+    proxy = CachingProxy(upstream, cache, ttl, stale_while_revalidate)
+    await proxy.start(host, port)
+    try:
+        await proxy.serve_forever()
+    finally:
+        await proxy.close()
+        if backend is not None:
+            backend.close()
+
+
+def main(argv=None) -> None:
+    """
+    Command line entry point.
+    """
+    parser = argparse.ArgumentParser(description="Caching proxy of the e-Gov eLaw API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--cache-url", default=None,
+                        help="shared cache backend, e.g. redis://host:6379/0")
+    parser.add_argument("--upstream", default=DEFAULT_BASE_URL)
+    parser.add_argument("--ttl", type=float, default=TTL_SEC)
+    parser.add_argument("--stale-while-revalidate", type=float,
+                        default=STALE_WHILE_REVALIDATE_SEC)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(
+            args.host, args.port, args.cache_dir, args.upstream,
+            args.ttl, args.stale_while_revalidate, args.cache_url
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,502 @@
+"""elaws_api_python.records
+
+Flattening of the full text of a law/ordinance into provision records.
+"""
+
+import json
+from typing import (
+    Any, Dict, IO, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+)
+from xml.etree import ElementTree as ET
+
+# Structural elements that make up the path of a record.
+FRAME_TAGS = (
+    "MainProvision", "SupplProvision",
+    "Part", "Chapter", "Section", "Subsection", "Division", "Article",
+)
+# Elements the flattener descends into. Any other element is handled as
+# a whole when it ends.
+DESCEND_TAGS = frozenset(FRAME_TAGS + (
+    "DataRoot", "ApplData", "LawFullText", "LawContents", "Law", "LawBody",
+))
+# Title element -> structural element it belongs to.
+TITLE_TAGS = {
+    "PartTitle": "Part",
+    "ChapterTitle": "Chapter",
+    "SectionTitle": "Section",
+    "SubsectionTitle": "Subsection",
+    "DivisionTitle": "Division",
+    "ArticleTitle": "Article",
+    "SupplProvisionLabel": "SupplProvision",
+}
+# Path levels exposed as columns by `ProvisionRecord.to_dict`.
+LEVELS = (
+    "part", "chapter", "section", "subsection", "division",
+    "article", "paragraph", "item",
+)
+COLUMNS = ("law_id", "key", "provision") + LEVELS + ("title", "caption", "text")
+
+
+def path_key(path: Iterable[Tuple[str, str]]) -> str:
+    """
+    Join a path of (tag, Num) pairs into a key, e.g. "MainProvision/Article[1]".
+
+    Parameters
+    ----------
+    path : Iterable[Tuple[str, str]]
+        Hierarchical path.
+
+    Returns
+    -------
+    str
+        The key.
+    """
+    return "/".join(f"{tag}[{num}]" if num else tag for tag, num in path)
+
+
+class ProvisionRecord(NamedTuple):
+    """
+    A flattened unit of text (a paragraph or an item) of a law/ordinance.
+
+    Attributes
+    ----------
+    law_id : str, optional
+        Law ID.
+    path : Tuple[Tuple[str, str], ...]
+        Hierarchical path as (tag, Num) pairs, starting from the provision,
+        e.g. (("MainProvision", ""), ("Chapter", "1"), ("Article", "1"),
+        ("Paragraph", "1")). The Num of a SupplProvision is its AmendLawNum.
+    titles : Tuple[str, ...]
+        Titles of the elements in `path`, e.g. "第一章　通則" or "第一条".
+    caption : str
+        Caption of the paragraph, or of its article if it has none.
+    text : str
+        Text of the paragraph or the item.
+    """
+    law_id: Optional[str]
+    path: Tuple[Tuple[str, str], ...]
+    titles: Tuple[str, ...]
+    caption: str
+    text: str
+
+    @property
+    def kind(self) -> str:
+        """
+        Tag of the unit, i.e. "Paragraph" or "Item".
+        """
+        return self.path[-1][0]
+
+    @property
+    def num(self) -> str:
+        """
+        Num of the unit.
+        """
+        return self.path[-1][1]
+
+    @property
+    def title(self) -> str:
+        """
+        Title of the unit, e.g. "２" for a paragraph or "一" for an item.
+        """
+        return self.titles[-1]
+
+    @property
+    def key(self) -> str:
+        """
+        Structural key of the unit, e.g. "MainProvision/Chapter[1]/Article[1]/Paragraph[1]".
+        """
+        return path_key(self.path)
+
+    @property
+    def article_key(self) -> Optional[str]:
+        """
+        Structural key of the article the unit belongs to, if any.
+        """
+        for index, (tag, _) in enumerate(self.path):
+            if tag == "Article":
+                return path_key(self.path[:index + 1])
+        return None
+
+    def level(self, tag: str) -> Optional[str]:
+        """
+        Get the Num of the element `tag` in the path.
+
+        Parameters
+        ----------
+        tag : str
+            Tag of the element, e.g. "Chapter".
+
+        Returns
+        -------
+        str, optional
+            The Num of the element, or None if the path does not include it.
+        """
+        for tag_, num in self.path:
+            if tag_ == tag:
+                return num
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the record into a flat dictionary with the keys in COLUMNS.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The record as a dictionary.
+        """
+        provision_tag, provision_num = self.path[0]
+        dst: Dict[str, Any] = {
+            "law_id": self.law_id,
+            "key": self.key,
+            "provision": (
+                f"{provision_tag}:{provision_num}" if provision_num else provision_tag
+            ),
+        }
+        for name in LEVELS:
+            dst[name] = None
+        for tag, num in self.path:
+            name = tag.lower()
+            if name in dst:
+                dst[name] = num
+        dst["title"] = self.title
+        dst["caption"] = self.caption
+        dst["text"] = self.text
+        return dst
+
+
+def _iter_text(elem: ET.Element) -> Iterator[str]:
+    if elem.text:
+        yield elem.text
+    for child in elem:
+        # skip ruby readings
+        if child.tag != "Rt":
+            yield from _iter_text(child)
+        if child.tail:
+            yield child.tail
+
+
+def element_text(elem: Optional[ET.Element]) -> str:
+    """
+    Get the text of an element without ruby readings.
+
+    Parameters
+    ----------
+    elem : xml.etree.ElementTree.Element, optional
+        The element.
+
+    Returns
+    -------
+    str
+        The concatenated text, or "" if `elem` is None.
+    """
+    if elem is None:
+        return ""
+    if len(elem) == 0:
+        return elem.text or ""
+    return "".join(_iter_text(elem))
+
+
+def sentence_text(elem: ET.Element) -> str:
+    """
+    Get the text of a sentence element such as `ParagraphSentence`.
+
+    Columns are rendered separated by a full-width space.
+
+    Parameters
+    ----------
+    elem : xml.etree.ElementTree.Element
+        The element.
+
+    Returns
+    -------
+    str
+        The text.
+    """
+    columns = [element_text(child) for child in elem if child.tag == "Column"]
+    if columns:
+        return "　".join(columns)
+    return element_text(elem)
+
+
+def _item_text(elem: ET.Element) -> str:
+    # The sentence of an item (or subitem) followed by its subitems.
+    lines: List[str] = []
+    for child in elem:
+        tag = child.tag
+        if tag.endswith("Sentence"):
+            lines.append(sentence_text(child))
+        elif tag.startswith("Subitem") and not tag.endswith("Title"):
+            title = element_text(child.find(tag + "Title"))
+            text = _item_text(child)
+            lines.append(f"{title}　{text}" if title else text)
+    return "\n".join(line for line in lines if line)
+
+
+class _Flattener:
+    """
+    Event handler that turns the start/end events of the full text into records.
+
+    Elements in DESCEND_TAGS are handled by their start and end events;
+    any other element is handled as a whole at its end event, so that the
+    handler can be driven either by a pruned walk over a retained tree or
+    by an incremental parser.
+    """
+
+    def __init__(self, law_id: Optional[str] = None, release: bool = False) -> None:
+        self.law_id: Optional[str] = law_id
+        self._release: bool = release
+        self._frames: List[List[str]] = []  # [tag, num, title, caption]
+        self._path: Tuple[Tuple[str, str], ...] = ()
+        self._titles: Tuple[str, ...] = ()
+        self._opaque: int = 0
+
+    def _update_path(self) -> None:
+        self._path = tuple((frame[0], frame[1]) for frame in self._frames)
+        self._titles = tuple(frame[2] for frame in self._frames)
+
+    def _caption(self) -> str:
+        for frame in reversed(self._frames):
+            if frame[3]:
+                return frame[3]
+        return ""
+
+    def start(self, elem: ET.Element) -> None:
+        tag = elem.tag
+        if tag in FRAME_TAGS:
+            num = elem.get("AmendLawNum", "") if tag == "SupplProvision" \
+                else elem.get("Num", "")
+            self._frames.append([tag, num, "", ""])
+            self._update_path()
+
+    def end(self, elem: ET.Element) -> None:
+        if elem.tag in FRAME_TAGS:
+            self._frames.pop()
+            self._update_path()
+            if self._release and elem.tag == "Article":
+                elem.clear()
+
+    def leaf(self, elem: ET.Element) -> Iterator[ProvisionRecord]:
+        tag = elem.tag
+        if tag == "Paragraph":
+            if self._frames:
+                yield from self._paragraph(elem)
+        elif tag in TITLE_TAGS:
+            if self._frames and self._frames[-1][0] == TITLE_TAGS[tag]:
+                self._frames[-1][2] = element_text(elem)
+                self._update_path()
+        elif tag == "ArticleCaption":
+            if self._frames and self._frames[-1][0] == "Article":
+                self._frames[-1][3] = element_text(elem)
+        elif tag == "LawId" and self.law_id is None:
+            self.law_id = elem.text
+        if self._release:
+            elem.clear()
+
+    def _paragraph(self, elem: ET.Element) -> Iterator[ProvisionRecord]:
+        path = self._path + (("Paragraph", elem.get("Num", "")),)
+        titles = self._titles
+        caption = self._caption()
+        paragraph_title = ""
+        sentences: List[str] = []
+        items: List[ET.Element] = []
+        for child in elem:
+            tag = child.tag
+            if tag == "ParagraphSentence":
+                sentences.append(sentence_text(child))
+            elif tag == "ParagraphNum":
+                paragraph_title = element_text(child)
+            elif tag == "ParagraphCaption":
+                caption = element_text(child)
+            elif tag == "Item":
+                items.append(child)
+        yield ProvisionRecord(
+            self.law_id, path, titles + (paragraph_title,), caption, "".join(sentences)
+        )
+        for item in items:
+            item_title = ""
+            for child in item:
+                if child.tag == "ItemTitle":
+                    item_title = element_text(child)
+                    break
+            yield ProvisionRecord(
+                self.law_id,
+                path + (("Item", item.get("Num", "")),),
+                titles + (paragraph_title, item_title),
+                caption, _item_text(item)
+            )
+
+    def feed(self, event: str, elem: ET.Element) -> Iterator[ProvisionRecord]:
+        """
+        Handle an event of an incremental parser.
+        """
+        if event == "start":
+            if self._opaque:
+                self._opaque += 1
+            elif elem.tag in DESCEND_TAGS:
+                self.start(elem)
+            else:
+                self._opaque = 1
+            return
+        if self._opaque > 1:
+            self._opaque -= 1
+        elif self._opaque == 1:
+            self._opaque = 0
+            yield from self.leaf(elem)
+        else:
+            self.end(elem)
+
+    def walk(self, elem: ET.Element) -> Iterator[ProvisionRecord]:
+        """
+        Handle a retained tree, descending only into DESCEND_TAGS.
+        """
+        if elem.tag not in DESCEND_TAGS:
+            yield from self.leaf(elem)
+            return
+        self.start(elem)
+        for child in elem:
+            if child.tag in DESCEND_TAGS:
+                yield from self.walk(child)
+            else:
+                yield from self.leaf(child)
+        self.end(elem)
+
+
+def iter_records(
+    law_full_text: ET.Element, law_id: Optional[str] = None
+) -> Iterator[ProvisionRecord]:
+    """
+    Flatten the full text of a law/ordinance into provision records.
+
+    The tree is walked once, descending only into the structural elements
+    down to the paragraphs.
+
+    Parameters
+    ----------
+    law_full_text : xml.etree.ElementTree.Element
+        The LawFullText (or LawContents, Law, LawBody) element.
+    law_id : str, optional
+        Law ID set to the records.
+
+    Yields
+    ------
+    ProvisionRecord
+        Records of the paragraphs and items in document order.
+    """
+    yield from _Flattener(law_id).walk(law_full_text)
+
+
+def iter_records_from_chunks(
+    chunks: Iterable[bytes], law_id: Optional[str] = None
+) -> Iterator[ProvisionRecord]:
+    """
+    Flatten the full text of a law/ordinance while it is being parsed.
+
+    Elements are released as soon as their records are yielded, so the
+    memory held is bounded by a paragraph rather than the whole document.
+
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        Chunks of the raw response of `base.request_law_text`,
+        e.g. from `base.stream_law_text`.
+    law_id : str, optional
+        Law ID set to the records. Taken from the response if not given.
+
+    Yields
+    ------
+    ProvisionRecord
+        Records of the paragraphs and items in document order.
+    """
+    flattener = _Flattener(law_id, release=True)
+    parser = ET.XMLPullParser(events=("start", "end"))
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            yield from flattener.feed(event, elem)
+    parser.close()
+    for event, elem in parser.read_events():
+        yield from flattener.feed(event, elem)
+
+
+def write_jsonl(records: Iterable[ProvisionRecord], file_: IO[str]) -> int:
+    """
+    Write records as JSON Lines.
+
+    Parameters
+    ----------
+    records : Iterable[ProvisionRecord]
+        Records to write.
+    file_ : IO[str]
+        Text stream to write to.
+
+    Returns
+    -------
+    int
+        The number of records written.
+    """
+    count = 0
+    for record in records:
+        file_.write(json.dumps(record.to_dict(), ensure_ascii=False))
+        file_.write("\n")
+        count += 1
+    return count
+
+
+def iter_plain_text_lines(records: Iterable[ProvisionRecord]) -> Iterator[str]:
+    """
+    Render records as lines of plain text.
+
+    Headings of parts, chapters, etc. and article captions are emitted when
+    they change, and each paragraph or item is prefixed with its title.
+
+    Parameters
+    ----------
+    records : Iterable[ProvisionRecord]
+        Records to render.
+
+    Yields
+    ------
+    str
+        Lines of text without trailing newlines.
+    """
+    previous: Tuple[Tuple[str, str], ...] = ()
+    for record in records:
+        frames = record.path[:-2] if record.kind == "Item" else record.path[:-1]
+        for depth, frame in enumerate(frames):
+            if depth < len(previous) and previous[depth] == frame:
+                continue
+            previous = ()
+            tag = frame[0]
+            title = record.titles[depth]
+            if tag == "Article":
+                if record.caption:
+                    yield record.caption
+            elif title:
+                yield title
+        previous = frames
+
+        if record.kind == "Item":
+            title = record.title
+        elif record.num == "1" and frames and frames[-1][0] == "Article":
+            title = record.titles[len(frames) - 1]
+        else:
+            title = record.title
+        yield f"{title}　{record.text}" if title else record.text
+
+
+def to_plain_text(records: Iterable[ProvisionRecord]) -> str:
+    """
+    Render records as plain text.
+
+    Parameters
+    ----------
+    records : Iterable[ProvisionRecord]
+        Records to render.
+
+    Returns
+    -------
+    str
+        The text.
+    """
+    return "\n".join(iter_plain_text_lines(records))
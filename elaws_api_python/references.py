@@ -0,0 +1,449 @@
+"""elaws_api_python.references
+
+Extraction of cross references between laws and articles, and a compact
+graph of them.
+"""
+
+import re
+import unicodedata
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+)
+
+from .classes.common import XMLSource
+from .classes.law_text_response import LawTextResponse
+from .numerals import kanji_to_int
+from .records import ProvisionRecord
+
+_NUMERAL = r"[0-9０-９〇一二三四五六七八九十百千]+"
+ARTICLE_REFERENCE_PATTERN = re.compile(
+    rf"第(?P<num>{_NUMERAL})条(?P<branch>(?:の{_NUMERAL})*)"
+)
+RELATIVE_REFERENCE_PATTERN = re.compile(r"(?P<relative>前条|次条)")
+# Law number in parentheses after a law name, e.g. 民法（明治二十九年法律第八十九号）
+_TRAILING_PARENTHESES_PATTERN = re.compile(r"[（(][^（）()]*[）)]$")
+# Text between two references that continues an enumeration, such as
+# 第二項及び or 、, so that the second one refers to the same law.
+_CONTINUATION_PATTERN = re.compile(
+    rf"(?:第{_NUMERAL}[項号](?:の{_NUMERAL})*|及び|又は|並びに|若しくは|から|まで|ないし|、|，|,)*"
+)
+# Endings of a law name that could not be resolved. A reference after
+# such a name is to another law and is not taken as one to the same law.
+_UNKNOWN_LAW_SUFFIXES = ("法", "令", "規則", "条約")
+_SAME_LAW_PREFIXES = ("この法律", "本法")
+_PREVIOUS_LAW_PREFIX = "同法"
+
+
+def _to_int(numeral: str) -> int:
+    numeral = unicodedata.normalize("NFKC", numeral)
+    if numeral.isdigit():
+        return int(numeral)
+    return kanji_to_int(numeral)
+
+
+def article_num(num: str, branch: str = "") -> str:
+    """
+    Convert an article number in text into the Num attribute format.
+
+    Parameters
+    ----------
+    num : str
+        Article number, e.g. "七百九".
+    branch : str, optional
+        Branch numbers, e.g. "の二".
+
+    Returns
+    -------
+    str
+        The Num, e.g. "709" or "3_2".
+    """
+    nums = [str(_to_int(num))]
+    nums.extend(str(_to_int(part)) for part in branch.split("の") if part)
+    return "_".join(nums)
+
+
+class Reference(NamedTuple):
+    """
+    A reference from an article to an article.
+
+    Attributes
+    ----------
+    law_id : str
+        Law ID of the referencing law.
+    article : str
+        Num of the referencing article.
+    target_law_id : str
+        Law ID of the referenced law.
+    target_article : str
+        Num of the referenced article.
+    """
+    law_id: str
+    article: str
+    target_law_id: str
+    target_article: str
+
+
+class LawNameIndex:
+    """
+    Index of law names to resolve the law name preceding an article reference.
+
+    Attributes
+    ----------
+    law_ids_by_name : Dict[str, str]
+        Law IDs keyed by law name.
+    """
+
+    def __init__(self, law_ids_by_name: Dict[str, str]) -> None:
+        """
+        Initialize the LawNameIndex object.
+
+        Parameters
+        ----------
+        law_ids_by_name : Dict[str, str]
+            Law IDs keyed by law name.
+        """
+        self.law_ids_by_name: Dict[str, str] = law_ids_by_name
+        self._lengths: List[int] = sorted(
+            {len(name) for name in law_ids_by_name}, reverse=True
+        )
+
+    @staticmethod
+    def from_law_list(law_list) -> "LawNameIndex":
+        """
+        Static method to build a LawNameIndex from a list of laws.
+
+        Parameters
+        ----------
+        law_list : ListOfLaws, LawNameListInfo or LawCatalog
+            Iterable of LawNameInfoElement, or object with `list_name_list_info`.
+
+        Returns
+        -------
+        LawNameIndex
+            The index.
+        """
+        elements = getattr(law_list, "list_name_list_info", law_list)
+        return LawNameIndex({
+            elem.law_name: elem.law_id
+            for elem in elements if elem.law_name and elem.law_id
+        })
+
+    def find_suffix(self, text: str) -> Optional[str]:
+        """
+        Find the law ID of the longest law name that `text` ends with.
+        """
+        for length in self._lengths:
+            if length <= len(text):
+                law_id = self.law_ids_by_name.get(text[-length:])
+                if law_id is not None:
+                    return law_id
+        return None
+
+
+def iter_references(
+    records: Iterable[ProvisionRecord], name_index: LawNameIndex
+) -> Iterator[Reference]:
+    """
+    Extract references from the records of the main provision of a law.
+
+    Explicit references such as 第五条第二項, references preceded by a law
+    name such as 民法第七百九条, 同法 and この法律, and 前条/次条 are
+    extracted. A law name may be followed by its law number in parentheses,
+    and a reference continuing an enumeration such as 民法第七百九条及び
+    第七百十条 refers to the law of the previous one. A reference after a
+    name ending like a law name that is not in `name_index` is skipped.
+
+    Parameters
+    ----------
+    records : Iterable[ProvisionRecord]
+        Records of a law, e.g. `LawTextResponse.iter_records()`.
+    name_index : LawNameIndex
+        Index of the known law names.
+
+    Yields
+    ------
+    Reference
+        References in document order. Duplicates are not removed.
+    """
+    article_nums: List[str] = []
+    pending: List[Tuple[str, str]] = []  # (article, relative) to resolve
+    law_id = None
+    for record in records:
+        if record.path[0][0] != "MainProvision":
+            continue
+        law_id = record.law_id
+        article = record.level("Article")
+        if article is None:
+            continue
+        if not article_nums or article_nums[-1] != article:
+            article_nums.append(article)
+
+        text = record.text
+        previous_law: Optional[str] = law_id
+        previous_end = None
+        for match in ARTICLE_REFERENCE_PATTERN.finditer(text):
+            continues = previous_end is not None and bool(
+                _CONTINUATION_PATTERN.fullmatch(text, previous_end, match.start()))
+            previous_end = match.end()
+            if continues:
+                target_law = previous_law
+            else:
+                head = _TRAILING_PARENTHESES_PATTERN.sub("", text[:match.start()])
+                target_law = name_index.find_suffix(head)
+                if target_law is None:
+                    if head.endswith(_PREVIOUS_LAW_PREFIX):
+                        target_law = previous_law
+                    elif head.endswith(_SAME_LAW_PREFIXES) \
+                            or not head.endswith(_UNKNOWN_LAW_SUFFIXES):
+                        target_law = law_id
+                previous_law = target_law
+            if target_law is None:
+                # a law not in `name_index`, or an enumeration continuing it
+                continue
+            target = article_num(match.group("num"), match.group("branch"))
+            if target_law != law_id or target != article:
+                yield Reference(law_id, article, target_law, target)
+        for match in RELATIVE_REFERENCE_PATTERN.finditer(text):
+            pending.append((article, match.group("relative")))
+
+    # 前条/次条 refer to the neighbours in document order.
+    positions = {num: index for index, num in enumerate(article_nums)}
+    for article, relative in pending:
+        index = positions[article] + (-1 if relative == "前条" else 1)
+        if 0 <= index < len(article_nums):
+            yield Reference(law_id, article, law_id, article_nums[index])
+
+
+class CSRGraph:
+    """
+    Directed graph in compressed sparse row form, with its reverse.
+
+    Attributes
+    ----------
+    nodes : List[str]
+        Node names. The position of a name is its node id.
+    """
+
+    def __init__(self, nodes: List[str], edges: Iterable[Tuple[int, int]]) -> None:
+        """
+        Initialize the CSRGraph object.
+
+        Parameters
+        ----------
+        nodes : List[str]
+            Node names.
+        edges : Iterable[Tuple[int, int]]
+            Edges as (source id, target id). Duplicates are removed.
+        """
+        self.nodes: List[str] = nodes
+        self._ids: Dict[str, int] = {name: index for index, name in enumerate(nodes)}
+        unique = sorted(set(edges))
+        self._out_indptr, self._out_indices = self._compress(
+            len(nodes), unique)
+        self._in_indptr, self._in_indices = self._compress(
+            len(nodes), sorted((target, source) for source, target in unique))
+
+    @staticmethod
+    def _compress(n_nodes: int, edges: Sequence[Tuple[int, int]]) -> Tuple[array, array]:
+        indptr = array("I", [0] * (n_nodes + 1))
+        indices = array("I", (target for _, target in edges))
+        for source, _ in edges:
+            indptr[source + 1] += 1
+        for index in range(n_nodes):
+            indptr[index + 1] += indptr[index]
+        return indptr, indices
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def n_edges(self) -> int:
+        """
+        Number of edges.
+        """
+        return len(self._out_indices)
+
+    def _neighbors(self, indptr: array, indices: array, node: str) -> List[str]:
+        index = self._ids.get(node)
+        if index is None:
+            return []
+        return [self.nodes[target] for target in indices[indptr[index]:indptr[index + 1]]]
+
+    def outbound(self, node: str) -> List[str]:
+        """
+        Get the nodes referenced by `node`.
+        """
+        return self._neighbors(self._out_indptr, self._out_indices, node)
+
+    def inbound(self, node: str) -> List[str]:
+        """
+        Get the nodes referencing `node`.
+        """
+        return self._neighbors(self._in_indptr, self._in_indices, node)
+
+    def impacted(self, node: str, max_depth: Optional[int] = None) -> Set[str]:
+        """
+        Get the nodes that reference `node` directly or transitively.
+
+        Parameters
+        ----------
+        node : str
+            The changed node.
+        max_depth : int, optional
+            Maximum number of reference hops. Default is unlimited.
+
+        Returns
+        -------
+        Set[str]
+            The impacted nodes, excluding `node` itself.
+        """
+        start = self._ids.get(node)
+        if start is None:
+            return set()
+        seen = {start}
+        queue = deque([(start, 0)])
+        while queue:
+            index, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for source in self._in_indices[self._in_indptr[index]:self._in_indptr[index + 1]]:
+                if source not in seen:
+                    seen.add(source)
+                    queue.append((source, depth + 1))
+        seen.discard(start)
+        return {self.nodes[index] for index in seen}
+
+
+def article_node(law_id: str, article: str) -> str:
+    """
+    Name of the node of an article in `ReferenceGraph.articles`.
+    """
+    return f"{law_id}:{article}"
+
+
+class ReferenceGraph:
+    """
+    Graphs of references between laws and between articles.
+
+    Attributes
+    ----------
+    laws : CSRGraph
+        Law-to-law graph whose nodes are law IDs.
+    articles : CSRGraph
+        Article-to-article graph whose nodes are "<law ID>:<article Num>".
+    """
+
+    def __init__(self, references: Iterable[Reference]) -> None:
+        """
+        Initialize the ReferenceGraph object from references.
+
+        Parameters
+        ----------
+        references : Iterable[Reference]
+            References between articles.
+        """
+        law_ids: Dict[str, int] = {}
+        article_ids: Dict[str, int] = {}
+        law_edges: List[Tuple[int, int]] = []
+        article_edges: List[Tuple[int, int]] = []
+        for ref in references:
+            source_law = law_ids.setdefault(ref.law_id, len(law_ids))
+            target_law = law_ids.setdefault(ref.target_law_id, len(law_ids))
+            if source_law != target_law:
+                law_edges.append((source_law, target_law))
+            article_edges.append((
+                article_ids.setdefault(article_node(ref.law_id, ref.article), len(article_ids)),
+                article_ids.setdefault(
+                    article_node(ref.target_law_id, ref.target_article), len(article_ids)),
+            ))
+        self.laws: CSRGraph = CSRGraph(list(law_ids), law_edges)
+        self.articles: CSRGraph = CSRGraph(list(article_ids), article_edges)
+
+    def impacted_laws(self, law_id: str, max_depth: Optional[int] = None) -> Set[str]:
+        """
+        Get the laws that reference `law_id` directly or transitively.
+        """
+        return self.laws.impacted(law_id, max_depth)
+
+    def impacted_articles(
+        self, law_id: str, article: str, max_depth: Optional[int] = None
+    ) -> Set[str]:
+        """
+        Get the article nodes that reference an article directly or transitively.
+        """
+        return self.articles.impacted(article_node(law_id, article), max_depth)
+
+
+_worker_name_index: Optional[LawNameIndex] = None
+
+
+def _init_worker(law_ids_by_name: Dict[str, str]) -> None:
+    global _worker_name_index  # pylint: disable=global-statement
+    _worker_name_index = LawNameIndex(law_ids_by_name)
+
+
+def _extract(xml_content: XMLSource) -> List[Reference]:
+    response = LawTextResponse(xml_content)
+    return list(iter_references(response.iter_records(), _worker_name_index))
+
+
+def extract_references(
+    xml_contents: Iterable[XMLSource], name_index: LawNameIndex,
+    max_workers: Optional[int] = None, chunksize: int = 4
+) -> List[Reference]:
+    """
+    Extract references from many full texts in parallel processes.
+
+    Parameters
+    ----------
+    xml_contents : Iterable[str or bytes]
+        Responses of `base.request_law_text`, as content or file paths.
+        Passing paths avoids sending the contents to the worker processes.
+    name_index : LawNameIndex
+        Index of the known law names.
+    max_workers : int, optional
+        Number of worker processes. Default is the number of CPUs.
+    chunksize : int, optional
+        Number of texts sent to a worker at once. Default is 4.
+
+    Returns
+    -------
+    List[Reference]
+        References of all the texts.
+    """
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker,
+        initargs=(name_index.law_ids_by_name,)
+    ) as executor:
+        references: List[Reference] = []
+        for chunk in executor.map(_extract, xml_contents, chunksize=chunksize):
+            references.extend(chunk)
+        return references
+
+
+def build_reference_graph(
+    xml_contents: Iterable[XMLSource], law_list,
+    max_workers: Optional[int] = None
+) -> ReferenceGraph:
+    """
+    Build the reference graph of many full texts.
+
+    Parameters
+    ----------
+    xml_contents : Iterable[str or bytes]
+        Responses of `base.request_law_text`, as content or file paths.
+    law_list : ListOfLaws, LawNameListInfo or LawCatalog
+        List of laws whose names are resolved in the texts.
+    max_workers : int, optional
+        Number of worker processes. Default is the number of CPUs.
+
+    Returns
+    -------
+    ReferenceGraph
+        The graph.
+    """
+    name_index = LawNameIndex.from_law_list(law_list)
+    return ReferenceGraph(extract_references(xml_contents, name_index, max_workers))
@@ -0,0 +1,605 @@
+"""elaws_api_python.search
+
+Ranked full-text search over the articles of laws and ordinances.
+
+Examples
+--------
+>>> from elaws_api_python.bulk import acquire_law_texts
+>>> index = SearchIndex()
+>>> for result in acquire_law_texts(1, law_ids, extract=extract_articles):
+...     index.add_articles(result.law_id, result.value)
+>>> index.search("損害賠償", limit=5)
+"""
+
+import json
+import math
+import os
+import re
+import unicodedata
+import uuid
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .classes.laws_and_ordinances_response import LawNameInfoElement
+from .diff import LawText, article_texts
+from .records import iter_records_from_chunks
+
+NGRAM = 2
+K1 = 1.2
+B = 0.75
+INDEX_FORMAT = 1
+_MAX_TF = 0xFFFF
+_RUN_PATTERN = re.compile(r"[^\W_]+")
+_DATE_PATTERN = re.compile(r"^\d{8}$")
+
+Articles = Dict[str, Tuple[str, str]]
+
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError as exc:
+        raise ImportError(
+            "numpy is required for the search index. "
+            "Install it with `pip install elaws-api-python[search]`."
+        ) from exc
+    return numpy
+
+
+def tokenize(text: str, ngram: int = NGRAM) -> List[str]:
+    """
+    Split a text into overlapping character n-grams.
+
+    The text is NFKC-normalized and lowercased, and split into runs of
+    letters and digits at whitespace and punctuation, so no n-gram spans
+    "、" or "。". A run shorter than `ngram` is kept as a single token.
+
+    Parameters
+    ----------
+    text : str
+        The text.
+    ngram : int, optional
+        Length of the n-grams. Default is NGRAM.
+
+    Returns
+    -------
+    List[str]
+        The n-grams in order, with repetitions.
+    """
+    tokens = []
+    for run in _RUN_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()):
+        if len(run) <= ngram:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + ngram] for i in range(len(run) - ngram + 1))
+    return tokens
+
+
+def extract_articles(content: bytes) -> Articles:
+    """
+    Group a raw response of `base.request_law_text` into article texts.
+
+    This is an extractor for `bulk.acquire_law_texts` whose values are
+    passed to `SearchIndex.add_articles`.
+
+    Parameters
+    ----------
+    content : bytes
+        Raw response.
+
+    Returns
+    -------
+    Dict[str, Tuple[str, str]]
+        Pairs of the header and the text of each article, keyed by article key.
+    """
+    return article_texts(iter_records_from_chunks((content,)))
+
+
+def _date_value(date: Union[str, int, None]) -> int:
+    if date is None:
+        return 0
+    if isinstance(date, int):
+        return date
+    date = date.replace("-", "")
+    return int(date) if _DATE_PATTERN.match(date) else 0
+
+
+def _remove_other_generations(directory: str, names: List[str], generation: str) -> None:
+    """
+    Remove the array files of the saves other than `generation`.
+    """
+    keep = {f"{name}.{generation}.npy" for name in names}
+    for file_name in os.listdir(directory):
+        stem = file_name.split(".", 1)[0]
+        if stem in names and file_name.endswith(".npy") and file_name not in keep:
+            try:
+                os.remove(os.path.join(directory, file_name))
+            except OSError:
+                # e.g. still mapped by a reader on Windows; removed by a later save
+                pass
+
+
+class SearchHit(NamedTuple):
+    """
+    An article matching a query.
+
+    Attributes
+    ----------
+    law_id : str
+        Law ID.
+    key : str
+        Article key, e.g. "MainProvision/Chapter[1]/Article[1]".
+    header : str
+        Title and caption of the article.
+    score : float
+        BM25 score.
+    """
+    law_id: str
+    key: str
+    header: str
+    score: float
+
+
+class SearchIndex:
+    """
+    In-memory BM25 index of articles with character n-gram tokens.
+
+    Each article is a document. Documents are added per law with
+    `add_articles` or `add_law_text`; adding a law again replaces its
+    articles. Additions are buffered in `array` buffers and merged into
+    the compressed postings (term offsets, document ids and term frequencies
+    as NumPy arrays) at the next query, so a corpus can be built law by
+    law. A query scores the postings of its n-grams with vectorized BM25
+    and can be filtered by law ID, category and promulgation date, taken
+    from `set_law_info` or `update_law_info`.
+
+    `save` writes the arrays as .npy files, and `load` maps the postings
+    into memory, so a saved index opens without reading them.
+
+    Attributes
+    ----------
+    ngram : int
+        Length of the n-grams.
+    k1 : float
+        BM25 term frequency saturation.
+    b : float
+        BM25 length normalization.
+    """
+
+    def __init__(self, ngram: int = NGRAM, k1: float = K1, b: float = B) -> None:
+        """
+        Initialize an empty SearchIndex object.
+
+        Parameters
+        ----------
+        ngram : int, optional
+            Length of the n-grams. Default is NGRAM.
+        k1 : float, optional
+            BM25 term frequency saturation. Default is K1.
+        b : float, optional
+            BM25 length normalization. Default is B.
+        """
+        self.ngram: int = ngram
+        self.k1: float = k1
+        self.b: float = b
+        self._term_ids: Dict[str, int] = {}
+        self._terms: List[str] = []
+        # documents
+        self._doc_keys: List[str] = []
+        self._doc_headers: List[str] = []
+        self._doc_laws = array("I")
+        self._doc_lengths = array("I")
+        self._alive = bytearray()
+        # laws
+        self._law_index: Dict[str, int] = {}
+        self._laws: List[str] = []
+        self._law_categories = array("I")
+        self._law_dates = array("I")
+        # live documents of each law
+        self._law_docs: Dict[int, List[int]] = {}
+        # merged postings, and postings added since the last merge
+        self._offsets = None
+        self._postings_docs = None
+        self._postings_tfs = None
+        self._norms = None
+        self._pending_terms = array("I")
+        self._pending_docs = array("I")
+        self._pending_tfs = array("H")
+        self._dirty: bool = False
+
+    def __len__(self) -> int:
+        return sum(self._alive)
+
+    @property
+    def law_ids(self) -> List[str]:
+        """
+        IDs of the laws that have articles in the index.
+        """
+        return [self._laws[law] for law in sorted(self._law_docs)]
+
+    def _law(self, law_id: str) -> int:
+        index = self._law_index.get(law_id)
+        if index is None:
+            index = len(self._laws)
+            self._law_index[law_id] = index
+            self._laws.append(law_id)
+            self._law_categories.append(0)
+            self._law_dates.append(0)
+        return index
+
+    def set_law_info(
+        self, law_id: str, element: Optional[LawNameInfoElement] = None,
+        categories: Iterable[int] = ()
+    ) -> None:
+        """
+        Set the information of a law used by the filters of `search`.
+
+        Parameters
+        ----------
+        law_id : str
+            Law ID.
+        element : LawNameInfoElement, optional
+            Information of the law; its promulgation date is used.
+        categories : Iterable[int], optional
+            Categories (law types) of the law, e.g. `base.LAWTYPE_CABINET_ORDERS`.
+        """
+        index = self._law(law_id)
+        if element is not None:
+            self._law_dates[index] = _date_value(element.promulgation_date)
+        mask = 0
+        for category in categories:
+            mask |= 1 << category
+        self._law_categories[index] = mask
+
+    def update_law_info(self, catalog) -> None:
+        """
+        Set the information of all the laws of a catalog.
+
+        Parameters
+        ----------
+        catalog : catalog.LawCatalog
+            The catalog.
+        """
+        for element in catalog:
+            self.set_law_info(element.law_id, element, catalog.categories_of(element.law_id))
+
+    def remove_law(self, law_id: str) -> int:
+        """
+        Remove the articles of a law.
+
+        Parameters
+        ----------
+        law_id : str
+            Law ID.
+
+        Returns
+        -------
+        int
+            Number of removed articles.
+        """
+        index = self._law_index.get(law_id)
+        if index is None:
+            return 0
+        docs = self._law_docs.pop(index, [])
+        for doc in docs:
+            self._alive[doc] = 0
+        self._dirty = self._dirty or bool(docs)
+        return len(docs)
+
+    def _index_law_docs(self) -> None:
+        self._law_docs = {}
+        for doc, (law, alive) in enumerate(zip(self._doc_laws, self._alive)):
+            if alive:
+                self._law_docs.setdefault(law, []).append(doc)
+
+    def add_articles(self, law_id: str, articles: Articles) -> int:
+        """
+        Add the articles of a law, replacing those added before.
+
+        Parameters
+        ----------
+        law_id : str
+            Law ID.
+        articles : Dict[str, Tuple[str, str]]
+            Pairs of the header and the text of each article keyed by
+            article key, as returned by `diff.article_texts`.
+
+        Returns
+        -------
+        int
+            Number of added articles.
+        """
+        self.remove_law(law_id)
+        law = self._law(law_id)
+        for key, (header, text) in articles.items():
+            doc = len(self._doc_keys)
+            counts = Counter(tokenize(header, self.ngram))
+            counts.update(tokenize(text, self.ngram))
+            for term, count in counts.items():
+                term_id = self._term_ids.get(term)
+                if term_id is None:
+                    term_id = len(self._terms)
+                    self._term_ids[term] = term_id
+                    self._terms.append(term)
+                self._pending_terms.append(term_id)
+                self._pending_docs.append(doc)
+                self._pending_tfs.append(min(count, _MAX_TF))
+            self._doc_keys.append(key)
+            self._doc_headers.append(header)
+            self._doc_laws.append(law)
+            self._doc_lengths.append(sum(counts.values()))
+            self._alive.append(1)
+            self._law_docs.setdefault(law, []).append(doc)
+        self._dirty = True
+        return len(articles)
+
+    def add_law_text(self, law_text: LawText, law_id: Optional[str] = None) -> int:
+        """
+        Add the articles of a full text, replacing those added before.
+
+        Parameters
+        ----------
+        law_text : LawTextResponse or Iterable[ProvisionRecord]
+            The full text.
+        law_id : str, optional
+            Law ID. Default is the law ID of `law_text`.
+
+        Returns
+        -------
+        int
+            Number of added articles.
+
+        Raises
+        ------
+        ValueError
+            If the law ID is neither given nor found in `law_text`.
+        """
+        if law_id is None:
+            appl_data = getattr(law_text, "appl_data", None)
+            if appl_data is not None:
+                law_id = appl_data.law_id
+            else:
+                law_text = list(law_text)
+                law_id = law_text[0].law_id if law_text else None
+        if law_id is None:
+            raise ValueError("The law ID is not found in the full text.")
+        return self.add_articles(law_id, article_texts(law_text))
+
+    def _merge(self) -> None:
+        if not self._dirty:
+            return
+        np = _import_numpy()
+        if self._offsets is not None:
+            counts = np.diff(self._offsets)
+            terms = np.repeat(np.arange(len(counts), dtype=np.uint32), counts)
+            docs = self._postings_docs
+            tfs = self._postings_tfs
+        else:
+            terms = docs = np.zeros(0, dtype=np.uint32)
+            tfs = np.zeros(0, dtype=np.uint16)
+        terms = np.concatenate((terms, np.frombuffer(self._pending_terms, dtype=np.uint32)))
+        docs = np.concatenate((docs, np.frombuffer(self._pending_docs, dtype=np.uint32)))
+        tfs = np.concatenate((tfs, np.frombuffer(self._pending_tfs, dtype=np.uint16)))
+
+        # drop removed documents and renumber the rest
+        alive = np.frombuffer(bytes(self._alive), dtype=np.uint8).astype(bool)
+        if not alive.all():
+            keep = alive[docs]
+            renumber = np.cumsum(alive, dtype=np.int64) - 1
+            terms, tfs = terms[keep], tfs[keep]
+            docs = renumber[docs[keep]].astype(np.uint32)
+            kept = np.flatnonzero(alive)
+            self._doc_keys = [self._doc_keys[doc] for doc in kept]
+            self._doc_headers = [self._doc_headers[doc] for doc in kept]
+            self._doc_laws = array("I", np.frombuffer(self._doc_laws, dtype=np.uint32)[kept].tobytes())
+            self._doc_lengths = array("I", np.frombuffer(self._doc_lengths, dtype=np.uint32)[kept].tobytes())
+            self._alive = bytearray(b"\x01" * len(kept))
+            self._index_law_docs()
+
+        # documents are numbered in order of addition, so a stable sort by
+        # term keeps the document ids of each term sorted
+        order = np.argsort(terms, kind="stable")
+        self._postings_docs = docs[order]
+        self._postings_tfs = tfs[order]
+        self._offsets = np.zeros(len(self._terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=len(self._terms)), out=self._offsets[1:])
+        self._pending_terms = array("I")
+        self._pending_docs = array("I")
+        self._pending_tfs = array("H")
+        self._update_norms()
+        self._dirty = False
+
+    def _update_norms(self) -> None:
+        np = _import_numpy()
+        lengths = np.frombuffer(self._doc_lengths, dtype=np.uint32).astype(np.float32)
+        average = float(lengths.mean()) if len(lengths) else 1.0
+        self._norms = (self.k1 * (1.0 - self.b + self.b * lengths / max(average, 1.0))).astype(np.float32)
+
+    def _filter(
+        self, law_ids: Optional[Iterable[str]], categories: Optional[Iterable[int]],
+        promulgated_from: Union[str, int, None], promulgated_to: Union[str, int, None]
+    ):
+        np = _import_numpy()
+        mask = np.ones(len(self._laws), dtype=bool)
+        if law_ids is not None:
+            mask[:] = False
+            mask[[self._law_index[law_id] for law_id in law_ids if law_id in self._law_index]] = True
+        if categories is not None:
+            category_mask = 0
+            for category in categories:
+                category_mask |= 1 << category
+            mask &= (np.frombuffer(self._law_categories, dtype=np.uint32) & category_mask) != 0
+        dates = np.frombuffer(self._law_dates, dtype=np.uint32)
+        if promulgated_from is not None:
+            mask &= dates >= _date_value(promulgated_from)
+        if promulgated_to is not None:
+            mask &= (dates <= _date_value(promulgated_to)) & (dates > 0)
+        return mask[np.frombuffer(self._doc_laws, dtype=np.uint32)]
+
+    def search(
+        self, query: str, limit: int = 10,
+        law_ids: Optional[Iterable[str]] = None,
+        categories: Optional[Iterable[int]] = None,
+        promulgated_from: Union[str, int, None] = None,
+        promulgated_to: Union[str, int, None] = None
+    ) -> List[SearchHit]:
+        """
+        Search the articles matching a query.
+
+        Parameters
+        ----------
+        query : str
+            The query, tokenized like the articles.
+        limit : int, optional
+            Maximum number of hits. Default is 10.
+        law_ids : Iterable[str], optional
+            Laws to search. Default is None (all the laws).
+        categories : Iterable[int], optional
+            Categories (law types) to search. Default is None (all).
+        promulgated_from : str or int, optional
+            Earliest promulgation date, e.g. "20000101". Default is None.
+        promulgated_to : str or int, optional
+            Latest promulgation date. Default is None.
+
+        Returns
+        -------
+        List[SearchHit]
+            Hits in descending order of score.
+        """
+        np = _import_numpy()
+        self._merge()
+        term_ids = {
+            self._term_ids[term] for term in tokenize(query, self.ngram)
+            if term in self._term_ids
+        }
+        if not term_ids or not self._doc_keys:
+            return []
+
+        n_docs = len(self._doc_keys)
+        scores = np.zeros(n_docs, dtype=np.float32)
+        for term_id in term_ids:
+            start, stop = self._offsets[term_id], self._offsets[term_id + 1]
+            if start == stop:
+                continue
+            docs = self._postings_docs[start:stop]
+            tfs = self._postings_tfs[start:stop].astype(np.float32)
+            idf = math.log(1.0 + (n_docs - (stop - start) + 0.5) / (stop - start + 0.5))
+            scores[docs] += idf * tfs * (self.k1 + 1.0) / (tfs + self._norms[docs])
+
+        if law_ids is not None or categories is not None or \
+                promulgated_from is not None or promulgated_to is not None:
+            scores[~self._filter(law_ids, categories, promulgated_from, promulgated_to)] = 0.0
+        candidates = np.flatnonzero(scores > 0.0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [
+            SearchHit(
+                self._laws[self._doc_laws[doc]], self._doc_keys[doc],
+                self._doc_headers[doc], float(scores[doc])
+            )
+            for doc in candidates
+        ]
+
+    def save(self, directory: str) -> None:
+        """
+        Save the index to a directory.
+
+        Parameters
+        ----------
+        directory : str
+            The directory. Files of an index saved there before are replaced.
+        """
+        np = _import_numpy()
+        self._merge()
+        os.makedirs(directory, exist_ok=True)
+        arrays = {
+            "offsets": self._offsets if self._offsets is not None else np.zeros(1, dtype=np.int64),
+            "postings_docs": self._postings_docs if self._offsets is not None else np.zeros(0, dtype=np.uint32),
+            "postings_tfs": self._postings_tfs if self._offsets is not None else np.zeros(0, dtype=np.uint16),
+            "doc_laws": np.frombuffer(self._doc_laws, dtype=np.uint32),
+            "doc_lengths": np.frombuffer(self._doc_lengths, dtype=np.uint32),
+            "law_categories": np.frombuffer(self._law_categories, dtype=np.uint32),
+            "law_dates": np.frombuffer(self._law_dates, dtype=np.uint32),
+        }
+        # The arrays of each save get their own file names and meta.json,
+        # replaced last, names them, so a reader sees either the old index
+        # or the new one, never the new arrays with the old documents.
+        generation = uuid.uuid4().hex[:16]
+        for name, values in arrays.items():
+            path = os.path.join(directory, f"{name}.{generation}.npy")
+            with open(path + ".part", "wb") as file_:
+                np.save(file_, values)
+            os.replace(path + ".part", path)
+        meta = {
+            "format": INDEX_FORMAT,
+            "generation": generation,
+            "ngram": self.ngram,
+            "k1": self.k1,
+            "b": self.b,
+            "terms": self._terms,
+            "laws": self._laws,
+            "doc_keys": self._doc_keys,
+            "doc_headers": self._doc_headers,
+        }
+        path = os.path.join(directory, "meta.json")
+        with open(path + ".part", "w", encoding="utf-8") as file_:
+            json.dump(meta, file_, ensure_ascii=False)
+        os.replace(path + ".part", path)
+        _remove_other_generations(directory, list(arrays), generation)
+
+    @staticmethod
+    def load(directory: str, mmap: bool = True):
+        """
+        Static method to load an index saved by `save`.
+
+        Parameters
+        ----------
+        directory : str
+            The directory.
+        mmap : bool, optional
+            If True, the postings are memory-mapped instead of read.
+            Default is True.
+
+        Returns
+        -------
+        SearchIndex
+            The index. Laws can be added to it as to a new one.
+
+        Raises
+        ------
+        ValueError
+            If the directory holds an index of an unknown format.
+        """
+        np = _import_numpy()
+        with open(os.path.join(directory, "meta.json"), "r", encoding="utf-8") as file_:
+            meta = json.load(file_)
+        if meta.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unknown search index format: {meta.get('format')}")
+
+        generation = meta.get("generation")
+        suffix = f".{generation}.npy" if generation else ".npy"
+
+        def read(name: str, mmap_mode: Optional[str] = None):
+            return np.load(os.path.join(directory, name + suffix), mmap_mode=mmap_mode)
+
+        index = SearchIndex(meta["ngram"], meta["k1"], meta["b"])
+        index._terms = meta["terms"]
+        index._term_ids = {term: term_id for term_id, term in enumerate(index._terms)}
+        index._laws = meta["laws"]
+        index._law_index = {law_id: law for law, law_id in enumerate(index._laws)}
+        index._doc_keys = meta["doc_keys"]
+        index._doc_headers = meta["doc_headers"]
+        index._doc_laws = array("I", read("doc_laws").astype(np.uint32).tobytes())
+        index._doc_lengths = array("I", read("doc_lengths").astype(np.uint32).tobytes())
+        index._law_categories = array("I", read("law_categories").astype(np.uint32).tobytes())
+        index._law_dates = array("I", read("law_dates").astype(np.uint32).tobytes())
+        index._alive = bytearray(b"\x01" * len(index._doc_keys))
+        index._index_law_docs()
+        mmap_mode = "r" if mmap else None
+        index._offsets = read("offsets", mmap_mode)
+        index._postings_docs = read("postings_docs", mmap_mode)
+        index._postings_tfs = read("postings_tfs", mmap_mode)
+        index._update_norms()
+        return index
@@ -0,0 +1,304 @@
+"""elaws_api_python.snapshot
+
+Binary snapshot of a parsed ListOfLaws for fast warm starts.
+
+The snapshot holds the law information as a single UTF-8 string pool with
+an offset table, plus lookup indexes sorted by law ID and by law name.
+Loading it memory-maps the file instead of reading it, so the pages are
+shared by every process on a host that loads the same snapshot, and rows
+are only decoded into LawNameInfoElement objects when they are accessed.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import List, Optional, Sequence, Union
+
+from .classes.common import Result
+from .classes.laws_and_ordinances_response import (
+    ApplData, LawNameInfoElement, LawNameListInfo, ListOfLaws
+)
+
+MAGIC = b"ELAWSSNP"
+FORMAT_VERSION = 1
+FIELDS = ("law_id", "law_name", "law_number", "promulgation_date")
+N_FIELDS = len(FIELDS)
+LAW_ID, LAW_NAME, LAW_NUMBER, PROMULGATION_DATE = range(N_FIELDS)
+
+# magic, format version, byte order, flags, category, result code, rows,
+# then (offset, length) of the sections: strings, offsets, nulls,
+# id_order, name_order, message
+_HEADER = struct.Struct("<8sHBBiiI" + "QQ" * 6)
+_HEADER_SIZE = 128
+_FLAG_CATEGORY = 0x01
+_FLAG_RESULT_CODE = 0x02
+_BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+
+def _align(size: int, alignment: int = 8) -> int:
+    return (size + alignment - 1) // alignment * alignment
+
+
+def save_snapshot(list_of_laws: ListOfLaws, path: str) -> None:
+    """
+    Save a ListOfLaws as a binary snapshot.
+
+    The file is written next to `path` and renamed into place, so processes
+    loading the snapshot never see a partially written file.
+
+    Parameters
+    ----------
+    list_of_laws : ListOfLaws
+        The list of laws and ordinances.
+    path : str
+        Path to the snapshot file.
+    """
+    elems = list(list_of_laws.list_name_list_info)
+    n_rows = len(elems)
+
+    pool = bytearray()
+    offsets = array("I", [0])
+    nulls = bytearray(n_rows * N_FIELDS)
+    for row, elem in enumerate(elems):
+        values = (elem.law_id, elem.law_name, elem.law_number, elem.promulgation_date)
+        for col, value in enumerate(values):
+            if value is None:
+                nulls[row * N_FIELDS + col] = 1
+            else:
+                pool += value.encode("utf-8")
+            offsets.append(len(pool))
+
+    def field(row: int, col: int) -> bytes:
+        index = row * N_FIELDS + col
+        return bytes(pool[offsets[index]:offsets[index + 1]])
+
+    id_order = array("I", sorted(
+        (row for row in range(n_rows) if not nulls[row * N_FIELDS + LAW_ID]),
+        key=lambda row: field(row, LAW_ID)
+    ))
+    name_order = array("I", sorted(
+        (row for row in range(n_rows) if not nulls[row * N_FIELDS + LAW_NAME]),
+        key=lambda row: field(row, LAW_NAME)
+    ))
+
+    result = list_of_laws.result
+    message = b""
+    if result is not None and result.message is not None:
+        message = result.message.encode("utf-8")
+    category = list_of_laws.appl_data.category
+    flags = 0
+    if category is not None:
+        flags |= _FLAG_CATEGORY
+    if result is not None and result.code is not None:
+        flags |= _FLAG_RESULT_CODE
+
+    sections = [bytes(pool), offsets.tobytes(), bytes(nulls),
+                id_order.tobytes(), name_order.tobytes(), message]
+    layout = []
+    position = _HEADER_SIZE
+    for section in sections:
+        layout.extend((position, len(section)))
+        position = _align(position + len(section))
+
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, _BYTE_ORDER, flags,
+        category if category is not None else 0,
+        result.code if flags & _FLAG_RESULT_CODE else 0,
+        n_rows, *layout
+    )
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as file_:
+        file_.write(header.ljust(_HEADER_SIZE, b"\0"))
+        for index, section in enumerate(sections):
+            file_.seek(layout[index * 2])
+            file_.write(section)
+        file_.truncate(position)
+    os.replace(tmp_path, path)
+
+
+class MappedSnapshot:
+    """
+    Read-only view of a memory-mapped snapshot file.
+
+    Attributes
+    ----------
+    path : str
+        Path to the snapshot file.
+    n_rows : int
+        Number of laws/ordinances.
+    category : int, optional
+        Law type category.
+    result : Result
+        Processing result.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the MappedSnapshot object by mapping the file at `path`.
+
+        Parameters
+        ----------
+        path : str
+            Path to the snapshot file.
+
+        Raises
+        ------
+        ValueError
+            If the file is not a snapshot of a supported format.
+        """
+        self.path: str = path
+        with open(path, "rb") as file_:
+            self._mmap = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        (magic, version, byte_order, flags, category, result_code,
+         n_rows, *layout) = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a supported ListOfLaws snapshot.")
+        if byte_order != _BYTE_ORDER:
+            raise ValueError(f"{path} was written with a different byte order.")
+
+        sections = [
+            view[layout[index]:layout[index] + layout[index + 1]]
+            for index in range(0, len(layout), 2)
+        ]
+        self.n_rows: int = n_rows
+        self._strings = sections[0]
+        self._offsets = sections[1].cast("I")
+        self._nulls = sections[2]
+        self._id_order = sections[3].cast("I")
+        self._name_order = sections[4].cast("I")
+        self.category: Optional[int] = category if flags & _FLAG_CATEGORY else None
+        self.result: Result = Result(
+            result_code if flags & _FLAG_RESULT_CODE else None,
+            bytes(sections[5]).decode("utf-8") or None
+        )
+
+    def field_bytes(self, row: int, col: int) -> Optional[bytes]:
+        """
+        Get a field of a row as raw UTF-8 bytes.
+        """
+        index = row * N_FIELDS + col
+        if self._nulls[index]:
+            return None
+        return self._strings[self._offsets[index]:self._offsets[index + 1]].tobytes()
+
+    def field(self, row: int, col: int) -> Optional[str]:
+        """
+        Get a field of a row as str.
+        """
+        value = self.field_bytes(row, col)
+        return value.decode("utf-8") if value is not None else None
+
+    def element(self, row: int) -> LawNameInfoElement:
+        """
+        Decode a row into a LawNameInfoElement.
+        """
+        return LawNameInfoElement(*(self.field(row, col) for col in range(N_FIELDS)))
+
+    def _search(self, order: memoryview, col: int, key: str) -> Optional[int]:
+        target = key.encode("utf-8")
+        low, high = 0, len(order)
+        while low < high:
+            middle = (low + high) // 2
+            if self.field_bytes(order[middle], col) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(order) and self.field_bytes(order[low], col) == target:
+            return order[low]
+        return None
+
+    def find_row_by_law_id(self, law_id: str) -> Optional[int]:
+        """
+        Find the row of a law ID with a binary search over the id index.
+        """
+        return self._search(self._id_order, LAW_ID, law_id)
+
+    def find_row_by_law_name(self, law_name: str) -> Optional[int]:
+        """
+        Find the first row of a law name with a binary search over the name index.
+        """
+        return self._search(self._name_order, LAW_NAME, law_name)
+
+
+class MappedLawNameList(Sequence):
+    """
+    Sequence of LawNameInfoElement decoded on access from a MappedSnapshot.
+    """
+
+    def __init__(self, snapshot: MappedSnapshot) -> None:
+        self._snapshot: MappedSnapshot = snapshot
+
+    def __len__(self) -> int:
+        return self._snapshot.n_rows
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._snapshot.element(row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list index out of range")
+        return self._snapshot.element(index)
+
+
+class MappedLawNameListInfo(LawNameListInfo):
+    """
+    LawNameListInfo backed by a memory-mapped snapshot.
+
+    Lookups by law ID and law name use the indexes stored in the snapshot.
+    """
+
+    def __init__(self, snapshot: MappedSnapshot) -> None:
+        """
+        Initialize the MappedLawNameListInfo object.
+
+        Parameters
+        ----------
+        snapshot : MappedSnapshot
+            The mapped snapshot.
+        """
+        super().__init__(MappedLawNameList(snapshot))
+        self._snapshot: MappedSnapshot = snapshot
+
+    def find_element_by_law_id(self, law_id: str) -> Optional[LawNameInfoElement]:
+        row = self._snapshot.find_row_by_law_id(law_id)
+        return self._snapshot.element(row) if row is not None else None
+
+    def find_element_by_law_name(self, law_name: str) -> Optional[LawNameInfoElement]:
+        row = self._snapshot.find_row_by_law_name(law_name)
+        return self._snapshot.element(row) if row is not None else None
+
+    @property
+    def law_ids(self) -> List[Optional[str]]:
+        return [self._snapshot.field(row, LAW_ID) for row in range(len(self))]
+
+    @property
+    def law_names(self) -> List[Optional[str]]:
+        return [self._snapshot.field(row, LAW_NAME) for row in range(len(self))]
+
+
+def load_snapshot(path: str) -> ListOfLaws:
+    """
+    Load a ListOfLaws from a binary snapshot.
+
+    Parameters
+    ----------
+    path : str
+        Path to the snapshot file written by `save_snapshot`.
+
+    Returns
+    -------
+    ListOfLaws
+        The list of laws and ordinances, backed by the mapped file.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a snapshot of a supported format.
+    """
+    snapshot = MappedSnapshot(path)
+    appl_data = ApplData(snapshot.category, MappedLawNameListInfo(snapshot))
+    return ListOfLaws.from_data(snapshot.result, appl_data)
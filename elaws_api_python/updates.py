@@ -0,0 +1,385 @@
+"""elaws_api_python.updates
+
+Acquisition of the lists of updated laws and ordinances over a range of
+dates, merged into the latest change per law.
+
+Examples
+--------
+>>> log = acquire_updated_laws(1, 20240401, 20240407, checkpoint="updates.json")
+>>> for change in log:
+...     print(change.law_id, change.update_date, change.amend_name)
+"""
+
+import datetime
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Union
+from xml.etree import ElementTree as ET
+
+from .base import TIMEOUT_SEC, stream_list_of_updated_laws_and_ordinance
+from .classes.updated_laws_response import UpdatedLawInfoElement
+
+MAX_WORKERS = 8
+
+DateLike = Union[int, str, datetime.date]
+
+
+def _to_date(date: DateLike) -> datetime.date:
+    if isinstance(date, datetime.date):
+        return date
+    return datetime.datetime.strptime(str(date).replace("-", ""), "%Y%m%d").date()
+
+
+def date_range(start: DateLike, end: DateLike) -> List[int]:
+    """
+    List the dates from `start` to `end` inclusive.
+
+    Parameters
+    ----------
+    start : int, str or datetime.date
+        First date, e.g. 20240401, "2024-04-01" or a date.
+    end : int, str or datetime.date
+        Last date.
+
+    Returns
+    -------
+    List[int]
+        The dates as YYYYMMDD integers, as taken by
+        `base.request_list_of_updated_laws_and_ordinance`.
+    """
+    start, end = _to_date(start), _to_date(end)
+    return [
+        int((start + datetime.timedelta(days=days)).strftime("%Y%m%d"))
+        for days in range((end - start).days + 1)
+    ]
+
+
+def iter_updated_laws_from_chunks(chunks: Iterable[bytes]) -> Iterator[UpdatedLawInfoElement]:
+    """
+    Parse a list of updated laws and ordinances while it is being received.
+
+    Each `LawNameListInfo` element is released once it is converted, so the
+    memory held does not grow with the length of the list.
+
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        Chunks of the raw response, e.g. from
+        `base.stream_list_of_updated_laws_and_ordinance`.
+
+    Yields
+    ------
+    UpdatedLawInfoElement
+        Information of each updated law/ordinance in order.
+
+    Raises
+    ------
+    ValueError
+        If the response reports an error in `Result/Code`, or has no
+        `Result` or `ApplData`, as `ListOfUpdatedLaws.parse_data` does.
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    parents: List[ET.Element] = []
+    found: Set[str] = set()
+
+    def read_events() -> Iterator[UpdatedLawInfoElement]:
+        for event, elem in parser.read_events():
+            if event == "start":
+                parents.append(elem)
+                continue
+            parents.pop()
+            if elem.tag == "LawNameListInfo":
+                yield UpdatedLawInfoElement.from_elem(elem)
+                if parents:
+                    parents[-1].remove(elem)
+            elif len(parents) == 1 and elem.tag == "Result":
+                found.add(elem.tag)
+                code = (elem.findtext("Code") or "").strip()
+                if code != "0":
+                    message = (elem.findtext("Message") or "").strip()
+                    raise ValueError(f"The API returned an error (code {code or '?'}): {message}")
+            elif len(parents) == 1 and elem.tag == "ApplData":
+                found.add(elem.tag)
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from read_events()
+    parser.close()
+    yield from read_events()
+    for tag in ("Result", "ApplData"):
+        if tag not in found:
+            raise ValueError(f"{tag} is not found.")
+
+
+def fetch_updated_laws(
+    version: int, date: int, timeout: float = TIMEOUT_SEC
+) -> List[UpdatedLawInfoElement]:
+    """
+    Acquire the list of the laws and ordinances updated on a date.
+
+    Parameters
+    ----------
+    version : int
+        Version number of the e-Gov eLaw API.
+    date : int
+        Date (YYYYMMDD).
+    timeout : float, optional
+        Timeout duration in seconds. Default is TIMEOUT_SEC.
+
+    Returns
+    -------
+    List[UpdatedLawInfoElement]
+        Information of the updated laws and ordinances.
+
+    Raises
+    ------
+    requests.exceptions.RequestException
+        If an error occurs during the API request.
+    ValueError
+        If the API reports an error for the date.
+    """
+    return list(iter_updated_laws_from_chunks(
+        stream_list_of_updated_laws_and_ordinance(version, date, timeout)))
+
+
+class LawChange(NamedTuple):
+    """
+    Latest change of a law/ordinance over the merged dates.
+
+    Attributes
+    ----------
+    law_id : str
+        Law ID.
+    law_name : str, optional
+        Law name.
+    law_number : str, optional
+        Law number.
+    update_date : str
+        Latest date (YYYYMMDD) whose list includes the law.
+    enforcement_date : str, optional
+        Enforcement date (YYYYMMDD) of the latest amendment.
+    amend_name : str, optional
+        Name of the latest amending law/ordinance.
+    amend_number : str, optional
+        Law number of the latest amending law/ordinance.
+    updates : int
+        Number of merged dates whose list includes the law.
+    """
+    law_id: str
+    law_name: Optional[str]
+    law_number: Optional[str]
+    update_date: str
+    enforcement_date: Optional[str]
+    amend_name: Optional[str]
+    amend_number: Optional[str]
+    updates: int = 1
+
+    @staticmethod
+    def from_info(info: UpdatedLawInfoElement, date: int):
+        """
+        Static method to create a LawChange object from an element of the list of a date.
+        """
+        return LawChange(
+            info.law_id, info.law_name, info.law_number, str(date),
+            info.enforcement_date, info.amend_name, info.amend_number
+        )
+
+    def merge(self, other: "LawChange") -> "LawChange":
+        """
+        Merge two changes of the same law, keeping the later one.
+        """
+        latest = max(self, other, key=lambda change: (change.update_date, change.enforcement_date or ""))
+        return latest._replace(updates=self.updates + other.updates)
+
+
+class UpdateLog:
+    """
+    Per-law latest changes merged from the lists of updated laws of several
+    dates, with the set of dates merged so far.
+
+    With a checkpoint path, the log is loaded from it if it exists and
+    saved to it as dates are merged, so an interrupted catch-up resumes
+    from the dates not yet merged.
+
+    Attributes
+    ----------
+    path : str, optional
+        Path to the checkpoint file.
+    changes : Dict[str, LawChange]
+        Latest change keyed by law ID.
+    dates : Set[int]
+        Dates (YYYYMMDD) merged so far.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        Initialize the UpdateLog object.
+
+        Parameters
+        ----------
+        path : str, optional
+            Path to the checkpoint file. Loaded if it exists. Default is None.
+        """
+        self.path: Optional[str] = path
+        self.changes: Dict[str, LawChange] = {}
+        self.dates: Set[int] = set()
+        if path is not None and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file_:
+                data = json.load(file_)
+            self.dates = set(data["dates"])
+            self.changes = {
+                law_id: LawChange(**change) for law_id, change in data["changes"].items()
+            }
+
+    def __iter__(self) -> Iterator[LawChange]:
+        return iter(sorted(self.changes.values(), key=lambda change: (change.update_date, change.law_id)))
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    @property
+    def law_ids(self) -> List[str]:
+        """
+        IDs of the changed laws.
+        """
+        return [change.law_id for change in self]
+
+    def merge(self, date: int, infos: Iterable[UpdatedLawInfoElement]) -> None:
+        """
+        Merge the list of updated laws of a date.
+
+        A date is merged at most once, so merging it again has no effect.
+
+        Parameters
+        ----------
+        date : int
+            Date of the list (YYYYMMDD).
+        infos : Iterable[UpdatedLawInfoElement]
+            The list.
+        """
+        if date in self.dates:
+            return
+        seen = set()
+        for info in infos:
+            # a law listed twice on a date counts as one update
+            if not info.law_id or info.law_id in seen:
+                continue
+            seen.add(info.law_id)
+            change = LawChange.from_info(info, date)
+            previous = self.changes.get(info.law_id)
+            self.changes[info.law_id] = change if previous is None else previous.merge(change)
+        self.dates.add(date)
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Save the log as JSON, replacing the file atomically.
+
+        Parameters
+        ----------
+        path : str, optional
+            Path to the JSON file. Default is `self.path`.
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path is given.")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file_:
+            json.dump({
+                "dates": sorted(self.dates),
+                "changes": {law_id: change._asdict() for law_id, change in self.changes.items()},
+            }, file_, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def fetch(
+        self, version: int, dates: Iterable[int],
+        timeout: float = TIMEOUT_SEC, max_workers: int = MAX_WORKERS
+    ) -> Dict[int, BaseException]:
+        """
+        Acquire and merge the lists of several dates concurrently.
+
+        Dates already merged are skipped. The lists are merged as they
+        arrive, and the log is saved to its checkpoint after each one.
+
+        Parameters
+        ----------
+        version : int
+            Version number of the e-Gov eLaw API.
+        dates : Iterable[int]
+            Dates (YYYYMMDD).
+        timeout : float, optional
+            Timeout duration in seconds. Default is TIMEOUT_SEC.
+        max_workers : int, optional
+            Maximum number of concurrent requests. Default is MAX_WORKERS.
+
+        Returns
+        -------
+        Dict[int, BaseException]
+            Errors of the dates that could not be acquired. They are not
+            marked as merged, so fetching again retries them.
+        """
+        errors: Dict[int, BaseException] = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(fetch_updated_laws, version, date, timeout): date
+                for date in dict.fromkeys(dates) if date not in self.dates
+            }
+            try:
+                while futures:
+                    done, _ = wait(list(futures), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        date = futures.pop(future)
+                        error = future.exception()
+                        if error is not None:
+                            errors[date] = error
+                            continue
+                        self.merge(date, future.result())
+                    if self.path is not None:
+                        self.save()
+            finally:
+                for future in futures:
+                    future.cancel()
+        return errors
+
+
+def acquire_updated_laws(
+    version: int, start: DateLike, end: DateLike,
+    checkpoint: Optional[str] = None,
+    timeout: float = TIMEOUT_SEC, max_workers: int = MAX_WORKERS
+) -> UpdateLog:
+    """
+    Acquire the laws and ordinances updated between two dates, merged into
+    the latest change per law.
+
+    Parameters
+    ----------
+    version : int
+        Version number of the e-Gov eLaw API.
+    start : int, str or datetime.date
+        First date.
+    end : int, str or datetime.date
+        Last date, inclusive.
+    checkpoint : str, optional
+        Path to a checkpoint file. If it exists, the dates merged in it are
+        not acquired again. Default is None.
+    timeout : float, optional
+        Timeout duration in seconds. Default is TIMEOUT_SEC.
+    max_workers : int, optional
+        Maximum number of concurrent requests. Default is MAX_WORKERS.
+
+    Returns
+    -------
+    UpdateLog
+        The merged changes.
+
+    Raises
+    ------
+    requests.exceptions.RequestException
+        If the list of a date cannot be acquired. The other dates are merged
+        and checkpointed first, so calling again resumes from that date.
+    """
+    log = UpdateLog(checkpoint)
+    errors = log.fetch(version, date_range(start, end), timeout, max_workers)
+    if errors:
+        raise errors[min(errors)]
+    return log
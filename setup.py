@@ -15,16 +15,22 @@ setup(
         'elaws_api_python': ['schema/*.xsd'],
     },
     include_package_data=True,
+    python_requires='>=3.7',
     install_requires=[
         'requests',
         'xmlschema'
     ],
+    extras_require={
+        'arrow': ['pyarrow'],
+        'zstd': ['zstandard'],
+        'search': ['numpy'],
+        'minhash': ['numpy'],
+    },
     classifiers=[
         'Development Status :: 3 - Alpha',
         'Intended Audience :: Developers',
         'License :: OSI Approved :: MIT License',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
@@ -0,0 +1,132 @@
+"""Shared fixtures of the tests.
+
+The tests run against the local fakes in `fake_server`
+and never reach e-Gov.
+"""
+
+import pytest
+
+from elaws_api_python import base
+from fake_server import FakeElawsServer
+
+
+def full_text_body(law_id: str, law_body: str, law_number: str = "令和五年法律第一号") -> bytes:
+    """
+    Build a response of `base.request_law_text` around the XML of a LawBody.
+    """
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        "<DataRoot><Result><Code>0</Code><Message/></Result><ApplData>"
+        f"<LawId>{law_id}</LawId><LawNum>{law_number}</LawNum><LawFullText>"
+        '<Law Era="Reiwa" Lang="ja" LawType="Act" Num="001" Year="05">'
+        f"<LawNum>{law_number}</LawNum><LawBody>{law_body}</LawBody></Law>"
+        "</LawFullText></ApplData></DataRoot>"
+    ).encode("utf-8")
+
+
+def article_xml(num: str, *paragraphs: str, caption: str = "") -> str:
+    """
+    Build the XML of an Article with a paragraph per sentence.
+    """
+    caption = f"<ArticleCaption>{caption}</ArticleCaption>" if caption else ""
+    title = "第" + num.replace("_", "条の") + ("条" if "_" not in num else "")
+    return (
+        f'<Article Num="{num}">{caption}<ArticleTitle>{title}</ArticleTitle>' + "".join(
+            f'<Paragraph Num="{index}"><ParagraphNum>{index if index > 1 else ""}</ParagraphNum>'
+            f"<ParagraphSentence><Sentence>{sentence}</Sentence></ParagraphSentence></Paragraph>"
+            for index, sentence in enumerate(paragraphs, 1)
+        ) + "</Article>"
+    )
+
+
+def law_text_body(law_id: str, sentence: str = "この法律は、試験のための法律である。") -> bytes:
+    """
+    Build a minimal response of `base.request_law_text`.
+    """
+    return full_text_body(
+        law_id,
+        f"<LawTitle>試験法</LawTitle><MainProvision>{article_xml('1', sentence)}</MainProvision>"
+    )
+
+
+def law_list_body(laws, category: int = 1) -> bytes:
+    """
+    Build a response of `base.request_laws_and_ordinances` from
+    (law ID, law name, law number, promulgation date) tuples.
+    """
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f"<DataRoot><Result><Code>0</Code><Message/></Result><ApplData><Category>{category}</Category>"
+        + "".join(
+            f"<LawNameListInfo><LawId>{law_id}</LawId><LawName>{name}</LawName>"
+            f"<LawNo>{number}</LawNo><PromulgationDate>{date}</PromulgationDate></LawNameListInfo>"
+            for law_id, name, number, date in laws
+        ) + "</ApplData></DataRoot>"
+    ).encode("utf-8")
+
+
+def updated_list_body(date: int, law_ids, enforcement_date: str = "") -> bytes:
+    """
+    Build a response of `base.request_list_of_updated_laws_and_ordinance`.
+    """
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f"<DataRoot><Result><Code>0</Code><Message/></Result><ApplData><Date>{date}</Date>"
+        + "".join(
+            "<LawNameListInfo><LawTypeName>法律</LawTypeName><LawNo>令和五年法律第一号</LawNo>"
+            "<LawName>試験法</LawName><LawNameKana>しけんほう</LawNameKana><OldLawName/>"
+            "<PromulgationDate>20230101</PromulgationDate><AmendName>試験法の一部を改正する法律"
+            "</AmendName><AmendNo>令和五年法律第二号</AmendNo><AmendPromulgationDate>20230201"
+            f"</AmendPromulgationDate><EnforcementDate>{enforcement_date}</EnforcementDate>"
+            f"<EnforcementComment/><LawId>{law_id}</LawId><LawUrl/><EnforcementFlg>0"
+            "</EnforcementFlg><AuthFlg>0</AuthFlg></LawNameListInfo>"
+            for law_id in law_ids
+        ) + "</ApplData></DataRoot>"
+    ).encode("utf-8")
+
+
+LAWS = [
+    ("129AC0000000089", "民法", "明治二十九年法律第八十九号", "18960427"),
+    ("132AC0000000048", "商法", "明治三十二年法律第四十八号", "18990309"),
+    ("329AC0000000162", "地方交付税法", "昭和二十九年法律第百六十二号", "19540531"),
+    ("415AC0000000057", "個人情報の保護に関する法律", "平成十五年法律第五十七号", "20030530"),
+    ("411AC0000000160", "試験法", "平成十一年法律第百六十号", "19991222"),
+    ("411AC1000000160", "試験法の特例に関する法律", "平成十一年法律第百六十号の二", "19991222"),
+    ("412M50000100127", "第３種郵便物の承認に関する省令（郵便承認省令）",
+     "平成十二年厚生省令第百二十七号", "20000801"),
+    ("321CONSTITUTION", "日本国憲法", "昭和二十一年憲法", "19461103"),
+    ("501AC0000000001", "令和元年の試験法", "令和元年法律第一号", "20190501"),
+]
+
+
+# An amending law: Article 1 amends another law and carries a new Article 5
+# and AppdxTable 1 of that law inside AmendProvision.
+AMENDING_LAW_BODY = (
+    "<LawTitle>改正法</LawTitle><MainProvision>"
+    '<Article Num="1"><ArticleTitle>第一条</ArticleTitle><Paragraph Num="1"><ParagraphNum/>'
+    "<ParagraphSentence><Sentence>試験法の一部を次のように改正する。</Sentence></ParagraphSentence>"
+    "<AmendProvision><AmendProvisionSentence><Sentence>第四条の次に次の一条を加える。</Sentence>"
+    "</AmendProvisionSentence><NewProvision>"
+    + article_xml("5", "改正される法律の条文", "改正される法律の第二項")
+    + '<AppdxTable Num="1"><AppdxTableTitle>別表第一</AppdxTableTitle></AppdxTable>'
+    "</NewProvision></AmendProvision></Paragraph></Article>"
+    + article_xml("2", "この法律の本文", "この法律の第二項")
+    + article_xml("2_2", "枝番号の条文")
+    + "</MainProvision>"
+    '<AppdxTable Num="1"><AppdxTableTitle>別表第一</AppdxTableTitle><TableStruct><Table>'
+    "<TableRow><TableColumn><Sentence>この法律の別表</Sentence></TableColumn></TableRow>"
+    "</Table></TableStruct></AppdxTable>"
+    '<AppdxTable Num="1_2"><AppdxTableTitle>別表第一の二</AppdxTableTitle><TableStruct><Table>'
+    "<TableRow><TableColumn><Sentence>枝番号の別表</Sentence></TableColumn></TableRow>"
+    "</Table></TableStruct></AppdxTable>"
+)
+
+
+@pytest.fixture
+def fake_server(monkeypatch):
+    """
+    A started FakeElawsServer that `base` sends its requests to.
+    """
+    with FakeElawsServer(latency=0.01, latency_per_request=0.0) as server:
+        monkeypatch.setattr(base, "BASE_URL", server.url)
+        yield server
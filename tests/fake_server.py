@@ -0,0 +1,329 @@
+"""fake_server
+
+Local fake of the e-Gov eLaw API with simulated latency and overload,
+for testing clients without access to the real servers, and a local
+stand-in of a Redis server for testing `cache_backends.RedisBackend`.
+
+Examples
+--------
+>>> from elaws_api_python import base
+>>> with FakeElawsServer({"/1/lawdata/129AC0000000089": body}) as server:
+...     base.BASE_URL = server.url
+...     text = base.request_law_text(1, "129AC0000000089")
+>>> with FakeRedisServer() as redis:
+...     backend = RedisBackend(redis.host, redis.port)
+"""
+
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from elaws_api_python.cache_backends import RedisError, read_reply
+
+LATENCY_SEC = 0.05
+LATENCY_PER_REQUEST_SEC = 0.01
+CAPACITY = 16
+
+
+class FakeElawsServer:
+    """
+    HTTP server answering registered paths like the e-Gov eLaw API.
+
+    Each response is delayed by `latency` plus `latency_per_request` for
+    every other request in flight, which mimics queueing at the server,
+    and requests beyond `capacity` in flight are answered with 429.
+
+    Attributes
+    ----------
+    responses : Dict[str, bytes]
+        Response bodies keyed by path, e.g. "/1/lawdata/129AC0000000089".
+    latency : float
+        Base latency in seconds.
+    latency_per_request : float
+        Additional latency per concurrent request in seconds.
+    capacity : int
+        Maximum number of requests in flight before answering 429.
+    requests : int
+        Number of requests received.
+    rejected : int
+        Number of requests answered with 429.
+    max_in_flight : int
+        Highest number of requests in flight observed.
+    """
+
+    def __init__(
+        self, responses: Optional[Dict[str, bytes]] = None,
+        latency: float = LATENCY_SEC,
+        latency_per_request: float = LATENCY_PER_REQUEST_SEC,
+        capacity: int = CAPACITY,
+        host: str = "127.0.0.1", port: int = 0
+    ) -> None:
+        """
+        Initialize the FakeElawsServer object. The server is not started yet.
+
+        Parameters
+        ----------
+        responses : Dict[str, bytes], optional
+            Response bodies keyed by path (URL-decoded, without the base URL).
+        latency : float, optional
+            Base latency in seconds. Default is LATENCY_SEC.
+        latency_per_request : float, optional
+            Additional latency per concurrent request. Default is LATENCY_PER_REQUEST_SEC.
+        capacity : int, optional
+            Maximum number of requests in flight. Default is CAPACITY.
+        host : str, optional
+            Host to bind. Default is "127.0.0.1".
+        port : int, optional
+            Port to bind. Default is 0 (any free port).
+        """
+        self.responses: Dict[str, bytes] = dict(responses or {})
+        self.latency: float = latency
+        self.latency_per_request: float = latency_per_request
+        self.capacity: int = capacity
+        self.requests: int = 0
+        self.rejected: int = 0
+        self.max_in_flight: int = 0
+        self._in_flight: int = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """
+        Base URL to set to `base.BASE_URL`.
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def add_law_text(self, law_id: str, body: bytes, version: int = 1) -> None:
+        """
+        Register the full text of a law/ordinance.
+        """
+        self.responses[f"/{version}/lawdata/{law_id}"] = body
+
+    def start(self) -> "FakeElawsServer":
+        """
+        Start serving on a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeElawsServer":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def _enter(self) -> Optional[int]:
+        with self._lock:
+            self.requests += 1
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                return None
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            return self._in_flight
+
+    def _exit(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # pylint: disable=invalid-name
+                in_flight = server._enter()
+                if in_flight is None:
+                    self._send(429, b"")
+                    return
+                try:
+                    time.sleep(server.latency + server.latency_per_request * (in_flight - 1))
+                    body = server.responses.get(unquote(self.path))
+                    if body is None:
+                        self._send(404, b"")
+                    else:
+                        self._send(200, body)
+                finally:
+                    server._exit()
+
+            def _send(self, status: int, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/xml")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                pass
+
+        return Handler
+
+
+class FakeRedisServer:
+    """
+    TCP server answering the subset of the Redis protocol used by
+    `cache_backends.RedisBackend`: PING, AUTH, SELECT, GET, SET (with EX,
+    PX and NX), DEL, EXISTS, DBSIZE and FLUSHDB.
+
+    Attributes
+    ----------
+    password : str, optional
+        Password required by AUTH, if any.
+    commands : int
+        Number of commands received.
+    """
+
+    def __init__(
+        self, password: Optional[str] = None,
+        host: str = "127.0.0.1", port: int = 0
+    ) -> None:
+        """
+        Initialize the FakeRedisServer object. The server is not started yet.
+
+        Parameters
+        ----------
+        password : str, optional
+            Password required by AUTH. Default is None.
+        host : str, optional
+            Host to bind. Default is "127.0.0.1".
+        port : int, optional
+            Port to bind. Default is 0 (any free port).
+        """
+        self.password: Optional[str] = password
+        self.commands: int = 0
+        # (value, expiry time or None) keyed by key, per database
+        self._dbs: Dict[int, Dict[bytes, Tuple[bytes, Optional[float]]]] = {}
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def host(self) -> str:
+        """
+        Host the server is bound to.
+        """
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        """
+        Port the server is bound to.
+        """
+        return self._server.server_address[1]
+
+    @property
+    def url(self) -> str:
+        """
+        URL to pass to `cache_backends.open_backend`.
+        """
+        auth = f":{self.password}@" if self.password is not None else ""
+        return f"redis://{auth}{self.host}:{self.port}/0"
+
+    def start(self) -> "FakeRedisServer":
+        """
+        Start serving on a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop serving.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeRedisServer":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def _execute(self, session: Dict, args: List[bytes]):
+        name = args[0].upper()
+        if name == b"AUTH":
+            if args[-1].decode("utf-8") != self.password:
+                raise RedisError("WRONGPASS invalid password")
+            session["authenticated"] = True
+            return b"OK"
+        if self.password is not None and not session.get("authenticated"):
+            raise RedisError("NOAUTH Authentication required.")
+        if name == b"PING":
+            return b"PONG"
+        if name == b"SELECT":
+            session["db"] = int(args[1])
+            return b"OK"
+        with self._lock:
+            db = self._dbs.setdefault(session.get("db", 0), {})
+            now = time.time()
+            for key in [key for key, (_, expires_at) in db.items()
+                        if expires_at is not None and expires_at <= now]:
+                del db[key]
+            if name == b"GET":
+                item = db.get(args[1])
+                return None if item is None else item[0]
+            if name == b"SET":
+                expires_at = None
+                options = [arg.upper() for arg in args[3:]]
+                if b"NX" in options and args[1] in db:
+                    return None
+                for unit, scale in ((b"EX", 1.0), (b"PX", 0.001)):
+                    if unit in options:
+                        expires_at = now + int(args[3 + options.index(unit) + 1]) * scale
+                db[args[1]] = (args[2], expires_at)
+                return b"OK"
+            if name == b"DEL":
+                return sum(db.pop(key, None) is not None for key in args[1:])
+            if name == b"EXISTS":
+                return sum(key in db for key in args[1:])
+            if name == b"DBSIZE":
+                return len(db)
+            if name == b"FLUSHDB":
+                db.clear()
+                return b"OK"
+        raise RedisError(f"ERR unknown command '{name.decode('utf-8', 'replace')}'")
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                session: Dict = {}
+                while True:
+                    try:
+                        args = read_reply(self.rfile)
+                    except (ConnectionError, ValueError):
+                        return
+                    with server._lock:
+                        server.commands += 1
+                    try:
+                        reply = server._execute(session, args)
+                    except RedisError as error:
+                        self.wfile.write(b"-%s\r\n" % str(error).encode("utf-8"))
+                        continue
+                    if isinstance(reply, int):
+                        self.wfile.write(b":%d\r\n" % reply)
+                    elif reply is None:
+                        self.wfile.write(b"$-1\r\n")
+                    elif reply in (b"OK", b"PONG"):
+                        self.wfile.write(b"+%s\r\n" % reply)
+                    else:
+                        self.wfile.write(b"$%d\r\n%s\r\n" % (len(reply), reply))
+
+        return Handler
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+import requests
+
+from elaws_api_python import base
+from elaws_api_python.cache import ResponseCache
+
+from conftest import law_text_body
+
+LAW_ID = "505AC0000000001"
+
+
+@pytest.fixture
+def law_server(fake_server):
+    fake_server.add_law_text(LAW_ID, law_text_body(LAW_ID))
+    return fake_server
+
+
+def test_stream_saves_the_body(law_server, tmp_path):
+    save_path = str(tmp_path / "law.xml")
+    chunks = list(base.stream_law_text(1, LAW_ID, chunk_size=100, save_path=save_path))
+    assert len(chunks) > 1
+    assert b"".join(chunks) == law_text_body(LAW_ID)
+    with open(save_path, "rb") as file_:
+        assert file_.read() == law_text_body(LAW_ID)
+    assert os.listdir(tmp_path) == ["law.xml"]
+
+
+def test_stream_removes_partial_files(law_server, tmp_path):
+    save_path = str(tmp_path / "law.xml")
+    chunks = base.stream_law_text(1, LAW_ID, chunk_size=100, save_path=save_path)
+    next(chunks)
+    assert os.path.exists(save_path + ".part")
+    chunks.close()
+    assert os.listdir(tmp_path) == []
+
+    with pytest.raises(requests.HTTPError):
+        list(base.stream_law_text(1, "505AC0000000999", save_path=save_path))
+    assert os.listdir(tmp_path) == []
+
+
+def test_stream_with_cache(law_server):
+    cache = ResponseCache(max_age=60.0)
+    url = base.build_law_text_url(1, LAW_ID)
+    body = b"".join(base.stream_law_text(1, LAW_ID, chunk_size=100, cache=cache))
+    assert body == law_text_body(LAW_ID)
+    assert cache.get(url).body == body
+    assert law_server.requests == 1
+
+    # a fresh entry is served without a request, streamed or not
+    assert b"".join(base.stream_law_text(1, LAW_ID, chunk_size=100, cache=cache)) == body
+    assert base.request_law_text(1, LAW_ID, cache=cache) == body.decode("utf-8")
+    assert law_server.requests == 1
+
+
+def test_streamed_and_plain_requests_cache_the_same_encoding(law_server):
+    url = base.build_law_text_url(1, LAW_ID)
+    streamed, plain = ResponseCache(), ResponseCache()
+    list(base.stream_law_text(1, LAW_ID, cache=streamed))
+    base.request_law_text(1, LAW_ID, cache=plain)
+    assert streamed.get(url).encoding == plain.get(url).encoding
+    assert streamed.get(url).text == plain.get(url).text == law_text_body(LAW_ID).decode("utf-8")
@@ -0,0 +1,119 @@
+import requests
+
+from elaws_api_python.batch import (
+    RESULT_NOT_FOUND, ContentSpec, acquire_law_contents, appdx_table_num, article_num,
+    extract_content, number_num, plan_batch
+)
+from elaws_api_python.classes.law_text_response import LawTextResponse
+
+from conftest import AMENDING_LAW_BODY, full_text_body
+
+LAW_ID = "505AC0000000001"
+OTHER_LAW_ID = "505AC0000000002"
+
+
+def _law_text() -> LawTextResponse:
+    return LawTextResponse(full_text_body(LAW_ID, AMENDING_LAW_BODY).decode("utf-8"))
+
+
+def _texts(response) -> list:
+    return [elem.text for elem in response.appl_data.law_contents.iter("Sentence")]
+
+
+def _content_body(law_id: str, article: str, sentence: str) -> bytes:
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        "<DataRoot><Result><Code>0</Code><Message/></Result><ApplData>"
+        f"<LawId>{law_id}</LawId><LawNum>令和五年法律第二号</LawNum>"
+        f"<Article>{article}</Article><Paragraph/><AppdxTable/><LawContents>"
+        f'<Article Num="{article}"><ArticleTitle>第{article}条</ArticleTitle>'
+        f'<Paragraph Num="1"><ParagraphNum/><ParagraphSentence><Sentence>{sentence}</Sentence>'
+        "</ParagraphSentence></Paragraph></Article></LawContents></ApplData></DataRoot>"
+    ).encode("utf-8")
+
+
+def test_normalize_numbers():
+    assert article_num("第三条の二") == "3_2"
+    assert article_num("３の２") == "3_2"
+    assert article_num("709") == "709"
+    assert article_num("附則") == "附則"
+    assert number_num("第二項") == "2"
+    assert number_num("２") == "2"
+    assert appdx_table_num("別表第一の二") == "1_2"
+    assert appdx_table_num("別表第一") == "1"
+    assert appdx_table_num(None) is None
+
+
+def test_extract_skips_amend_provision():
+    law_text = _law_text()
+    article = extract_content(law_text, ContentSpec(LAW_ID, "第二条"))
+    assert article.result.code == 0
+    assert _texts(article) == ["この法律の本文", "この法律の第二項"]
+
+    # Article 5 exists only in the law being amended
+    missing = extract_content(law_text, ContentSpec(LAW_ID, "5"))
+    assert missing.result.code == RESULT_NOT_FOUND
+    assert missing.appl_data.law_contents is None
+    missing = extract_content(law_text, ContentSpec(LAW_ID, "5", "2"))
+    assert missing.result.code == RESULT_NOT_FOUND
+
+    paragraph = extract_content(law_text, ContentSpec(LAW_ID, paragraph="第二項"))
+    assert _texts(paragraph) == ["この法律の第二項"]
+    table = extract_content(law_text, ContentSpec(LAW_ID, appdx_table="別表第一"))
+    assert _texts(table) == ["この法律の別表"]
+    table = extract_content(law_text, ContentSpec(LAW_ID, appdx_table="別表第一の二"))
+    assert _texts(table) == ["枝番号の別表"]
+    branch = extract_content(law_text, ContentSpec(LAW_ID, "第二条の二"))
+    assert _texts(branch) == ["枝番号の条文"]
+
+
+def test_extract_leaves_the_full_text_intact():
+    law_text = _law_text()
+    first = extract_content(law_text, ContentSpec(LAW_ID, "2"))
+    second = extract_content(law_text, ContentSpec(LAW_ID, "2"))
+    assert _texts(first) == _texts(second) == ["この法律の本文", "この法律の第二項"]
+    assert law_text.law_full_text.find("Law/LawBody/MainProvision/Article[@Num='2']") is not None
+
+
+def test_plan_batch():
+    specs = [ContentSpec(LAW_ID, str(number)) for number in range(1, 7)]
+    specs += [ContentSpec(OTHER_LAW_ID, "1"), ContentSpec(OTHER_LAW_ID, "1")]
+    assert plan_batch(specs) == {LAW_ID: True, OTHER_LAW_ID: False}
+    assert plan_batch(specs, full_text_cost=6.0) == {LAW_ID: False, OTHER_LAW_ID: False}
+    assert plan_batch(specs, full_text_cost=0.5) == {LAW_ID: True, OTHER_LAW_ID: True}
+
+
+def test_acquire_law_contents(fake_server):
+    fake_server.add_law_text(LAW_ID, full_text_body(LAW_ID, AMENDING_LAW_BODY))
+    fake_server.responses[f"/1/articles;lawId={OTHER_LAW_ID};article=1;"] = \
+        _content_body(OTHER_LAW_ID, "1", "別の法律の第一条")
+    specs = [
+        (LAW_ID, "2"), (OTHER_LAW_ID, "1"), (LAW_ID, None, None, "別表第一"),
+        (LAW_ID, "5"), (LAW_ID, "2"), (LAW_ID, "2_2"),
+    ]
+    results = acquire_law_contents(1, specs, full_text_cost=1.0)
+
+    # one full text for LAW_ID and one content request for OTHER_LAW_ID
+    assert fake_server.requests == 2
+    assert [result.result.code for result in results] == [0, 0, 0, RESULT_NOT_FOUND, 0, 0]
+    assert _texts(results[0]) == _texts(results[4]) == ["この法律の本文", "この法律の第二項"]
+    assert _texts(results[1]) == ["別の法律の第一条"]
+    assert _texts(results[2]) == ["この法律の別表"]
+    assert _texts(results[5]) == ["枝番号の条文"]
+    assert results[1].appl_data.law_id == OTHER_LAW_ID
+
+
+def test_acquire_law_contents_errors(fake_server):
+    fake_server.add_law_text(LAW_ID, full_text_body(LAW_ID, AMENDING_LAW_BODY))
+    specs = [(LAW_ID, "2"), (OTHER_LAW_ID, "1"), (LAW_ID, "2_2")]
+    results = acquire_law_contents(1, specs, full_text_cost=1.0, return_exceptions=True)
+    assert isinstance(results[1], requests.HTTPError)
+    assert results[1].response.status_code == 404
+    assert _texts(results[2]) == ["枝番号の条文"]
+
+    try:
+        acquire_law_contents(1, specs, full_text_cost=1.0)
+    except requests.HTTPError as error:
+        assert error.response.status_code == 404
+    else:
+        raise AssertionError("HTTPError is not raised.")
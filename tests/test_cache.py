@@ -0,0 +1,65 @@
+import os
+import time
+
+from elaws_api_python.cache import CacheEntry, ResponseCache, compute_digest
+
+URL = "http://example.com/1/lawdata/505AC0000000001"
+
+
+def test_update_and_load(tmp_path):
+    directory = str(tmp_path / "cache")
+    cache = ResponseCache(directory)
+    assert cache.get(URL) is None
+    entry = cache.update(URL, "<DataRoot>本文</DataRoot>".encode("utf-8"), etag='"v1"',
+                         last_modified="Mon, 01 Apr 2024 00:00:00 GMT")
+    assert entry.text == "<DataRoot>本文</DataRoot>"
+    assert entry.conditional_headers() == {
+        "If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Apr 2024 00:00:00 GMT"}
+
+    loaded = ResponseCache(directory).get(URL)
+    assert loaded.body == entry.body
+    assert loaded.etag == '"v1"'
+    assert loaded.digest == compute_digest(entry.body)
+    assert not [name for name in os.listdir(directory) if name.endswith(".part")]
+
+
+def test_unchanged_body_keeps_the_parsed_object(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache"))
+    entry = cache.update(URL, b"<DataRoot/>", etag='"v1"')
+    entry.parsed = object()
+    same = cache.update(URL, b"<DataRoot/>", etag='"v2"')
+    assert same is entry and same.etag == '"v2"'
+    changed = cache.update(URL, b"<DataRoot>new</DataRoot>")
+    assert changed is not entry and changed.parsed is None
+
+
+def test_revalidated_is_persisted(tmp_path):
+    directory = str(tmp_path / "cache")
+    cache = ResponseCache(directory, max_age=60.0)
+    entry = cache.update(URL, b"<DataRoot/>", etag='"v1"')
+    entry.fetched_at = time.time() - 3600.0
+    assert not cache.is_fresh(entry)
+    assert cache.revalidated(URL) is entry
+    assert cache.is_fresh(entry)
+    # a restarted process sees the entry as fresh, too
+    restarted = ResponseCache(directory, max_age=60.0)
+    assert restarted.is_fresh(restarted.get(URL))
+    assert cache.revalidated("http://example.com/other") is None
+
+
+def test_corrupt_files_are_misses(tmp_path):
+    directory = str(tmp_path / "cache")
+    ResponseCache(directory).update(URL, b"<DataRoot/>")
+    body_path = [os.path.join(directory, name) for name in os.listdir(directory)
+                 if name.endswith(".xml")][0]
+    with open(body_path, "wb") as file_:
+        file_.write(b"<DataRoot")
+    assert ResponseCache(directory).get(URL) is None
+
+
+def test_entry_bytes_round_trip():
+    entry = CacheEntry(b"<DataRoot/>", "utf-8", '"v1"', None, compute_digest(b"<DataRoot/>"),
+                       fetched_at=123.0)
+    restored = CacheEntry.from_bytes(entry.to_bytes())
+    assert (restored.body, restored.etag, restored.last_modified, restored.digest,
+            restored.fetched_at) == (entry.body, '"v1"', None, entry.digest, 123.0)
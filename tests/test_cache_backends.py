@@ -0,0 +1,147 @@
+import socket
+import time
+
+import pytest
+
+from elaws_api_python.cache import ResponseCache
+from elaws_api_python.cache_backends import (
+    FileSystemBackend, RedisBackend, RedisError, SQLiteBackend, open_backend
+)
+from fake_server import FakeRedisServer
+
+BACKENDS = ["file", "sqlite", "redis"]
+
+
+@pytest.fixture
+def redis_server():
+    with FakeRedisServer() as server:
+        yield server
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request, tmp_path):
+    if request.param == "file":
+        backend_ = FileSystemBackend(str(tmp_path / "cache"))
+    elif request.param == "sqlite":
+        backend_ = SQLiteBackend(str(tmp_path / "cache.db"))
+    else:
+        server = request.getfixturevalue("redis_server")
+        backend_ = RedisBackend(server.host, server.port)
+    with backend_:
+        yield backend_
+
+
+def test_round_trip(backend):
+    compressible = "第一条　この法律は、".encode("utf-8") * 100
+    backend.set("text", compressible)
+    backend.set("binary", bytes(range(256)))
+    backend.set("empty", b"")
+    assert backend.get("text") == compressible
+    assert backend.get("binary") == bytes(range(256))
+    assert backend.get("empty") == b""
+    assert backend.get("missing") is None
+    backend.set("text", b"replaced")
+    assert backend.get("text") == b"replaced"
+    backend.delete("text")
+    backend.delete("text")
+    assert backend.get("text") is None
+
+
+def test_ttl(backend):
+    backend.set("short", b"value", ttl=0.2)
+    backend.set("long", b"value", ttl=60.0)
+    backend.set("forever", b"value")
+    assert backend.get("short") == b"value"
+    time.sleep(0.3)
+    assert backend.get("short") is None
+    assert backend.get("long") == b"value"
+    assert backend.get("forever") == b"value"
+
+
+def test_sqlite_purge(tmp_path):
+    with SQLiteBackend(str(tmp_path / "cache.db")) as backend:
+        backend.set("short", b"value", ttl=0.01)
+        backend.set("forever", b"value")
+        time.sleep(0.05)
+        assert backend.purge() == 1
+        assert backend.get("forever") == b"value"
+
+
+def test_shared_between_instances(backend):
+    if isinstance(backend, FileSystemBackend):
+        other = FileSystemBackend(backend.directory)
+    elif isinstance(backend, SQLiteBackend):
+        other = SQLiteBackend(backend.path)
+    else:
+        other = RedisBackend(backend.host, backend.port)
+    with other:
+        backend.set("key", b"value")
+        assert other.get("key") == b"value"
+
+
+def test_redis_auth():
+    with FakeRedisServer(password="secret") as server:
+        with RedisBackend(server.host, server.port, password="secret") as backend:
+            backend.set("key", b"value")
+            assert backend.get("key") == b"value"
+        with open_backend(server.url) as backend:
+            assert backend.get("key") == b"value"
+        with RedisBackend(server.host, server.port) as backend:
+            with pytest.raises(RedisError, match="NOAUTH"):
+                backend.get("key")
+        with RedisBackend(server.host, server.port, password="wrong") as backend:
+            with pytest.raises(RedisError, match="WRONGPASS"):
+                backend.get("key")
+            # a connection that failed to authenticate is not kept
+            assert backend._socket is None
+            with pytest.raises(RedisError, match="WRONGPASS"):
+                backend.get("key")
+
+
+def test_redis_select_and_prefix(redis_server):
+    with RedisBackend(redis_server.host, redis_server.port, db=1) as db1, \
+            RedisBackend(redis_server.host, redis_server.port, db=0) as db0, \
+            RedisBackend(redis_server.host, redis_server.port, prefix="other:") as other:
+        db1.set("key", b"one")
+        db0.set("key", b"zero")
+        assert db1.get("key") == b"one"
+        assert db0.get("key") == b"zero"
+        assert other.get("key") is None
+        assert db0.execute("EXISTS", "elaws:key") == 1
+
+
+def test_redis_reconnects(redis_server):
+    with RedisBackend(redis_server.host, redis_server.port) as backend:
+        backend.set("key", b"value")
+        # the connection is broken, e.g. by a server restart or an idle timeout
+        backend._socket.shutdown(socket.SHUT_RDWR)
+        assert backend.get("key") == b"value"
+        backend.close()
+        assert backend.get("key") == b"value"
+
+
+def test_redis_unreachable():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    with RedisBackend("127.0.0.1", port, timeout=1.0) as backend:
+        with pytest.raises(OSError):
+            backend.get("key")
+        # the cache falls back to its own entries
+        cache = ResponseCache(backend=backend)
+        assert cache.get("http://example.com/") is None
+        entry = cache.update("http://example.com/", b"<DataRoot/>")
+        assert cache.get("http://example.com/") is entry
+
+
+def test_open_backend(tmp_path, redis_server):
+    with open_backend(f"file://{tmp_path / 'cache'}") as backend:
+        assert isinstance(backend, FileSystemBackend)
+    with open_backend(f"sqlite:///{tmp_path / 'cache.db'}") as backend:
+        assert isinstance(backend, SQLiteBackend)
+    with open_backend(redis_server.url) as backend:
+        assert isinstance(backend, RedisBackend)
+        backend.set("key", b"value")
+        assert backend.get("key") == b"value"
+    with pytest.raises(ValueError):
+        open_backend("memcached://127.0.0.1:11211")
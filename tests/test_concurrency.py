@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from elaws_api_python.base import request_law_text
+from elaws_api_python.concurrency import AdaptiveLimiter, is_overload_error
+
+from conftest import law_text_body
+
+LAW_ID = "505AC0000000001"
+
+
+def _request(limiter: AdaptiveLimiter) -> bool:
+    try:
+        limiter.call(request_law_text, 1, LAW_ID, 5.0)
+    except requests.HTTPError as error:
+        assert is_overload_error(error)
+        return False
+    return True
+
+
+def test_limit_decreases_on_429(fake_server):
+    fake_server.add_law_text(LAW_ID, law_text_body(LAW_ID))
+    fake_server.latency = 0.2
+    fake_server.capacity = 2
+    limiter = AdaptiveLimiter(initial_limit=8, max_limit=8)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: _request(limiter), range(8)))
+
+    assert fake_server.rejected > 0
+    assert results.count(False) == fake_server.rejected
+    metrics = limiter.metrics()
+    assert metrics.overloaded == fake_server.rejected
+    assert metrics.limit < 8
+
+
+def test_limit_recovers_after_overload(fake_server):
+    fake_server.add_law_text(LAW_ID, law_text_body(LAW_ID))
+    fake_server.latency = 0.2
+    fake_server.capacity = 1
+    limiter = AdaptiveLimiter(initial_limit=8, max_limit=8)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: _request(limiter), range(8)))
+    reduced = limiter.limit
+    assert reduced < 8
+
+    # the server recovers: successful requests raise the limit again
+    fake_server.latency = 0.01
+    fake_server.capacity = 64
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: _request(limiter), range(60)))
+
+    assert all(results)
+    assert limiter.limit > reduced
+    assert limiter.metrics().in_flight == 0
+
+
+def test_limit_bounds_requests_in_flight(fake_server):
+    fake_server.add_law_text(LAW_ID, law_text_body(LAW_ID))
+    fake_server.latency = 0.05
+    limiter = AdaptiveLimiter(initial_limit=3, max_limit=3)
+
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        results = list(executor.map(lambda _: _request(limiter), range(24)))
+
+    assert all(results)
+    assert fake_server.max_in_flight <= 3
+
+
+def _http_error(status_code: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status_code
+    return requests.HTTPError(response=response)
+
+
+def test_overload_errors():
+    for status_code in (429, 500, 502, 503, 504):
+        assert is_overload_error(_http_error(status_code))
+    for status_code in (400, 404):
+        assert not is_overload_error(_http_error(status_code))
+    assert is_overload_error(requests.Timeout())
+    assert not is_overload_error(ValueError())
@@ -0,0 +1,107 @@
+import pytest
+
+from elaws_api_python.classes.law_text_response import LawTextResponse
+from elaws_api_python.diff import (
+    ADDED, MODIFIED, REMOVED, article_texts, diff_law_texts, inline_diff
+)
+from elaws_api_python.records import ProvisionRecord
+
+from conftest import article_xml, full_text_body
+
+LAW_ID = "505AC0000000001"
+
+
+def _law_text(*articles: str, law_id: str = LAW_ID) -> LawTextResponse:
+    body = "<LawTitle>試験法</LawTitle><MainProvision>" + "".join(articles) + "</MainProvision>"
+    return LawTextResponse(full_text_body(law_id, body).decode("utf-8"))
+
+
+def _changes(diff) -> list:
+    return [(unit.change, unit.kind, unit.key) for unit in diff]
+
+
+def _record(num: str, text: str, caption: str = "（目的）", item: str = None) -> ProvisionRecord:
+    path = (("MainProvision", ""), ("Article", "1"), ("Paragraph", num))
+    titles = ("第一条", num)
+    if item is not None:
+        path += (("Item", item),)
+        titles += (item,)
+    return ProvisionRecord(LAW_ID, path, titles, caption, text)
+
+
+def test_inline_diff():
+    assert inline_diff("甲は乙に", "甲は丙に") == "甲は[-乙-]{+丙+}に"
+    assert inline_diff("同じ", "同じ") == "同じ"
+    assert inline_diff("", "追加") == "{+追加+}"
+
+
+def test_identical_versions():
+    old = _law_text(article_xml("1", "本文"), article_xml("2", "本文"))
+    new = _law_text(article_xml("1", "本文"), article_xml("2", "本文"))
+    diff = diff_law_texts(old, new)
+    assert not diff and len(diff) == 0
+
+
+def test_added_removed_and_modified():
+    old = _law_text(
+        article_xml("1", "第一項", "第二項"), article_xml("2", "削られる条"),
+        article_xml("3", "第一項", "削られる項"))
+    new = _law_text(
+        article_xml("1", "改正された第一項", "第二項", "追加された第三項"),
+        article_xml("3", "第一項"), article_xml("3_2", "追加された条"))
+    diff = diff_law_texts(old, new)
+    assert _changes(diff) == [
+        (MODIFIED, "Paragraph", "MainProvision/Article[1]/Paragraph[1]"),
+        (ADDED, "Paragraph", "MainProvision/Article[1]/Paragraph[3]"),
+        (REMOVED, "Paragraph", "MainProvision/Article[3]/Paragraph[2]"),
+        (ADDED, "Article", "MainProvision/Article[3_2]"),
+        (REMOVED, "Article", "MainProvision/Article[2]"),
+    ]
+    modified = diff.modified[0]
+    assert (modified.old_text, modified.new_text) == ("第一項", "改正された第一項")
+    assert modified.text_diff == "{+改正された+}第一項"
+    assert modified.article_key == "MainProvision/Article[1]"
+    assert [unit.key for unit in diff.added] == [
+        "MainProvision/Article[1]/Paragraph[3]", "MainProvision/Article[3_2]"]
+    assert diff.removed[1].old_text == "削られる条"
+    assert diff.changed_article_keys == {
+        "MainProvision/Article[1]", "MainProvision/Article[2]",
+        "MainProvision/Article[3]", "MainProvision/Article[3_2]"}
+    assert diff.law_id == LAW_ID
+
+
+def test_article_caption_is_compared_in_the_header():
+    old = _law_text(article_xml("1", "本文", "第二項", caption="（目的）"))
+    new = _law_text(article_xml("1", "本文", "第二項", caption="（趣旨）"))
+    diff = diff_law_texts(old, new)
+    assert _changes(diff) == [(MODIFIED, "Article", "MainProvision/Article[1]")]
+    assert diff.modified[0].text_diff == "第1条（[-目的-]{+趣旨+}）"
+
+
+def test_unit_caption_change_is_a_modification():
+    old = [_record("1", "本文"), _record("2", "特例", caption="（特例）")]
+    new = [_record("1", "本文"), _record("2", "特例", caption="（例外）")]
+    diff = diff_law_texts(old, new)
+    assert _changes(diff) == [(MODIFIED, "Paragraph", "MainProvision/Article[1]/Paragraph[2]")]
+    assert diff.modified[0].old_text == diff.modified[0].new_text == "特例"
+    assert diff.modified[0].text_diff == "（[-特-]例{+外+}）"
+
+
+def test_reordered_unit_is_a_modification():
+    old = [_record("1", "本文"), _record("1", "一号", item="1"), _record("1", "二号", item="2")]
+    new = [_record("1", "本文"), _record("1", "二号", item="2"), _record("1", "一号", item="1")]
+    diff = diff_law_texts(old, new)
+    assert len(diff) == 1
+    assert diff.modified[0].kind == "Item"
+    assert diff.modified[0].text_diff is None
+
+
+def test_different_laws_are_rejected():
+    with pytest.raises(ValueError):
+        diff_law_texts(_law_text(article_xml("1", "本文")),
+                       _law_text(article_xml("1", "本文"), law_id="505AC0000000002"))
+
+
+def test_article_texts():
+    texts = article_texts(_law_text(article_xml("1", "第一項", "第二項", caption="（目的）")))
+    assert texts == {"MainProvision/Article[1]": ("第1条（目的）", "第一項\n第二項")}
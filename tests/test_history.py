@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+from elaws_api_python.classes.law_text_response import LawTextResponse
+from elaws_api_python.history import HistoryStore, LawHistory
+
+from conftest import article_xml, full_text_body, updated_list_body
+
+LAW_ID = "505AC0000000001"
+OTHER_LAW_ID = "505AC0000000002"
+
+
+def _law_text(*articles: str, law_id: str = LAW_ID) -> LawTextResponse:
+    body = "<LawTitle>試験法</LawTitle><MainProvision>" + "".join(articles) + "</MainProvision>"
+    return LawTextResponse(full_text_body(law_id, body).decode("utf-8"))
+
+
+V1 = (article_xml("1", "初版の第一条"), article_xml("2", "初版の第二条"))
+V2 = (article_xml("1", "改正後の第一条"), article_xml("2", "初版の第二条"),
+      article_xml("3", "新設の第三条"))
+V3 = (article_xml("1", "改正後の第一条"), article_xml("3", "新設の第三条"))
+
+
+def _history() -> LawHistory:
+    history = LawHistory(LAW_ID)
+    history.apply(_law_text(*V1), "2020-04-01")
+    history.apply(_law_text(*V2), "20220401")
+    history.apply(_law_text(*V3), "2024-04-01")
+    return history
+
+
+def test_point_in_time_queries():
+    history = _history()
+    assert history.latest_date == "2024-04-01"
+    assert history.article_at("1", "2021-01-01").text == "初版の第一条"
+    assert history.article_at("1", "2022-04-01").text == "改正後の第一条"
+    assert history.article_at("1", "2019-12-31") is None
+    assert history.article_at("3", "2021-01-01") is None
+    assert history.article_at("2", "2023-01-01").text == "初版の第二条"
+    assert history.article_at("2", "2024-04-01") is None
+    versions = history.versions("1")
+    assert [(version.start, version.end) for version in versions] == \
+        [("2020-04-01", "2022-04-01"), ("2022-04-01", None)]
+    assert [version.text for version in history.versions("2")] == ["初版の第二条", None]
+    assert sorted(version.key for version in history.articles_at("2023-01-01")) == [
+        "MainProvision/Article[1]", "MainProvision/Article[2]", "MainProvision/Article[3]"]
+    assert history.versions("99") == []
+
+
+def test_apply_returns_the_diff():
+    history = LawHistory(LAW_ID)
+    assert len(history.apply(_law_text(*V1), "2020-04-01").added) == 2
+    diff = history.apply(_law_text(*V2), "2022-04-01")
+    assert diff.changed_article_keys == {"MainProvision/Article[1]", "MainProvision/Article[3]"}
+    assert not history.apply(_law_text(*V2), "2022-04-01")
+    with pytest.raises(ValueError):
+        history.apply(_law_text(*V1), "2021-01-01")
+
+
+def test_dict_round_trip():
+    history = _history()
+    restored = LawHistory.from_dict(LAW_ID, history.to_dict())
+    assert restored.latest_date == history.latest_date
+    for key in history.article_keys:
+        assert restored.versions(key) == history.versions(key)
+    # the latest records are kept, so the next version is diffed against them
+    assert not restored.apply(_law_text(*V3), "2025-01-01")
+
+
+def test_store_saves_each_law(tmp_path):
+    directory = str(tmp_path / "history")
+    store = HistoryStore(directory)
+    store.apply(LAW_ID, _law_text(*V1), "2020-04-01")
+    store.apply(OTHER_LAW_ID, _law_text(*V1, law_id=OTHER_LAW_ID), "2020-04-01")
+    assert store.save() == 2
+    assert sorted(os.listdir(directory)) == [f"{LAW_ID}.json", f"{OTHER_LAW_ID}.json"]
+
+    store.apply(LAW_ID, _law_text(*V2), "2022-04-01")
+    mtime = os.stat(os.path.join(directory, f"{OTHER_LAW_ID}.json")).st_mtime_ns
+    assert store.save() == 1
+    assert os.stat(os.path.join(directory, f"{OTHER_LAW_ID}.json")).st_mtime_ns == mtime
+    assert store.save() == 0
+
+    restored = HistoryStore(directory)
+    assert sorted(restored.law_ids) == [LAW_ID, OTHER_LAW_ID]
+    assert LAW_ID in restored and "505AC0000000003" not in restored
+    assert restored.article_text(LAW_ID, "3", "2022-04-01") == "新設の第三条"
+    assert restored.article_text(OTHER_LAW_ID, "1", "2022-04-01") == "初版の第一条"
+    assert restored.article_text("505AC0000000003", "1", "2022-04-01") is None
+    with pytest.raises(ValueError):
+        HistoryStore().save()
+
+
+def test_sync(fake_server, tmp_path):
+    fake_server.responses["/1/updatelawlists/20240401"] = \
+        updated_list_body(20240401, [LAW_ID, OTHER_LAW_ID], enforcement_date="20300101")
+    fake_server.responses["/1/updatelawlists/20230401"] = updated_list_body(20230401, [LAW_ID])
+    fake_server.add_law_text(LAW_ID, full_text_body(
+        LAW_ID, "<LawTitle>試験法</LawTitle><MainProvision>" + "".join(V2) + "</MainProvision>"))
+    store = HistoryStore(str(tmp_path / "history"))
+
+    result = store.sync(1, 20240401, parse_workers=0)
+    # dated by the update list, not by the enforcement date in the future
+    assert list(result.diffs) == [LAW_ID]
+    assert store.history(LAW_ID).latest_date == "2024-04-01"
+    # a failing law is reported and does not stop the others
+    assert list(result.errors) == [OTHER_LAW_ID]
+    assert HistoryStore(str(tmp_path / "history")).article_text(
+        LAW_ID, "3", "2024-04-01") == "新設の第三条"
+
+    # an older list is not applied over a newer version
+    result = store.sync(1, 20230401, parse_workers=0)
+    assert result.diffs == {}
+    assert isinstance(result.errors[LAW_ID], ValueError)
+    assert store.history(LAW_ID).latest_date == "2024-04-01"
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+import pytest
+
+from elaws_api_python import classes
+
+
+def _imported_after(statement: str) -> set:
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return set(output.split())
+
+
+def test_classes_are_loaded_on_first_access():
+    assert classes.ListOfLaws.__name__ == "ListOfLaws"
+    assert "LawTextResponse" in dir(classes)
+    with pytest.raises(AttributeError):
+        classes.NoSuchClass  # pylint: disable=pointless-statement
+
+
+def test_importing_a_class_does_not_load_the_others():
+    modules = _imported_after("from elaws_api_python.classes import ListOfLaws")
+    assert "elaws_api_python.classes.laws_and_ordinances_response" in modules
+    assert "elaws_api_python.classes.law_text_response" not in modules
+    assert "requests" not in modules
+
+
+def test_importing_base_does_not_load_requests():
+    assert "requests" not in _imported_after("import elaws_api_python.base")
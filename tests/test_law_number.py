@@ -0,0 +1,53 @@
+from elaws_api_python.classes.laws_and_ordinances_response import ListOfLaws
+from elaws_api_python.law_number import LawNumber, parse_law_number, resolve_law_id
+
+from conftest import LAWS, law_list_body
+
+
+def test_parse_law_number():
+    assert parse_law_number("昭和二十九年法律第百六十二号") == LawNumber(3, 29, "法律", 162)
+    assert parse_law_number("昭和29年法律第162号") == LawNumber(3, 29, "法律", 162)
+    assert parse_law_number("昭和２９年法律第１６２号") == LawNumber(3, 29, "法律", 162)
+    assert parse_law_number("令和元年法律第一号") == LawNumber(5, 1, "法律", 1)
+    assert parse_law_number("平成十二年八月一日厚生省令第百二十七号") == \
+        LawNumber(4, 12, "厚生省令", 127)
+    assert parse_law_number("昭和二十一年憲法") == LawNumber(3, 21, "憲法", None)
+    assert parse_law_number("1954年法律第162号") == LawNumber(None, 1954, "法律", 162)
+    assert parse_law_number("民法") is None
+    assert parse_law_number("") is None
+
+
+def test_parse_branch_number():
+    parsed = parse_law_number("平成十一年法律第百六十号の二")
+    assert parsed == LawNumber(4, 11, "法律", 160, 2)
+    assert parsed.law_type == "法律"
+    assert parsed.key == (4, 11, "法律", 160, 2)
+    assert str(parsed) == "平成11年法律第160号の2"
+    assert parse_law_number("1999年法律第160号の2") == LawNumber(None, 1999, "法律", 160, 2)
+    assert parse_law_number("平成十一年法律第百六十号").key != parsed.key
+
+
+def test_keys_and_str():
+    parsed = parse_law_number("昭和二十九年法律第百六十二号")
+    assert parsed.western_year == 1954
+    assert parsed.key == (3, 29, "法律", 162, None)
+    assert parsed.western_key == (1954, "法律", 162, None)
+    assert str(parsed) == "昭和29年法律第162号"
+    assert parse_law_number(str(parsed)) == parsed
+    western = parse_law_number("2019年法律第1号")
+    assert western.key is None
+    assert western.western_key == parse_law_number("令和元年法律第一号").western_key
+
+
+def test_find_law_id_by_law_number():
+    law_list = ListOfLaws(law_list_body(LAWS).decode("utf-8"))
+    assert law_list.find_law_id_by_law_number("昭和29年法律第162号") == "329AC0000000162"
+    assert law_list.find_law_id_by_law_number("1896年法律第89号") == "129AC0000000089"
+    assert law_list.find_law_id_by_law_number("平成十一年法律第百六十号") == "411AC0000000160"
+    assert law_list.find_law_id_by_law_number("平成11年法律第160号の2") == "411AC1000000160"
+    assert law_list.find_law_id_by_law_number("昭和二十一年憲法") == "321CONSTITUTION"
+    assert law_list.find_law_id_by_law_number("令和元年法律第一号") == "501AC0000000001"
+    assert law_list.find_law_id_by_law_number("昭和29年法律第163号") is None
+    assert law_list.find_law_id_by_law_number("民法") is None
+    assert resolve_law_id("平成十五年法律第五十七号", law_list) == "415AC0000000057"
+    assert resolve_law_id("415AC0000000057", law_list) == "415AC0000000057"
@@ -0,0 +1,161 @@
+import multiprocessing
+import os
+import signal
+import time
+
+import pytest
+
+from elaws_api_python.blob_store import LawTextStore
+from elaws_api_python.mirror import (
+    STATUS_DONE, HashRing, MirrorCoordinator, MirrorWorker, SQLiteWorkQueue, WorkQueue
+)
+
+from conftest import law_text_body
+
+LAW_IDS = [f"505AC0000000{number:03d}" for number in range(1, 61)]
+
+requires_fork = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="the workers are forked to share the fake server's URL"
+)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue_ = SQLiteWorkQueue(str(tmp_path / "mirror.sqlite"))
+    yield queue_
+    queue_.close()
+
+
+def test_work_queue_is_abstract():
+    with pytest.raises(TypeError):
+        WorkQueue()  # pylint: disable=abstract-class-instantiated
+
+
+def test_lease_complete_and_fail(queue):
+    assert queue.enqueue([("A", 0), ("B", 1), ("C", 1)]) == 3
+    assert queue.enqueue([("A", 0)]) == 0
+    tasks = queue.lease("w1", 2, 60.0, shards=[1])
+    assert [(task.law_id, task.attempts) for task in tasks] == [("B", 1), ("C", 1)]
+    assert [task.law_id for task in queue.lease("w2", 5, 60.0)] == ["A"]
+    assert queue.lease("w3", 5, 60.0) == []
+
+    # only the holder of the lease can complete it
+    assert queue.complete("w2", [("B", "digest")]) == 0
+    assert queue.complete("w1", [("B", "digest")]) == 1
+    queue.fail("w1", "C", "error", max_attempts=2)
+    assert queue.counts() == {"pending": 1, "leased": 1, "done": 1, "failed": 0}
+    assert [(task.law_id, task.attempts) for task in queue.lease("w1", 5, 60.0)] == [("C", 2)]
+    queue.fail("w1", "C", "error again", max_attempts=2)
+    assert queue.failures() == {"C": "error again"}
+
+    # a refresh makes the laws pending again
+    assert queue.enqueue([("A", 0), ("B", 1), ("C", 1)], reset=True) == 3
+    assert queue.counts()["pending"] == 3
+
+
+def test_expired_leases(queue):
+    queue.enqueue([("A", 0)])
+    assert queue.lease("w1", 1, 0.0, max_attempts=2)[0].attempts == 1
+    time.sleep(0.01)
+    assert queue.lease("w2", 1, 0.0, max_attempts=2)[0].attempts == 2
+    time.sleep(0.01)
+    # the law crashed both workers that took it, so it is not leased again
+    assert queue.lease("w3", 1, 60.0, max_attempts=2) == []
+    assert queue.counts() == {"pending": 0, "leased": 0, "done": 0, "failed": 1}
+    assert queue.complete("w2", [("A", "digest")]) == 0
+
+
+def test_hash_ring_moves_few_keys():
+    keys = [f"505AC0000000{number:03d}" for number in range(500)]
+    ring = HashRing(["a", "b", "c"])
+    before = {key: ring.node_for(key) for key in keys}
+    assert set(before.values()) == {"a", "b", "c"}
+    ring.add("d")
+    after = {key: ring.node_for(key) for key in keys}
+    moved = [key for key in keys if before[key] != after[key]]
+    assert all(after[key] == "d" for key in moved)
+    assert len(moved) < len(keys) / 2
+    ring.remove("d")
+    assert {key: ring.node_for(key) for key in keys} == before
+    with pytest.raises(ValueError):
+        HashRing().node_for("A")
+
+
+def test_coordinator_plans_and_assigns(queue):
+    coordinator = MirrorCoordinator(queue, shards=8)
+    sizes = coordinator.plan(LAW_IDS + LAW_IDS[:5])
+    assert sum(sizes.values()) == len(LAW_IDS)
+    assert all(0 <= shard < 8 for shard in sizes)
+    assignment = coordinator.assign(["w1", "w2", "w3"])
+    assert sorted(shard for shards in assignment.values() for shard in shards) == list(range(8))
+    assert coordinator.progress()["pending"] == len(LAW_IDS)
+
+
+def _work(queue_path: str, store_path: str, worker_id: str, results) -> None:
+    queue = SQLiteWorkQueue(queue_path)
+    worker = MirrorWorker(
+        queue, LawTextStore(store_path), worker_id=worker_id, fetch_date="2024-04-01",
+        batch_size=4, lease_sec=1.0, fetch_workers=2
+    )
+    worker.run(poll_sec=0.1)
+    results.put((worker_id, worker.fetched, worker.changed))
+    queue.close()
+
+
+def _done(queue_path: str) -> int:
+    queue = SQLiteWorkQueue(queue_path)
+    try:
+        return queue.counts()[STATUS_DONE]
+    finally:
+        queue.close()
+
+
+@requires_fork
+def test_mirror_survives_a_killed_worker(fake_server, tmp_path):
+    for law_id in LAW_IDS:
+        fake_server.add_law_text(law_id, law_text_body(law_id))
+    fake_server.latency = 0.05
+    queue_path = str(tmp_path / "mirror.sqlite")
+    store_path = str(tmp_path / "archive")
+    queue = SQLiteWorkQueue(queue_path)
+    MirrorCoordinator(queue).plan(LAW_IDS)
+    queue.close()
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    victim = context.Process(target=_work, args=(queue_path, store_path, "victim", results))
+    victim.start()
+    deadline = time.monotonic() + 30.0
+    while _done(queue_path) < 8 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    os.kill(victim.pid, signal.SIGKILL)
+    victim.join()
+    done_by_victim = _done(queue_path)
+    assert 8 <= done_by_victim < len(LAW_IDS)
+    stored_by_victim = len(LawTextStore(store_path).manifest.law_ids)
+
+    workers = [
+        context.Process(target=_work, args=(queue_path, store_path, f"w{index}", results))
+        for index in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60.0)
+        assert worker.exitcode == 0
+    counts = {worker_id: (fetched, changed) for worker_id, fetched, changed in
+              (results.get(timeout=5.0) for _ in workers)}
+
+    queue = SQLiteWorkQueue(queue_path)
+    assert queue.counts() == {"pending": 0, "leased": 0, "done": len(LAW_IDS), "failed": 0}
+    queue.close()
+    store = LawTextStore(store_path)
+    assert sorted(store.manifest.law_ids) == LAW_IDS
+    assert all(len(store.manifest.entries(law_id)) == 1 for law_id in LAW_IDS)
+    with open(os.path.join(store_path, "manifest.jsonl"), "rb") as file_:
+        assert file_.read().count(b"\n") == len(LAW_IDS)
+    assert sum(changed for _, changed in counts.values()) == len(LAW_IDS) - stored_by_victim
+    assert sum(fetched for fetched, _ in counts.values()) >= len(LAW_IDS) - done_by_victim
+    for law_id in LAW_IDS:
+        assert store.get(law_id) == law_text_body(law_id)
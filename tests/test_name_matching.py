@@ -0,0 +1,105 @@
+from elaws_api_python.classes import ListOfLaws
+from elaws_api_python.classes.laws_and_ordinances_response import LawNameInfoElement
+from elaws_api_python.name_matching import (
+    LawNameMatcher, bounded_edit_distance, law_name_aliases, ngrams, normalize_law_name
+)
+
+from conftest import LAWS, law_list_body
+
+POSTAL = "第３種郵便物の承認に関する省令（郵便承認省令）"
+
+
+def _matcher() -> LawNameMatcher:
+    elements = [LawNameInfoElement(*law) for law in LAWS]
+    elements.append(LawNameInfoElement("999AC0000000999", None))
+    return LawNameMatcher(elements)
+
+
+def _names(elements) -> list:
+    return [elem.law_name for elem in elements]
+
+
+def test_normalize_law_name():
+    assert normalize_law_name(POSTAL) == "第3種郵便物の承認に関する省令"
+    assert normalize_law_name("第三種郵便物の承認に関する省令") == "第3種郵便物の承認に関する省令"
+    assert normalize_law_name("地方交付税法　（昭和二十九年法律第百六十二号）") == "地方交付税法"
+    assert normalize_law_name("甲法（乙（丙）丁）") == "甲法"
+    assert normalize_law_name("ＡＢＣ 法") == "ABC法"
+    assert normalize_law_name("") == ""
+    assert law_name_aliases(POSTAL) == ["郵便承認省令"]
+    assert law_name_aliases("甲法（乙（丙）丁）") == ["丙"]
+    assert law_name_aliases("民法") == []
+
+
+def test_ngrams():
+    assert ngrams("試験法") == {"試験", "験法"}
+    assert ngrams("民法") == {"民法"}
+    assert ngrams("法") == {"法"}
+    assert ngrams("") == set()
+    assert ngrams("ababa", 3) == {"aba", "bab"}
+
+
+def test_bounded_edit_distance():
+    assert bounded_edit_distance("kitten", "sitting", 3) == 3
+    assert bounded_edit_distance("sitting", "kitten", 3) == 3
+    assert bounded_edit_distance("kitten", "sitting", 2) is None
+    assert bounded_edit_distance("民法", "民法", 0) == 0
+    assert bounded_edit_distance("", "abc", 3) == 3
+    assert bounded_edit_distance("", "abcd", 3) is None
+    assert bounded_edit_distance("abcdef", "badcfe", 3) is None
+    assert bounded_edit_distance("abcdef", "badcfe", 4) == 4
+
+
+def test_find_exact():
+    matcher = _matcher()
+    assert _names(matcher.find_exact("民法")) == ["民法"]
+    assert _names(matcher.find_exact("民 法")) == ["民法"]
+    assert _names(matcher.find_exact("第三種郵便物の承認に関する省令")) == [POSTAL]
+    assert _names(matcher.find_exact("郵便承認省令")) == [POSTAL]
+    assert matcher.find_exact("民放") == []
+    assert matcher.find_exact("") == []
+
+
+def test_match():
+    matcher = _matcher()
+    assert [(elem.law_name, round(score, 3)) for elem, score in
+            matcher.match_with_scores("個人情報の保護に関すろ法律")] == [
+        ("個人情報の保護に関する法律", 0.923)
+    ]
+    assert _names(matcher.match("地方交付税法（昭和二十九年法律第百六十二号）")) == ["地方交付税法"]
+    # an abbreviation matches its law
+    assert _names(matcher.match("郵便承認省令")) == [POSTAL]
+    assert matcher.match("ニホンコク憲法") == []
+    assert matcher.match("") == []
+    assert matcher.match("（）") == []
+
+
+def test_match_short_queries():
+    matcher = _matcher()
+    # the edit can remove every bigram of a short query
+    assert [(elem.law_name, score) for elem, score in matcher.match_with_scores("民放")] == [("民法", 0.5)]
+    assert [(elem.law_name, score) for elem, score in matcher.match_with_scores("商法")] == [
+        ("商法", 1.0), ("民法", 0.5)
+    ]
+    assert _names(matcher.match("商法", limit=1)) == ["商法"]
+    assert _names(matcher.match("商法", max_distance=0)) == ["商法"]
+    assert _names(matcher.match("法")) == ["民法", "商法"]
+
+
+def test_match_ranking():
+    matcher = _matcher()
+    assert _names(matcher.match("試験法", limit=2, max_distance=5)) == ["試験法", "令和元年の試験法"]
+    assert len(matcher.match("試験法", max_distance=5)) > 2
+    # ties keep the list order
+    tied = LawNameMatcher([LawNameInfoElement("b", "乙法"), LawNameInfoElement("a", "甲法")])
+    assert [elem.law_id for elem in tied.match("丙法")] == ["b", "a"]
+
+
+def test_list_of_laws():
+    list_of_laws = ListOfLaws(law_list_body(LAWS))
+    info = list_of_laws.appl_data.law_name_list_info
+    assert info.name_matcher is info.name_matcher
+    assert _names(info.findall_elements_by_fuzzy_law_name("個人情報の保護に関すろ法律")) == [
+        "個人情報の保護に関する法律"
+    ]
+    assert info.findall_elements_by_fuzzy_law_name("民放", max_distance=0) == []
@@ -0,0 +1,167 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from elaws_api_python.near_duplicates import (
+    ArticleRef, NearDuplicateIndex, compute_signatures, minhash_signatures, shingle_hashes
+)
+
+FIRST = "505AC0000000001"
+SECOND = "505AC0000000002"
+
+CLAUSE = (
+    "この法律は、国民の健康の保持増進に資するため、事業者が講ずべき措置に関する基本的な事項を定めるとともに、"
+    "国及び地方公共団体の責務を明らかにし、もって国民生活の安定向上に寄与することを目的とする。"
+)
+OTHER = (
+    "前条の規定による届出をした者は、当該届出に係る事項に変更があったときは、遅滞なく、"
+    "その旨を主務大臣に届け出なければならない。届出の様式は、主務省令で定める。"
+)
+UNRELATED = "何人も、みだりに他人の土地に立ち入り、又は工作物を損壊してはならない。罰則は別に定める。"
+
+
+def _articles(*texts: str) -> dict:
+    return {
+        f"MainProvision/Article[{number}]": (f"第{number}条", text)
+        for number, text in enumerate(texts, 1)
+    }
+
+
+def _index(**kwargs) -> NearDuplicateIndex:
+    index = NearDuplicateIndex(workers=0, **kwargs)
+    index.add_articles(FIRST, _articles(CLAUSE, OTHER))
+    index.add_articles(SECOND, _articles(CLAUSE.replace("安定向上", "安定及び向上"), UNRELATED))
+    return index
+
+
+def test_shingle_hashes():
+    assert len(shingle_hashes("")) == 0
+    assert len(shingle_hashes("abc")) == 1
+    assert len(shingle_hashes("abcabc", shingle=3)) == 3
+    assert np.array_equal(shingle_hashes("a b\tc"), shingle_hashes("abc"))
+    assert np.array_equal(shingle_hashes("ＡＢＣ"), shingle_hashes("ABC"))
+
+
+def test_signatures():
+    signatures = minhash_signatures([CLAUSE, "", CLAUSE], num_perm=32)
+    assert signatures.shape == (3, 32)
+    assert signatures.dtype == np.uint32
+    assert np.array_equal(signatures[0], signatures[2])
+    assert (signatures[1] == 0xFFFFFFFF).all()
+    assert not np.array_equal(minhash_signatures([CLAUSE], seed=2)[0], minhash_signatures([CLAUSE])[0])
+    assert np.array_equal(compute_signatures([CLAUSE, OTHER], workers=0), minhash_signatures([CLAUSE, OTHER]))
+
+
+def test_bands_must_divide_num_perm():
+    with pytest.raises(ValueError):
+        NearDuplicateIndex(num_perm=100, bands=16)
+
+
+def test_query():
+    index = _index()
+    assert len(index) == 4
+    assert (FIRST, "MainProvision/Article[1]") in index
+    assert index.law_ids == [FIRST, SECOND]
+
+    matches = index.query(FIRST, "MainProvision/Article[1]")
+    assert [match.article for match in matches] == [ArticleRef(SECOND, "MainProvision/Article[1]")]
+    assert 0.8 <= matches[0].similarity < 1.0
+    assert index.query(FIRST, "MainProvision/Article[2]") == []
+    assert index.query(FIRST, "MainProvision/Article[9]") == []
+
+    matches = index.query_text(CLAUSE)
+    assert matches[0] == (ArticleRef(FIRST, "MainProvision/Article[1]"), 1.0)
+    assert index.query_text(UNRELATED)[0].article == ArticleRef(SECOND, "MainProvision/Article[2]")
+    assert index.query_text("") == []
+
+
+def test_groups():
+    index = _index()
+    index.add_articles("505AC0000000003", _articles(CLAUSE, "", OTHER))
+    assert len(index) == 6
+    assert index.groups() == [
+        [
+            ArticleRef(FIRST, "MainProvision/Article[1]"),
+            ArticleRef(SECOND, "MainProvision/Article[1]"),
+            ArticleRef("505AC0000000003", "MainProvision/Article[1]"),
+        ],
+        [
+            ArticleRef(FIRST, "MainProvision/Article[2]"),
+            ArticleRef("505AC0000000003", "MainProvision/Article[3]"),
+        ],
+    ]
+    assert len(index.groups(min_size=3)) == 1
+    assert index.groups(threshold=1.01) == []
+
+
+def test_replace_and_remove():
+    index = _index()
+    # the unchanged article reuses its signature
+    assert index.add_articles(FIRST, _articles(CLAUSE, UNRELATED)) == 1
+    assert len(index) == 4
+    assert [match.article for match in index.query(FIRST, "MainProvision/Article[2]")] == [
+        ArticleRef(SECOND, "MainProvision/Article[2]")
+    ]
+    assert index.query_text(OTHER) == []
+
+    assert index.remove_law(SECOND) == 2
+    assert index.remove_law(SECOND) == 0
+    assert index.law_ids == [FIRST]
+    assert len(index) == 2
+    assert index.query(FIRST, "MainProvision/Article[1]") == []
+    assert index.groups() == []
+
+
+def test_add_corpus():
+    index = NearDuplicateIndex(workers=0)
+    index.add_articles(FIRST, _articles(UNRELATED))
+    assert index.add_corpus({FIRST: _articles(CLAUSE), SECOND: _articles(CLAUSE, "　")}) == 2
+    assert len(index) == 2
+    assert index.groups() == [[
+        ArticleRef(FIRST, "MainProvision/Article[1]"),
+        ArticleRef(SECOND, "MainProvision/Article[1]"),
+    ]]
+
+
+def test_save_load(tmp_path):
+    index = _index(num_perm=64, bands=8)
+    index.remove_law(SECOND)
+    index.add_articles(SECOND, _articles(CLAUSE))
+    directory = str(tmp_path / "index")
+    index.save(directory)
+
+    loaded = NearDuplicateIndex.load(directory, workers=0)
+    assert (loaded.num_perm, loaded.bands) == (64, 8)
+    assert len(loaded) == len(index) == 3
+    assert loaded.groups() == index.groups()
+    assert loaded.query(FIRST, "MainProvision/Article[1]") == index.query(FIRST, "MainProvision/Article[1]")
+    # the saved digests let the loaded index reuse the signatures
+    assert loaded.add_articles(FIRST, _articles(CLAUSE, OTHER)) == 0
+
+    loaded.remove_law(SECOND)
+    loaded.save(directory)
+    reloaded = NearDuplicateIndex.load(directory, workers=0)
+    assert reloaded.law_ids == [FIRST]
+    assert len([name for name in os.listdir(directory) if name.startswith("signatures.")]) == 1
+
+
+def test_load_invalid(tmp_path):
+    directory = str(tmp_path / "index")
+    _index().save(directory)
+    path = os.path.join(directory, "meta.json")
+    with open(path, "r", encoding="utf-8") as file_:
+        meta = json.load(file_)
+
+    meta["articles"] = meta["articles"][:-1]
+    with open(path, "w", encoding="utf-8") as file_:
+        json.dump(meta, file_)
+    with pytest.raises(ValueError):
+        NearDuplicateIndex.load(directory)
+
+    meta["format"] = -1
+    with open(path, "w", encoding="utf-8") as file_:
+        json.dump(meta, file_)
+    with pytest.raises(ValueError):
+        NearDuplicateIndex.load(directory)
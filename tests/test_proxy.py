@@ -0,0 +1,159 @@
+import asyncio
+import time
+
+import pytest
+import requests
+
+from elaws_api_python.cache import ResponseCache
+from elaws_api_python.proxy import CachingProxy
+
+from conftest import law_text_body
+from fake_server import FakeElawsServer
+
+LAW_ID = "505AC0000000001"
+PATH = f"/1/lawdata/{LAW_ID}"
+
+
+@pytest.fixture
+def upstream():
+    with FakeElawsServer({PATH: law_text_body(LAW_ID)}, latency=0.1, latency_per_request=0.0) as server:
+        yield server
+
+
+def _run(url: str, scenario, **kwargs) -> CachingProxy:
+    """
+    Run `scenario` with a started CachingProxy of the upstream at `url`.
+    """
+    proxy = CachingProxy(url, **kwargs)
+
+    async def main() -> None:
+        await proxy.start()
+        try:
+            await scenario(proxy)
+        finally:
+            await proxy.close()
+
+    asyncio.run(main())
+    return proxy
+
+
+async def _settle(proxy: CachingProxy) -> None:
+    # wait for the background revalidations
+    while proxy._in_flight:
+        await asyncio.sleep(0.01)
+
+
+def test_coalesced_misses(upstream):
+    async def scenario(proxy):
+        results = await asyncio.gather(*(proxy.get(PATH) for _ in range(10)))
+        assert {status for status, _, _, _ in results} == {200}
+        assert {cache_status for _, _, cache_status, _ in results} == {"MISS"}
+        assert len({id(entry) for _, entry, _, _ in results}) == 1
+        assert results[0][1].body == law_text_body(LAW_ID)
+        status, _, cache_status, _ = await proxy.get(PATH)
+        assert (status, cache_status) == (200, "HIT")
+
+    proxy = _run(upstream.url, scenario)
+    assert upstream.requests == 1
+    assert (proxy.misses, proxy.coalesced, proxy.hits) == (10, 9, 1)
+    assert proxy.upstream_requests == 1
+
+
+def test_stale_while_revalidate(upstream):
+    async def scenario(proxy):
+        await proxy.get(PATH)
+        await asyncio.sleep(0.25)
+        upstream.responses[PATH] = law_text_body(LAW_ID, "改正後の本文")
+
+        # served at once while revalidated in the background
+        started = time.monotonic()
+        results = await asyncio.gather(proxy.get(PATH), proxy.get(PATH))
+        assert time.monotonic() - started < 0.1
+        assert [cache_status for _, _, cache_status, _ in results] == ["STALE", "STALE"]
+        assert results[0][1].body == law_text_body(LAW_ID)
+        await _settle(proxy)
+
+        status, entry, cache_status, _ = await proxy.get(PATH)
+        assert (status, cache_status) == (200, "HIT")
+        assert entry.body == law_text_body(LAW_ID, "改正後の本文")
+
+        # beyond the stale window the client waits on the upstream
+        await asyncio.sleep(1.3)
+        _, entry, cache_status, _ = await proxy.get(PATH)
+        assert cache_status == "MISS"
+
+    proxy = _run(upstream.url, scenario, ttl=0.2, stale_while_revalidate=1.0)
+    assert upstream.requests == 3
+    assert (proxy.stale_hits, proxy.coalesced, proxy.misses) == (2, 1, 2)
+    assert proxy.errors == 0
+
+
+def test_upstream_errors(upstream):
+    async def scenario(proxy):
+        # errors are passed through and not cached
+        status, entry, _, _ = await proxy.get("/1/lawdata/999AC0000000999")
+        assert (status, entry) == (404, None)
+        status, _, _, _ = await proxy.get("/1/lawdata/999AC0000000999")
+        assert status == 404
+
+        # a cached response is served when the upstream is overloaded
+        await proxy.get(PATH)
+        await asyncio.sleep(0.15)
+        upstream.capacity = 0
+        status, entry, cache_status, _ = await proxy.get(PATH)
+        assert (status, cache_status) == (200, "STALE")
+        assert entry.body == law_text_body(LAW_ID)
+        upstream.capacity = 16
+        status, _, cache_status, _ = await proxy.get(PATH)
+        assert (status, cache_status) == (200, "MISS")
+
+    proxy = _run(upstream.url, scenario, ttl=0.1, stale_while_revalidate=0.0)
+    assert upstream.rejected == 1
+    assert proxy.errors == 3
+    assert proxy.stale_hits == 1
+
+
+def test_upstream_down():
+    with FakeElawsServer(latency=0.0) as upstream:
+        url = upstream.url
+
+    async def scenario(proxy):
+        status, entry, cache_status, _ = await proxy.get(PATH)
+        assert (status, entry, cache_status) == (502, None, "MISS")
+
+    proxy = _run(url, scenario, timeout=1.0)
+    assert proxy.errors == 1
+
+
+def test_http(upstream, tmp_path):
+    def fetch(proxy, path, method="GET", **headers):
+        return requests.request(method, proxy.url + path, headers=headers, timeout=5.0)
+
+    async def scenario(proxy):
+        loop = asyncio.get_running_loop()
+
+        async def call(*args, **headers):
+            return await loop.run_in_executor(None, lambda: fetch(proxy, *args, **headers))
+
+        response = await call(PATH)
+        assert response.status_code == 200
+        assert response.content == law_text_body(LAW_ID)
+        assert response.headers["X-Cache"] == "MISS"
+        etag = response.headers["ETag"]
+
+        response = await call(PATH, **{"If-None-Match": etag})
+        assert (response.status_code, response.content) == (304, b"")
+        response = await call(PATH, "HEAD")
+        assert response.status_code == 200
+        assert response.headers["Content-Length"] == str(len(law_text_body(LAW_ID)))
+        assert response.headers["X-Cache"] == "HIT"
+
+        assert (await call(PATH, "POST")).status_code == 405
+        assert (await call("/1/unknown/path")).status_code == 404
+        assert (await call("/1/lawdata/999AC0000000999")).status_code == 404
+
+    cache = ResponseCache(str(tmp_path / "cache"))
+    _run(upstream.url, scenario, cache=cache)
+    assert upstream.requests == 2
+    # the persisted cache serves a new proxy
+    assert ResponseCache(str(tmp_path / "cache")).get(upstream.url + PATH).body == law_text_body(LAW_ID)
@@ -0,0 +1,155 @@
+import io
+import json
+from xml.etree import ElementTree as ET
+
+from elaws_api_python.classes.law_text_response import LawTextResponse
+from elaws_api_python.records import (
+    COLUMNS, ProvisionRecord, iter_plain_text_lines, iter_records, iter_records_from_chunks,
+    path_key, to_plain_text, write_jsonl
+)
+
+from conftest import article_xml, full_text_body
+
+LAW_ID = "505AC0000000001"
+BODY = (
+    "<LawTitle>試験法</LawTitle><MainProvision>"
+    '<Chapter Num="1"><ChapterTitle>第一章　総則</ChapterTitle>'
+    '<Article Num="1"><ArticleCaption>（定義）</ArticleCaption><ArticleTitle>第一条</ArticleTitle>'
+    '<Paragraph Num="1"><ParagraphNum/><ParagraphSentence>'
+    "<Sentence>この法律において、次の各号に掲げる用語の意義は、</Sentence>"
+    "<Sentence>当該各号に定めるところによる。</Sentence></ParagraphSentence>"
+    '<Item Num="1"><ItemTitle>一</ItemTitle><ItemSentence>'
+    "<Column><Sentence>試験</Sentence></Column><Column><Sentence>能力を測ること</Sentence></Column>"
+    "</ItemSentence>"
+    '<Subitem1 Num="1"><Subitem1Title>イ</Subitem1Title>'
+    "<Subitem1Sentence><Sentence>筆記試験</Sentence></Subitem1Sentence></Subitem1>"
+    '<Subitem1 Num="2"><Subitem1Title>ロ</Subitem1Title>'
+    "<Subitem1Sentence><Sentence>口述試験</Sentence></Subitem1Sentence></Subitem1>"
+    "</Item>"
+    '<Item Num="2"><ItemTitle>二</ItemTitle><ItemSentence><Sentence>'
+    "<Ruby>受験者<Rt>じゅけんしゃ</Rt></Ruby>　試験を受ける者</Sentence></ItemSentence></Item>"
+    "</Paragraph>"
+    '<Paragraph Num="2"><ParagraphCaption>（適用除外）</ParagraphCaption><ParagraphNum>２</ParagraphNum>'
+    "<ParagraphSentence><Sentence>前項の規定は、適用しない。</Sentence></ParagraphSentence></Paragraph>"
+    "</Article>"
+    + article_xml("2", "第二条の本文")
+    + "</Chapter></MainProvision>"
+    '<SupplProvision><SupplProvisionLabel>附　則</SupplProvisionLabel>'
+    '<Paragraph Num="1"><ParagraphNum/><ParagraphSentence><Sentence>この法律は、公布の日から施行する。'
+    "</Sentence></ParagraphSentence></Paragraph></SupplProvision>"
+    '<SupplProvision AmendLawNum="令和六年法律第二号"><SupplProvisionLabel>附　則</SupplProvisionLabel>'
+    + article_xml("1", "経過措置")
+    + "</SupplProvision>"
+)
+CONTENT = full_text_body(LAW_ID, BODY)
+
+
+def _records() -> list:
+    return list(iter_records_from_chunks([CONTENT]))
+
+
+def test_path_key():
+    assert path_key((("MainProvision", ""), ("Article", "1"))) == "MainProvision/Article[1]"
+    assert path_key((("SupplProvision", "令和六年法律第二号"),)) == "SupplProvision[令和六年法律第二号]"
+    assert path_key(()) == ""
+
+
+def test_records():
+    records = _records()
+    assert [record.key for record in records] == [
+        "MainProvision/Chapter[1]/Article[1]/Paragraph[1]",
+        "MainProvision/Chapter[1]/Article[1]/Paragraph[1]/Item[1]",
+        "MainProvision/Chapter[1]/Article[1]/Paragraph[1]/Item[2]",
+        "MainProvision/Chapter[1]/Article[1]/Paragraph[2]",
+        "MainProvision/Chapter[1]/Article[2]/Paragraph[1]",
+        "SupplProvision/Paragraph[1]",
+        "SupplProvision[令和六年法律第二号]/Article[1]/Paragraph[1]",
+    ]
+    assert {record.law_id for record in records} == {LAW_ID}
+    paragraph, item, ruby, captioned, second, suppl, amended = records
+
+    assert paragraph.kind == "Paragraph" and paragraph.num == "1"
+    assert paragraph.titles == ("", "第一章　総則", "第一条", "")
+    assert paragraph.caption == "（定義）"
+    assert paragraph.text == "この法律において、次の各号に掲げる用語の意義は、当該各号に定めるところによる。"
+    assert paragraph.article_key == "MainProvision/Chapter[1]/Article[1]"
+    assert paragraph.level("Chapter") == "1"
+    assert paragraph.level("Section") is None
+
+    assert item.kind == "Item" and item.title == "一"
+    assert item.text == "試験　能力を測ること\nイ　筆記試験\nロ　口述試験"
+    assert item.caption == "（定義）"
+    # ruby readings are dropped
+    assert ruby.text == "受験者　試験を受ける者"
+    # a paragraph caption replaces the article caption
+    assert (captioned.title, captioned.caption) == ("２", "（適用除外）")
+    assert (second.titles[2], second.caption) == ("第2条", "")
+
+    assert suppl.titles == ("附　則", "")
+    assert suppl.article_key is None
+    assert suppl.level("SupplProvision") == ""
+    assert amended.level("SupplProvision") == "令和六年法律第二号"
+
+
+def test_retained_and_streamed_trees_agree():
+    chunks = [CONTENT[start:start + 5] for start in range(0, len(CONTENT), 5)]
+    streamed = list(iter_records_from_chunks(chunks))
+    assert streamed == _records()
+    root = ET.fromstring(CONTENT)
+    assert list(iter_records(root)) == streamed
+    # the law ID is taken from the response unless given
+    assert {record.law_id for record in iter_records(root.find("ApplData/LawFullText"))} == {None}
+    assert {record.law_id for record in iter_records_from_chunks([CONTENT], "999AC0000000999")} == \
+        {"999AC0000000999"}
+    assert list(LawTextResponse(CONTENT).iter_records()) == streamed
+
+
+def test_empty_law():
+    assert list(iter_records_from_chunks([full_text_body(LAW_ID, "<LawTitle>試験法</LawTitle>")])) == []
+    assert to_plain_text([]) == ""
+
+
+def test_to_dict():
+    records = _records()
+    row = records[1].to_dict()
+    assert tuple(row) == COLUMNS
+    assert row == {
+        "law_id": LAW_ID,
+        "key": "MainProvision/Chapter[1]/Article[1]/Paragraph[1]/Item[1]",
+        "provision": "MainProvision",
+        "part": None, "chapter": "1", "section": None, "subsection": None, "division": None,
+        "article": "1", "paragraph": "1", "item": "1",
+        "title": "一", "caption": "（定義）",
+        "text": "試験　能力を測ること\nイ　筆記試験\nロ　口述試験",
+    }
+    assert records[-1].to_dict()["provision"] == "SupplProvision:令和六年法律第二号"
+    assert records[-2].to_dict()["article"] is None
+    record = ProvisionRecord(None, (("MainProvision", ""), ("Paragraph", "1")), ("", ""), "", "本文")
+    assert record.to_dict()["paragraph"] == "1"
+
+
+def test_write_jsonl():
+    records = _records()
+    file_ = io.StringIO()
+    assert write_jsonl(records, file_) == len(records)
+    lines = file_.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == [record.to_dict() for record in records]
+    assert "附　則" not in lines[0] and "（定義）" in lines[0]
+    assert write_jsonl([], io.StringIO()) == 0
+
+
+def test_plain_text():
+    # captions are emitted per article, so that of a paragraph is not
+    assert list(iter_plain_text_lines(_records())) == [
+        "第一章　総則",
+        "（定義）",
+        "第一条　この法律において、次の各号に掲げる用語の意義は、当該各号に定めるところによる。",
+        "一　試験　能力を測ること\nイ　筆記試験\nロ　口述試験",
+        "二　受験者　試験を受ける者",
+        "２　前項の規定は、適用しない。",
+        "第2条　第二条の本文",
+        "附　則",
+        "この法律は、公布の日から施行する。",
+        "附　則",
+        "第1条　経過措置",
+    ]
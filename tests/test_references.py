@@ -0,0 +1,159 @@
+from elaws_api_python.classes.law_text_response import LawTextResponse
+from elaws_api_python.classes.laws_and_ordinances_response import LawNameInfoElement
+from elaws_api_python.references import (
+    CSRGraph, LawNameIndex, Reference, ReferenceGraph, article_num,
+    build_reference_graph, iter_references
+)
+
+from conftest import article_xml, full_text_body
+
+LAW_ID = "505AC0000000001"
+CIVIL = "129AC0000000089"
+COMMERCIAL = "132AC0000000048"
+NAME_INDEX = LawNameIndex({"民法": CIVIL, "商法": COMMERCIAL, "商法施行法": "332AC0000000049"})
+
+
+def _content(*articles: str, law_id: str = LAW_ID) -> bytes:
+    body = "<LawTitle>試験法</LawTitle><MainProvision>" + "".join(articles) + "</MainProvision>"
+    return full_text_body(law_id, body)
+
+
+def _references(*articles: str) -> list:
+    records = LawTextResponse(_content(*articles).decode("utf-8")).iter_records()
+    return [
+        (ref.article, ref.target_law_id, ref.target_article)
+        for ref in iter_references(records, NAME_INDEX)
+    ]
+
+
+def test_article_num():
+    assert article_num("七百九") == "709"
+    assert article_num("3") == "3"
+    assert article_num("１２") == "12"
+    assert article_num("三", "の二") == "3_2"
+    assert article_num("三", "の二の三") == "3_2_3"
+
+
+def test_law_name_index():
+    assert NAME_INDEX.find_suffix("この場合において、民法") == CIVIL
+    # the longest name wins
+    assert NAME_INDEX.find_suffix("商法施行法") == "332AC0000000049"
+    assert NAME_INDEX.find_suffix("商法") == COMMERCIAL
+    assert NAME_INDEX.find_suffix("刑法") is None
+    assert NAME_INDEX.find_suffix("") is None
+    index = LawNameIndex.from_law_list([
+        LawNameInfoElement(CIVIL, "民法"), LawNameInfoElement(None, "名無し"),
+        LawNameInfoElement("999AC0000000001", ""),
+    ])
+    assert index.law_ids_by_name == {"民法": CIVIL}
+
+
+def test_same_law_references():
+    assert _references(
+        article_xml("1", "第三条の規定は、第二条第二項の場合に準用する。"),
+        article_xml("2", "この法律第一条及び本法第三条の二を適用する。"),
+        article_xml("3", "第3条の規定にかかわらず、第４条による。"),
+    ) == [
+        ("1", LAW_ID, "3"),
+        ("1", LAW_ID, "2"),
+        ("2", LAW_ID, "1"),
+        ("2", LAW_ID, "3_2"),
+        ("3", LAW_ID, "4"),
+    ]
+
+
+def test_other_law_references():
+    assert _references(article_xml(
+        "1",
+        "民法（明治二十九年法律第八十九号）第七百九条及び第七百十条並びに同法第七百十五条の規定は、"
+        "商法第五百一条、第五百二条から第五百四条までの場合に準用する。",
+    )) == [
+        ("1", CIVIL, "709"),
+        ("1", CIVIL, "710"),
+        ("1", CIVIL, "715"),
+        ("1", COMMERCIAL, "501"),
+        ("1", COMMERCIAL, "502"),
+        ("1", COMMERCIAL, "504"),
+    ]
+
+
+def test_unknown_law_is_skipped():
+    assert _references(article_xml(
+        "1", "刑法第百九十九条及び第二百条の罪並びに労働基準法施行規則第五条の規定は、第二条の例による。"
+    )) == [("1", LAW_ID, "2")]
+
+
+def test_relative_references():
+    assert _references(
+        article_xml("1", "次条に定める。"),
+        article_xml("2", "前条の規定は、次条の場合に準用する。"),
+        article_xml("3", "前条及び次条による。"),
+    ) == [
+        ("1", LAW_ID, "2"),
+        ("2", LAW_ID, "1"),
+        ("2", LAW_ID, "3"),
+        ("3", LAW_ID, "2"),
+    ]
+
+
+def test_self_and_supplementary_references():
+    body = (
+        "<LawTitle>試験法</LawTitle><MainProvision>"
+        + article_xml("1", "第一条の規定は、前条に定める。")
+        + "</MainProvision><SupplProvision>"
+        + article_xml("1", "この法律は、第二条の規定の施行の日から施行する。")
+        + "</SupplProvision>"
+    )
+    records = LawTextResponse(full_text_body(LAW_ID, body).decode("utf-8")).iter_records()
+    assert list(iter_references(records, NAME_INDEX)) == []
+
+
+def test_csr_graph():
+    graph = CSRGraph(["a", "b", "c", "d"], [(0, 1), (1, 2), (0, 1), (3, 2), (2, 0)])
+    assert len(graph) == 4
+    assert graph.n_edges == 4
+    assert graph.outbound("a") == ["b"]
+    assert graph.outbound("d") == ["c"]
+    assert sorted(graph.inbound("c")) == ["b", "d"]
+    assert graph.inbound("d") == []
+    assert graph.outbound("missing") == []
+    # cycles end at the changed node
+    assert graph.impacted("c") == {"a", "b", "d"}
+    assert graph.impacted("c", max_depth=1) == {"b", "d"}
+    assert graph.impacted("d") == set()
+    assert graph.impacted("missing") == set()
+
+    empty = CSRGraph([], [])
+    assert len(empty) == 0
+    assert empty.n_edges == 0
+
+
+def test_reference_graph():
+    graph = ReferenceGraph([
+        Reference(LAW_ID, "1", CIVIL, "709"),
+        Reference(LAW_ID, "2", LAW_ID, "1"),
+        Reference(COMMERCIAL, "1", LAW_ID, "2"),
+        Reference(COMMERCIAL, "1", LAW_ID, "2"),
+    ])
+    assert sorted(graph.laws.nodes) == sorted([LAW_ID, CIVIL, COMMERCIAL])
+    assert graph.laws.n_edges == 2
+    assert graph.impacted_laws(CIVIL) == {LAW_ID, COMMERCIAL}
+    assert graph.impacted_laws(CIVIL, max_depth=1) == {LAW_ID}
+    assert graph.impacted_laws(COMMERCIAL) == set()
+    assert graph.impacted_articles(CIVIL, "709") == {
+        f"{LAW_ID}:1", f"{LAW_ID}:2", f"{COMMERCIAL}:1"
+    }
+    assert graph.impacted_articles(LAW_ID, "2") == {f"{COMMERCIAL}:1"}
+    assert graph.impacted_articles(CIVIL, "1") == set()
+
+
+def test_build_reference_graph(tmp_path):
+    path = tmp_path / "law.xml"
+    path.write_bytes(_content(article_xml("1", "民法第一条による。"), article_xml("2", "前条による。")))
+    other = _content(article_xml("1", "試験法第二条による。"), law_id=COMMERCIAL)
+    law_list = [LawNameInfoElement(CIVIL, "民法"), LawNameInfoElement(LAW_ID, "試験法")]
+    graph = build_reference_graph([str(path), other], law_list, max_workers=1)
+    assert graph.impacted_laws(CIVIL) == {LAW_ID, COMMERCIAL}
+    assert graph.impacted_articles(CIVIL, "1") == {
+        f"{LAW_ID}:1", f"{LAW_ID}:2", f"{COMMERCIAL}:1"
+    }
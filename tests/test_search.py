@@ -0,0 +1,145 @@
+import os
+
+import pytest
+
+from elaws_api_python.classes.law_text_response import LawTextResponse
+from elaws_api_python.search import SearchIndex, extract_articles, tokenize
+
+from conftest import article_xml, full_text_body
+
+CIVIL = "129AC0000000089"
+COMMERCIAL = "132AC0000000048"
+
+
+def _body(*articles: str) -> bytes:
+    return (
+        "<LawTitle>試験法</LawTitle><MainProvision>" + "".join(articles) + "</MainProvision>"
+    ).encode("utf-8")
+
+
+def _articles(*articles: str, law_id: str = CIVIL):
+    return extract_articles(full_text_body(law_id, _body(*articles).decode("utf-8")))
+
+
+def _index() -> SearchIndex:
+    index = SearchIndex()
+    index.add_articles(CIVIL, _articles(
+        article_xml("1", "私権は、公共の福祉に適合しなければならない。", caption="（基本原則）"),
+        article_xml("2", "この法律は、個人の尊厳と両性の本質的平等を旨として、解釈しなければならない。"),
+    ))
+    index.add_articles(COMMERCIAL, _articles(
+        article_xml("1", "商人の営業、商行為その他商事については、この法律の定めるところによる。"),
+        law_id=COMMERCIAL,
+    ))
+    return index
+
+
+def _hits(index: SearchIndex, query: str, **kwargs) -> list:
+    return [(hit.law_id, hit.key) for hit in index.search(query, **kwargs)]
+
+
+def test_tokenize():
+    assert tokenize("公共の福祉") == ["公共", "共の", "の福", "福祉"]
+    assert tokenize("私権は、公共") == ["私権", "権は", "公共"]
+    assert tokenize("甲、乙") == ["甲", "乙"]
+    assert tokenize("ＡＢｃ", ngram=3) == ["abc"]
+    assert tokenize("、。") == []
+
+
+def test_search():
+    index = _index()
+    assert len(index) == 3
+    assert index.law_ids == [CIVIL, COMMERCIAL]
+    hits = index.search("公共の福祉")
+    assert [(hit.law_id, hit.key) for hit in hits][:1] == [(CIVIL, "MainProvision/Article[1]")]
+    assert hits[0].header == "第1条（基本原則）"
+    assert all(a.score >= b.score for a, b in zip(hits, hits[1:]))
+    assert _hits(index, "商行為") == [(COMMERCIAL, "MainProvision/Article[1]")]
+    assert _hits(index, "刑罰") == []
+    assert _hits(index, "") == []
+    assert len(index.search("法律", limit=1)) == 1
+
+
+def test_filters():
+    index = _index()
+    index.set_law_info(CIVIL, categories=(2,))
+    index.set_law_info(COMMERCIAL, categories=(3,))
+    assert {law_id for law_id, _ in _hits(index, "法律")} == {CIVIL, COMMERCIAL}
+    assert {law_id for law_id, _ in _hits(index, "法律", law_ids=[COMMERCIAL])} == {COMMERCIAL}
+    assert _hits(index, "法律", law_ids=["unknown"]) == []
+    assert {law_id for law_id, _ in _hits(index, "法律", categories=[2])} == {CIVIL}
+    # no promulgation date is set, so an upper bound excludes every law
+    assert _hits(index, "法律", promulgated_to="20000101") == []
+
+
+def test_replace_and_remove():
+    index = _index()
+    index.search("法律")
+    index.add_articles(CIVIL, _articles(article_xml("1", "信義に従い誠実に行わなければならない。")))
+    assert len(index) == 2
+    assert _hits(index, "公共の福祉") == []
+    assert _hits(index, "信義") == [(CIVIL, "MainProvision/Article[1]")]
+
+    assert index.remove_law(COMMERCIAL) == 1
+    assert index.remove_law(COMMERCIAL) == 0
+    assert index.remove_law("unknown") == 0
+    assert index.law_ids == [CIVIL]
+    assert _hits(index, "商行為") == []
+    assert _hits(index, "信義") == [(CIVIL, "MainProvision/Article[1]")]
+
+    # removed before the next merge
+    index.add_articles(COMMERCIAL, _articles(article_xml("1", "商行為"), law_id=COMMERCIAL))
+    index.remove_law(COMMERCIAL)
+    assert _hits(index, "商行為") == []
+
+
+def test_add_law_text():
+    index = SearchIndex()
+    content = full_text_body(CIVIL, _body(article_xml("1", "公共の福祉")).decode("utf-8"))
+    assert index.add_law_text(LawTextResponse(content.decode("utf-8"))) == 1
+    assert index.law_ids == [CIVIL]
+    assert index.add_law_text([], law_id=COMMERCIAL) == 0
+    with pytest.raises(ValueError):
+        index.add_law_text([])
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load(tmp_path, mmap):
+    index = _index()
+    index.set_law_info(COMMERCIAL, categories=(3,))
+    index.remove_law(CIVIL)
+    index.add_articles(CIVIL, _articles(article_xml("1", "公共の福祉")))
+    directory = str(tmp_path / "index")
+    index.save(directory)
+
+    loaded = SearchIndex.load(directory, mmap=mmap)
+    assert len(loaded) == len(index) == 2
+    assert loaded.law_ids == index.law_ids
+    for query in ("公共の福祉", "商行為", "法律"):
+        assert loaded.search(query) == index.search(query)
+    assert _hits(loaded, "法律", categories=[3]) == [(COMMERCIAL, "MainProvision/Article[1]")]
+
+    # a loaded index is extended and saved again over the previous files
+    loaded.add_articles("999AC0000000001", _articles(article_xml("1", "新たな法律")))
+    loaded.remove_law(COMMERCIAL)
+    loaded.save(directory)
+    del loaded
+    reloaded = SearchIndex.load(directory, mmap=mmap)
+    assert reloaded.law_ids == [CIVIL, "999AC0000000001"]
+    assert _hits(reloaded, "新たな") == [("999AC0000000001", "MainProvision/Article[1]")]
+    assert _hits(reloaded, "商行為") == []
+    assert len([name for name in os.listdir(directory) if name.startswith("offsets.")]) == 1
+
+
+def test_save_load_empty(tmp_path):
+    directory = str(tmp_path / "index")
+    SearchIndex().save(directory)
+    loaded = SearchIndex.load(directory)
+    assert len(loaded) == 0
+    assert loaded.search("法律") == []
+
+
+def test_load_unknown_format(tmp_path):
+    (tmp_path / "meta.json").write_text('{"format": -1}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        SearchIndex.load(str(tmp_path))
@@ -0,0 +1,120 @@
+from xml.etree import ElementTree as ET
+
+import pytest
+
+from elaws_api_python.classes.common import Step, load_root, parse_selected, parse_selector
+from elaws_api_python.classes.law_text_response import LawTextResponse
+
+from conftest import article_xml, full_text_body
+
+LAW_ID = "505AC0000000001"
+BODY = (
+    "<LawTitle>試験法</LawTitle><MainProvision>"
+    '<Chapter Num="1"><ChapterTitle>第一章　総則</ChapterTitle>'
+    + article_xml("1", "目的", caption="（目的）") + article_xml("2", "定義")
+    + "</Chapter>"
+    '<Chapter Num="2"><ChapterTitle>第二章　雑則</ChapterTitle>'
+    + article_xml("3", "雑則", "第二項") + article_xml("3_2", "枝番号")
+    + "</Chapter></MainProvision>"
+    '<SupplProvision><SupplProvisionLabel>附　則</SupplProvisionLabel>'
+    + article_xml("1", "施行期日")
+    + "</SupplProvision>"
+    '<SupplProvision AmendLawNum="令和五年法律第二号"><SupplProvisionLabel>附　則</SupplProvisionLabel>'
+    + article_xml("1", "経過措置")
+    + "</SupplProvision>"
+)
+CONTENT = full_text_body(LAW_ID, BODY)
+
+
+def _select(*select: str, content: bytes = CONTENT) -> ET.Element:
+    return load_root(content, list(select))
+
+
+def _nums(root: ET.Element, tag: str = "Article") -> list:
+    return [elem.get("Num") for elem in root.iter(tag)]
+
+
+def _sentences(root: ET.Element) -> list:
+    return [elem.text for elem in root.iter("Sentence")]
+
+
+def test_parse_selector():
+    assert parse_selector("MainProvision/Chapter[@Num=3]") == (
+        Step("MainProvision", (), False), Step("Chapter", (("Num", "3"),), False)
+    )
+    assert parse_selector("MainProvision//Article[@Num='709'][@Delete=\"false\"]") == (
+        Step("MainProvision", (), False),
+        Step("Article", (("Num", "709"), ("Delete", "false")), True),
+    )
+    assert parse_selector("//*") == (Step("*", (), True),)
+    assert parse_selector(" SupplProvision ") == (Step("SupplProvision", (), False),)
+    for selector in ("", "/", "Main Provision", "Article[Num=1]", "Article[@Num=1"):
+        with pytest.raises(ValueError):
+            parse_selector(selector)
+
+
+def test_select_article():
+    root = _select("MainProvision//Article[@Num=3]")
+    assert _nums(root) == ["3"]
+    assert _sentences(root) == ["雑則", "第二項"]
+    # the ancestors keep their headings only
+    assert [elem.text for elem in root.iter("ChapterTitle")] == ["第二章　雑則"]
+    assert _nums(root, "Chapter") == ["2"]
+    assert [elem.text for elem in root.iter("LawTitle")] == ["試験法"]
+    assert root.find("ApplData/LawId").text == LAW_ID
+    assert root.find(".//SupplProvision") is None
+
+
+def test_select_subtrees():
+    root = _select("MainProvision/Chapter[@Num=1]", "SupplProvision[@AmendLawNum='令和五年法律第二号']")
+    assert _nums(root) == ["1", "2", "1"]
+    assert _sentences(root) == ["目的", "定義", "経過措置"]
+    assert [elem.text for elem in root.iter("ArticleCaption")] == ["（目的）"]
+    # the other SupplProvision is dropped with its label
+    assert [elem.text for elem in root.iter("SupplProvisionLabel")] == ["附　則"]
+
+
+def test_select_wildcards():
+    assert _nums(_select("//Article")) == ["1", "2", "3", "3_2", "1", "1"]
+    assert _nums(_select("*/Chapter/Article[@Num=2]")) == ["2"]
+    # selectors start at the children of LawBody
+    assert _nums(_select("Chapter/Article[@Num=2]")) == []
+    assert _nums(_select("SupplProvision")) == ["1", "1"]
+
+
+def test_select_nothing():
+    root = _select("MainProvision//Article[@Num=99]")
+    assert _nums(root) == []
+    assert root.find(".//MainProvision") is None
+    assert root.find(".//LawBody") is not None
+    assert root.find(".//LawNum").text == "令和五年法律第一号"
+    # an empty selection keeps the headings of the anchor only
+    assert [elem.tag for elem in _select().find(".//LawBody")] == ["LawTitle"]
+
+
+def test_select_sources(tmp_path):
+    expected = ET.tostring(_select("MainProvision//Article[@Num=3_2]"))
+    path = tmp_path / "law.xml"
+    path.write_bytes(CONTENT)
+    chunks = [CONTENT[start:start + 7] for start in range(0, len(CONTENT), 7)]
+    assert ET.tostring(load_root(str(path), ["MainProvision//Article[@Num=3_2]"])) == expected
+    assert ET.tostring(load_root(CONTENT.decode("utf-8"), ["MainProvision//Article[@Num=3_2]"])) == expected
+    assert ET.tostring(parse_selected(iter(chunks), ["MainProvision//Article[@Num=3_2]"])) == expected
+    with pytest.raises(ET.ParseError):
+        parse_selected([], ["MainProvision"])
+
+
+def test_whole_tree_without_select():
+    assert ET.tostring(load_root(CONTENT)) == ET.tostring(ET.fromstring(CONTENT))
+    chunks = [CONTENT[start:start + 11] for start in range(0, len(CONTENT), 11)]
+    assert ET.tostring(load_root(iter(chunks))) == ET.tostring(ET.fromstring(CONTENT))
+
+
+def test_law_text_response_select():
+    response = LawTextResponse(CONTENT, select=["MainProvision/Chapter[@Num=2]"])
+    assert response.appl_data.law_id == LAW_ID
+    records = list(response.iter_records())
+    assert [record.level("Article") for record in records] == ["3", "3", "3_2"]
+    assert [record.text for record in records] == ["雑則", "第二項", "枝番号"]
+    full = LawTextResponse(CONTENT)
+    assert len(list(full.iter_records())) == 7
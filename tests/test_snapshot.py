@@ -0,0 +1,152 @@
+import os
+
+import pytest
+
+from elaws_api_python.cache import ResponseCache
+from elaws_api_python.cache_backends import FileSystemBackend
+from elaws_api_python.classes import ListOfLaws
+from elaws_api_python.classes.common import Result
+from elaws_api_python.classes.laws_and_ordinances_response import (
+    ApplData, LawNameInfoElement, LawNameListInfo
+)
+from elaws_api_python.main import load_or_acquire_laws_and_ordinances
+from elaws_api_python.snapshot import load_snapshot, save_snapshot
+
+from conftest import LAWS, law_list_body
+
+CATEGORY = 2
+LIST_PATH = f"/1/lawlists/{CATEGORY}"
+
+
+def _fields(list_of_laws: ListOfLaws) -> list:
+    return [
+        (elem.law_id, elem.law_name, elem.law_number, elem.promulgation_date)
+        for elem in list_of_laws.list_name_list_info
+    ]
+
+
+def _age(path: str, seconds: float) -> None:
+    mtime = os.path.getmtime(path) - seconds
+    os.utime(path, (mtime, mtime))
+
+
+def test_round_trip(tmp_path):
+    list_of_laws = ListOfLaws(law_list_body(LAWS, category=CATEGORY))
+    path = str(tmp_path / "laws.snapshot")
+    save_snapshot(list_of_laws, path)
+    assert os.listdir(str(tmp_path)) == ["laws.snapshot"]
+
+    loaded = load_snapshot(path)
+    assert _fields(loaded) == _fields(list_of_laws) == [tuple(law) for law in LAWS]
+    assert loaded.appl_data.category == CATEGORY
+    assert loaded.result.code == 0
+    info = loaded.appl_data.law_name_list_info
+    assert len(info) == len(LAWS)
+    assert info.law_ids == [law[0] for law in LAWS]
+    assert info.law_names == [law[1] for law in LAWS]
+    assert loaded.find_element_by_law_id("132AC0000000048").law_name == "商法"
+    assert loaded.find_element_by_law_name("日本国憲法").law_id == "321CONSTITUTION"
+    assert loaded.find_element_by_law_id("999AC0000000999") is None
+    assert loaded.find_element_by_law_name("") is None
+    elements = loaded.list_name_list_info
+    assert elements[-1].law_id == LAWS[-1][0]
+    assert [elem.law_id for elem in elements[1:3]] == [LAWS[1][0], LAWS[2][0]]
+    with pytest.raises(IndexError):
+        elements[len(LAWS)]
+
+    # replaced in place
+    save_snapshot(ListOfLaws(law_list_body(LAWS[:2], category=CATEGORY)), path)
+    assert _fields(load_snapshot(path)) == [tuple(law) for law in LAWS[:2]]
+
+
+def test_missing_fields(tmp_path):
+    list_of_laws = ListOfLaws.from_data(
+        Result(), ApplData(None, LawNameListInfo([
+            LawNameInfoElement("505AC0000000001", None, "令和五年法律第一号"),
+            LawNameInfoElement(None, "名前だけの法律"),
+            LawNameInfoElement("", ""),
+        ]))
+    )
+    path = str(tmp_path / "laws.snapshot")
+    save_snapshot(list_of_laws, path)
+    loaded = load_snapshot(path)
+    assert _fields(loaded) == [
+        ("505AC0000000001", None, "令和五年法律第一号", None),
+        (None, "名前だけの法律", None, None),
+        ("", "", None, None),
+    ]
+    assert loaded.appl_data.category is None
+    assert loaded.result.code is None and loaded.result.message is None
+    assert loaded.find_element_by_law_name("名前だけの法律").law_id is None
+
+    empty = ListOfLaws.from_data(Result(0), ApplData(1, LawNameListInfo([])))
+    save_snapshot(empty, path)
+    assert _fields(load_snapshot(path)) == []
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / "laws.snapshot"
+    path.write_bytes(b"<DataRoot/>".ljust(256, b"\0"))
+    with pytest.raises(ValueError):
+        load_snapshot(str(path))
+
+
+def test_load_or_acquire(fake_server, tmp_path):
+    fake_server.responses[LIST_PATH] = law_list_body(LAWS, category=CATEGORY)
+    path = str(tmp_path / "laws.snapshot")
+    acquired = load_or_acquire_laws_and_ordinances(1, CATEGORY, path)
+    assert fake_server.requests == 1
+    assert _fields(acquired) == [tuple(law) for law in LAWS]
+    assert os.path.exists(path)
+
+    # loaded from the snapshot without a request
+    fake_server.responses[LIST_PATH] = law_list_body(LAWS[:1], category=CATEGORY)
+    assert _fields(load_or_acquire_laws_and_ordinances(1, CATEGORY, path)) == _fields(acquired)
+    assert _fields(load_or_acquire_laws_and_ordinances(1, CATEGORY, path, max_age=60.0)) == _fields(acquired)
+    assert fake_server.requests == 1
+
+
+def test_refresh_after_max_age(fake_server, tmp_path):
+    fake_server.responses[LIST_PATH] = law_list_body(LAWS, category=CATEGORY)
+    path = str(tmp_path / "laws.snapshot")
+    cache = ResponseCache()
+    load_or_acquire_laws_and_ordinances(1, CATEGORY, path, cache=cache, max_age=60.0)
+
+    # unchanged: the snapshot is only touched
+    _age(path, 3600.0)
+    aged = os.path.getmtime(path)
+    with open(path, "rb") as file_:
+        before = file_.read()
+    loaded = load_or_acquire_laws_and_ordinances(1, CATEGORY, path, cache=cache, max_age=60.0)
+    assert fake_server.requests == 2
+    assert _fields(loaded) == [tuple(law) for law in LAWS]
+    with open(path, "rb") as file_:
+        assert file_.read() == before
+    assert os.path.getmtime(path) > aged + 3000.0
+
+    # changed: the snapshot is rewritten
+    _age(path, 3600.0)
+    fake_server.responses[LIST_PATH] = law_list_body(LAWS[:3], category=CATEGORY)
+    refreshed = load_or_acquire_laws_and_ordinances(1, CATEGORY, path, cache=cache, max_age=60.0)
+    assert fake_server.requests == 3
+    assert _fields(refreshed) == [tuple(law) for law in LAWS[:3]]
+    assert _fields(load_snapshot(path)) == [tuple(law) for law in LAWS[:3]]
+    assert load_or_acquire_laws_and_ordinances(1, CATEGORY, path, cache=cache, max_age=60.0)
+    assert fake_server.requests == 3
+
+
+def test_shared_snapshot(fake_server, tmp_path):
+    fake_server.responses[LIST_PATH] = law_list_body(LAWS, category=CATEGORY)
+    backend = FileSystemBackend(str(tmp_path / "shared"))
+    first = str(tmp_path / "first" / "laws.snapshot")
+    second = str(tmp_path / "second" / "laws.snapshot")
+    os.makedirs(os.path.dirname(first))
+    os.makedirs(os.path.dirname(second))
+    load_or_acquire_laws_and_ordinances(1, CATEGORY, first, cache=ResponseCache(backend=backend))
+    # another host takes the snapshot from the backend
+    loaded = load_or_acquire_laws_and_ordinances(1, CATEGORY, second, cache=ResponseCache(backend=backend))
+    assert fake_server.requests == 1
+    assert _fields(loaded) == [tuple(law) for law in LAWS]
+    with open(first, "rb") as file_, open(second, "rb") as other:
+        assert file_.read() == other.read()
+    assert os.listdir(os.path.dirname(second)) == ["laws.snapshot"]